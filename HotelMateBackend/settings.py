@@ -38,6 +38,12 @@ EMAIL_USE_TLS = True
 EMAIL_HOST_USER = env('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = env('EMAIL_HOST_PASSWORD')
 DEFAULT_FROM_EMAIL = f'HotelsMates <{EMAIL_HOST_USER}>'
+# Deliver transactional mail from a background worker (notifications.email_delivery)
+EMAIL_ASYNC_DELIVERY = env.bool('EMAIL_ASYNC_DELIVERY', default=True)
+# Generate stocktake/period exports in a background worker (stock_tracker.export_jobs)
+STOCK_EXPORT_ASYNC = env.bool('STOCK_EXPORT_ASYNC', default=True)
+# Build chat attachment thumbnails in a background worker (common.attachment_uploads)
+ATTACHMENT_ASYNC_PROCESSING = env.bool('ATTACHMENT_ASYNC_PROCESSING', default=True)
 
 # Frontend URL used for registration links, QR codes, password resets, etc.
 FRONTEND_BASE_URL = env('FRONTEND_BASE_URL', default='https://hotelsmates.com')
@@ -134,6 +140,10 @@ if 'test' in sys.argv:
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': ':memory:'
     }
+    # Send mail synchronously so tests can inspect mail.outbox
+    EMAIL_ASYNC_DELIVERY = False
+    STOCK_EXPORT_ASYNC = False
+    ATTACHMENT_ASYNC_PROCESSING = False
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -254,10 +264,16 @@ if CLOUDINARY_URL:
     # Use Cloudinary for media file storage
     DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
     MEDIA_URL = '/media/'  # Cloudinary will serve files
+    # Chat attachments are uploaded straight to Cloudinary (common.attachment_uploads)
+    ATTACHMENT_UPLOAD_BACKEND = 'common.attachment_uploads.CloudinaryUploadBackend'
+    # Stock export files must be shared by every dyno (stock_tracker.export_jobs);
+    # DEFAULT_FILE_STORAGE is ignored by Django 5, so default_storage is local disk
+    STOCK_EXPORT_STORAGE = 'common.storage.RawFileCloudinaryStorage'
 else:
     # Fallback to local storage for development
     MEDIA_URL = '/media/'
     MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+    ATTACHMENT_UPLOAD_BACKEND = 'common.attachment_uploads.LocalUploadBackend'
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -1,15 +1,16 @@
-from django.db.models import Sum, Count, Avg, F
+from django.db.models import Sum, Count, F, DecimalField
 from django.db.models.functions import ExtractWeek, ExtractYear
-from .models import StaffRoster
-from django.db.models import Sum, Count, Avg, DecimalField
 from django.db.models.functions import Coalesce
+from .daily_rollup import average_shift_length, roster_rows
+
+
+# Aggregates the StaffDailyAttendance rollup (attendance/daily_rollup.py)
+# rather than individual StaffRoster rows; output keys are unchanged.
 class RosterAnalytics:
     # Staff totals - alias nested fields to flat keys expected by serializers
     @staticmethod
     def staff_totals(hotel, start, end, department=None):
-        qs = StaffRoster.objects.filter(hotel=hotel, shift_date__range=[start, end])
-        if department:
-            qs = qs.filter(department__slug=department)
+        qs = roster_rows(hotel, start, end, department)
 
         return qs.values('staff_id').annotate(
             first_name=F('staff__first_name'),
@@ -17,61 +18,57 @@ class RosterAnalytics:
             department__id=F('department__id'),
             department_name=F('department__name'),
             department_slug=F('department__slug'),
-            total_rostered_hours=Sum('expected_hours'),
-            shifts_count=Count('id'),
-            avg_shift_length=Avg('expected_hours'),
+            total_rostered_hours=Sum('rostered_hours'),
+            shifts_count=Sum('shifts_count'),
+            avg_shift_length=average_shift_length(),
         ).order_by('department_name', 'last_name')
 
     # Department totals - renaming applied via annotate; avoid collision by aliasing department_id as dept_id
     @staticmethod
     def department_totals(hotel, start, end, department=None):
-        qs = StaffRoster.objects.filter(hotel=hotel, shift_date__range=[start, end], department__isnull=False)
-        if department:
-            qs = qs.filter(department__slug=department)
+        qs = roster_rows(hotel, start, end, department).filter(department__isnull=False)
 
         return qs.annotate(
             dept_id=F('department__id'),
             department_name=F('department__name'),
             department_slug=F('department__slug'),
         ).values('dept_id', 'department_name', 'department_slug').annotate(
-            total_rostered_hours=Sum('expected_hours'),
-            shifts_count=Count('id'),
-            avg_shift_length=Avg('expected_hours'),
+            total_rostered_hours=Sum('rostered_hours'),
+            shifts_count=Sum('shifts_count'),
+            avg_shift_length=average_shift_length(),
             unique_staff=Count('staff', distinct=True),
         ).order_by('department_name')
 
-    # Daily totals - rename shift_date -> date
+    # Daily totals
     @staticmethod
     def daily_totals(hotel, start, end, department=None):
-        qs = StaffRoster.objects.filter(hotel=hotel, shift_date__range=[start, end])
-        if department:
-            qs = qs.filter(department__slug=department)
+        qs = roster_rows(hotel, start, end, department)
 
-        return qs.annotate(date=F('shift_date')).values('date').annotate(
-            total_rostered_hours=Sum('expected_hours'),
-            shifts_count=Count('id'),
+        return qs.values('date').annotate(
+            total_rostered_hours=Sum('rostered_hours'),
+            shifts_count=Sum('shifts_count'),
         ).order_by('date')
 
     # Daily by department
     @staticmethod
     def daily_by_department(hotel, start, end):
-        qs = StaffRoster.objects.filter(hotel=hotel, shift_date__range=[start, end], department__isnull=False)
+        qs = roster_rows(hotel, start, end).filter(department__isnull=False)
 
         results = qs.values(
-            'shift_date',
+            'date',
             'department__id',
             'department__name',
             'department__slug'
         ).annotate(
-            total_rostered_hours=Sum('expected_hours'),
-            shifts_count=Count('id'),
+            total_rostered_hours=Sum('rostered_hours'),
+            shifts_count=Sum('shifts_count'),
             unique_staff=Count('staff', distinct=True),
-        ).order_by('shift_date', 'department__name')
+        ).order_by('date', 'department__name')
         
         # Transform to expected format
         return [
             {
-                'date': row['shift_date'],
+                'date': row['date'],
                 'dept_id': row['department__id'],
                 'department_name': row['department__name'],
                 'department_slug': row['department__slug'],
@@ -85,12 +82,10 @@ class RosterAnalytics:
     # Daily by staff
     @staticmethod
     def daily_by_staff(hotel, start, end, department=None):
-        qs = StaffRoster.objects.filter(hotel=hotel, shift_date__range=[start, end])
-        if department:
-            qs = qs.filter(department__slug=department)
+        qs = roster_rows(hotel, start, end, department)
 
         results = qs.values(
-            'shift_date',
+            'date',
             'staff_id',
             'staff__first_name',
             'staff__last_name',
@@ -98,14 +93,14 @@ class RosterAnalytics:
             'department__name',
             'department__slug'
         ).annotate(
-            total_rostered_hours=Sum('expected_hours'),
-            shifts_count=Count('id'),
-        ).order_by('shift_date', 'department__name', 'staff__last_name')
+            total_rostered_hours=Sum('rostered_hours'),
+            shifts_count=Sum('shifts_count'),
+        ).order_by('date', 'department__name', 'staff__last_name')
         
         # Transform to expected format
         return [
             {
-                'date': row['shift_date'],
+                'date': row['date'],
                 'staff_id': row['staff_id'],
                 'first_name': row['staff__first_name'],
                 'last_name': row['staff__last_name'],
@@ -121,33 +116,31 @@ class RosterAnalytics:
     # Weekly totals
     @staticmethod
     def weekly_totals(hotel, start, end, department=None):
-        qs = StaffRoster.objects.filter(hotel=hotel, shift_date__range=[start, end])
-        if department:
-            qs = qs.filter(department__slug=department)
+        qs = roster_rows(hotel, start, end, department)
 
         return qs.annotate(
-            year=ExtractYear('shift_date'),
-            week=ExtractWeek('shift_date'),
+            year=ExtractYear('date'),
+            week=ExtractWeek('date'),
         ).values('year', 'week').annotate(
-            total_rostered_hours=Sum('expected_hours'),
-            shifts_count=Count('id'),
+            total_rostered_hours=Sum('rostered_hours'),
+            shifts_count=Sum('shifts_count'),
             unique_staff=Count('staff', distinct=True),
         ).order_by('year', 'week')
 
     # Weekly by department
     @staticmethod
     def weekly_by_department(hotel, start, end):
-        qs = StaffRoster.objects.filter(hotel=hotel, shift_date__range=[start, end], department__isnull=False)
+        qs = roster_rows(hotel, start, end).filter(department__isnull=False)
 
         results = qs.values(
             'department__id',
             'department__name', 
             'department__slug'
         ).annotate(
-            year=ExtractYear('shift_date'),
-            week=ExtractWeek('shift_date'),
-            total_rostered_hours=Sum('expected_hours'),
-            shifts_count=Count('id'),
+            year=ExtractYear('date'),
+            week=ExtractWeek('date'),
+            total_rostered_hours=Sum('rostered_hours'),
+            shifts_count=Sum('shifts_count'),
             unique_staff=Count('staff', distinct=True),
         ).order_by('year', 'week', 'department__name')
         
@@ -169,9 +162,7 @@ class RosterAnalytics:
     # Weekly by staff
     @staticmethod
     def weekly_by_staff(hotel, start, end, department=None):
-        qs = StaffRoster.objects.filter(hotel=hotel, shift_date__range=[start, end])
-        if department:
-            qs = qs.filter(department__slug=department)
+        qs = roster_rows(hotel, start, end, department)
 
         results = qs.values(
             'staff_id',
@@ -181,10 +172,10 @@ class RosterAnalytics:
             'department__name',
             'department__slug'
         ).annotate(
-            year=ExtractYear('shift_date'),
-            week=ExtractWeek('shift_date'),
-            total_rostered_hours=Sum('expected_hours'),
-            shifts_count=Count('id'),
+            year=ExtractYear('date'),
+            week=ExtractWeek('date'),
+            total_rostered_hours=Sum('rostered_hours'),
+            shifts_count=Sum('shifts_count'),
         ).order_by('year', 'week', 'department__name', 'staff__last_name')
         
         # Transform to expected format
@@ -207,17 +198,18 @@ class RosterAnalytics:
     # KPIs method added here to avoid AttributeError
     @staticmethod
     def kpis(hotel, start, end, department=None):
-        qs = StaffRoster.objects.filter(hotel=hotel, shift_date__range=[start, end])
-        if department:
-            qs = qs.filter(department__slug=department)
+        qs = roster_rows(hotel, start, end, department)
 
-        total_hours = qs.aggregate(
-            total_hours=Coalesce(Sum('expected_hours'), 0, output_field=DecimalField())
-        )['total_hours']
-        total_shifts = qs.aggregate(total_shifts=Count('id'))['total_shifts']
-        unique_staff = qs.aggregate(unique_staff=Count('staff', distinct=True))['unique_staff']
-
-        avg_shift_length = qs.aggregate(avg_shift_length=Avg('expected_hours'))['avg_shift_length'] or 0
+        totals = qs.aggregate(
+            total_hours=Coalesce(Sum('rostered_hours'), 0, output_field=DecimalField()),
+            total_shifts=Coalesce(Sum('shifts_count'), 0),
+            unique_staff=Count('staff', distinct=True),
+            avg_shift_length=average_shift_length(),
+        )
+        total_hours = totals['total_hours']
+        total_shifts = totals['total_shifts']
+        unique_staff = totals['unique_staff']
+        avg_shift_length = totals['avg_shift_length'] or 0
 
         return {
             'total_rostered_hours': float(total_hours),  # convert Decimal to float if desired
@@ -0,0 +1,246 @@
+"""
+Daily attendance rollup (StaffDailyAttendance).
+
+Roster analytics and the staff attendance summary used to scan every
+StaffRoster / ClockLog row of the requested range, the summary once per
+staff member and metric. Here those rows are rolled up per hotel, staff
+member, date and department, and the readers sum the rollup instead.
+
+Signals (attendance/signals.py) refresh the affected staff-days after the
+transaction commits; paths writing with bulk_create / bulk_update call
+refresh_daily_attendance themselves. Existing data is backfilled by
+migration 0024; rebuild_daily_attendance repairs a date range (see the
+rebuild_daily_attendance management command).
+"""
+import threading
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Q, Sum
+from django.db.models.functions import Cast, Coalesce, NullIf, TruncDate
+from django.utils import timezone
+
+from .models import ClockLog, StaffDailyAttendance, StaffRoster
+
+EXCESSIVE_HOURS_THRESHOLD = 16
+
+# Closed and approved: counted as worked
+WORKED_LOG = Q(time_out__isnull=False, is_approved=True)
+
+ROSTER_AGGREGATES = {
+    'rostered_hours': Sum('expected_hours'),
+    'shifts_count': Count('id'),
+    'timed_shifts_count': Count('expected_hours'),
+}
+
+LOG_AGGREGATES = {
+    'clock_logs_count': Count('id'),
+    'worked_shifts': Count('id', filter=WORKED_LOG),
+    'worked_hours': Sum('hours_worked', filter=WORKED_LOG),
+    'open_logs_count': Count('id', filter=Q(time_out__isnull=True)),
+    'excessive_logs_count': Count('id', filter=Q(
+        time_out__isnull=False, hours_worked__gt=EXCESSIVE_HOURS_THRESHOLD
+    )),
+    'rejected_logs_count': Count('id', filter=Q(is_rejected=True)),
+    'unapproved_unrostered_count': Count('id', filter=Q(
+        is_unrostered=True, is_approved=False
+    )),
+}
+
+SUMMARY_FIELDS = (
+    'shifts_count',
+    'clock_logs_count',
+    'worked_shifts',
+    'worked_hours',
+    'open_logs_count',
+    'excessive_logs_count',
+    'rejected_logs_count',
+    'unapproved_unrostered_count',
+)
+
+
+def attendance_date(value):
+    """Date a clock log counts towards (matches time_in__date lookups)."""
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.date()
+
+
+def _staff_day(instance):
+    if isinstance(instance, StaffRoster):
+        return (instance.staff_id, instance.shift_date)
+    return (instance.staff_id, attendance_date(instance.time_in))
+
+
+def build_rollup_rows(roster_qs, log_qs, model=StaffDailyAttendance):
+    """
+    Unsaved rollup rows for the given shifts and clock logs.
+
+    Args:
+        model: the rollup model (migrations pass their historical model)
+    """
+    rows = {}
+
+    def row_for(values):
+        key = (values['hotel_id'], values['staff_id'], values['day'], values['dept'])
+        if key not in rows:
+            rows[key] = model(
+                hotel_id=key[0], staff_id=key[1], date=key[2], department_id=key[3]
+            )
+        return rows[key]
+
+    roster_totals = roster_qs.order_by().values(
+        'hotel_id', 'staff_id', day=F('shift_date'), dept=F('department_id')
+    ).annotate(**ROSTER_AGGREGATES)
+    for values in roster_totals:
+        row = row_for(values)
+        for name in ROSTER_AGGREGATES:
+            setattr(row, name, values[name] or 0)
+
+    log_totals = log_qs.order_by().values(
+        'hotel_id',
+        'staff_id',
+        day=TruncDate('time_in'),
+        dept=Coalesce('roster_shift__department_id', 'staff__department_id'),
+    ).annotate(**LOG_AGGREGATES)
+    for values in log_totals:
+        row = row_for(values)
+        for name in LOG_AGGREGATES:
+            setattr(row, name, values[name] or 0)
+
+    return list(rows.values())
+
+
+def _replace_rows(stale_qs, roster_qs, log_qs):
+    rows = build_rollup_rows(roster_qs, log_qs)
+    with transaction.atomic():
+        stale_qs.delete()
+        # A concurrent rebuild of the same day may have inserted first; both
+        # read committed data, so keeping either is fine.
+        StaffDailyAttendance.objects.bulk_create(rows, ignore_conflicts=True)
+    return len(rows)
+
+
+def rebuild_staff_days(staff_days):
+    """
+    Rebuild the rollup rows of the given (staff_id, date) pairs.
+
+    Returns:
+        int: number of rollup rows written
+    """
+    staff_by_date = defaultdict(set)
+    for staff_id, day in staff_days:
+        if staff_id is not None and day is not None:
+            staff_by_date[day].add(staff_id)
+    if not staff_by_date:
+        return 0
+
+    roster_filter, log_filter, stale_filter = Q(), Q(), Q()
+    for day, staff_ids in staff_by_date.items():
+        roster_filter |= Q(shift_date=day, staff_id__in=staff_ids)
+        log_filter |= Q(time_in__date=day, staff_id__in=staff_ids)
+        stale_filter |= Q(date=day, staff_id__in=staff_ids)
+
+    return _replace_rows(
+        StaffDailyAttendance.objects.filter(stale_filter),
+        StaffRoster.objects.filter(roster_filter),
+        ClockLog.objects.filter(log_filter),
+    )
+
+
+def rebuild_daily_attendance(hotel, start, end):
+    """
+    Rebuild a hotel's rollup rows for a date range (backfill / repair).
+
+    Returns:
+        int: number of rollup rows written
+    """
+    return _replace_rows(
+        StaffDailyAttendance.objects.filter(hotel=hotel, date__range=[start, end]),
+        StaffRoster.objects.filter(hotel=hotel, shift_date__range=[start, end]),
+        ClockLog.objects.filter(hotel=hotel, time_in__date__range=[start, end]),
+    )
+
+
+_pending = threading.local()
+
+
+def _flush_pending():
+    staff_days = getattr(_pending, 'staff_days', None)
+    if staff_days:
+        _pending.staff_days = set()
+        rebuild_staff_days(staff_days)
+
+
+def refresh_daily_attendance(instances=(), staff_days=()):
+    """
+    Rebuild the staff-days touched by roster shifts / clock logs on commit.
+
+    Days scheduled within one transaction are rebuilt together by the
+    first callback that runs.
+
+    Args:
+        instances: StaffRoster / ClockLog instances that were written
+        staff_days: extra (staff_id, date) pairs, e.g. a shift's old date
+    """
+    pending = getattr(_pending, 'staff_days', None)
+    if pending is None:
+        pending = _pending.staff_days = set()
+    pending.update(_staff_day(instance) for instance in instances)
+    pending.update(staff_days)
+    transaction.on_commit(_flush_pending)
+
+
+def roster_rows(hotel, start, end, department=None):
+    """Rollup rows of a hotel with rostered shifts in the range."""
+    qs = StaffDailyAttendance.objects.filter(
+        hotel=hotel, date__range=[start, end], shifts_count__gt=0
+    )
+    if department:
+        qs = qs.filter(department__slug=department)
+    return qs
+
+
+def average_shift_length():
+    """Aggregate: mean expected_hours of the rolled-up shifts."""
+    return Cast(Sum('rostered_hours'), FloatField()) / NullIf(
+        Sum('timed_shifts_count'), 0
+    )
+
+
+def attendance_totals(staff_ids, from_date, to_date):
+    """
+    Summed rollup per staff member for a date range.
+
+    Includes stale_open_logs: open logs older than 24 hours. That depends on
+    the current time, so it is counted from the (few) open logs directly.
+
+    Returns:
+        dict: staff_id -> dict of SUMMARY_FIELDS plus stale_open_logs
+    """
+    totals = {
+        row.pop('staff_id'): row
+        for row in StaffDailyAttendance.objects.filter(
+            staff_id__in=staff_ids, date__range=[from_date, to_date]
+        ).order_by().values('staff_id').annotate(
+            **{name: Sum(name) for name in SUMMARY_FIELDS}
+        )
+    }
+    for row in totals.values():
+        row['stale_open_logs'] = 0
+
+    with_open_logs = [
+        staff_id for staff_id, row in totals.items() if row['open_logs_count']
+    ]
+    if with_open_logs:
+        stale = ClockLog.objects.filter(
+            staff_id__in=with_open_logs,
+            time_in__date__range=[from_date, to_date],
+            time_out__isnull=True,
+            time_in__lt=timezone.now() - timedelta(hours=24),
+        ).order_by().values('staff_id').annotate(count=Count('id'))
+        for row in stale:
+            totals[row['staff_id']]['stale_open_logs'] = row['count']
+
+    return totals
@@ -406,10 +406,10 @@ class FaceManagementViewSet(AttendanceHotelScopedMixin, viewsets.GenericViewSet)
                 }, status=status.HTTP_200_OK)
             else:
                 # Clock in - create new log with roster checking
-                from .views import find_matching_shift_for_datetime
+                from .shift_windows import find_cached_matching_shift
                 
                 current_dt = now()
-                matching_shift = find_matching_shift_for_datetime(hotel, matched_staff, current_dt)
+                matching_shift = find_cached_matching_shift(hotel, matched_staff, current_dt)
                 
                 if matching_shift:
                     # Normal rostered clock-in (ONE STEP - AUTOMATIC)
@@ -11,7 +11,7 @@ Usage:
 from django.core.management.base import BaseCommand
 from django.utils.timezone import now
 from hotel.models import Hotel
-from attendance.utils import check_open_log_alerts_for_hotel
+from attendance.utils import sweep_open_log_alerts
 
 
 class Command(BaseCommand):
@@ -50,8 +50,8 @@ class Command(BaseCommand):
                 return
         else:
             # Check all hotels
-            hotels = Hotel.objects.filter(is_active=True)
-            hotels_count = hotels.count()
+            hotels = list(Hotel.objects.filter(is_active=True))
+            hotels_count = len(hotels)
 
         total_alerts = {
             'break_warnings': 0,
@@ -66,19 +66,31 @@ class Command(BaseCommand):
 
         self.stdout.write(f'Checking attendance alerts for {hotels_count} hotel(s)...')
 
-        for hotel in hotels:
-            if options['verbose']:
-                self.stdout.write(f'Processing {hotel.name} ({hotel.slug})...')
-
+        if options['dry_run']:
+            # In dry run mode, we'd need to implement a dry-run version
+            # of the alert checker or modify the existing one
+            for hotel in hotels:
+                self.stdout.write(f'  Would check alerts for {hotel.name}')
+        else:
+            # All hotels are classified and alerted in a single sweep
             try:
-                if options['dry_run']:
-                    # In dry run mode, we'd need to implement a dry-run version
-                    # of the alert checker or modify the existing one
-                    self.stdout.write(f'  Would check alerts for {hotel.name}')
+                results = sweep_open_log_alerts(hotels=hotels)
+            except Exception as e:
+                results = {}
+                self.stdout.write(
+                    self.style.ERROR(f'Error sweeping attendance alerts: {str(e)}')
+                )
+                if options['verbose']:
+                    import traceback
+                    self.stdout.write(traceback.format_exc())
+
+            for hotel in hotels:
+                alerts_sent = results.get(hotel.id)
+                if alerts_sent is None:
+                    if options['verbose']:
+                        self.stdout.write(f'  {hotel.name}: limits not enforced, skipped')
                     continue
 
-                alerts_sent = check_open_log_alerts_for_hotel(hotel)
-                
                 # Accumulate totals
                 for alert_type, count in alerts_sent.items():
                     total_alerts[alert_type] += count
@@ -91,16 +103,6 @@ class Command(BaseCommand):
                         f'{alerts_sent["hard_limit_warnings"]} hard limit alerts sent'
                     )
 
-            except Exception as e:
-                self.stdout.write(
-                    self.style.ERROR(
-                        f'Error processing {hotel.name}: {str(e)}'
-                    )
-                )
-                if options['verbose']:
-                    import traceback
-                    self.stdout.write(traceback.format_exc())
-
         # Summary
         end_time = now()
         duration = (end_time - start_time).total_seconds()
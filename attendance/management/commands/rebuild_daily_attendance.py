@@ -0,0 +1,82 @@
+"""
+Management command to (re)build the daily attendance rollup.
+
+Existing data is backfilled by migration 0024; use this to repair rows
+touched by writes that bypass the model signals.
+
+Usage:
+    python manage.py rebuild_daily_attendance
+    python manage.py rebuild_daily_attendance --hotel=hotel-slug
+    python manage.py rebuild_daily_attendance --from=2025-01-01 --to=2025-03-31
+"""
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from hotel.models import Hotel
+from attendance.daily_rollup import rebuild_daily_attendance
+from attendance.models import ClockLog, StaffRoster
+
+
+class Command(BaseCommand):
+    help = 'Rebuild StaffDailyAttendance rows from roster shifts and clock logs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hotel',
+            type=str,
+            help='Rebuild a specific hotel slug only',
+        )
+        parser.add_argument(
+            '--from',
+            dest='from_date',
+            type=str,
+            help='First date (YYYY-MM-DD); defaults to the earliest shift or log',
+        )
+        parser.add_argument(
+            '--to',
+            dest='to_date',
+            type=str,
+            help='Last date (YYYY-MM-DD); defaults to the latest shift or log',
+        )
+
+    def _parse_date(self, value):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f"Invalid date '{value}'. Use YYYY-MM-DD.")
+
+    def handle(self, *args, **options):
+        hotels = Hotel.objects.all()
+        if options['hotel']:
+            hotels = hotels.filter(slug=options['hotel'])
+            if not hotels.exists():
+                raise CommandError(f"Hotel '{options['hotel']}' not found")
+
+        for hotel in hotels:
+            shifts = StaffRoster.objects.filter(hotel=hotel).aggregate(
+                first=Min('shift_date'), last=Max('shift_date')
+            )
+            logs = ClockLog.objects.filter(hotel=hotel).aggregate(
+                first=Min('time_in__date'), last=Max('time_in__date')
+            )
+            firsts = [d for d in (shifts['first'], logs['first']) if d]
+            lasts = [d for d in (shifts['last'], logs['last']) if d]
+
+            start = (
+                self._parse_date(options['from_date']) if options['from_date']
+                else min(firsts, default=None)
+            )
+            end = (
+                self._parse_date(options['to_date']) if options['to_date']
+                else max(lasts, default=None)
+            )
+            if start is None or end is None:
+                self.stdout.write(f"{hotel.slug}: nothing to rebuild")
+                continue
+
+            rows = rebuild_daily_attendance(hotel, start, end)
+            self.stdout.write(
+                self.style.SUCCESS(f"{hotel.slug}: {rows} rows for {start} to {end}")
+            )
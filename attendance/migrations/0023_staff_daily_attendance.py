@@ -0,0 +1,42 @@
+# Generated by Django 5.2.4 on 2026-10-18 22:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0022_alter_clocklog_is_kiosk_mode'),
+        ('hotel', '0059_roombooking_integrity_dirty_at'),
+        ('staff', '0028_remove_operations_admin_role'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StaffDailyAttendance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('rostered_hours', models.DecimalField(decimal_places=2, default=0, max_digits=7)),
+                ('shifts_count', models.PositiveIntegerField(default=0)),
+                ('timed_shifts_count', models.PositiveIntegerField(default=0)),
+                ('clock_logs_count', models.PositiveIntegerField(default=0)),
+                ('worked_shifts', models.PositiveIntegerField(default=0, help_text='Closed, approved clock logs')),
+                ('worked_hours', models.DecimalField(decimal_places=2, default=0, help_text='hours_worked of closed, approved clock logs', max_digits=7)),
+                ('open_logs_count', models.PositiveIntegerField(default=0)),
+                ('excessive_logs_count', models.PositiveIntegerField(default=0)),
+                ('rejected_logs_count', models.PositiveIntegerField(default=0)),
+                ('unapproved_unrostered_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='daily_attendance', to='staff.department')),
+                ('hotel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_attendance', to='hotel.hotel')),
+                ('staff', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_attendance', to='staff.staff')),
+            ],
+            options={
+                'ordering': ['date'],
+                'indexes': [models.Index(fields=['hotel', 'date'], name='attendance__hotel_i_b3dfbe_idx'), models.Index(fields=['staff', 'date'], name='attendance__staff_i_896f96_idx')],
+                'unique_together': {('hotel', 'staff', 'date', 'department')},
+            },
+        ),
+    ]
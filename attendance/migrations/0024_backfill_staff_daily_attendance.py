@@ -0,0 +1,39 @@
+from django.db import migrations
+
+
+def backfill_daily_attendance(apps, schema_editor):
+    """Roll up existing shifts and clock logs, one hotel at a time."""
+    from attendance.daily_rollup import build_rollup_rows
+
+    StaffDailyAttendance = apps.get_model('attendance', 'StaffDailyAttendance')
+    StaffRoster = apps.get_model('attendance', 'StaffRoster')
+    ClockLog = apps.get_model('attendance', 'ClockLog')
+
+    hotel_ids = set(
+        StaffRoster.objects.order_by().values_list('hotel_id', flat=True).distinct()
+    ) | set(
+        ClockLog.objects.order_by().values_list('hotel_id', flat=True).distinct()
+    )
+    for hotel_id in hotel_ids:
+        StaffDailyAttendance.objects.filter(hotel_id=hotel_id).delete()
+        rows = build_rollup_rows(
+            StaffRoster.objects.filter(hotel_id=hotel_id),
+            ClockLog.objects.filter(hotel_id=hotel_id),
+            model=StaffDailyAttendance,
+        )
+        StaffDailyAttendance.objects.bulk_create(rows, batch_size=1000)
+
+
+def clear_daily_attendance(apps, schema_editor):
+    apps.get_model('attendance', 'StaffDailyAttendance').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0023_staff_daily_attendance'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_daily_attendance, clear_daily_attendance),
+    ]
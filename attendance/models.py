@@ -305,6 +305,63 @@ class StaffRoster(models.Model):
         )
 
 
+class StaffDailyAttendance(models.Model):
+    """
+    Daily attendance rollup per staff member and department.
+
+    Rebuilt from StaffRoster and ClockLog writes (attendance/daily_rollup.py)
+    so roster analytics and the attendance summary read a few summed rows
+    instead of scanning shifts and clock logs. Clock logs count towards the
+    department of their roster shift, else the staff member's department.
+    """
+    hotel = models.ForeignKey(
+        'hotel.Hotel', on_delete=models.CASCADE, related_name='daily_attendance'
+    )
+    staff = models.ForeignKey(
+        'staff.Staff', on_delete=models.CASCADE, related_name='daily_attendance'
+    )
+    department = models.ForeignKey(
+        'staff.Department',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='daily_attendance'
+    )
+    date = models.DateField()
+
+    # Roster
+    rostered_hours = models.DecimalField(max_digits=7, decimal_places=2, default=0)
+    shifts_count = models.PositiveIntegerField(default=0)
+    # Shifts with expected_hours set (denominator of the average shift length)
+    timed_shifts_count = models.PositiveIntegerField(default=0)
+
+    # Clock logs
+    clock_logs_count = models.PositiveIntegerField(default=0)
+    worked_shifts = models.PositiveIntegerField(
+        default=0, help_text="Closed, approved clock logs"
+    )
+    worked_hours = models.DecimalField(
+        max_digits=7, decimal_places=2, default=0,
+        help_text="hours_worked of closed, approved clock logs"
+    )
+    open_logs_count = models.PositiveIntegerField(default=0)
+    excessive_logs_count = models.PositiveIntegerField(default=0)
+    rejected_logs_count = models.PositiveIntegerField(default=0)
+    unapproved_unrostered_count = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('hotel', 'staff', 'date', 'department')
+        ordering = ['date']
+        indexes = [
+            models.Index(fields=['hotel', 'date']),
+            models.Index(fields=['staff', 'date']),
+        ]
+
+    def __str__(self):
+        return f"{self.staff} on {self.date}"
+
 
 class StaffAvailability(models.Model):
     staff = models.ForeignKey(
@@ -1,8 +1,11 @@
 # attendance/pdf_report.py
+import hashlib
 from io import BytesIO
 from datetime import datetime, date, time, timedelta
 from collections import defaultdict
+from typing import NamedTuple
 
+from django.core.cache import cache
 from reportlab.lib.pagesizes import A4, landscape, portrait
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet
@@ -13,6 +16,116 @@ from reportlab.platypus import (
 from reportlab.lib.units import cm
 
 
+# Rendered PDFs are cached by the rows they show (see cached_roster_pdf)
+ROSTER_PDF_TTL = 60 * 60
+
+
+# ---------------------- shared styles ------------------------ #
+# Built once per process instead of on every export.
+
+STYLES = getSampleStyleSheet()
+
+ANALYTICS_TABLE_STYLE = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+    ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+])
+
+LIST_TABLE_STYLE = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+    ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ("FONTSIZE", (0, 0), (-1, -1), 8),
+    ("ALIGN", (2, 1), (4, -1), "CENTER"),
+])
+
+WEEKLY_TABLE_STYLE = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+    ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ("FONTSIZE", (0, 0), (-1, -1), 7),
+    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ("ALIGN", (1, 1), (-1, -1), "CENTER"),
+    ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.whitesmoke, colors.lightyellow]),
+    # Make first column (Staff) a bit wider
+    ("COLWIDTHS", (0, 0), (0, -1), 4.5 * cm),
+])
+
+
+# ------------------------ data loading ----------------------- #
+
+class RosterRow(NamedTuple):
+    shift_date: date
+    staff_id: int
+    first_name: str
+    last_name: str
+    shift_start: time
+    shift_end: time
+    location_name: str
+
+
+ROSTER_ROW_FIELDS = (
+    "shift_date", "staff_id", "staff__first_name", "staff__last_name",
+    "shift_start", "shift_end", "location__name",
+)
+
+
+def roster_rows(shifts):
+    """
+    Flat RosterRow tuples for the PDF builders.
+
+    A StaffRoster queryset is read with one values_list() query (no model
+    instances or related objects); other iterables of shifts are converted
+    attribute by attribute.
+    """
+    if hasattr(shifts, "values_list"):
+        return [RosterRow(*values) for values in shifts.values_list(*ROSTER_ROW_FIELDS)]
+
+    rows = []
+    for s in shifts:
+        if isinstance(s, RosterRow):
+            rows.append(s)
+            continue
+        staff = getattr(s, "staff", None)
+        rows.append(RosterRow(
+            s.shift_date,
+            getattr(s, "staff_id", None) or getattr(staff, "id", None),
+            getattr(staff, "first_name", "") or "",
+            getattr(staff, "last_name", "") or "",
+            s.shift_start,
+            s.shift_end,
+            getattr(getattr(s, "location", None), "name", None),
+        ))
+    return rows
+
+
+def cached_roster_pdf(shifts, key_parts, render):
+    """
+    Rendered PDF for a roster, cached by the rows it is rendered from.
+
+    The rows are read with one query and fingerprinted, so any change that
+    shows up in the PDF (a shift, a renamed staff member or location) makes
+    a new entry; only the rendering is skipped on a hit.
+
+    Args:
+        shifts: StaffRoster queryset the PDF is built from
+        key_parts: everything else the PDF depends on (kind, title, meta...)
+        render: callable taking the RosterRows and producing the PDF bytes
+            on a cache miss
+    """
+    rows = roster_rows(shifts)
+    # Sorted: rows tied on the queryset ordering can come back in any order
+    digest = hashlib.md5(
+        repr((tuple(key_parts), sorted(map(repr, rows)))).encode()
+    ).hexdigest()
+    key = f"attendance:roster_pdf:{digest}"
+    pdf = cache.get(key)
+    if pdf is None:
+        pdf = render(rows)
+        cache.set(key, pdf, ROSTER_PDF_TTL)
+    return pdf
+
+
 # -------------------------- helpers -------------------------- #
 
 def _to_time(value):
@@ -38,13 +151,9 @@ def _fmt_hhmm(t):
         return str(t)
 
 
-def _safe_staff_name(staff, staff_id=None):
-    if not staff:
-        return f"#{staff_id or ''}".strip()
-    first = getattr(staff, "first_name", "") or ""
-    last = getattr(staff, "last_name", "") or ""
-    full = f"{first} {last}".strip()
-    return full or f"#{getattr(staff, 'id', staff_id) or ''}"
+def _row_staff_name(row):
+    full = f"{row.first_name or ''} {row.last_name or ''}".strip()
+    return full or f"#{row.staff_id or ''}".strip()
 
 
 # ------------------------------------------------------------- #
@@ -54,7 +163,10 @@ def build_roster_pdf(title, meta_lines, shifts, landscape_mode=True):
     """
     Flat list PDF (Date, Staff, Start, End, Hours, Location).
     Reused for daily & per-staff exports.
+
+    `shifts` may be a StaffRoster queryset, shift objects or RosterRows.
     """
+    rows = roster_rows(shifts)
     buf = BytesIO()
 
     page_size = landscape(A4) if landscape_mode else portrait(A4)
@@ -67,59 +179,41 @@ def build_roster_pdf(title, meta_lines, shifts, landscape_mode=True):
         bottomMargin=1.0 * cm,
     )
 
-    styles = getSampleStyleSheet()
     elems = []
 
     # ---- header
-    elems.append(Paragraph(title, styles["Title"]))
+    elems.append(Paragraph(title, STYLES["Title"]))
     for ml in meta_lines:
-        elems.append(Paragraph(ml, styles["Normal"]))
+        elems.append(Paragraph(ml, STYLES["Normal"]))
     elems.append(Spacer(1, 8))
 
-    # ---- analytics
-    shift_count = 0
+    # ---- shifts table (and analytics, in the same pass)
     total_hours = 0.0
-    for s in shifts:
+    data = [["Date", "Staff", "Start", "End", "Hours", "Location"]]
+    for s in rows:
         hrs = _hours_between(s.shift_date, s.shift_start, s.shift_end)
         total_hours += hrs
-        shift_count += 1
+        data.append([
+            s.shift_date.isoformat(),
+            _row_staff_name(s),
+            _fmt_hhmm(s.shift_start),
+            _fmt_hhmm(s.shift_end),
+            f"{hrs:.2f}",
+            s.location_name or "—",
+        ])
 
     analytics_table = Table(
         [["Metric", "Value"],
-         ["Total Shifts", shift_count],
+         ["Total Shifts", len(rows)],
          ["Total Hours", f"{total_hours:.2f}"]],
         hAlign='LEFT'
     )
-    analytics_table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-    ]))
+    analytics_table.setStyle(ANALYTICS_TABLE_STYLE)
     elems.append(analytics_table)
     elems.append(Spacer(1, 12))
 
-    # ---- shifts table
-    data = [["Date", "Staff", "Start", "End", "Hours", "Location"]]
-    for s in shifts:
-        hrs = _hours_between(s.shift_date, s.shift_start, s.shift_end)
-        staff_name = _safe_staff_name(getattr(s, "staff", None), getattr(s, "staff_id", None))
-        data.append([
-            s.shift_date.isoformat(),
-            staff_name,
-            _fmt_hhmm(s.shift_start),
-            _fmt_hhmm(s.shift_end),
-            f"{hrs:.2f}",
-            getattr(getattr(s, "location", None), "name", "—"),
-        ])
-
     tbl = Table(data, repeatRows=1)
-    tbl.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-        ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-        ("FONTSIZE", (0, 0), (-1, -1), 8),
-        ("ALIGN", (2, 1), (4, -1), "CENTER"),
-    ]))
+    tbl.setStyle(LIST_TABLE_STYLE)
 
     elems.append(tbl)
 
@@ -140,10 +234,11 @@ def build_weekly_roster_pdf(title, meta_lines, shifts, start_date, end_date):
     Args:
         title (str)
         meta_lines (list[str])
-        shifts (iterable[StaffRoster])
+        shifts (StaffRoster queryset, iterable[StaffRoster] or RosterRows)
         start_date (date)
         end_date (date)  # inclusive
     """
+    rows = roster_rows(shifts)
     buf = BytesIO()
 
     # a wide table; force landscape
@@ -156,13 +251,12 @@ def build_weekly_roster_pdf(title, meta_lines, shifts, start_date, end_date):
         bottomMargin=0.8 * cm,
     )
 
-    styles = getSampleStyleSheet()
     elems = []
 
     # header
-    elems.append(Paragraph(title, styles["Title"]))
+    elems.append(Paragraph(title, STYLES["Title"]))
     for ml in meta_lines:
-        elems.append(Paragraph(ml, styles["Normal"]))
+        elems.append(Paragraph(ml, STYLES["Normal"]))
     elems.append(Spacer(1, 8))
 
     # build days
@@ -178,14 +272,13 @@ def build_weekly_roster_pdf(title, meta_lines, shifts, start_date, end_date):
     total_hours = 0.0
     total_shifts = 0
 
-    for s in shifts:
-        sid = getattr(s, "staff_id", None) or getattr(getattr(s, "staff", None), "id", None)
+    for s in rows:
+        sid = s.staff_id
         if sid is None:
             continue
-        staff_name = _safe_staff_name(getattr(s, "staff", None), sid)
 
         if sid not in grouped:
-            grouped[sid] = {"name": staff_name, "by_date": defaultdict(list)}
+            grouped[sid] = {"name": _row_staff_name(s), "by_date": defaultdict(list)}
 
         grouped[sid]["by_date"][s.shift_date].append(s)
 
@@ -203,11 +296,7 @@ def build_weekly_roster_pdf(title, meta_lines, shifts, start_date, end_date):
         ],
         hAlign='LEFT'
     )
-    analytics_table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-    ]))
+    analytics_table.setStyle(ANALYTICS_TABLE_STYLE)
     elems.append(analytics_table)
     elems.append(Spacer(1, 12))
 
@@ -228,7 +317,7 @@ def build_weekly_roster_pdf(title, meta_lines, shifts, start_date, end_date):
                 # multiple shifts -> newline
                 lines = []
                 for s in day_shifts:
-                    loc = getattr(getattr(s, "location", None), "name", "") or ""
+                    loc = s.location_name or ""
                     st = _fmt_hhmm(s.shift_start)
                     en = _fmt_hhmm(s.shift_end)
                     lines.append(f"{st}–{en}{(' ' + loc) if loc else ''}")
@@ -236,19 +325,7 @@ def build_weekly_roster_pdf(title, meta_lines, shifts, start_date, end_date):
         data.append(row)
 
     tbl = Table(data, repeatRows=1)
-
-    # Some basic styling
-    tbl.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-        ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-        ("FONTSIZE", (0, 0), (-1, -1), 7),
-        ("VALIGN", (0, 0), (-1, -1), "TOP"),
-        ("ALIGN", (1, 1), (-1, -1), "CENTER"),
-        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.whitesmoke, colors.lightyellow]),
-        # Make first column (Staff) a bit wider
-        ("COLWIDTHS", (0, 0), (0, -1), 4.5 * cm),
-    ]))
+    tbl.setStyle(WEEKLY_TABLE_STYLE)
 
     elems.append(tbl)
 
@@ -275,13 +352,12 @@ def build_daily_plan_grouped_pdf(title, meta_lines, entries):
         topMargin=1.0 * cm,
         bottomMargin=1.0 * cm,
     )
-    styles = getSampleStyleSheet()
     elems = []
 
     # Title + meta
-    elems.append(Paragraph(title, styles["Title"]))
+    elems.append(Paragraph(title, STYLES["Title"]))
     for line in meta_lines:
-        elems.append(Paragraph(line, styles["Normal"]))
+        elems.append(Paragraph(line, STYLES["Normal"]))
     elems.append(Spacer(1, 12))
 
     # Group entries by location
@@ -293,8 +369,8 @@ def build_daily_plan_grouped_pdf(title, meta_lines, entries):
 
     # For each location, print heading and bulleted staff list
     for location, staff_list in grouped.items():
-        elems.append(Paragraph(location, styles["Heading2"]))
-        staff_items = [ListItem(Paragraph(staff, styles["Normal"]), leftIndent=10) for staff in staff_list]
+        elems.append(Paragraph(location, STYLES["Heading2"]))
+        staff_items = [ListItem(Paragraph(staff, STYLES["Normal"]), leftIndent=10) for staff in staff_list]
         elems.append(ListFlowable(staff_items, bulletType="bullet", start="•", leftIndent=15))
         elems.append(Spacer(1, 10))
 
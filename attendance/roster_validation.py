@@ -0,0 +1,205 @@
+"""
+Roster shift validation: duplicate and overlapping shifts.
+
+Shifts are normalised to integer minute intervals (an overnight shift ends
+the next day) and checked with one sorted sweep per staff member. A whole
+batch is validated together with the existing shifts of the affected staff,
+loaded in a single query, and every conflicting shift is reported with its
+index in the batch, so checking a bulk save or roster copy takes one query
+however many shifts it contains. The rows themselves are then written with
+bulk_create / bulk_update by the views.
+"""
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from itertools import chain
+from typing import NamedTuple, Optional
+
+from .models import StaffRoster
+
+MINUTES_PER_DAY = 24 * 60
+
+DUPLICATE = 'duplicate'
+OVERLAP = 'overlap'
+
+
+class ShiftInterval(NamedTuple):
+    staff_id: int
+    shift_date: date
+    shift_start: time
+    start: int  # minutes since 0001-01-01
+    end: int
+    index: Optional[int] = None  # position in the validated batch
+    shift_id: Optional[int] = None  # StaffRoster pk
+
+
+def parse_shift_date(value):
+    """date from a date/datetime/ISO string, None if unparseable."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_shift_time(value):
+    """time from a time or 'HH:MM[:SS]' string, None if unparseable."""
+    if isinstance(value, time):
+        return value
+    try:
+        return time.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def make_interval(staff_id, shift_date, shift_start, shift_end, index=None, shift_id=None):
+    """ShiftInterval for one shift, None if any field can't be parsed."""
+    shift_date = parse_shift_date(shift_date)
+    shift_start = parse_shift_time(shift_start)
+    shift_end = parse_shift_time(shift_end)
+    try:
+        staff_id = int(staff_id)
+    except (TypeError, ValueError):
+        return None
+    if shift_date is None or shift_start is None or shift_end is None:
+        return None
+
+    day = shift_date.toordinal() * MINUTES_PER_DAY
+    start = day + shift_start.hour * 60 + shift_start.minute
+    end = day + shift_end.hour * 60 + shift_end.minute
+    if end < start:
+        end += MINUTES_PER_DAY
+    return ShiftInterval(staff_id, shift_date, shift_start, start, end, index, shift_id)
+
+
+def shift_intervals(shifts):
+    """
+    Intervals for a batch of shifts.
+
+    Args:
+        shifts: dicts (staff/staff_id, shift_date, shift_start, shift_end,
+            optional id) or StaffRoster instances
+
+    Shifts with unparseable fields are left out; serializer validation
+    reports those.
+    """
+    intervals = []
+    for index, shift in enumerate(shifts):
+        if isinstance(shift, dict):
+            interval = make_interval(
+                shift.get('staff_id') or shift.get('staff'),
+                shift.get('shift_date'),
+                shift.get('shift_start'),
+                shift.get('shift_end'),
+                index=index,
+                shift_id=shift.get('id'),
+            )
+        else:
+            interval = make_interval(
+                shift.staff_id,
+                shift.shift_date,
+                shift.shift_start,
+                shift.shift_end,
+                index=index,
+                shift_id=shift.pk,
+            )
+        if interval is not None:
+            intervals.append(interval)
+    return intervals
+
+
+def load_existing_intervals(intervals, exclude_ids=()):
+    """
+    Stored shifts of the batch's staff around the batch's dates.
+
+    One query; the window is widened by a day either side so overnight
+    shifts crossing into it are included.
+    """
+    if not intervals:
+        return []
+
+    qs = StaffRoster.objects.filter(
+        staff_id__in={interval.staff_id for interval in intervals},
+        shift_date__range=[
+            min(interval.shift_date for interval in intervals) - timedelta(days=1),
+            max(interval.shift_date for interval in intervals) + timedelta(days=1),
+        ],
+    )
+    if exclude_ids:
+        qs = qs.exclude(id__in=list(exclude_ids))
+
+    return [
+        make_interval(staff_id, shift_date, shift_start, shift_end, shift_id=pk)
+        for pk, staff_id, shift_date, shift_start, shift_end in qs.values_list(
+            'id', 'staff_id', 'shift_date', 'shift_start', 'shift_end'
+        )
+    ]
+
+
+def _conflict(kind, interval, other):
+    # Report against the batch shift; `other` may be a stored one
+    if interval.index is None:
+        interval, other = other, interval
+    return {
+        'type': kind,
+        'index': interval.index,
+        'staff_id': interval.staff_id,
+        'shift_date': interval.shift_date.isoformat(),
+        'shift_start': interval.shift_start.strftime('%H:%M'),
+        'conflicts_with': {
+            'index': other.index,
+            'id': other.shift_id,
+            'shift_date': other.shift_date.isoformat(),
+            'shift_start': other.shift_start.strftime('%H:%M'),
+        },
+    }
+
+
+def find_roster_conflicts(intervals, existing=()):
+    """
+    Duplicate / overlapping shifts among a batch and stored shifts.
+
+    Same staff, date and start time is a duplicate (the StaffRoster unique
+    key); otherwise shifts overlap when one starts before another ends
+    (back-to-back shifts are fine). Conflicts between two stored shifts
+    are not reported.
+
+    Returns:
+        list of conflict dicts (type, index, staff_id, shift_date,
+        shift_start, conflicts_with), ordered by batch index
+    """
+    by_staff = defaultdict(list)
+    for interval in chain(intervals, existing):
+        by_staff[interval.staff_id].append(interval)
+
+    conflicts = []
+    for staff_intervals in by_staff.values():
+        # Stored shifts first among equal starts, then batch order, so
+        # duplicates point at the stored / earlier shift
+        staff_intervals.sort(key=lambda i: (i.start, -1 if i.index is None else i.index))
+        group_head = furthest = None
+        for interval in staff_intervals:
+            if group_head is not None and interval.start == group_head.start:
+                if interval.index is not None or group_head.index is not None:
+                    conflicts.append(_conflict(DUPLICATE, interval, group_head))
+            else:
+                group_head = interval
+                if furthest is not None and interval.start < furthest.end and (
+                    interval.index is not None or furthest.index is not None
+                ):
+                    conflicts.append(_conflict(OVERLAP, interval, furthest))
+            if furthest is None or interval.end > furthest.end:
+                furthest = interval
+
+    conflicts.sort(key=lambda conflict: conflict['index'])
+    return conflicts
+
+
+def find_conflicts_with_existing(shifts, exclude_ids=()):
+    """find_roster_conflicts() for a batch against the stored roster."""
+    intervals = shift_intervals(shifts)
+    return find_roster_conflicts(
+        intervals, load_existing_intervals(intervals, exclude_ids)
+    )
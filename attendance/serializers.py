@@ -136,18 +136,45 @@ class ShiftLocationSerializer(serializers.ModelSerializer):
         read_only_fields = ["hotel", "hotel_name", "hotel_slug"]
 
 
+class PreloadedRelatedFieldMixin:
+    """
+    Take related objects from ``context['preloaded'][field_name]``.
+
+    Bulk endpoints load every object a batch refers to up front, keyed by
+    the submitted value, so validating the batch doesn't run one lookup
+    per row. Values missing there are looked up (and rejected) as usual.
+    """
+
+    def to_internal_value(self, data):
+        preloaded = self.context.get('preloaded', {}).get(self.field_name, {})
+        obj = preloaded.get(str(data))
+        if obj is not None:
+            return obj
+        return super().to_internal_value(data)
+
+
+class PreloadedPrimaryKeyRelatedField(PreloadedRelatedFieldMixin, serializers.PrimaryKeyRelatedField):
+    pass
+
+
+class PreloadedSlugRelatedField(PreloadedRelatedFieldMixin, serializers.SlugRelatedField):
+    pass
+
+
 class StaffRosterSerializer(serializers.ModelSerializer):
+    serializer_related_field = PreloadedPrimaryKeyRelatedField
+
     staff_name = serializers.SerializerMethodField(read_only=True)
     period_title = serializers.CharField(source='period.title', read_only=True)
     location = ShiftLocationSerializer(read_only=True)
-    location_id = serializers.PrimaryKeyRelatedField(
+    location_id = PreloadedPrimaryKeyRelatedField(
         queryset=ShiftLocation.objects.all(),
         source="location",
         write_only=True,
         required=False,
         allow_null=True
     )
-    department = serializers.SlugRelatedField(
+    department = PreloadedSlugRelatedField(
         queryset=Department.objects.all(),
         slug_field='slug',
         required=True,
@@ -207,6 +234,13 @@ class StaffRosterSerializer(serializers.ModelSerializer):
 
     # ---------- validation ----------
 
+    def get_validators(self):
+        # Bulk saves check duplicates for the whole batch in one sweep
+        # (roster_validation) instead of one unique_together query per row
+        if self.context.get('conflicts_checked'):
+            return []
+        return super().get_validators()
+
     def validate(self, attrs):
         """
         Comprehensive validation using centralized overnight shift utilities.
@@ -221,7 +255,7 @@ class StaffRosterSerializer(serializers.ModelSerializer):
         location = attrs.get('location') or getattr(self.instance, 'location', None)
 
         # Hotel / period consistency
-        if hotel and period and hotel != period.hotel:
+        if hotel and period and hotel.pk != period.hotel_id:
             raise serializers.ValidationError(
                 "Hotel mismatch: period.hotel and hotel must be identical."
             )
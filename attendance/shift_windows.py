@@ -0,0 +1,149 @@
+"""
+Cached shift windows for clock-in matching.
+
+find_matching_shift_for_datetime queries the staff member's shifts for
+yesterday and today, which the clock-in paths did on every clock-in (and
+relink_day once per log). Here each hotel gets a cached map per day: staff id -> sorted
+(start, end, shift_date, shift_id) windows for the shifts of the day before,
+the day itself and the day after, so matching a clock-in is a lookup.
+
+The map is built on first use. When roster shifts change (signals.py;
+bulk_create paths call refresh_shift_windows) the day maps they appear in
+are deleted once the transaction commits and rebuilt on the next
+clock-in. SHIFT_WINDOWS_TTL is kept short, so a map rebuilt from a read
+that raced an edit is not served for long.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.timezone import is_aware, make_aware
+
+from .models import StaffRoster
+
+SHIFT_WINDOWS_TTL = 60 * 5
+
+
+def _cache_key(hotel_id, day):
+    return f"attendance:shift_windows:{hotel_id}:{day.isoformat()}"
+
+
+def _load_windows(hotel_id, first, last, staff_ids=None):
+    """(staff_id, shift_date) -> windows for shifts dated first..last."""
+    from .views import shift_to_datetime_range
+
+    qs = StaffRoster.objects.filter(
+        hotel_id=hotel_id,
+        shift_date__range=[first, last],
+        shift_start__isnull=False,
+        shift_end__isnull=False,
+    )
+    if staff_ids is not None:
+        qs = qs.filter(staff_id__in=staff_ids)
+
+    windows = defaultdict(list)
+    for pk, staff_id, shift_date, shift_start, shift_end in qs.values_list(
+        'id', 'staff_id', 'shift_date', 'shift_start', 'shift_end'
+    ):
+        start_dt, end_dt = shift_to_datetime_range(shift_date, shift_start, shift_end)
+        windows[(staff_id, shift_date)].append(
+            (make_aware(start_dt), make_aware(end_dt), shift_date, pk)
+        )
+    return windows
+
+
+def _day_map(windows, day, staff_ids):
+    days = (day - timedelta(days=1), day, day + timedelta(days=1))
+    return {
+        staff_id: sorted(
+            window for shift_day in days for window in windows.get((staff_id, shift_day), ())
+        )
+        for staff_id in staff_ids
+    }
+
+
+def get_shift_windows(hotel_id, day):
+    """Cached staff id -> windows map for a hotel and day."""
+    key = _cache_key(hotel_id, day)
+    day_windows = cache.get(key)
+    if day_windows is None:
+        windows = _load_windows(
+            hotel_id, day - timedelta(days=1), day + timedelta(days=1)
+        )
+        day_windows = _day_map(
+            windows, day, {staff_id for staff_id, _ in windows}
+        )
+        cache.set(key, day_windows, SHIFT_WINDOWS_TTL)
+    return day_windows
+
+
+def match_shift_id(hotel_id, staff_id, current_dt):
+    """
+    Id of the shift whose window contains current_dt, else None.
+
+    Only shifts dated the same day or the day before count (overnight
+    shifts); the earliest, then shortest, window wins.
+    """
+    if not is_aware(current_dt):
+        current_dt = make_aware(current_dt)
+    today = current_dt.date()
+    yesterday = today - timedelta(days=1)
+
+    # Windows are sorted by (start, end): the first hit is the earliest,
+    # then shortest
+    for start_dt, end_dt, shift_date, shift_id in get_shift_windows(hotel_id, today).get(staff_id, ()):
+        if start_dt > current_dt:
+            break
+        if shift_date in (yesterday, today) and current_dt <= end_dt:
+            return shift_id
+    return None
+
+
+def find_cached_matching_shift(hotel, staff, current_dt):
+    """
+    find_matching_shift_for_datetime() using the cached windows.
+
+    Only a match costs a query (to load the shift).
+    """
+    shift_id = match_shift_id(hotel.id, staff.id, current_dt)
+    if shift_id is None:
+        return None
+    return StaffRoster.objects.select_related('department').filter(pk=shift_id).first()
+
+
+def invalidate_shift_windows(hotel_id, shift_dates):
+    """
+    Drop the cached day maps that show shifts dated shift_dates.
+
+    Each shift date appears in the maps of the day before, itself and after.
+    """
+    days = {
+        shift_date + timedelta(days=offset)
+        for shift_date in shift_dates if shift_date is not None
+        for offset in (-1, 0, 1)
+    }
+    if days:
+        cache.delete_many([_cache_key(hotel_id, day) for day in days])
+
+
+def refresh_shift_windows(shifts=(), staff_days=()):
+    """
+    Drop the cached windows for written shifts once the transaction commits.
+
+    Args:
+        shifts: StaffRoster instances that were saved / deleted
+        staff_days: extra (hotel_id, staff_id, shift_date) triples, e.g. a
+            shift's previous date
+    """
+    by_hotel = defaultdict(set)
+    for shift in shifts:
+        by_hotel[shift.hotel_id].add(shift.shift_date)
+    for hotel_id, _, shift_date in staff_days:
+        by_hotel[hotel_id].add(shift_date)
+
+    def invalidate():
+        for hotel_id, shift_dates in by_hotel.items():
+            invalidate_shift_windows(hotel_id, shift_dates)
+
+    transaction.on_commit(invalidate)
@@ -0,0 +1,62 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import ClockLog, StaffRoster
+
+# ClockLog fields the daily rollup depends on; saves touching only others
+# (alert flags, break times, ...) leave it alone
+LOG_ROLLUP_FIELDS = {
+    'hotel', 'staff', 'time_in', 'time_out', 'hours_worked', 'roster_shift',
+    'is_unrostered', 'is_approved', 'is_rejected',
+}
+
+
+@receiver(pre_save, sender=StaffRoster)
+def remember_roster_staff_day(sender, instance, raw=False, **kwargs):
+    """Keep the shift's previous staff-day so moving it refreshes both."""
+    if instance.pk and not raw:
+        instance._previous_staff_day = StaffRoster.objects.filter(
+            pk=instance.pk
+        ).values_list('staff_id', 'shift_date').first()
+
+
+@receiver(post_save, sender=StaffRoster)
+@receiver(post_delete, sender=StaffRoster)
+def refresh_roster_derived_data(sender, instance, raw=False, **kwargs):
+    """Daily attendance rollup and cached clock-in shift windows."""
+    from .daily_rollup import refresh_daily_attendance
+    from .shift_windows import refresh_shift_windows
+
+    if raw:
+        return
+    previous = getattr(instance, '_previous_staff_day', None)
+    refresh_daily_attendance([instance], [previous] if previous else ())
+    refresh_shift_windows(
+        [instance], [(instance.hotel_id, *previous)] if previous else ()
+    )
+
+
+@receiver(pre_save, sender=ClockLog)
+def remember_log_staff_day(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Keep the log's previous staff-day so moving it refreshes both."""
+    from .daily_rollup import attendance_date
+
+    if (not instance.pk or raw
+            or (update_fields and not {'staff', 'time_in'} & set(update_fields))):
+        return
+    previous = ClockLog.objects.filter(pk=instance.pk).values_list(
+        'staff_id', 'time_in'
+    ).first()
+    if previous:
+        instance._previous_staff_day = (previous[0], attendance_date(previous[1]))
+
+
+@receiver(post_save, sender=ClockLog)
+@receiver(post_delete, sender=ClockLog)
+def refresh_log_daily_attendance(sender, instance, raw=False, update_fields=None, **kwargs):
+    from .daily_rollup import refresh_daily_attendance
+
+    if raw or (update_fields and not LOG_ROLLUP_FIELDS & set(update_fields)):
+        return
+    previous = getattr(instance, '_previous_staff_day', None)
+    refresh_daily_attendance([instance], [previous] if previous else ())
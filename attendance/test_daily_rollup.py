@@ -0,0 +1,180 @@
+"""
+Tests for the daily attendance rollup (attendance/daily_rollup.py).
+"""
+from datetime import time, timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from hotel.models import Hotel
+from staff.attendance_utils import (
+    attach_attendance_totals,
+    attendance_status_from_totals,
+    calculate_attendance_status,
+    calculate_worked_minutes,
+    count_attendance_issues,
+    count_issues_from_totals,
+    worked_minutes_from_totals,
+)
+from staff.models import Department, Staff
+from .analytics_roster import RosterAnalytics
+from .daily_rollup import rebuild_daily_attendance
+from .models import ClockLog, StaffDailyAttendance, StaffRoster
+
+
+class DailyRollupTests(TestCase):
+    """Roster / clock log writes keep the rollup in step with the source rows."""
+
+    def setUp(self):
+        self.hotel = Hotel.objects.create(name='Rollup Hotel', slug='rollup-hotel')
+        self.bar = Department.objects.create(hotel=self.hotel, name='Bar', slug='bar')
+        self.kitchen = Department.objects.create(
+            hotel=self.hotel, name='Kitchen', slug='kitchen'
+        )
+        self.staff = Staff.objects.create(
+            hotel=self.hotel,
+            department=self.bar,
+            first_name='Ann',
+            last_name='Byrne',
+            email='ann@example.com',
+        )
+        self.today = timezone.localdate()
+
+    def _shift(self, shift_date, start, hours, department=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return StaffRoster.objects.create(
+                hotel=self.hotel,
+                staff=self.staff,
+                department=department or self.bar,
+                shift_date=shift_date,
+                shift_start=time(start),
+                shift_end=time(start + int(hours)),
+                expected_hours=hours,
+            )
+
+    def _log(self, hours=None, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            log = ClockLog.objects.create(
+                hotel=self.hotel, staff=self.staff, **fields
+            )
+            if hours is not None:
+                log.time_out = log.time_in + timedelta(hours=hours)
+                log.hours_worked = Decimal(str(hours))
+                log.save()
+        return log
+
+    def test_rollup_follows_roster_and_log_writes(self):
+        shift = self._shift(self.today, 9, Decimal('8'))
+        self._shift(self.today, 18, Decimal('4'), department=self.kitchen)
+        self._log(hours=7.5, roster_shift=shift)
+        self._log(hours=17)
+
+        bar = StaffDailyAttendance.objects.get(department=self.bar, date=self.today)
+        self.assertEqual(bar.shifts_count, 1)
+        self.assertEqual(bar.rostered_hours, Decimal('8'))
+        self.assertEqual(bar.clock_logs_count, 2)
+        self.assertEqual(bar.worked_shifts, 2)
+        self.assertEqual(bar.worked_hours, Decimal('24.5'))
+        self.assertEqual(bar.excessive_logs_count, 1)
+        kitchen = StaffDailyAttendance.objects.get(
+            department=self.kitchen, date=self.today
+        )
+        self.assertEqual(kitchen.rostered_hours, Decimal('4'))
+        self.assertEqual(kitchen.clock_logs_count, 0)
+
+        # Moving the shift refreshes the old and the new day
+        tomorrow = self.today + timedelta(days=1)
+        shift.shift_date = tomorrow
+        with self.captureOnCommitCallbacks(execute=True):
+            shift.save()
+        self.assertEqual(
+            StaffDailyAttendance.objects.get(
+                department=self.bar, date=self.today
+            ).shifts_count,
+            0,
+        )
+        self.assertEqual(
+            StaffDailyAttendance.objects.get(
+                department=self.bar, date=tomorrow
+            ).shifts_count,
+            1,
+        )
+
+    def test_roster_analytics_read_the_rollup(self):
+        self._shift(self.today, 9, Decimal('8'))
+        self._shift(self.today, 18, Decimal('4'))
+        self._shift(self.today + timedelta(days=1), 9, Decimal('6'), self.kitchen)
+        end = self.today + timedelta(days=6)
+
+        kpis = RosterAnalytics.kpis(self.hotel, self.today, end)
+        self.assertEqual(kpis['total_rostered_hours'], 18.0)
+        self.assertEqual(kpis['total_shifts'], 3)
+        self.assertEqual(kpis['unique_staff'], 1)
+        self.assertEqual(kpis['avg_shift_length'], 6.0)
+
+        departments = {
+            row['department_slug']: row
+            for row in RosterAnalytics.department_totals(self.hotel, self.today, end)
+        }
+        self.assertEqual(departments['bar']['shifts_count'], 2)
+        self.assertEqual(departments['bar']['avg_shift_length'], 6.0)
+        self.assertEqual(departments['kitchen']['total_rostered_hours'], Decimal('6'))
+
+        daily = list(RosterAnalytics.daily_totals(self.hotel, self.today, end, 'bar'))
+        self.assertEqual(
+            [(row['date'], row['shifts_count']) for row in daily], [(self.today, 2)]
+        )
+
+    def test_attendance_totals_match_per_staff_calculations(self):
+        self._shift(self.today, 9, Decimal('8'))
+        self._shift(self.today, 18, Decimal('4'))
+        self._shift(self.today - timedelta(days=1), 9, Decimal('8'))
+        self._log(hours=6.25)
+        self._log(is_unrostered=True, is_approved=False)
+        start = self.today - timedelta(days=1)
+
+        staff = Staff.objects.get(pk=self.staff.pk)
+        with self.assertNumQueries(2):
+            attach_attendance_totals([staff], start, self.today)
+        totals = staff.attendance_totals
+
+        self.assertEqual(totals['shifts_count'], 3)
+        self.assertEqual(totals['worked_shifts'], 1)
+        self.assertEqual(
+            worked_minutes_from_totals(totals),
+            calculate_worked_minutes(staff, start, self.today),
+        )
+        self.assertEqual(
+            count_issues_from_totals(totals),
+            count_attendance_issues(staff, start, self.today),
+        )
+        self.assertEqual(
+            attendance_status_from_totals(staff, totals),
+            calculate_attendance_status(staff, start, self.today),
+        )
+
+    def test_rebuild_matches_incremental_rows(self):
+        self._shift(self.today, 9, Decimal('8'))
+        self._log(hours=8)
+        fields = ('department_id', 'date', 'shifts_count', 'worked_hours')
+        incremental = list(StaffDailyAttendance.objects.values_list(*fields))
+
+        StaffDailyAttendance.objects.all().delete()
+        rebuild_daily_attendance(self.hotel, self.today, self.today)
+
+        self.assertEqual(
+            list(StaffDailyAttendance.objects.values_list(*fields)), incremental
+        )
+
+    def test_moving_a_log_refreshes_its_old_day(self):
+        log = self._log(hours=8)
+        yesterday = self.today - timedelta(days=1)
+
+        log.time_in -= timedelta(days=1)
+        log.time_out -= timedelta(days=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            log.save()
+
+        worked = dict(StaffDailyAttendance.objects.values_list('date', 'worked_hours'))
+        self.assertEqual(worked, {yesterday: Decimal('8')})
@@ -0,0 +1,88 @@
+"""
+Tests for roster PDF rows and caching (attendance/pdf_report.py).
+"""
+from datetime import date, time
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from hotel.models import Hotel
+from staff.models import Staff
+from .models import StaffRoster
+from .pdf_report import (
+    RosterRow,
+    build_roster_pdf,
+    build_weekly_roster_pdf,
+    cached_roster_pdf,
+    roster_rows,
+)
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+)
+class RosterPdfTests(TestCase):
+    """PDFs are built from flat rows and cached by the rows they show."""
+
+    def setUp(self):
+        cache.clear()
+        self.hotel = Hotel.objects.create(name='PDF Hotel', slug='pdf-hotel')
+        self.staff = Staff.objects.create(
+            hotel=self.hotel, first_name='Ann', last_name='Byrne', email='ann@example.com'
+        )
+        self.shift = StaffRoster.objects.create(
+            hotel=self.hotel,
+            staff=self.staff,
+            shift_date=date(2025, 3, 3),
+            shift_start=time(22),
+            shift_end=time(6),
+        )
+        self.qs = StaffRoster.objects.filter(hotel=self.hotel)
+
+    def test_rows_come_from_one_query(self):
+        with self.assertNumQueries(1):
+            rows = roster_rows(self.qs)
+
+        self.assertEqual(rows, [RosterRow(
+            date(2025, 3, 3), self.staff.id, 'Ann', 'Byrne', time(22), time(6), None
+        )])
+        self.assertEqual(roster_rows([self.shift]), rows)
+
+    def test_builders_accept_querysets_and_rows(self):
+        for shifts in (self.qs, roster_rows(self.qs)):
+            self.assertTrue(build_roster_pdf('Daily', ['Meta'], shifts).startswith(b'%PDF'))
+            self.assertTrue(build_weekly_roster_pdf(
+                'Weekly', ['Meta'], shifts, date(2025, 3, 3), date(2025, 3, 9)
+            ).startswith(b'%PDF'))
+
+    def test_pdf_is_rendered_again_only_after_roster_changes(self):
+        renders = []
+
+        def render(rows):
+            renders.append(1)
+            return build_roster_pdf('Daily', [], rows)
+
+        first = cached_roster_pdf(self.qs, ('daily',), render)
+        self.assertEqual(cached_roster_pdf(self.qs, ('daily',), render), first)
+        self.assertEqual(len(renders), 1)
+
+        cached_roster_pdf(self.qs, ('daily', 'other department'), render)
+        self.assertEqual(len(renders), 2)
+
+        self.shift.shift_end = time(7)
+        self.shift.save()
+        cached_roster_pdf(self.qs, ('daily',), render)
+        self.assertEqual(len(renders), 3)
+
+        # Names shown on the PDF, though the shifts themselves are unchanged
+        self.staff.last_name = 'Walsh'
+        self.staff.save()
+        cached_roster_pdf(self.qs, ('daily',), render)
+        self.assertEqual(len(renders), 4)
+
+        with self.assertNumQueries(1):
+            cached_roster_pdf(self.qs, ('daily',), render)
+
+        self.shift.delete()
+        cached_roster_pdf(self.qs, ('daily',), render)
+        self.assertEqual(len(renders), 5)
@@ -0,0 +1,180 @@
+"""
+Tests for roster duplicate / overlap detection (attendance/roster_validation.py).
+"""
+from datetime import date, time
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from hotel.models import Hotel
+from staff.models import Department, Staff
+from .models import RosterPeriod, StaffRoster
+from .roster_validation import (
+    DUPLICATE,
+    OVERLAP,
+    find_conflicts_with_existing,
+    find_roster_conflicts,
+    shift_intervals,
+)
+from .views import StaffRosterViewSet
+
+
+def _shift(staff, day, start, end, **extra):
+    return {'staff': staff, 'shift_date': day, 'shift_start': start, 'shift_end': end, **extra}
+
+
+class FindRosterConflictsTests(SimpleTestCase):
+    """Batches are checked with one sweep per staff member."""
+
+    def test_reports_every_conflicting_shift_with_its_index(self):
+        conflicts = find_roster_conflicts(shift_intervals([
+            _shift(1, '2025-03-03', '09:00', '17:00'),
+            _shift(1, '2025-03-03', '17:00', '22:00'),     # back-to-back: fine
+            _shift(2, '2025-03-03', '09:00', '17:00'),     # other staff: fine
+            _shift(1, '2025-03-03', '12:00:00', '14:00'),  # inside the first
+            _shift(1, '2025-03-03', '09:00', '11:00'),     # same start
+            _shift(1, '2025-03-04', 'nonsense', '11:00'),  # unparseable: skipped
+        ]))
+
+        self.assertEqual(
+            [(c['index'], c['type'], c['conflicts_with']['index']) for c in conflicts],
+            [(3, OVERLAP, 0), (4, DUPLICATE, 0)],
+        )
+
+    def test_overnight_shift_overlaps_next_morning(self):
+        conflicts = find_roster_conflicts(shift_intervals([
+            _shift(1, date(2025, 3, 3), time(22), time(6)),
+            _shift(1, date(2025, 3, 4), time(5), time(13)),
+            _shift(1, date(2025, 3, 4), time(22), time(6)),
+        ]))
+
+        self.assertEqual([(c['index'], c['type']) for c in conflicts], [(1, OVERLAP)])
+        self.assertEqual(conflicts[0]['conflicts_with']['shift_date'], '2025-03-03')
+
+
+class ConflictsWithExistingTests(TestCase):
+    """Stored shifts are loaded in one query and conflicts point at them."""
+
+    def setUp(self):
+        self.hotel = Hotel.objects.create(name='Roster Hotel', slug='roster-hotel')
+        self.staff = Staff.objects.create(
+            hotel=self.hotel, first_name='Ann', last_name='Byrne', email='ann@example.com'
+        )
+        self.stored = StaffRoster.objects.create(
+            hotel=self.hotel,
+            staff=self.staff,
+            shift_date=date(2025, 3, 2),
+            shift_start=time(20),
+            shift_end=time(2),
+        )
+
+    def test_batch_is_checked_against_stored_shifts_in_one_query(self):
+        new_shifts = [
+            StaffRoster(
+                hotel=self.hotel,
+                staff=self.staff,
+                shift_date=date(2025, 3, day),
+                shift_start=time(hour),
+                shift_end=time(hour + 8),
+            )
+            for day in range(3, 10)
+            for hour in (1, 9)
+        ]
+
+        with self.assertNumQueries(1):
+            conflicts = find_conflicts_with_existing(new_shifts)
+
+        self.assertEqual(len(conflicts), 1)
+        self.assertEqual(conflicts[0]['index'], 0)
+        self.assertEqual(conflicts[0]['conflicts_with']['id'], self.stored.id)
+
+    def test_excluded_shift_is_not_a_conflict(self):
+        moved = _shift(self.staff.id, '2025-03-02', '21:00', '01:00', id=self.stored.id)
+
+        self.assertEqual(
+            find_conflicts_with_existing([moved], exclude_ids=[self.stored.id]), []
+        )
+        self.assertEqual(
+            find_conflicts_with_existing([moved])[0]['type'], OVERLAP
+        )
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+)
+class BulkSaveQueriesTests(TestCase):
+    """bulk-save runs the same queries for 2 shifts as for 40."""
+
+    def setUp(self):
+        self.hotel = Hotel.objects.create(name='Roster Hotel', slug='roster-hotel')
+        self.department = Department.objects.create(
+            hotel=self.hotel, name='Bar', slug='bar'
+        )
+        self.period = RosterPeriod.objects.create(
+            hotel=self.hotel, title='March', start_date=date(2025, 3, 1),
+            end_date=date(2025, 3, 31),
+        )
+        self.user = User.objects.create_user('ann', password='x', is_superuser=True)
+        self.manager = Staff.objects.create(
+            user=self.user, hotel=self.hotel, first_name='Ann', last_name='Byrne',
+            email='ann@example.com',
+        )
+        self.staff = [
+            Staff.objects.create(
+                hotel=self.hotel, first_name=f'Staff {i}', last_name='X',
+                email=f'staff{i}@example.com',
+            )
+            for i in range(4)
+        ]
+        self.stored = [
+            StaffRoster.objects.create(
+                hotel=self.hotel, staff=staff, period=self.period,
+                department=self.department, shift_date=date(2025, 3, 1),
+                shift_start=time(9), shift_end=time(17),
+            )
+            for staff in self.staff
+        ]
+
+    def _bulk_save(self, days, start_day=2):
+        shifts = [
+            {
+                'staff': staff.id,
+                'department': 'bar',
+                'shift_date': f'2025-03-{day:02d}',
+                'shift_start': '09:00',
+                'shift_end': '17:00',
+            }
+            for day in range(start_day, start_day + days)
+            for staff in self.staff[:2]
+        ]
+        shifts += [
+            {'id': shift.id, 'shift_start': f'{8 + days % 2}:00'}
+            for shift in self.stored[:days]
+        ]
+        request = APIRequestFactory().post('/', {
+            'hotel': self.hotel.id, 'period': self.period.id, 'shifts': shifts,
+        }, format='json')
+        force_authenticate(request, user=self.user)
+        return StaffRosterViewSet.as_view({'post': 'bulk_save'})(
+            request, hotel_slug=self.hotel.slug
+        )
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        with CaptureQueriesContext(connection) as small:
+            response = self._bulk_save(1)
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual((len(response.data['created']), len(response.data['updated'])), (2, 1))
+
+        with self.assertNumQueries(len(small)):
+            response = self._bulk_save(20, start_day=5)
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual((len(response.data['created']), len(response.data['updated'])), (40, 4))
+        self.assertEqual(response.data['created'][0]['department_name'], 'Bar')
+        self.assertEqual(response.data['updated'][0]['staff_name'], 'Staff 0 X')
+
+        shift = StaffRoster.objects.get(pk=self.stored[0].pk)
+        self.assertEqual(shift.shift_start, time(8))
+        self.assertEqual(shift.approved_by, self.manager)
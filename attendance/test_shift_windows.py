@@ -0,0 +1,71 @@
+"""
+Tests for cached clock-in shift windows (attendance/shift_windows.py).
+"""
+from datetime import date, datetime, time, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from hotel.models import Hotel
+from staff.models import Staff
+from .models import StaffRoster
+from .shift_windows import find_cached_matching_shift, match_shift_id
+
+
+def _at(day, hour, minute=0):
+    return datetime(2025, 3, day, hour, minute, tzinfo=dt_timezone.utc)
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+)
+class ShiftWindowTests(TestCase):
+    """Clock-ins are matched from a per-hotel daily map dropped on edits."""
+
+    def setUp(self):
+        cache.clear()
+        self.hotel = Hotel.objects.create(name='Window Hotel', slug='window-hotel')
+        self.staff = Staff.objects.create(
+            hotel=self.hotel, first_name='Ann', last_name='Byrne', email='ann@example.com'
+        )
+        self.night = self._shift(date(2025, 3, 2), time(22), time(6))
+        self.day = self._shift(date(2025, 3, 3), time(9), time(17))
+
+    def _shift(self, shift_date, start, end):
+        with self.captureOnCommitCallbacks(execute=True):
+            return StaffRoster.objects.create(
+                hotel=self.hotel,
+                staff=self.staff,
+                shift_date=shift_date,
+                shift_start=start,
+                shift_end=end,
+            )
+
+    def test_matches_day_and_overnight_shifts(self):
+        self.assertEqual(match_shift_id(self.hotel.id, self.staff.id, _at(3, 5)), self.night.id)
+        self.assertEqual(match_shift_id(self.hotel.id, self.staff.id, _at(3, 12)), self.day.id)
+        self.assertIsNone(match_shift_id(self.hotel.id, self.staff.id, _at(3, 7)))
+
+        shift = find_cached_matching_shift(self.hotel, self.staff, _at(3, 9))
+        self.assertEqual(shift, self.day)
+
+    def test_lookups_after_the_first_are_served_from_the_cache(self):
+        match_shift_id(self.hotel.id, self.staff.id, _at(3, 12))
+
+        with self.assertNumQueries(0):
+            self.assertIsNone(match_shift_id(self.hotel.id, self.staff.id, _at(3, 18)))
+            self.assertEqual(
+                match_shift_id(self.hotel.id, self.staff.id, _at(3, 16)), self.day.id
+            )
+
+    def test_roster_edits_drop_the_cached_map(self):
+        self.assertIsNone(match_shift_id(self.hotel.id, self.staff.id, _at(3, 18)))
+
+        self.day.shift_end = time(20)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.day.save()
+        self.assertEqual(match_shift_id(self.hotel.id, self.staff.id, _at(3, 18)), self.day.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.day.delete()
+        self.assertIsNone(match_shift_id(self.hotel.id, self.staff.id, _at(3, 12)))
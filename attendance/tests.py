@@ -1420,4 +1420,114 @@ class AttendanceSettingsTestCase(MultiHotelSecurityTestCase):
         self.assertEqual(AttendanceSettings.objects.filter(hotel=self.hotel_b).count(), 1)
 
 
+class AttendanceSweepTestCase(TestCase):
+    """Test bulk alert and auto clock-out sweeps across hotels"""
+    
+    def setUp(self):
+        from django.utils.timezone import now
+        from hotel.models import AttendanceSettings
+        
+        self.hotel_a = Hotel.objects.create(name="Sweep Alpha", slug="sweep-alpha")
+        self.hotel_b = Hotel.objects.create(name="Sweep Beta", slug="sweep-beta")
+        
+        # Settings are auto-created by the hotel signal; tighten them per hotel
+        AttendanceSettings.objects.filter(hotel=self.hotel_a).update(
+            break_warning_hours=1.0, overtime_warning_hours=2.0, hard_limit_hours=3.0
+        )
+        AttendanceSettings.objects.filter(hotel=self.hotel_b).update(
+            break_warning_hours=4.0, overtime_warning_hours=5.0, hard_limit_hours=6.0
+        )
+        
+        self.staff_a = self._create_staff(self.hotel_a, "alice")
+        self.staff_b = self._create_staff(self.hotel_b, "bob")
+        self.now = now()
+    
+    def _create_staff(self, hotel, username):
+        user = User.objects.create_user(username=username, password="pass12345")
+        return Staff.objects.create(
+            user=user, hotel=hotel, first_name=username.title(), last_name="Test",
+            duty_status='on_duty', is_on_duty=True
+        )
+    
+    def _open_log(self, hotel, staff, hours_ago, **extra):
+        log = ClockLog.objects.create(hotel=hotel, staff=staff, **extra)
+        ClockLog.objects.filter(pk=log.pk).update(time_in=self.now - timedelta(hours=hours_ago))
+        return log
+    
+    def test_alert_sweep_uses_each_hotels_thresholds(self):
+        from unittest.mock import patch
+        from .utils import sweep_open_log_alerts
+        
+        log_a = self._open_log(self.hotel_a, self.staff_a, 2.5)
+        log_b = self._open_log(self.hotel_b, self.staff_b, 2.5)
+        
+        with patch('attendance.utils.pusher_trigger_batch', return_value=0) as mock_batch:
+            results = sweep_open_log_alerts()
+            again = sweep_open_log_alerts()
+        
+        self.assertEqual(results[self.hotel_a.id], {
+            'break_warnings': 1, 'overtime_warnings': 1, 'hard_limit_warnings': 0,
+        })
+        self.assertEqual(results[self.hotel_b.id], {
+            'break_warnings': 0, 'overtime_warnings': 0, 'hard_limit_warnings': 0,
+        })
+        # Flags persisted, so the second sweep sends nothing
+        self.assertEqual(again[self.hotel_a.id]['break_warnings'], 0)
+        self.assertEqual(mock_batch.call_count, 1)
+        self.assertEqual(len(mock_batch.call_args[0][0]), 4)  # 2 warnings x (staff + managers)
+        
+        log_a.refresh_from_db()
+        log_b.refresh_from_db()
+        self.assertTrue(log_a.break_warning_sent)
+        self.assertTrue(log_a.overtime_warning_sent)
+        self.assertFalse(log_a.hard_limit_warning_sent)
+        self.assertFalse(log_b.break_warning_sent)
+    
+    def test_auto_clock_out_sweep(self):
+        from unittest.mock import patch
+        from .utils import sweep_auto_clock_out
+        
+        warned = self._open_log(self.hotel_a, self.staff_a, 4, hard_limit_warning_sent=True)
+        not_warned = self._open_log(self.hotel_b, self.staff_b, 7)
+        
+        with patch('attendance.utils.pusher_trigger_batch', return_value=0), \
+                patch('notifications.notification_manager.pusher_trigger_batch', return_value=0):
+            dry = sweep_auto_clock_out(dry_run=True)
+            results = sweep_auto_clock_out()
+        
+        self.assertEqual(dry[self.hotel_a.id]['found'], 1)
+        self.assertEqual(dry[self.hotel_a.id]['clocked_out'], 0)
+        self.assertEqual(results[self.hotel_a.id]['clocked_out'], 1)
+        self.assertEqual(results[self.hotel_b.id]['found'], 0)  # No hard limit warning yet
+        
+        warned.refresh_from_db()
+        not_warned.refresh_from_db()
+        self.staff_a.refresh_from_db()
+        self.assertIsNotNone(warned.time_out)
+        self.assertTrue(warned.auto_clock_out)
+        self.assertIsNone(not_warned.time_out)
+        self.assertFalse(self.staff_a.is_on_duty)
+        self.assertEqual(self.staff_a.duty_status, 'off_duty')
+    
+    def test_bulk_clock_status_uses_loaded_logs(self):
+        from unittest.mock import patch
+        from notifications.notification_manager import notification_manager
+        
+        log = self._open_log(self.hotel_a, self.staff_a, 1)
+        Staff.objects.filter(pk=self.staff_a.pk).update(duty_status='on_break')
+        staff = Staff.objects.select_related(
+            'user', 'department', 'role', 'hotel'
+        ).get(pk=self.staff_a.pk)
+        
+        with patch('notifications.notification_manager.pusher_trigger_batch',
+                   return_value=0) as mock_batch, self.assertNumQueries(0):
+            notification_manager.realtime_attendance_clock_status_updated_bulk(
+                [staff], 'start_break', clock_logs={staff.id: log}
+            )
+        
+        payload = mock_batch.call_args[0][0][0]['data']['payload']
+        self.assertEqual(payload['current_status']['status'], 'on_break')
+        self.assertIn('total_break_minutes', payload['current_status'])
+
+
 # Run tests with: python manage.py test attendance.tests
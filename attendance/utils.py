@@ -3,8 +3,13 @@ Attendance system utilities for Phase 4 implementation.
 Includes attendance settings helpers and break/overtime alert system.
 """
 
+import logging
+from datetime import timedelta
+
 from django.utils.timezone import now
-from chat.utils import pusher_client
+from chat.utils import pusher_client, pusher_trigger_batch
+
+logger = logging.getLogger(__name__)
 
 
 def get_attendance_settings(hotel):
@@ -45,65 +50,269 @@ def check_open_log_alerts_for_hotel(hotel):
     Returns:
         dict: Summary of alerts sent
     """
+    # Ensure the hotel has settings before the sweep reads them
+    get_attendance_settings(hotel)
+    
+    results = sweep_open_log_alerts(hotels=[hotel])
+    return results.get(hotel.id, _empty_alert_summary())
+
+
+# (flag field on ClockLog, threshold field on AttendanceSettings, summary key)
+ALERT_LEVELS = (
+    ('break_warning_sent', 'break_warning_hours', 'break_warnings'),
+    ('overtime_warning_sent', 'overtime_warning_hours', 'overtime_warnings'),
+    ('hard_limit_warning_sent', 'hard_limit_hours', 'hard_limit_warnings'),
+)
+
+
+def _empty_alert_summary():
+    return {
+        'break_warnings': 0,
+        'overtime_warnings': 0,
+        'hard_limit_warnings': 0,
+    }
+
+
+def _threshold_condition(hours_by_hotel, current):
+    """
+    Build a Q matching open logs whose duration reached their hotel's threshold.
+    
+    Hotels sharing the same threshold are grouped, so the condition stays
+    small even across dozens of hotels. Returns None if no hotel has a
+    threshold configured.
+    """
+    from django.db.models import Q
+    
+    hotels_by_hours = {}
+    for hotel_id, hours in hours_by_hotel.items():
+        if hours:
+            hotels_by_hours.setdefault(float(hours), []).append(hotel_id)
+    
+    condition = None
+    for hours, hotel_ids in hotels_by_hours.items():
+        q = Q(hotel_id__in=hotel_ids, time_in__lte=current - timedelta(hours=hours))
+        condition = q if condition is None else condition | q
+    return condition
+
+
+def sweep_open_log_alerts(hotels=None):
+    """
+    Classify open ClockLogs across hotels and send due break/overtime/hard
+    limit warnings in bulk.
+    
+    All open logs are classified in one query: each hotel's AttendanceSettings
+    thresholds are turned into time_in cutoffs and evaluated in SQL, so only
+    logs with a pending warning are loaded. Flags are written with a single
+    bulk_update and warnings are sent with batched Pusher calls.
+    
+    Args:
+        hotels: Optional iterable of Hotel instances (default: all hotels)
+        
+    Returns:
+        dict: {hotel_id: summary of alerts sent}
+    """
+    from django.db.models import BooleanField, Case, Q, Value, When
+    from hotel.models import AttendanceSettings
     from .models import ClockLog
     
-    settings = get_attendance_settings(hotel)
     current = now()
     
-    # Only check logs that are approved and not rejected
-    open_logs = ClockLog.objects.filter(
-        hotel=hotel,
-        time_out__isnull=True,
-        is_approved=True,
-        is_rejected=False,
-    ).select_related('staff')
+    settings_qs = AttendanceSettings.objects.filter(enforce_limits=True)
+    if hotels is not None:
+        settings_qs = settings_qs.filter(hotel__in=hotels)
+    settings_by_hotel = {s.hotel_id: s for s in settings_qs}
     
-    alerts_sent = {
-        'break_warnings': 0,
-        'overtime_warnings': 0,
-        'hard_limit_warnings': 0,
+    results = {hotel_id: _empty_alert_summary() for hotel_id in settings_by_hotel}
+    if not settings_by_hotel:
+        return results
+    
+    event_builders = {
+        'break_warnings': build_break_warning_events,
+        'overtime_warnings': build_overtime_warning_events,
+        'hard_limit_warnings': build_hard_limit_warning_events,
     }
     
-    for log in open_logs:
+    # One annotation per alert level: "threshold reached and not yet warned"
+    annotations = {}
+    pending = None
+    for flag, threshold_field, _key in ALERT_LEVELS:
+        reached = _threshold_condition(
+            {hotel_id: getattr(s, threshold_field) for hotel_id, s in settings_by_hotel.items()},
+            current,
+        )
+        if reached is None:
+            annotations[f'{flag}_due'] = Value(False, output_field=BooleanField())
+            continue
+        due = reached & Q(**{flag: False})
+        annotations[f'{flag}_due'] = Case(
+            When(due, then=Value(True)),
+            default=Value(False),
+            output_field=BooleanField(),
+        )
+        pending = due if pending is None else pending | due
+    
+    if pending is None:
+        return results
+    
+    # Only logs that are approved and not rejected
+    due_logs = list(
+        ClockLog.objects.filter(
+            hotel_id__in=settings_by_hotel.keys(),
+            time_out__isnull=True,
+            is_approved=True,
+            is_rejected=False,
+        ).filter(pending).annotate(**annotations).select_related('staff', 'hotel')
+    )
+    
+    if not due_logs:
+        return results
+    
+    events = []
+    for log in due_logs:
         duration_hours = (current - log.time_in).total_seconds() / 3600
+        for flag, _threshold_field, key in ALERT_LEVELS:
+            if getattr(log, f'{flag}_due'):
+                setattr(log, flag, True)
+                events.extend(event_builders[key](log.hotel, log, duration_hours))
+                results[log.hotel_id][key] += 1
+    
+    # Persist flags before notifying so a Pusher failure never re-sends warnings
+    ClockLog.objects.bulk_update(due_logs, [flag for flag, *_ in ALERT_LEVELS])
+    
+    failed = pusher_trigger_batch(events)
+    if failed:
+        logger.warning(f"Attendance alert sweep: {failed} of {len(events)} Pusher events failed")
+    
+    return results
+
+
+def sweep_auto_clock_out(hotels=None, max_hours=None, force=False, dry_run=False):
+    """
+    Auto clock-out open sessions that exceeded their hotel's hard limit.
+    
+    Processes ALL open sessions (approved or not) that are not rejected, for
+    worker protection. Excessive logs across all hotels are found with one
+    query, closed with a single bulk_update, staff are set off duty with one
+    UPDATE, and realtime notifications are sent in Pusher batches.
+    
+    Args:
+        hotels: Optional iterable of Hotel instances (default: all hotels)
+        max_hours: Optional override for AttendanceSettings.hard_limit_hours
+        force: Clock out even if the hard limit warning was not sent
+        dry_run: Only report what would be clocked out
         
-        # Break warning
-        if (
-            settings.enforce_limits
-            and settings.break_warning_hours
-            and not log.break_warning_sent
-            and duration_hours >= float(settings.break_warning_hours)
-        ):
-            send_break_warning(hotel, log, duration_hours)
-            log.break_warning_sent = True
-            log.save(update_fields=['break_warning_sent'])
-            alerts_sent['break_warnings'] += 1
-        
-        # Overtime warning
-        if (
-            settings.enforce_limits
-            and settings.overtime_warning_hours
-            and not log.overtime_warning_sent
-            and duration_hours >= float(settings.overtime_warning_hours)
-        ):
-            send_overtime_warning(hotel, log, duration_hours)
-            log.overtime_warning_sent = True
-            log.save(update_fields=['overtime_warning_sent'])
-            alerts_sent['overtime_warnings'] += 1
-        
-        # Hard limit warning
-        if (
-            settings.enforce_limits
-            and settings.hard_limit_hours
-            and not log.hard_limit_warning_sent
-            and duration_hours >= float(settings.hard_limit_hours)
-        ):
-            send_hard_limit_warning(hotel, log, duration_hours)
-            log.hard_limit_warning_sent = True
-            log.save(update_fields=['hard_limit_warning_sent'])
-            alerts_sent['hard_limit_warnings'] += 1
+    Returns:
+        dict: {hotel_id: {'found': int, 'clocked_out': int, 'max_hours': float,
+               'sessions': [(staff_name, duration_hours), ...]}}
+    """
+    from django.db import transaction
+    from hotel.models import AttendanceSettings, Hotel
+    from staff.models import Staff
+    from .daily_rollup import refresh_daily_attendance
+    from .models import ClockLog
+    
+    current = now()
     
-    return alerts_sent
+    if hotels is not None:
+        hotel_ids = [hotel.pk for hotel in hotels]
+    else:
+        hotel_ids = list(Hotel.objects.values_list('pk', flat=True))
+    
+    if max_hours:
+        hours_by_hotel = {hotel_id: max_hours for hotel_id in hotel_ids}
+    else:
+        # Hotels without settings fall back to the model default
+        default_hours = AttendanceSettings._meta.get_field('hard_limit_hours').default
+        hours_by_hotel = {hotel_id: default_hours for hotel_id in hotel_ids}
+        hours_by_hotel.update(
+            AttendanceSettings.objects.filter(hotel_id__in=hotel_ids)
+            .values_list('hotel_id', 'hard_limit_hours')
+        )
+    
+    results = {
+        hotel_id: {'found': 0, 'clocked_out': 0, 'max_hours': float(hours), 'sessions': []}
+        for hotel_id, hours in hours_by_hotel.items()
+    }
+    
+    excessive = _threshold_condition(hours_by_hotel, current)
+    if excessive is None:
+        return results
+    
+    logs = ClockLog.objects.filter(
+        time_out__isnull=True,
+        is_rejected=False,  # Only exclude explicitly rejected logs
+    ).filter(excessive)
+    if not force:
+        # Only auto-clock-out if hard limit warning was sent
+        logs = logs.filter(hard_limit_warning_sent=True)
+    logs = list(logs.select_related(
+        'hotel', 'staff', 'staff__user', 'staff__department', 'staff__role', 'staff__hotel'
+    ))
+    
+    for log in logs:
+        duration_hours = (current - log.time_in).total_seconds() / 3600
+        staff_name = f"{log.staff.first_name} {log.staff.last_name}"
+        results[log.hotel_id]['found'] += 1
+        results[log.hotel_id]['sessions'].append((staff_name, duration_hours))
+    
+    if dry_run or not logs:
+        return results
+    
+    for log in logs:
+        log.time_out = current
+        log.long_session_ack_mode = 'auto_clocked_out'
+        log.auto_clock_out = True
+        log.hours_worked = round((current - log.time_in).total_seconds() / 3600, 2)
+    
+    staff_members = {log.staff_id: log.staff for log in logs}
+    
+    with transaction.atomic():
+        ClockLog.objects.bulk_update(
+            logs, ['time_out', 'long_session_ack_mode', 'auto_clock_out', 'hours_worked']
+        )
+        Staff.objects.filter(pk__in=staff_members.keys()).update(
+            duty_status='off_duty', is_on_duty=False
+        )
+        refresh_daily_attendance(logs)
+    
+    for log in logs:
+        results[log.hotel_id]['clocked_out'] += 1
+    
+    # Real-time notifications (clock status + attendance log), batched
+    for staff in staff_members.values():
+        staff.duty_status = 'off_duty'
+        staff.is_on_duty = False
+    
+    from notifications.notification_manager import notification_manager
+    notification_manager.realtime_attendance_clock_status_updated_bulk(
+        staff_members.values(), 'clock_out',
+        clock_logs={log.staff_id: log for log in logs},
+    )
+    
+    events = []
+    for log in logs:
+        duration_hours = (current - log.time_in).total_seconds() / 3600
+        events.append({
+            'channel': f'{log.hotel.slug}',
+            'name': 'attendance_logged',
+            'data': {
+                'action': 'auto_clock_out',
+                'log_id': log.id,
+                'staff_id': log.staff.id,
+                'staff_name': f"{log.staff.first_name} {log.staff.last_name}",
+                'department': log.staff.department.name if log.staff.department else None,
+                'time': log.time_out.isoformat(),
+                'verified_by_face': False,
+                'timestamp': current.isoformat(),
+            },
+        })
+        logger.info(
+            f"Auto clock-out: staff {log.staff.id} in hotel {log.hotel.slug} "
+            f"after {duration_hours:.1f} hours"
+        )
+    pusher_trigger_batch(events)
+    
+    return results
 
 
 def send_break_warning(hotel, clock_log, duration_hours):
@@ -115,6 +324,46 @@ def send_break_warning(hotel, clock_log, duration_hours):
         clock_log: ClockLog instance
         duration_hours: Current shift duration in hours
     """
+    _trigger_warning_events(build_break_warning_events(hotel, clock_log, duration_hours))
+
+
+def send_overtime_warning(hotel, clock_log, duration_hours):
+    """
+    Send an overtime warning notification via Pusher.
+    
+    Args:
+        hotel: Hotel instance
+        clock_log: ClockLog instance
+        duration_hours: Current shift duration in hours
+    """
+    _trigger_warning_events(build_overtime_warning_events(hotel, clock_log, duration_hours))
+
+
+def send_hard_limit_warning(hotel, clock_log, duration_hours):
+    """
+    Send a hard limit warning notification via Pusher.
+    Staff must choose to stay clocked in or clock out.
+    
+    Args:
+        hotel: Hotel instance
+        clock_log: ClockLog instance
+        duration_hours: Current shift duration in hours
+    """
+    _trigger_warning_events(build_hard_limit_warning_events(hotel, clock_log, duration_hours))
+
+
+def _trigger_warning_events(events):
+    for event in events:
+        pusher_client.trigger(event['channel'], event['name'], event['data'])
+
+
+def build_break_warning_events(hotel, clock_log, duration_hours):
+    """
+    Build the Pusher events for a break reminder (staff + managers channels).
+    
+    Returns:
+        list: Event dicts with 'channel', 'name' and 'data' keys
+    """
     event_data = {
         'type': 'break_warning',
         'clock_log_id': clock_log.id,
@@ -125,29 +374,28 @@ def send_break_warning(hotel, clock_log, duration_hours):
         'timestamp': now().isoformat(),
     }
     
-    # Send to staff-specific channel
-    pusher_client.trigger(
-        f"attendance-{hotel.slug}-staff-{clock_log.staff.id}",
-        'break-warning',
-        event_data
-    )
-    
-    # Also send to managers channel for oversight
-    pusher_client.trigger(
-        f"attendance-{hotel.slug}-managers",
-        'staff-break-warning',
-        event_data
-    )
-
-
-def send_overtime_warning(hotel, clock_log, duration_hours):
+    return [
+        # Staff-specific channel
+        {
+            'channel': f"attendance-{hotel.slug}-staff-{clock_log.staff.id}",
+            'name': 'break-warning',
+            'data': event_data,
+        },
+        # Managers channel for oversight
+        {
+            'channel': f"attendance-{hotel.slug}-managers",
+            'name': 'staff-break-warning',
+            'data': event_data,
+        },
+    ]
+
+
+def build_overtime_warning_events(hotel, clock_log, duration_hours):
     """
-    Send an overtime warning notification via Pusher.
+    Build the Pusher events for an overtime warning (staff + managers channels).
     
-    Args:
-        hotel: Hotel instance
-        clock_log: ClockLog instance
-        duration_hours: Current shift duration in hours
+    Returns:
+        list: Event dicts with 'channel', 'name' and 'data' keys
     """
     event_data = {
         'type': 'overtime_warning',
@@ -159,30 +407,28 @@ def send_overtime_warning(hotel, clock_log, duration_hours):
         'timestamp': now().isoformat(),
     }
     
-    # Send to staff-specific channel
-    pusher_client.trigger(
-        f"attendance-{hotel.slug}-staff-{clock_log.staff.id}",
-        'overtime-warning',
-        event_data
-    )
-    
-    # Send to managers channel for oversight
-    pusher_client.trigger(
-        f"attendance-{hotel.slug}-managers",
-        'staff-overtime-warning',
-        event_data
-    )
-
-
-def send_hard_limit_warning(hotel, clock_log, duration_hours):
+    return [
+        # Staff-specific channel
+        {
+            'channel': f"attendance-{hotel.slug}-staff-{clock_log.staff.id}",
+            'name': 'overtime-warning',
+            'data': event_data,
+        },
+        # Managers channel for oversight
+        {
+            'channel': f"attendance-{hotel.slug}-managers",
+            'name': 'staff-overtime-warning',
+            'data': event_data,
+        },
+    ]
+
+
+def build_hard_limit_warning_events(hotel, clock_log, duration_hours):
     """
-    Send a hard limit warning notification via Pusher.
-    Staff must choose to stay clocked in or clock out.
+    Build the Pusher events for a hard limit warning (staff + managers channels).
     
-    Args:
-        hotel: Hotel instance
-        clock_log: ClockLog instance
-        duration_hours: Current shift duration in hours
+    Returns:
+        list: Event dicts with 'channel', 'name' and 'data' keys
     """
     event_data = {
         'type': 'hard_limit_warning',
@@ -206,19 +452,20 @@ def send_hard_limit_warning(hotel, clock_log, duration_hours):
         'timestamp': now().isoformat(),
     }
     
-    # Send to staff-specific channel
-    pusher_client.trigger(
-        f"attendance-{hotel.slug}-staff-{clock_log.staff.id}",
-        'hard-limit-warning',
-        event_data
-    )
-    
-    # Send to managers channel for urgent oversight
-    pusher_client.trigger(
-        f"attendance-{hotel.slug}-managers",
-        'staff-hard-limit-warning',
-        event_data
-    )
+    return [
+        # Staff-specific channel
+        {
+            'channel': f"attendance-{hotel.slug}-staff-{clock_log.staff.id}",
+            'name': 'hard-limit-warning',
+            'data': event_data,
+        },
+        # Managers channel for urgent oversight
+        {
+            'channel': f"attendance-{hotel.slug}-managers",
+            'name': 'staff-hard-limit-warning',
+            'data': event_data,
+        },
+    ]
 
 
 def send_unrostered_request_notification(hotel, clock_log):
@@ -63,7 +63,18 @@ from staff.permissions import (
     CanManageDailyPlan,
     CanManageDailyPlanEntry,
 )
-from .pdf_report import build_roster_pdf, build_weekly_roster_pdf, build_daily_plan_grouped_pdf
+from .daily_rollup import refresh_daily_attendance
+from .shift_windows import find_cached_matching_shift, match_shift_id, refresh_shift_windows
+from .roster_validation import (
+    DUPLICATE,
+    find_conflicts_with_existing,
+    find_roster_conflicts,
+    load_existing_intervals,
+    shift_intervals,
+)
+from .pdf_report import (
+    build_roster_pdf, build_weekly_roster_pdf, build_daily_plan_grouped_pdf, cached_roster_pdf
+)
 from django_filters.rest_framework import DjangoFilterBackend
 from collections import defaultdict
 from .models import ClockLog, StaffFace, RosterPeriod, StaffRoster, ShiftLocation, DailyPlan, DailyPlanEntry, RosterAuditLog, FaceAuditLog
@@ -80,6 +91,7 @@ from .serializers import (
 )
 
 from hotel.models import Hotel
+from staff.models import Department, Staff
 from staff.pusher_utils import (
     trigger_clock_status_update,
     trigger_attendance_log,
@@ -183,87 +195,11 @@ def validate_overnight_shift_end_time(shift_start, shift_end, max_end_hour=6):
 
 def has_overlaps_for_staff(shifts):
     """
-    Check for overlapping shifts within the same staff member on the same date.
+    Check for overlapping shifts within the same staff member.
     Different staff can work the same hours without conflict.
+    Overnight shifts are checked against the next day's shifts.
     """
-    from collections import defaultdict
-    
-    # Group shifts by (staff_id, shift_date)
-    groups = defaultdict(list)
-    
-    for shift in shifts:
-        # Handle both date objects and string dates
-        shift_date = shift["shift_date"]
-        if isinstance(shift_date, str):
-            shift_date = datetime.strptime(shift_date, "%Y-%m-%d").date()
-        elif isinstance(shift_date, datetime):
-            shift_date = shift_date.date()
-        
-        # Handle staff_id vs staff field names
-        staff_id = shift.get("staff_id") or shift.get("staff")
-        
-        key = (staff_id, shift_date)
-        groups[key].append(shift)
-    
-    # Check for overlaps within each group
-    for key, group in groups.items():
-        if len(group) <= 1:
-            continue  # No overlaps possible with single shift
-            
-        # Convert to datetime ranges
-        ranges = []
-        for shift in group:
-            shift_date = shift["shift_date"]
-            if isinstance(shift_date, str):
-                shift_date = datetime.strptime(shift_date, "%Y-%m-%d").date()
-            elif isinstance(shift_date, datetime):
-                shift_date = shift_date.date()
-            
-            # Parse time strings to time objects
-            shift_start = shift["shift_start"]
-            shift_end = shift["shift_end"]
-            
-            if isinstance(shift_start, str):
-                # Try different time formats
-                try:
-                    shift_start = datetime.strptime(shift_start, "%H:%M").time()
-                except ValueError:
-                    try:
-                        shift_start = datetime.strptime(shift_start, "%H:%M:%S").time()
-                    except ValueError:
-                        # If parsing fails, skip this shift from overlap check
-                        continue
-            
-            if isinstance(shift_end, str):
-                # Try different time formats
-                try:
-                    shift_end = datetime.strptime(shift_end, "%H:%M").time()
-                except ValueError:
-                    try:
-                        shift_end = datetime.strptime(shift_end, "%H:%M:%S").time()
-                    except ValueError:
-                        # If parsing fails, skip this shift from overlap check
-                        continue
-                
-            start_dt, end_dt = shift_to_datetime_range(
-                shift_date, shift_start, shift_end
-            )
-            ranges.append((start_dt, end_dt, shift))
-        
-        # Sort by start time
-        ranges.sort(key=lambda r: r[0])
-        
-        # Check consecutive intervals for overlap
-        for i in range(len(ranges) - 1):
-            current_end = ranges[i][1]
-            next_start = ranges[i + 1][0]
-            
-            # Overlaps if current shift ends after next shift starts
-            # Allow exact adjacency (current_end == next_start)
-            if current_end > next_start:
-                return True
-    
-    return False
+    return bool(find_roster_conflicts(shift_intervals(shifts)))
 
 
 def get_existing_shifts_for_overlap_check(staff_ids, date_range, hotel_id=None):
@@ -485,7 +421,7 @@ class ClockLogViewSet(AttendanceHotelScopedMixin, viewsets.ModelViewSet):
             else:
                 # CLOCK-IN path - find matching shift
                 current_dt = now()
-                matching_shift = find_matching_shift_for_datetime(hotel, staff, current_dt)
+                matching_shift = find_cached_matching_shift(hotel, staff, current_dt)
                 
                 if matching_shift:
                     # Normal rostered clock-in
@@ -661,9 +597,9 @@ class ClockLogViewSet(AttendanceHotelScopedMixin, viewsets.ModelViewSet):
 
         updated = 0
         for log in logs:
-            match = find_matching_shift_for_datetime(hotel, log.staff, log.time_in)
-            if match != log.roster_shift:
-                log.roster_shift = match
+            match_id = match_shift_id(hotel.id, log.staff_id, log.time_in)
+            if match_id != log.roster_shift_id:
+                log.roster_shift_id = match_id
                 log.save(update_fields=['roster_shift'])
                 updated += 1
 
@@ -1198,8 +1134,7 @@ class RosterPeriodViewSet(AttendanceHotelScopedMixin, viewsets.ModelViewSet):
         department = request.query_params.get("department")
         location_id = request.query_params.get("location")
 
-        qs = StaffRoster.objects.select_related("staff", "location") \
-                                .filter(period=period, hotel=hotel)
+        qs = StaffRoster.objects.filter(period=period, hotel=hotel)
         if department:
             qs = qs.filter(department__slug=department)
 
@@ -1213,13 +1148,18 @@ class RosterPeriodViewSet(AttendanceHotelScopedMixin, viewsets.ModelViewSet):
             f"Department: {department or 'All'}",
         ]
 
-        # NEW: Use the weekly board-style PDF
-        pdf_bytes = build_weekly_roster_pdf(
-            title,
-            meta,
+        # Weekly board-style PDF, re-rendered only when the roster changes
+        pdf_bytes = cached_roster_pdf(
             qs,
-            period.start_date,
-            period.end_date
+            ("weekly", period.id, hotel.id, department, location_id, title, meta,
+             period.start_date, period.end_date),
+            lambda rows: build_weekly_roster_pdf(
+                title,
+                meta,
+                rows,
+                period.start_date,
+                period.end_date
+            ),
         )
 
         resp = HttpResponse(pdf_bytes, content_type="application/pdf")
@@ -1340,9 +1280,9 @@ class RosterPeriodViewSet(AttendanceHotelScopedMixin, viewsets.ModelViewSet):
                     if period.start_date <= new_date <= period.end_date:
                         new_shifts.append(
                             StaffRoster(
-                                hotel=shift.hotel,
-                                staff=shift.staff,
-                                department=shift.department,
+                                hotel_id=shift.hotel_id,
+                                staff_id=shift.staff_id,
+                                department_id=shift.department_id,
                                 period=period,
                                 shift_date=new_date,
                                 shift_start=shift.shift_start,
@@ -1353,13 +1293,15 @@ class RosterPeriodViewSet(AttendanceHotelScopedMixin, viewsets.ModelViewSet):
                                 shift_type=shift.shift_type,
                                 is_split_shift=shift.is_split_shift,
                                 is_night_shift=shift.is_night_shift,
-                                location=shift.location,
+                                location_id=shift.location_id,
                                 notes=f"Copied from {source_period.title}"
                             )
                         )
                 
                 if new_shifts:
                     StaffRoster.objects.bulk_create(new_shifts)
+                    refresh_daily_attendance(new_shifts)
+                    refresh_shift_windows(new_shifts)
                 
                 # Log the copy operation
                 try:
@@ -1461,9 +1403,9 @@ class RosterPeriodViewSet(AttendanceHotelScopedMixin, viewsets.ModelViewSet):
             new_date = shift.shift_date + timedelta(days=date_offset)
             new_shifts.append(
                 StaffRoster(
-                    hotel=shift.hotel,
-                    staff=shift.staff,
-                    department=shift.department,
+                    hotel_id=shift.hotel_id,
+                    staff_id=shift.staff_id,
+                    department_id=shift.department_id,
                     period=new_period,
                     shift_date=new_date,
                     shift_start=shift.shift_start,
@@ -1474,13 +1416,15 @@ class RosterPeriodViewSet(AttendanceHotelScopedMixin, viewsets.ModelViewSet):
                     shift_type=shift.shift_type,
                     is_split_shift=shift.is_split_shift,
                     is_night_shift=shift.is_night_shift,
-                    location=shift.location,
+                    location_id=shift.location_id,
                     notes=f"Copied from {source_period.title}"
                 )
             )
         
         if new_shifts:
             StaffRoster.objects.bulk_create(new_shifts)
+            refresh_daily_attendance(new_shifts)
+            refresh_shift_windows(new_shifts)
         
         # Log the duplication operation
         try:
@@ -1795,8 +1739,47 @@ class StaffRosterViewSet(AttendanceHotelScopedMixin, viewsets.ModelViewSet):
         serializer = self.get_serializer(qs, many=True)
         return Response(serializer.data)
 
+    @staticmethod
+    def _preload_shift_relations(payloads):
+        """
+        Objects a batch of shift payloads refers to, one query per model.
+
+        Keyed like PreloadedRelatedFieldMixin expects: field name, then the
+        submitted value as a string.
+        """
+        def ids(key):
+            return {str(p[key]) for p in payloads if str(p.get(key, '')).isdigit()}
+
+        def by_pk(queryset, key):
+            return {str(pk): obj for pk, obj in queryset.in_bulk(ids(key)).items()}
+
+        # Department slugs aren't unique across hotels: ambiguous ones are
+        # left to the serializer field
+        slugs = {p['department'] for p in payloads if isinstance(p.get('department'), str)}
+        departments = defaultdict(list)
+        for department in Department.objects.filter(slug__in=slugs):
+            departments[department.slug].append(department)
+
+        return {
+            'hotel': by_pk(Hotel.objects, 'hotel'),
+            'staff': by_pk(Staff.objects, 'staff'),
+            'period': by_pk(RosterPeriod.objects, 'period'),
+            'location_id': by_pk(ShiftLocation.objects.select_related('hotel'), 'location_id'),
+            'department': {
+                slug: matches[0] for slug, matches in departments.items() if len(matches) == 1
+            },
+        }
+
     @action(detail=False, methods=['post'], url_path='bulk-save')
     def bulk_save(self, request, *args, **kwargs):
+        """
+        Create and update many shifts in one request.
+
+        Conflicts are found with one sweep over the batch and the stored
+        roster, related objects are loaded once for the whole batch and
+        shifts are written with bulk_create / bulk_update, so the number
+        of queries doesn't grow with the batch.
+        """
         all_shifts = request.data.get('shifts', []) or []
         created_data = [s for s in all_shifts if not s.get("id")]
         updated_data = [s for s in all_shifts if s.get("id")]
@@ -1813,142 +1796,87 @@ class StaffRosterViewSet(AttendanceHotelScopedMixin, viewsets.ModelViewSet):
         errors = []
         created_result, updated_result = [], []
 
-        # In-batch duplicate check
-        seen = set()
-        for idx, shift in enumerate(created_data):
-            key = (shift.get("staff"), shift.get("shift_date"), shift.get("shift_start"))
-            if key in seen:
-                errors.append({"index": idx, "error": "Duplicate shift in batch."})
-            else:
-                seen.add(key)
-
-        if errors:
-            return Response({"created": [], "updated": [], "errors": errors}, status=status.HTTP_400_BAD_REQUEST)
-
-        # DB-level duplicate check for updates
-        for idx, payload in enumerate(updated_data):
-            instance = StaffRoster.objects.filter(pk=payload["id"]).first()
-            if not instance:
+        # Updated shifts are loaded once and validated with their new values
+        update_ids = [payload["id"] for payload in updated_data]
+        instances = {
+            str(pk): instance
+            for pk, instance in StaffRoster.objects.select_related(
+                'hotel', 'staff', 'period', 'department', 'location__hotel'
+            ).in_bulk(update_ids).items()
+        }
+        for payload in updated_data:
+            if str(payload["id"]) not in instances:
                 errors.append({"id": payload.get("id"), "detail": "Shift not found"})
-                continue
-
-            staff = payload.get("staff", instance.staff_id)
-            shift_date = payload.get("shift_date", instance.shift_date.strftime("%Y-%m-%d"))
-            shift_start = payload.get("shift_start", instance.shift_start.strftime("%H:%M"))
-
-            conflict = StaffRoster.objects.filter(
-                staff=staff,
-                shift_date=shift_date,
-                shift_start=shift_start
-            ).exclude(id=instance.id).exists()
-
-            if conflict:
-                errors.append({"id": payload.get("id"), "detail": "Duplicate shift with these fields exists."})
 
         if errors:
             return Response({"created": [], "updated": [], "errors": errors}, status=status.HTTP_400_BAD_REQUEST)
 
+        candidates = list(created_data)
+        for payload in updated_data:
+            instance = instances[str(payload["id"])]
+            candidates.append({
+                "id": payload["id"],
+                "staff": payload.get("staff", instance.staff_id),
+                "shift_date": payload.get("shift_date", instance.shift_date),
+                "shift_start": payload.get("shift_start", instance.shift_start),
+                "shift_end": payload.get("shift_end", instance.shift_end),
+            })
+
         with transaction.atomic():
-            # Comprehensive overlap detection using new utilities
-            # Prepare all shifts for overlap checking
-            all_shifts_to_check = []
-            
-            # Add new shifts
-            for shift in created_data:
-                all_shifts_to_check.append({
-                    "staff_id": shift.get("staff"),
-                    "shift_date": shift.get("shift_date"),
-                    "shift_start": shift.get("shift_start"),
-                    "shift_end": shift.get("shift_end"),
-                })
-            
-            # Add updated shifts
-            for shift in updated_data:
-                all_shifts_to_check.append({
-                    "staff_id": shift.get("staff"),
-                    "shift_date": shift.get("shift_date"),
-                    "shift_start": shift.get("shift_start"),
-                    "shift_end": shift.get("shift_end"),
-                })
-            
-            # Get existing shifts for the affected staff/dates (excluding ones being updated)
-            staff_ids = set()
-            date_range = [None, None]
-            
-            for shift in all_shifts_to_check:
-                staff_ids.add(shift["staff_id"])
-                shift_date = shift["shift_date"]
-                if isinstance(shift_date, str):
-                    shift_date = datetime.strptime(shift_date, "%Y-%m-%d").date()
-                
-                if date_range[0] is None or shift_date < date_range[0]:
-                    date_range[0] = shift_date
-                if date_range[1] is None or shift_date > date_range[1]:
-                    date_range[1] = shift_date
-            
-            if staff_ids and date_range[0] and date_range[1]:
-                # Get existing shifts but exclude ones being updated
-                update_ids = [shift["id"] for shift in updated_data if shift.get("id")]
-                existing_query = StaffRoster.objects.filter(
-                    staff_id__in=list(staff_ids),
-                    shift_date__range=date_range
-                )
-                if update_ids:
-                    existing_query = existing_query.exclude(id__in=update_ids)
-                
-                existing_shifts = existing_query.values(
-                    "staff_id", "shift_date", "shift_start", "shift_end"
-                )
-                
-                # Combine existing and new/updated shifts
-                all_shifts_combined = list(existing_shifts) + all_shifts_to_check
-                
-                # Check for overlaps
-                if has_overlaps_for_staff(all_shifts_combined):
-                    errors.append({
-                        "detail": "Bulk save would create overlapping shifts for one or more staff members."
-                    })
-            
+            # Duplicates and overlaps across the batch and the stored roster
+            intervals = shift_intervals(candidates)
+            existing = load_existing_intervals(intervals, exclude_ids=update_ids)
+
+            for conflict in find_roster_conflicts(intervals, existing):
+                index = conflict["index"]
+                if conflict["type"] == DUPLICATE:
+                    if conflict["conflicts_with"]["index"] is not None:
+                        detail = "Duplicate shift in batch."
+                    else:
+                        detail = "Duplicate shift with these fields exists."
+                else:
+                    detail = "Shift overlaps another shift for this staff member."
+                if index < len(created_data):
+                    error = {"index": index}
+                else:
+                    error = {"id": candidates[index]["id"]}
+                error.update({"detail": detail, "conflict": conflict})
+                errors.append(error)
+
             # Mark split shifts
-            staff_date_map = defaultdict(list)
-            for shift in created_data:
-                staff_id = shift.get("staff")
-                shift_date = shift.get("shift_date")
-                if staff_id and shift_date:
-                    staff_date_map[(staff_id, shift_date)].append(shift)
-
-            for (staff_id, shift_date), new_shifts in staff_date_map.items():
-                existing_count = StaffRoster.objects.filter(
-                    staff_id=staff_id, shift_date=shift_date
-                ).exclude(
-                    id__in=[shift["id"] for shift in updated_data if shift.get("id")]
-                ).count()
-                
-                if len(new_shifts) > 1 or existing_count > 0:
-                    for shift in new_shifts:
-                        shift["is_split_shift"] = True
+            existing_per_day = defaultdict(int)
+            for interval in existing:
+                existing_per_day[(interval.staff_id, interval.shift_date)] += 1
+            new_per_day = defaultdict(list)
+            for interval in intervals:
+                if interval.index < len(created_data):
+                    new_per_day[(interval.staff_id, interval.shift_date)].append(interval.index)
+
+            for key, indexes in new_per_day.items():
+                if len(indexes) > 1 or existing_per_day[key] > 0:
+                    for index in indexes:
+                        created_data[index]["is_split_shift"] = True
 
             if errors:
                 return Response({"created": [], "updated": [], "errors": errors}, status=status.HTTP_400_BAD_REQUEST)
 
-            create_ser = StaffRosterSerializer(data=created_data, many=True, context={'request': request})
-            if create_ser.is_valid():
-                create_ser.save()
-                created_result = create_ser.data
-            else:
+            context = {
+                'request': request,
+                'preloaded': self._preload_shift_relations(all_shifts),
+                'conflicts_checked': True,
+            }
+            create_ser = StaffRosterSerializer(data=created_data, many=True, context=context)
+            if not create_ser.is_valid():
                 print("Create serializer errors:", create_ser.errors)
                 errors.extend(create_ser.errors)
 
+            updates = []
             if updated_data and not errors:
                 for payload in updated_data:
-                    instance = StaffRoster.objects.filter(pk=payload["id"]).first()
-                    if not instance:
-                        errors.append({"id": payload.get("id"), "detail": "Shift not found"})
-                        continue
-                    ser = StaffRosterSerializer(instance, data=payload, partial=True, context={'request': request})
+                    instance = instances[str(payload["id"])]
+                    ser = StaffRosterSerializer(instance, data=payload, partial=True, context=context)
                     if ser.is_valid():
-                        ser.save()
-                        updated_result.append(ser.data)
+                        updates.append((instance, ser.validated_data))
                     else:
                         print("Update serializer errors:", ser.errors)
                         errors.append(ser.errors)
@@ -1957,6 +1885,34 @@ class StaffRosterViewSet(AttendanceHotelScopedMixin, viewsets.ModelViewSet):
                 transaction.set_rollback(True)
                 return Response({"created": [], "updated": [], "errors": errors}, status=status.HTTP_400_BAD_REQUEST)
 
+            # Written in bulk, so the save signals don't run: the daily
+            # rollup and cached shift windows are refreshed here instead
+            approver = getattr(request.user, 'staff_profile', None)
+            new_shifts = [StaffRoster(**attrs) for attrs in create_ser.validated_data]
+            updated_shifts, previous_days, update_fields = [], [], {'updated_at'}
+            for instance, attrs in updates:
+                previous_days.append((instance.hotel_id, instance.staff_id, instance.shift_date))
+                for attr, value in attrs.items():
+                    setattr(instance, attr, value)
+                instance.updated_at = now()
+                update_fields.update(attrs)
+                updated_shifts.append(instance)
+            if approver:
+                for shift in new_shifts + updated_shifts:
+                    shift.approved_by = approver
+                update_fields.add('approved_by')
+
+            StaffRoster.objects.bulk_create(new_shifts)
+            if updated_shifts:
+                StaffRoster.objects.bulk_update(updated_shifts, sorted(update_fields))
+            refresh_daily_attendance(
+                new_shifts + updated_shifts, [day[1:] for day in previous_days]
+            )
+            refresh_shift_windows(new_shifts + updated_shifts, previous_days)
+
+            created_result = StaffRosterSerializer(new_shifts, many=True, context=context).data
+            updated_result = StaffRosterSerializer(updated_shifts, many=True, context=context).data
+
         return Response({"created": created_result, "updated": updated_result, "errors": []}, status=status.HTTP_201_CREATED)
     
     @action(detail=False, methods=["get"], url_path="daily-pdf")
@@ -1985,7 +1941,11 @@ class StaffRosterViewSet(AttendanceHotelScopedMixin, viewsets.ModelViewSet):
             f"Department: {department or 'All'}",
         ]
 
-        pdf_bytes = build_roster_pdf(title, meta, qs, landscape_mode=False)
+        pdf_bytes = cached_roster_pdf(
+            qs,
+            ("daily", staff_hotel.id, day, department, location_id, title, meta),
+            lambda rows: build_roster_pdf(title, meta, rows, landscape_mode=False),
+        )
         resp = HttpResponse(pdf_bytes, content_type="application/pdf")
         resp["Content-Disposition"] = f'attachment; filename="roster_{staff_hotel.slug}_{day}.pdf"'
         return resp
@@ -2020,10 +1980,10 @@ class StaffRosterViewSet(AttendanceHotelScopedMixin, viewsets.ModelViewSet):
         if location_id:
             qs = qs.filter(location_id=location_id)
 
-        staff = qs.first().staff if qs.exists() else None
+        names = qs.values_list("staff__first_name", "staff__last_name").first()
         staff_name = (
-            f"{getattr(staff, 'first_name', '')} {getattr(staff, 'last_name', '')}".strip()
-            if staff else f"#{staff_id}"
+            f"{names[0] or ''} {names[1] or ''}".strip()
+            if names else f"#{staff_id}"
         )
 
         if period_obj:
@@ -2039,7 +1999,12 @@ class StaffRosterViewSet(AttendanceHotelScopedMixin, viewsets.ModelViewSet):
             f"Department: {department or 'All'}",
         ]
 
-        pdf_bytes = build_roster_pdf(title, meta, qs, landscape_mode=False)
+        pdf_bytes = cached_roster_pdf(
+            qs,
+            ("staff", staff_hotel.id, staff_id, period_id, start, end,
+             department, location_id, title, meta),
+            lambda rows: build_roster_pdf(title, meta, rows, landscape_mode=False),
+        )
         resp = HttpResponse(pdf_bytes, content_type="application/pdf")
         resp["Content-Disposition"] = f'attachment; filename="roster_{staff_hotel.slug}_staff_{staff_id}.pdf"'
         return resp
@@ -2133,8 +2098,8 @@ class DailyPlanViewSet(HotelScopedViewSetMixin, viewsets.ModelViewSet):
         for shift in roster_shifts:
             DailyPlanEntry.objects.update_or_create(
                 plan=plan,
-                staff=shift.staff,
-                location=shift.location,
+                staff_id=shift.staff_id,
+                location_id=shift.location_id,
                 shift_start=shift.shift_start,
                 shift_end=shift.shift_end,
                 defaults={
@@ -2323,14 +2288,14 @@ class CopyRosterViewSet(AttendanceHotelScopedMixin, viewsets.ViewSet):
             if target_period.start_date <= new_date <= target_period.end_date:
                 new_shifts.append(
                     StaffRoster(
-                        hotel=shift.hotel,
-                        staff=shift.staff,
+                        hotel_id=shift.hotel_id,
+                        staff_id=shift.staff_id,
                         shift_date=new_date,
                         shift_start=shift.shift_start,
                         shift_end=shift.shift_end,
                         expected_hours=shift.expected_hours,
-                        department=shift.department,
-                        location=shift.location,
+                        department_id=shift.department_id,
+                        location_id=shift.location_id,
                         period=target_period,
                     )
                 )
@@ -2342,30 +2307,9 @@ class CopyRosterViewSet(AttendanceHotelScopedMixin, viewsets.ViewSet):
             )
 
         with transaction.atomic():
-            # Check for overlaps before creating
-            # Get existing shifts in target period
-            existing_shifts = list(
-                StaffRoster.objects.filter(
-                    hotel__slug=hotel_slug,
-                    shift_date__gte=target_period.start_date,
-                    shift_date__lte=target_period.end_date,
-                ).values("staff_id", "shift_date", "shift_start", "shift_end")
-            )
-            
-            # Prepare candidate shifts for overlap checking
-            candidate_shifts = [
-                {
-                    "staff_id": shift.staff_id,
-                    "shift_date": shift.shift_date,
-                    "shift_start": shift.shift_start,
-                    "shift_end": shift.shift_end,
-                } for shift in new_shifts
-            ]
-            
-            # Combine existing and candidate shifts
-            all_combined = existing_shifts + candidate_shifts
-            
-            if has_overlaps_for_staff(all_combined):
+            # Duplicates / overlaps with the target roster, checked in one pass
+            conflicts = find_conflicts_with_existing(new_shifts)
+            if conflicts:
                 # Audit failed operation
                 try:
                     staff = request.user.staff_profile
@@ -2385,12 +2329,14 @@ class CopyRosterViewSet(AttendanceHotelScopedMixin, viewsets.ViewSet):
                 except AttributeError:
                     pass
                 return Response(
-                    {"detail": "Bulk roster copy would create overlapping shifts. Operation cancelled."},
+                    {"detail": "Bulk roster copy would create overlapping shifts. Operation cancelled.", "conflicts": conflicts},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
             
             # Use ignore_conflicts to prevent duplicate key errors
             created_shifts = StaffRoster.objects.bulk_create(new_shifts, ignore_conflicts=True)
+            refresh_daily_attendance(new_shifts)
+            refresh_shift_windows(new_shifts)
             
             # Count actual created shifts (bulk_create with ignore_conflicts doesn't return count)
             actual_count = StaffRoster.objects.filter(
@@ -2493,41 +2439,22 @@ class CopyRosterViewSet(AttendanceHotelScopedMixin, viewsets.ViewSet):
         for shift in source_shifts:
             new_shifts.append(
                 StaffRoster(
-                    hotel=shift.hotel,
-                    staff=shift.staff,
+                    hotel_id=shift.hotel_id,
+                    staff_id=shift.staff_id,
                     shift_date=target_date,
                     shift_start=shift.shift_start,
                     shift_end=shift.shift_end,
                     expected_hours=shift.expected_hours,
-                    department=shift.department,
-                    location=shift.location,
+                    department_id=shift.department_id,
+                    location_id=shift.location_id,
                     period=target_period,
                 )
             )
 
         with transaction.atomic():
-            # Check for overlapping shifts using improved detection
-            existing_shifts = list(
-                StaffRoster.objects.filter(
-                    hotel__slug=hotel_slug,
-                    shift_date=target_date
-                ).values("staff_id", "shift_date", "shift_start", "shift_end")
-            )
-            
-            # Prepare new shifts for overlap checking
-            new_shifts_data = [
-                {
-                    "staff_id": shift.staff_id,
-                    "shift_date": shift.shift_date,
-                    "shift_start": shift.shift_start,
-                    "shift_end": shift.shift_end
-                } for shift in new_shifts
-            ]
-            
-            # Combine existing and new shifts
-            all_combined = existing_shifts + new_shifts_data
-            
-            if has_overlaps_for_staff(all_combined):
+            # Duplicates / overlaps with the target roster, checked in one pass
+            conflicts = find_conflicts_with_existing(new_shifts)
+            if conflicts:
                 # Audit failed operation
                 try:
                     staff = request.user.staff_profile
@@ -2548,12 +2475,14 @@ class CopyRosterViewSet(AttendanceHotelScopedMixin, viewsets.ViewSet):
                 except AttributeError:
                     pass
                 return Response(
-                    {"detail": "Copying would create overlapping shifts for one or more staff on the target date."},
+                    {"detail": "Copying would create overlapping shifts for one or more staff on the target date.", "conflicts": conflicts},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
             # Use ignore_conflicts to prevent duplicate key errors
             StaffRoster.objects.bulk_create(new_shifts, ignore_conflicts=True)
+            refresh_daily_attendance(new_shifts)
+            refresh_shift_windows(new_shifts)
             
             # Audit successful operation
             try:
@@ -2649,14 +2578,14 @@ class CopyRosterViewSet(AttendanceHotelScopedMixin, viewsets.ViewSet):
             if target_period.start_date <= new_date <= target_period.end_date:
                 new_shifts.append(
                     StaffRoster(
-                        hotel=shift.hotel,
-                        staff=shift.staff,
+                        hotel_id=shift.hotel_id,
+                        staff_id=shift.staff_id,
                         shift_date=new_date,
                         shift_start=shift.shift_start,
                         shift_end=shift.shift_end,
                         expected_hours=shift.expected_hours,
-                        department=shift.department,
-                        location=shift.location,
+                        department_id=shift.department_id,
+                        location_id=shift.location_id,
                         period=target_period,
                     )
                 )
@@ -2668,29 +2597,9 @@ class CopyRosterViewSet(AttendanceHotelScopedMixin, viewsets.ViewSet):
             )
 
         with transaction.atomic():
-            # Check for overlapping shifts for this staff member
-            existing_shifts = list(
-                StaffRoster.objects.filter(
-                    staff_id=staff_id,
-                    shift_date__gte=target_period.start_date,
-                    shift_date__lte=target_period.end_date
-                ).values("staff_id", "shift_date", "shift_start", "shift_end")
-            )
-            
-            # Prepare new shifts for overlap checking
-            new_shifts_data = [
-                {
-                    "staff_id": shift.staff_id,
-                    "shift_date": shift.shift_date,
-                    "shift_start": shift.shift_start,
-                    "shift_end": shift.shift_end
-                } for shift in new_shifts
-            ]
-            
-            # Combine existing and new shifts for overlap detection
-            all_combined = existing_shifts + new_shifts_data
-            
-            if has_overlaps_for_staff(all_combined):
+            # Duplicates / overlaps with the target roster, checked in one pass
+            conflicts = find_conflicts_with_existing(new_shifts)
+            if conflicts:
                 # Audit failed operation
                 try:
                     staff = request.user.staff_profile
@@ -2711,12 +2620,14 @@ class CopyRosterViewSet(AttendanceHotelScopedMixin, viewsets.ViewSet):
                 except AttributeError:
                     pass
                 return Response(
-                    {"detail": "Copying would create overlapping shifts for this staff member. Operation cancelled."},
+                    {"detail": "Copying would create overlapping shifts for this staff member. Operation cancelled.", "conflicts": conflicts},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
             # Use ignore_conflicts to prevent duplicate key errors
             StaffRoster.objects.bulk_create(new_shifts, ignore_conflicts=True)
+            refresh_daily_attendance(new_shifts)
+            refresh_shift_windows(new_shifts)
             
             # Audit successful operation
             try:
@@ -2887,9 +2798,9 @@ class CopyRosterViewSet(AttendanceHotelScopedMixin, viewsets.ViewSet):
             if target_period.start_date <= new_date <= target_period.end_date:
                 new_shifts.append(
                     StaffRoster(
-                        hotel=shift.hotel,
-                        staff=shift.staff,
-                        department=shift.department,
+                        hotel_id=shift.hotel_id,
+                        staff_id=shift.staff_id,
+                        department_id=shift.department_id,
                         period=target_period,
                         shift_date=new_date,
                         shift_start=shift.shift_start,
@@ -2900,7 +2811,7 @@ class CopyRosterViewSet(AttendanceHotelScopedMixin, viewsets.ViewSet):
                         shift_type=shift.shift_type,
                         is_split_shift=shift.is_split_shift,
                         is_night_shift=shift.is_night_shift,
-                        location=shift.location,
+                        location_id=shift.location_id,
                         notes=f"Copied from {source_period.title}"
                     )
                 )
@@ -2935,36 +2846,18 @@ class CopyRosterViewSet(AttendanceHotelScopedMixin, viewsets.ViewSet):
         
         actual_created = 0
         with transaction.atomic():
-            # Check for overlaps
-            existing_shifts = list(
-                StaffRoster.objects.filter(
-                    hotel=hotel,
-                    shift_date__gte=target_period.start_date,
-                    shift_date__lte=target_period.end_date
-                ).values("staff_id", "shift_date", "shift_start", "shift_end")
-            )
-            
-            # Prepare new shifts for overlap checking
-            new_shifts_data = [
-                {
-                    "staff_id": shift.staff_id,
-                    "shift_date": shift.shift_date,
-                    "shift_start": shift.shift_start,
-                    "shift_end": shift.shift_end
-                } for shift in new_shifts
-            ]
-            
-            # Check for overlaps
-            all_combined = existing_shifts + new_shifts_data
-            
-            if has_overlaps_for_staff(all_combined):
+            # Duplicates / overlaps with the target roster, checked in one pass
+            conflicts = find_conflicts_with_existing(new_shifts)
+            if conflicts:
                 return Response(
-                    {"detail": "Copying would create overlapping shifts. Operation cancelled."},
+                    {"detail": "Copying would create overlapping shifts. Operation cancelled.", "conflicts": conflicts},
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
             # Use bulk_create with ignore_conflicts to handle any remaining duplicates
             created_shifts = StaffRoster.objects.bulk_create(new_shifts, ignore_conflicts=True)
+            refresh_daily_attendance(new_shifts)
+            refresh_shift_windows(new_shifts)
             actual_created = len(created_shifts)
             
             # Log successful operation
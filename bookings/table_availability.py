@@ -0,0 +1,139 @@
+"""
+Table availability for a restaurant day.
+
+All of the day's table reservations are read with one joined query into
+per-table sorted (start, end) minute intervals, merged into disjoint busy
+blocks. A single slot is then a binary search per table, and a whole
+evening grid (every N-minute slot, with free tables per seat count) is one
+forward sweep per table, instead of a query per slot or per booking.
+"""
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+from datetime import time
+
+from .models import BookingTable, DiningTable
+
+
+def to_minutes(value):
+    """Minutes since midnight for a time."""
+    return value.hour * 60 + value.minute
+
+
+def to_time(minutes):
+    minutes = min(max(minutes, 0), 24 * 60 - 1)
+    return time(minutes // 60, minutes % 60)
+
+
+class TableAvailability:
+    """
+    Reservations of a restaurant's tables on one date.
+
+    Args:
+        restaurant: Restaurant (or its id)
+        day: date
+        exclude_booking_ids: bookings to ignore, e.g. the one being moved
+        active_only: only consider active tables
+    """
+
+    def __init__(self, restaurant, day, exclude_booking_ids=(), active_only=False):
+        self.restaurant_id = getattr(restaurant, "pk", restaurant)
+        self.day = day
+
+        tables = DiningTable.objects.filter(restaurant_id=self.restaurant_id)
+        if active_only:
+            tables = tables.filter(is_active=True)
+        self.capacities = dict(tables.values_list("id", "capacity"))
+
+        reservations = BookingTable.objects.filter(
+            table__restaurant_id=self.restaurant_id,
+            booking__date=day,
+            booking__start_time__isnull=False,
+            booking__end_time__isnull=False,
+        )
+        if exclude_booking_ids:
+            reservations = reservations.exclude(booking_id__in=list(exclude_booking_ids))
+
+        self.intervals = defaultdict(list)
+        for table_id, booking_id, start, end in reservations.values_list(
+            "table_id", "booking_id", "booking__start_time", "booking__end_time"
+        ):
+            self.intervals[table_id].append((to_minutes(start), to_minutes(end), booking_id))
+        # Overlapping / touching reservations merged into busy blocks, whose
+        # starts and ends both ascend
+        self.blocks = {}
+        self._block_ends = {}
+        for table_id, intervals in self.intervals.items():
+            intervals.sort()
+            blocks = []
+            for start, end, _ in intervals:
+                if blocks and start <= blocks[-1][1]:
+                    blocks[-1][1] = max(blocks[-1][1], end)
+                else:
+                    blocks.append([start, end])
+            self.blocks[table_id] = blocks
+            self._block_ends[table_id] = [end for _, end in blocks]
+
+    def conflicts(self, table_id, start, end):
+        """Booking ids holding table_id for any part of [start, end)."""
+        start, end = to_minutes(start), to_minutes(end)
+        intervals = self.intervals.get(table_id, ())
+        # Only intervals starting before `end` can overlap
+        upto = bisect_left(intervals, (end,))
+        return [
+            booking_id
+            for b_start, b_end, booking_id in intervals[:upto]
+            if b_end > start
+        ]
+
+    def is_free(self, table_id, start, end):
+        start, end = to_minutes(start), to_minutes(end)
+        # First busy block still running after `start`
+        ends = self._block_ends.get(table_id, ())
+        position = bisect_right(ends, start)
+        return position == len(ends) or self.blocks[table_id][position][0] >= end
+
+    def free_table_ids(self, start, end, min_capacity=0):
+        """Ids of tables free for the whole of [start, end)."""
+        return [
+            table_id
+            for table_id, capacity in self.capacities.items()
+            if capacity >= min_capacity and self.is_free(table_id, start, end)
+        ]
+
+    def grid(self, opening, closing, step_minutes=15, duration_minutes=90):
+        """
+        Free tables for every slot from opening to closing.
+
+        A slot at `t` needs a table for [t, t + duration); slots whose
+        sitting would run past closing are left out.
+
+        Returns:
+            list of dicts: start_time, end_time, free_tables (ids),
+            free_by_capacity ({seat count: free tables}), max_party
+        """
+        first, last = to_minutes(opening), to_minutes(closing)
+        slots = list(range(first, last - duration_minutes + 1, step_minutes))
+        free = [[] for _ in slots]
+
+        for table_id in self.capacities:
+            blocks = self.blocks.get(table_id, ())
+            # Slots ascend, so blocks ending at or before a slot never
+            # matter again: one pointer per table
+            position = 0
+            for i, slot in enumerate(slots):
+                while position < len(blocks) and blocks[position][1] <= slot:
+                    position += 1
+                if position == len(blocks) or blocks[position][0] >= slot + duration_minutes:
+                    free[i].append(table_id)
+
+        grid = []
+        for slot, table_ids in zip(slots, free):
+            by_capacity = Counter(self.capacities[table_id] for table_id in table_ids)
+            grid.append({
+                "start_time": to_time(slot).strftime("%H:%M"),
+                "end_time": to_time(slot + duration_minutes).strftime("%H:%M"),
+                "free_tables": table_ids,
+                "free_by_capacity": dict(sorted(by_capacity.items())),
+                "max_party": max(by_capacity, default=0),
+            })
+        return grid
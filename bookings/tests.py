@@ -6,10 +6,14 @@ from rest_framework import status
 from hotel.models import Hotel
 from rooms.models import Room
 from guests.models import Guest
+from datetime import date, time
+
 from .models import (
-    Restaurant, BookingSubcategory, BookingCategory, Booking
+    Restaurant, BookingSubcategory, BookingCategory, Booking,
+    BookingTable, DiningTable
 )
 from .serializers import BookingCreateSerializer, BookingCategorySerializer
+from .table_availability import TableAvailability
 
 
 class MultiHotelIntegrityTestCase(TestCase):
@@ -329,3 +333,68 @@ class MultiHotelSerializerTestCase(APITestCase):
         
         self.assertFalse(serializer.is_valid())
         # Should fail during create() when full_clean() is called
+
+
+class TableAvailabilityTestCase(TestCase):
+    """Table availability is answered from one query's sorted intervals"""
+
+    def setUp(self):
+        self.hotel = Hotel.objects.create(name="Hotel Tables", slug="tables")
+        self.restaurant = Restaurant.objects.create(
+            name="Grill", slug="grill", hotel=self.hotel
+        )
+        subcategory = BookingSubcategory.objects.create(
+            name="Dinner", slug="dinner", hotel=self.hotel
+        )
+        self.category = BookingCategory.objects.create(
+            name="Dinner", subcategory=subcategory, hotel=self.hotel
+        )
+        self.day = date(2025, 12, 20)
+        self.two = DiningTable.objects.create(restaurant=self.restaurant, code="T1", capacity=2)
+        self.four = DiningTable.objects.create(restaurant=self.restaurant, code="T2", capacity=4)
+        self.early = self._book(self.two, time(18), time(19, 30))
+        self.late = self._book(self.two, time(19), time(20))
+
+    def _book(self, table, start, end):
+        booking = Booking.objects.create(
+            hotel=self.hotel, category=self.category, restaurant=self.restaurant,
+            date=self.day, start_time=start, end_time=end
+        )
+        BookingTable.objects.create(booking=booking, table=table)
+        return booking
+
+    def test_slot_lookup_uses_two_queries(self):
+        with self.assertNumQueries(2):
+            availability = TableAvailability(self.restaurant, self.day)
+
+        self.assertEqual(availability.free_table_ids(time(19, 30), time(21)), [self.four.id])
+        self.assertEqual(
+            sorted(availability.free_table_ids(time(20), time(21))),
+            sorted([self.two.id, self.four.id])
+        )
+        self.assertEqual(availability.free_table_ids(time(17), time(18), min_capacity=3), [self.four.id])
+        self.assertEqual(
+            sorted(availability.conflicts(self.two.id, time(19), time(19, 15))),
+            sorted([self.early.id, self.late.id])
+        )
+
+    def test_excluded_booking_frees_its_table(self):
+        availability = TableAvailability(
+            self.restaurant, self.day, exclude_booking_ids=[self.late.id]
+        )
+        self.assertTrue(availability.is_free(self.two.id, time(19, 30), time(21)))
+        self.assertEqual(availability.conflicts(self.two.id, time(19), time(20)), [self.early.id])
+
+    def test_grid_counts_free_tables_per_seat_count(self):
+        grid = TableAvailability(self.restaurant, self.day).grid(
+            time(17), time(21), step_minutes=30, duration_minutes=60
+        )
+
+        self.assertEqual(
+            [slot["start_time"] for slot in grid],
+            ["17:00", "17:30", "18:00", "18:30", "19:00", "19:30", "20:00"]
+        )
+        self.assertEqual(grid[0]["free_by_capacity"], {2: 1, 4: 1})
+        self.assertEqual(grid[1]["free_by_capacity"], {4: 1})
+        self.assertEqual(grid[1]["max_party"], 4)
+        self.assertEqual(grid[-1]["free_by_capacity"], {2: 1, 4: 1})
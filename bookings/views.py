@@ -54,9 +54,11 @@ from rest_framework.response import Response
 from rest_framework import status
 from hotel.models import Hotel
 from rooms.models import Room
+from django.db.models import Sum
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, time as dt_time
+from .table_availability import TableAvailability
 today = timezone.localdate()
 
 import logging
@@ -279,7 +281,7 @@ class GuestDinnerBookingView(APIView):
             start_time__lt=end_time,
             end_time__gt=start_time
         )
-        current_guests = sum(b.total_seats() for b in overlapping_bookings)
+        current_guests = overlapping_bookings.aggregate(total=Sum("seats__total"))["total"] or 0
 
         if current_guests + total_guests > restaurant.capacity:
             
@@ -299,10 +301,45 @@ class GuestDinnerBookingView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        # --- Optional table selection: tables must be free for the slot ---
+        table_ids = (
+            request.data.getlist("table_ids") if hasattr(request.data, "getlist")
+            else request.data.get("table_ids")
+        ) or []
+        tables = []
+        if table_ids:
+            try:
+                table_ids = {int(table_id) for table_id in table_ids}
+            except (TypeError, ValueError):
+                return Response({"detail": "Invalid table_ids."}, status=status.HTTP_400_BAD_REQUEST)
+
+            availability = TableAvailability(restaurant, booking_date, active_only=True)
+            unknown = table_ids - availability.capacities.keys()
+            if unknown:
+                return Response(
+                    {"detail": "Selected tables do not belong to this restaurant.", "table_ids": sorted(unknown)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            busy = sorted(
+                table_id for table_id in table_ids
+                if not availability.is_free(table_id, start_time, end_time)
+            )
+            if busy:
+                return Response(
+                    {"detail": "Selected tables are already booked at this time.", "table_ids": busy},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if sum(availability.capacities[table_id] for table_id in table_ids) < total_guests:
+                return Response(
+                    {"detail": f"Selected tables do not seat {total_guests} guests."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            tables = list(DiningTable.objects.filter(id__in=table_ids))
+
         # --- Serializer handles booking creation ---
         serializer = BookingCreateSerializer(data=data)
         if serializer.is_valid():
-            booking = serializer.save()
+            booking = serializer.save(assigned_tables=tables)
             out = BookingSerializer(booking)
 
             # ✅ Notify F&B staff using NotificationManager
@@ -586,16 +623,30 @@ class BlueprintObjectViewSet(viewsets.ModelViewSet):
 
 
 class AvailableTablesView(APIView):
+    """
+    Free tables for a date.
+
+      • ?date=&start_time=[&end_time=|&duration_hours=] → tables free for that slot
+      • ?date=&grid=true[&start_time=&end_time=&step_minutes=&duration_hours=]
+        → every slot between opening and closing (or the given times) with
+          its free tables and free tables per seat count
+    """
     permission_classes = [AllowAny]
 
     def get(self, request, hotel_slug, restaurant_slug):
         date_str = request.query_params.get("date")
         start_str = request.query_params.get("start_time")
         end_str = request.query_params.get("end_time")
+        grid = request.query_params.get("grid") == "true"
 
-        if not date_str or not start_str:
+        if not date_str or not (start_str or grid):
             return Response({"detail": "Date and start_time required."}, status=status.HTTP_400_BAD_REQUEST)
 
+        restaurant = get_object_or_404(Restaurant, slug=restaurant_slug, hotel__slug=hotel_slug)
+
+        if grid:
+            return self.get_grid(request, restaurant, date_str, start_str, end_str)
+
         # Parse requested times
         try:
             booking_date = datetime.strptime(date_str, "%Y-%m-%d").date()
@@ -615,31 +666,53 @@ class AvailableTablesView(APIView):
         if start_dt >= end_dt:
             return Response({"detail": "end_time must be after start_time."}, status=status.HTTP_400_BAD_REQUEST)
 
-        # --- Fetch restaurant and tables ---
-        restaurant = get_object_or_404(Restaurant, slug=restaurant_slug, hotel__slug=hotel_slug)
-        all_tables = DiningTable.objects.filter(restaurant=restaurant)
-
-        # --- Find conflicting bookings ---
-        bookings = Booking.objects.filter(
-            restaurant=restaurant,
-            date=booking_date,
-            booking_tables__isnull=False
-        ).distinct()
-
-        conflicting_table_ids = []
-        for b in bookings:
-            b_start_dt = datetime.combine(b.date, b.start_time)
-            b_end_dt = datetime.combine(b.date, b.end_time)
-            # Overlap check
-            if (start_dt < b_end_dt) and (end_dt > b_start_dt):
-                conflicting_table_ids.extend(
-                    list(b.booking_tables.values_list('table_id', flat=True))
-                )
+        # Bookings are same-day: a sitting running past midnight holds the
+        # table until the end of the day
+        end_time = end_dt.time() if end_dt.date() == booking_date else dt_time(23, 59)
 
-        available_tables = all_tables.exclude(id__in=conflicting_table_ids)
+        # --- One query for the day's reservations, then an interval lookup per table ---
+        availability = TableAvailability(restaurant, booking_date)
+        available_tables = DiningTable.objects.filter(
+            id__in=availability.free_table_ids(start_time, end_time)
+        )
         serializer = DiningTableSerializer(available_tables, many=True)
         return Response(serializer.data)
 
+    def get_grid(self, request, restaurant, date_str, start_str, end_str):
+        try:
+            booking_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+            opening = (
+                datetime.strptime(start_str, "%H:%M").time() if start_str
+                else restaurant.opening_time
+            )
+            closing = (
+                datetime.strptime(end_str, "%H:%M").time() if end_str
+                else restaurant.closing_time
+            )
+            step_minutes = int(request.query_params.get("step_minutes", 15))
+            duration_minutes = int(float(request.query_params.get("duration_hours", 1.5)) * 60)
+        except (ValueError, TypeError):
+            return Response({"detail": "Invalid date, time or number format."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if opening is None or closing is None:
+            return Response(
+                {"detail": "start_time and end_time required: the restaurant has no opening hours set."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if step_minutes <= 0 or duration_minutes <= 0:
+            return Response(
+                {"detail": "step_minutes and duration_hours must be positive."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        availability = TableAvailability(restaurant, booking_date, active_only=True)
+        return Response({
+            "date": booking_date.isoformat(),
+            "step_minutes": step_minutes,
+            "duration_minutes": duration_minutes,
+            "slots": availability.grid(opening, closing, step_minutes, duration_minutes),
+        })
+
 
 @api_view(["POST"])
 @permission_classes([
@@ -688,6 +761,18 @@ class AssignGuestToTableAPIView(APIView):
             booking = get_object_or_404(Booking, pk=booking_id)
             table = get_object_or_404(DiningTable, pk=table_id)
 
+            # Refuse tables held by another booking overlapping this one
+            if booking.start_time and booking.end_time:
+                conflicting = TableAvailability(
+                    table.restaurant_id, booking.date, exclude_booking_ids=[booking.id]
+                ).conflicts(table.id, booking.start_time, booking.end_time)
+                if conflicting:
+                    return Response({
+                        "success": False,
+                        "error": f"{table.code} is already booked at this time.",
+                        "conflicting_booking_ids": conflicting,
+                    }, status=status.HTTP_400_BAD_REQUEST)
+
             # Connect booking to table
             assignment, created = BookingTable.objects.get_or_create(
                 booking=booking,
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-19 01:26
+
+import chat.models
+import common.attachment_uploads
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0013_add_booking_to_conversation'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='messageattachment',
+            name='thumbnail',
+            field=models.ImageField(blank=True, help_text='Auto-generated thumbnail for images', null=True, storage=common.attachment_uploads.thumbnail_storage, upload_to=chat.models.message_attachment_path),
+        ),
+    ]
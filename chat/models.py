@@ -3,6 +3,7 @@ from django.utils import timezone
 from django.core.exceptions import ValidationError
 from datetime import timedelta
 from cloudinary.models import CloudinaryField
+from common.attachment_uploads import thumbnail_storage
 import uuid
 import os
 
@@ -248,6 +249,7 @@ class MessageAttachment(models.Model):
     # Optional thumbnail for images
     thumbnail = models.ImageField(
         upload_to=message_attachment_path,
+        storage=thumbnail_storage,
         null=True,
         blank=True,
         help_text="Auto-generated thumbnail for images"
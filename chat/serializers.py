@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Conversation, RoomMessage, MessageAttachment
+from common.attachment_uploads import attachment_file_url
 
 
 class MessageAttachmentSerializer(serializers.ModelSerializer):
@@ -19,8 +20,8 @@ class MessageAttachmentSerializer(serializers.ModelSerializer):
     
     def get_file_url(self, obj):
         """Get absolute URL for file"""
-        if obj.file and hasattr(obj.file, 'url'):
-            file_url = obj.file.url
+        if obj.file:
+            file_url = attachment_file_url(obj.file)
             # Cloudinary URLs are already absolute, don't modify them
             if file_url.startswith('http://') or file_url.startswith('https://'):
                 return file_url
@@ -190,8 +191,8 @@ class RoomMessageSerializer(serializers.ModelSerializer):
                 # Limit to 3 previews
                 for attachment in obj.reply_to.attachments.all()[:3]:
                     file_url = None
-                    if hasattr(attachment.file, 'url'):
-                        file_url = attachment.file.url
+                    if attachment.file:
+                        file_url = attachment_file_url(attachment.file)
 
                     thumbnail_url = None
                     if (attachment.thumbnail and
@@ -14,6 +14,8 @@ from chat.views import (
     update_message,
     delete_message,
     upload_message_attachment,
+    attachment_upload_params,
+    finalize_message_attachments,
     delete_attachment,
     save_fcm_token,
   
@@ -54,6 +56,16 @@ urlpatterns = [
         upload_message_attachment,
         name="upload_message_attachment"
     ),
+    path(
+        "conversations/<int:conversation_id>/attachment-upload-params/",
+        attachment_upload_params,
+        name="attachment_upload_params"
+    ),
+    path(
+        "conversations/<int:conversation_id>/finalize-attachments/",
+        finalize_message_attachments,
+        name="finalize_message_attachments"
+    ),
     path("attachments/<int:attachment_id>/delete/", delete_attachment, name="delete_attachment"),
 
     # --- FCM Token ---
@@ -1,6 +1,11 @@
 #chat/utils.py
+import json
+import logging
 import pusher
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+logger = logging.getLogger(__name__)
 
 pusher_client = pusher.Pusher(
     app_id=settings.PUSHER_APP_ID,
@@ -9,3 +14,65 @@ pusher_client = pusher.Pusher(
     cluster=settings.PUSHER_CLUSTER,
     ssl=True
 )
+
+# Pusher accepts at most 10 events per batch_events call
+PUSHER_BATCH_LIMIT = 10
+
+# Pusher drops messages over 10KB (pusher_client raises past 30KB)
+PUSHER_MESSAGE_LIMIT = 10240
+
+
+def payload_size(data):
+    """Encoded size in bytes of an event payload."""
+    return len(json.dumps(data, cls=DjangoJSONEncoder).encode())
+
+
+def chunk_event_payloads(data, key, limit=PUSHER_MESSAGE_LIMIT):
+    """
+    Split an event whose data[key] list may be too big for one Pusher message.
+
+    Every payload is a copy of ``data`` holding a slice of data[key] plus
+    'chunk' (1-based) and 'chunks', and encodes to at most ``limit`` bytes
+    (a single row bigger than that still goes out on its own).
+
+    Returns:
+        list[dict]: Payloads to send in order (one when everything fits)
+    """
+    base_size = payload_size({**data, key: [], 'chunk': 0, 'chunks': 0}) + 8
+    groups, group, size = [], [], base_size
+    for row in data[key]:
+        row_size = payload_size(row) + 1  # plus the separating comma
+        if group and size + row_size > limit:
+            groups.append(group)
+            group, size = [], base_size
+        group.append(row)
+        size += row_size
+    groups.append(group)
+
+    return [
+        {**data, key: rows, 'chunk': index, 'chunks': len(groups)}
+        for index, rows in enumerate(groups, start=1)
+    ]
+
+
+def pusher_trigger_batch(events):
+    """
+    Send many Pusher events using as few HTTP calls as possible.
+
+    Args:
+        events: List of dicts with 'channel', 'name' and 'data' keys
+
+    Returns:
+        int: Number of events that could not be sent
+    """
+    failed = 0
+
+    for start in range(0, len(events), PUSHER_BATCH_LIMIT):
+        chunk = events[start:start + PUSHER_BATCH_LIMIT]
+        try:
+            pusher_client.trigger_batch(chunk)
+        except Exception as e:
+            failed += len(chunk)
+            logger.error(f"Pusher batch of {len(chunk)} events failed: {e}")
+
+    return failed
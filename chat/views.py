@@ -973,38 +973,33 @@ def delete_message(request, message_id):
 
 # ==================== FILE ATTACHMENT OPERATIONS ====================
 
-@api_view(['POST'])
-@permission_classes([
-    IsAuthenticated, IsStaffMember, IsSameHotel,
-    CanViewChatModule, CanUploadChatAttachment,
-])
-def upload_message_attachment(request, hotel_slug, conversation_id):
-    """
-    Upload file attachment(s) to a message.
-    Supports multiple files per message.
-    Hard-rule: staff-only — guests use the canonical guest endpoint.
-    """
-    from .models import MessageAttachment
-    from .serializers import MessageAttachmentSerializer
-    
+# Storage folder for guest chat attachments (MessageAttachment.file)
+ATTACHMENT_FOLDER = "chat_attachments"
+
+
+def _attachment_conversation(hotel_slug, conversation_id):
+    """Conversation for an attachment upload, or an error Response."""
     conversation = get_object_or_404(Conversation, id=conversation_id)
     hotel = get_object_or_404(Hotel, slug=hotel_slug)
-    
+
     if conversation.room.hotel != hotel:
-        return Response(
+        return None, Response(
             {"error": "Conversation does not belong to this hotel"},
             status=400
         )
-    
-    # Get or create message
+    return conversation, None
+
+
+def _attachment_message(request, conversation):
+    """Existing message (message_id) or a new one for the uploaded files."""
     message_id = request.data.get('message_id')
-    message_text = request.data.get('message', '').strip()
+    message_text = (request.data.get('message') or '').strip()
     reply_to_id = request.data.get('reply_to')
-    
+
     # Determine sender type based on authentication
     staff_instance = getattr(request.user, "staff_profile", None)
     sender_type = "staff" if staff_instance else "guest"
-    
+
     logger.info(
         f"📤 File upload request | User: {request.user} | "
         f"Is authenticated: {request.user.is_authenticated} | "
@@ -1012,143 +1007,207 @@ def upload_message_attachment(request, hotel_slug, conversation_id):
         f"Sender type: {sender_type} | "
         f"Reply to: {reply_to_id if reply_to_id else 'None'}"
     )
-    
+
     if message_id:
         # Attach to existing message
-        message = get_object_or_404(RoomMessage, id=message_id)
-    else:
-        # Create new message with attachment
-        if not message_text:
-            message_text = "[File shared]"
-        
-        # Handle reply_to if provided
-        reply_to_message = None
-        if reply_to_id:
-            try:
-                reply_to_message = RoomMessage.objects.get(
-                    id=reply_to_id,
-                    conversation=conversation
-                )
-                logger.info(
-                    f"File attachment message is replying to "
-                    f"message ID: {reply_to_id}"
-                )
-            except RoomMessage.DoesNotExist:
-                logger.warning(
-                    f"Reply target message {reply_to_id} not found "
-                    f"for file upload"
-                )
-        
-        message = RoomMessage.objects.create(
-            conversation=conversation,
-            room=conversation.room,
-            staff=staff_instance if staff_instance else None,
-            message=message_text,
-            sender_type=sender_type,
-            reply_to=reply_to_message,
-        )
-    
-    # Process uploaded files
-    files = request.FILES.getlist('files')
-    if not files:
-        return Response(
-            {"error": "No files provided"},
-            status=400
-        )
-    
-    # File size limit (50MB per file for high-resolution images)
-    MAX_FILE_SIZE = 50 * 1024 * 1024
-    
-    # Allowed extensions
-    ALLOWED_EXTENSIONS = [
-        '.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp',  # Images
-        '.pdf',  # PDF
-        '.doc', '.docx', '.xls', '.xlsx', '.txt', '.csv'  # Documents
-    ]
-    
-    attachments = []
-    errors = []
-    
-    for file in files:
-        # Validate file size
-        if file.size > MAX_FILE_SIZE:
-            size_mb = file.size / (1024 * 1024)
-            errors.append(
-                f"{file.name}: File too large ({size_mb:.2f}MB, max 50MB)"
-            )
-            continue
-        
-        # Validate file extension
-        import os
-        ext = os.path.splitext(file.name)[1].lower()
-        if ext not in ALLOWED_EXTENSIONS:
-            errors.append(
-                f"{file.name}: File type '{ext}' not allowed. "
-                f"Allowed: images, PDF, documents"
-            )
-            continue
-        
+        return get_object_or_404(RoomMessage, id=message_id)
+
+    # Create new message with attachment
+    if not message_text:
+        message_text = "[File shared]"
+
+    # Handle reply_to if provided
+    reply_to_message = None
+    if reply_to_id:
         try:
-            # Create attachment
-            attachment = MessageAttachment.objects.create(
-                message=message,
-                file=file,
-                file_name=file.name,
-                file_size=file.size,
-                mime_type=file.content_type or ''
+            reply_to_message = RoomMessage.objects.get(
+                id=reply_to_id,
+                conversation=conversation
             )
-            attachments.append(attachment)
             logger.info(
-                f"File uploaded: {file.name} ({file.size} bytes) "
-                f"by {sender_type}"
+                f"File attachment message is replying to "
+                f"message ID: {reply_to_id}"
             )
-        except Exception as e:
-            errors.append(f"{file.name}: Upload failed - {str(e)}")
-            logger.error(f"Failed to upload {file.name}: {e}")
-    
-    if not attachments and errors:
+        except RoomMessage.DoesNotExist:
+            logger.warning(
+                f"Reply target message {reply_to_id} not found "
+                f"for file upload"
+            )
+
+    return RoomMessage.objects.create(
+        conversation=conversation,
+        room=conversation.room,
+        staff=staff_instance if staff_instance else None,
+        message=message_text,
+        sender_type=sender_type,
+        reply_to=reply_to_message,
+    )
+
+
+def _record_attachments(request, conversation, stored, errors):
+    """
+    Attach stored files to a message, broadcast it and build the response.
+    """
+    from .models import MessageAttachment
+    from .serializers import MessageAttachmentSerializer
+    from common.attachment_uploads import create_attachments
+
+    if not stored:
         return Response(
             {"error": "No valid files uploaded", "details": errors},
             status=400
         )
-    
+
+    message = _attachment_message(request, conversation)
+    attachments = create_attachments(MessageAttachment, message, stored)
+
     # Serialize attachments
     serializer = MessageAttachmentSerializer(
         attachments,
         many=True,
         context={'request': request}
     )
-    
+
     # Get full message with attachments
-    from .serializers import RoomMessageSerializer
     message_serializer = RoomMessageSerializer(message, context={'request': request})
-    
+
     logger.info(
         f"Uploaded {len(attachments)} file(s) to message {message.id} "
-        f"by {'staff ' + str(staff_instance) if staff_instance else 'guest'}"
+        f"by {message.sender_type}"
     )
-    
+
     # Use unified guest chat message broadcast for file attachments
     try:
         notification_manager.realtime_guest_chat_message_created(message)
         logger.info(f"Unified file attachment broadcast sent for message {message.id}")
     except Exception as e:
         logger.error(f"Failed to broadcast file attachment via NotificationManager: {e}")
-    
+
     # Legacy direct Pusher/FCM removed — NotificationManager handles all broadcasts
-    
+
     response_data = {
         "message": message_serializer.data,
         "attachments": serializer.data,
         "success": True
     }
-    
+
+    if errors:
+        response_data["warnings"] = errors
+
+    return Response(response_data)
+
+
+@api_view(['POST'])
+@permission_classes([
+    IsAuthenticated, IsStaffMember, IsSameHotel,
+    CanViewChatModule, CanUploadChatAttachment,
+])
+def upload_message_attachment(request, hotel_slug, conversation_id):
+    """
+    Upload file attachment(s) to a message.
+    Supports multiple files per message.
+    Hard-rule: staff-only — guests use the canonical guest endpoint.
+
+    Legacy multipart path: the files are pushed to storage in parallel.
+    New clients upload directly to storage (attachment_upload_params +
+    finalize_message_attachments) instead.
+    """
+    from common.attachment_uploads import store_files
+
+    conversation, error = _attachment_conversation(hotel_slug, conversation_id)
+    if error:
+        return error
+
+    # Process uploaded files
+    files = request.FILES.getlist('files')
+    if not files:
+        return Response(
+            {"error": "No files provided"},
+            status=400
+        )
+
+    stored, errors = store_files(ATTACHMENT_FOLDER, files)
+    return _record_attachments(request, conversation, stored, errors)
+
+
+@api_view(['POST'])
+@permission_classes([
+    IsAuthenticated, IsStaffMember, IsSameHotel,
+    CanViewChatModule, CanUploadChatAttachment,
+])
+def attachment_upload_params(request, hotel_slug, conversation_id):
+    """
+    Signed parameters for uploading files directly to storage.
+
+    Body (JSON):
+    {
+        "files": [{"name": "photo.jpg", "size": 123456, "content_type": "image/jpeg"}]
+    }
+
+    Each returned upload is posted by the client to upload_url with its
+    fields and the file, then passed to finalize_message_attachments as
+    {"ticket": ..., "result": <storage response>}.
+    """
+    from common.attachment_uploads import sign_uploads
+
+    conversation, error = _attachment_conversation(hotel_slug, conversation_id)
+    if error:
+        return error
+
+    files = request.data.get('files')
+    if not files or not isinstance(files, list):
+        return Response({"error": "No files provided"}, status=400)
+
+    uploads, errors = sign_uploads(
+        ATTACHMENT_FOLDER, files, conversation.id, request.user.staff_profile.id
+    )
+    if not uploads:
+        return Response(
+            {"error": "No valid files", "details": errors},
+            status=400
+        )
+
+    response_data = {"uploads": uploads}
     if errors:
         response_data["warnings"] = errors
-    
     return Response(response_data)
 
 
+@api_view(['POST'])
+@permission_classes([
+    IsAuthenticated, IsStaffMember, IsSameHotel,
+    CanViewChatModule, CanUploadChatAttachment,
+])
+def finalize_message_attachments(request, hotel_slug, conversation_id):
+    """
+    Record files the client uploaded directly to storage.
+
+    Body (JSON):
+    {
+        "uploads": [{"ticket": "...", "result": {...}}],
+        "message_id": <optional_existing_message_id>,
+        "message": "Optional text",
+        "reply_to": <optional_reply_to_message_id>
+    }
+
+    Responds like upload_message_attachment.
+    """
+    from common.attachment_uploads import finalize_uploads
+
+    conversation, error = _attachment_conversation(hotel_slug, conversation_id)
+    if error:
+        return error
+
+    uploads = request.data.get('uploads')
+    if not uploads or not isinstance(uploads, list):
+        return Response({"error": "No uploads provided"}, status=400)
+
+    stored, errors = finalize_uploads(
+        ATTACHMENT_FOLDER, uploads, conversation.id, request.user.staff_profile.id
+    )
+    return _record_attachments(request, conversation, stored, errors)
+
+
 @api_view(['DELETE'])
 @permission_classes([
     IsAuthenticated, IsStaffMember,
@@ -0,0 +1,527 @@
+"""
+Chat attachment uploads (guest chat and staff chat).
+
+Attachments of up to 50MB used to be streamed through the Django worker
+and pushed to Cloudinary one after another before the request returned.
+Uploads now go through this module instead:
+
+- Direct uploads: sign_uploads() issues per-file upload parameters, the
+  client sends the file straight to storage, and finalize_uploads()
+  verifies each finished upload and returns what the attachment rows
+  need. The file never touches the Django worker.
+- Legacy multipart uploads: store_files() pushes the received files to
+  storage in parallel (PARALLEL_UPLOADS threads) instead of one by one.
+- queue_thumbnails() generates image thumbnails with Pillow once the
+  transaction commits, on a background worker. Set
+  ATTACHMENT_ASYNC_PROCESSING = False to generate them synchronously.
+
+Storage goes through the backend named by ATTACHMENT_UPLOAD_BACKEND:
+CloudinaryUploadBackend (default) or LocalUploadBackend, which keeps
+files in Django's default storage and stands in for Cloudinary in
+development and tests.
+"""
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import NamedTuple
+
+from django.apps import apps
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils.module_loading import import_string
+
+from .concurrency import WorkerQueue
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTACHMENT_SIZE = 50 * 1024 * 1024  # 50MB
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp')
+ALLOWED_EXTENSIONS = IMAGE_EXTENSIONS + (
+    '.pdf',
+    '.doc', '.docx', '.xls', '.xlsx', '.txt', '.csv',
+)
+# Signed upload tickets expire after this many seconds
+UPLOAD_TICKET_MAX_AGE = 60 * 60
+UPLOAD_TICKET_SALT = 'common.attachment_uploads'
+PARALLEL_UPLOADS = 4
+THUMBNAIL_SIZE = (400, 400)
+
+DEFAULT_UPLOAD_BACKEND = 'common.attachment_uploads.CloudinaryUploadBackend'
+
+
+class UploadRejected(Exception):
+    """A file or finished upload that cannot be attached."""
+
+
+class StoredFile(NamedTuple):
+    """A file in storage, ready to be recorded as an attachment."""
+    ref: str  # value for the attachment's CloudinaryField
+    file_name: str
+    file_size: int
+    mime_type: str
+
+
+def validate_attachment(file_name, file_size):
+    """
+    Check a file against the attachment size and type limits.
+
+    Returns:
+        str error message, or None if the file is allowed
+    """
+    if file_size is not None and file_size > MAX_ATTACHMENT_SIZE:
+        size_mb = file_size / (1024 * 1024)
+        return f"{file_name}: File too large ({size_mb:.2f}MB, max 50MB)"
+
+    ext = os.path.splitext(file_name)[1].lower()
+    if ext not in ALLOWED_EXTENSIONS:
+        return (
+            f"{file_name}: File type '{ext}' not allowed. "
+            f"Allowed: images, PDF, documents"
+        )
+    return None
+
+
+def is_image(file_name):
+    return os.path.splitext(file_name)[1].lower() in IMAGE_EXTENSIONS
+
+
+# ---------------------------------------------------------------------------
+# Storage backends
+# ---------------------------------------------------------------------------
+
+class CloudinaryUploadBackend:
+    """
+    Cloudinary storage.
+
+    Direct uploads are signed for a fixed public_id and allowed_formats
+    and posted to a fixed resource type, so the client can only create the
+    asset it was issued. Finished uploads are checked against the asset
+    Cloudinary actually stored (Admin API), never against the upload
+    response the client hands back.
+    """
+
+    def new_key(self, folder, file_name):
+        # Cloudinary appends the format to image public_ids itself; raw
+        # files keep their extension in the public_id
+        ext = os.path.splitext(file_name)[1].lower()
+        suffix = '' if ext in IMAGE_EXTENSIONS else ext
+        return f"{folder}/{uuid.uuid4().hex}{suffix}"
+
+    @staticmethod
+    def _resource_type(key):
+        # new_key() leaves the extension off image keys only
+        return 'raw' if os.path.splitext(key)[1] else 'image'
+
+    def upload_params(self, key, file_name):
+        import cloudinary
+        from cloudinary.utils import api_sign_request
+
+        config = cloudinary.config()
+        resource_type = self._resource_type(key)
+        if resource_type == 'image':
+            formats = [ext.lstrip('.') for ext in IMAGE_EXTENSIONS]
+        else:
+            formats = [os.path.splitext(key)[1].lstrip('.')]
+        fields = {
+            'public_id': key,
+            'allowed_formats': ','.join(formats),
+            'timestamp': int(time.time()),
+        }
+        fields['signature'] = api_sign_request(fields, config.api_secret)
+        fields['api_key'] = config.api_key
+        return {
+            'upload_url': (
+                f"https://api.cloudinary.com/v1_1/{config.cloud_name}"
+                f"/{resource_type}/upload"
+            ),
+            'fields': fields,
+        }
+
+    def verify_upload(self, key, upload):
+        from cloudinary import api
+        from cloudinary.exceptions import NotFound
+
+        # Looked up under the resource type the upload was signed for, so
+        # an asset posted to another endpoint is not found
+        resource_type = self._resource_type(key)
+        try:
+            resource = api.resource(key, resource_type=resource_type)
+        except NotFound:
+            raise UploadRejected("File was not uploaded")
+
+        if resource_type == 'raw':
+            ext = os.path.splitext(key)[1]
+        else:
+            ext = f".{resource.get('format') or ''}".lower()
+        return self._ref(resource), int(resource.get('bytes') or 0), ext
+
+    def upload(self, key, file):
+        from cloudinary import uploader
+
+        result = uploader.upload(file, public_id=key, resource_type='auto')
+        return self._ref(result), int(result.get('bytes') or file.size)
+
+    def delete(self, ref):
+        from cloudinary import uploader
+
+        resource = self._resource(ref)
+        uploader.destroy(resource.public_id, resource_type=resource.resource_type)
+
+    def url(self, value):
+        # Freshly created attachments still hold the stored string
+        if isinstance(value, str):
+            value = self._resource(value)
+        return value.url
+
+    def open(self, ref):
+        from urllib.request import urlopen
+
+        return urlopen(self._resource(ref).build_url(), timeout=30)
+
+    def thumbnail_storage(self):
+        from cloudinary_storage.storage import MediaCloudinaryStorage
+
+        return MediaCloudinaryStorage()
+
+    @staticmethod
+    def _ref(result):
+        """The string a CloudinaryField stores for an upload result."""
+        resource_type = result.get('resource_type') or 'image'
+        ref = f"{resource_type}/upload/v{result['version']}/{result['public_id']}"
+        if result.get('format') and resource_type != 'raw':
+            ref += f".{result['format']}"
+        return ref
+
+    @staticmethod
+    def _resource(ref):
+        from cloudinary.models import CloudinaryField
+
+        return CloudinaryField(resource_type='auto').parse_cloudinary_resource(ref)
+
+
+class LocalUploadBackend:
+    """
+    Django default storage, as a stand-in for Cloudinary.
+
+    A "direct upload" is the client (or test) writing the file to
+    default_storage under the issued key.
+    """
+
+    def new_key(self, folder, file_name):
+        ext = os.path.splitext(file_name)[1].lower()
+        return f"{folder}/{uuid.uuid4().hex}{ext}"
+
+    def upload_params(self, key, file_name):
+        return {'upload_url': None, 'fields': {'key': key}}
+
+    def verify_upload(self, key, upload):
+        if not default_storage.exists(key):
+            raise UploadRejected("File was not uploaded")
+        return key, default_storage.size(key), os.path.splitext(key)[1]
+
+    def upload(self, key, file):
+        stored = default_storage.save(key, file)
+        return stored, default_storage.size(stored)
+
+    def delete(self, ref):
+        default_storage.delete(ref)
+
+    def url(self, value):
+        # Loaded attachments hold a CloudinaryResource parsed from the key
+        key = value if isinstance(value, str) else (
+            f"{value.public_id}.{value.format}" if value.format else value.public_id
+        )
+        return default_storage.url(key)
+
+    def open(self, ref):
+        return default_storage.open(ref, 'rb')
+
+    def thumbnail_storage(self):
+        return default_storage
+
+
+def get_upload_backend():
+    path = getattr(settings, 'ATTACHMENT_UPLOAD_BACKEND', DEFAULT_UPLOAD_BACKEND)
+    return import_string(path)()
+
+
+def thumbnail_storage():
+    """
+    Storage for attachment thumbnails (ImageField storage callable).
+
+    Thumbnails live next to the attachments themselves: Cloudinary in
+    production, where default_storage is the dyno's own unserved disk.
+    """
+    return get_upload_backend().thumbnail_storage()
+
+
+def attachment_file_url(value):
+    """
+    URL of an attachment's stored file.
+
+    Accepts the CloudinaryField value either as loaded from the database
+    or as the string set by create_attachments().
+    """
+    return get_upload_backend().url(value)
+
+
+# ---------------------------------------------------------------------------
+# Direct (two-phase) uploads
+# ---------------------------------------------------------------------------
+
+def sign_uploads(folder, files, conversation_id, staff_id):
+    """
+    Issue direct-upload parameters for files the client is about to send.
+
+    Args:
+        folder: storage folder, e.g. "chat_attachments"
+        files: list of {"name", "size", "content_type"} dicts
+        conversation_id, staff_id: the conversation and uploader the
+            tickets are issued for; finalize_uploads() only accepts them
+            for the same pair
+
+    Returns:
+        (uploads, errors): one {"file_name", "ticket", "upload_url",
+        "fields"} dict per allowed file, and error messages for the rest.
+        The client posts the file with `fields` to `upload_url` and hands
+        the ticket back to finalize_uploads().
+    """
+    backend = get_upload_backend()
+    uploads, errors = [], []
+    for item in files:
+        name = os.path.basename(str(item.get('name') or ''))
+        try:
+            size = int(item.get('size') or 0)
+        except (TypeError, ValueError):
+            size = None
+        error = validate_attachment(name, size) if name else "File name is required"
+        if error:
+            errors.append(error)
+            continue
+
+        content_type = item.get('content_type') or ''
+        key = backend.new_key(folder, name)
+        ticket = signing.dumps(
+            {
+                'key': key,
+                'name': name,
+                'content_type': content_type,
+                'conversation_id': conversation_id,
+                'staff_id': staff_id,
+            },
+            salt=UPLOAD_TICKET_SALT,
+        )
+        uploads.append({
+            'file_name': name,
+            'ticket': ticket,
+            **backend.upload_params(key, name),
+        })
+    return uploads, errors
+
+
+def finalize_uploads(folder, uploads, conversation_id, staff_id):
+    """
+    Verify finished direct uploads.
+
+    Size and type are checked against what storage actually holds, not
+    against anything the client reports, and each ticket is accepted once.
+
+    Args:
+        folder: the folder the uploads were signed for
+        uploads: list of {"ticket", "result"} dicts, where result is what
+            storage returned to the client (Cloudinary's upload response)
+        conversation_id, staff_id: must match the pair the tickets were
+            issued for by sign_uploads()
+
+    Returns:
+        (stored, errors): StoredFile per verified upload, and error
+        messages for the rest. Oversized or disallowed uploads are
+        deleted again.
+    """
+    backend = get_upload_backend()
+    stored, errors = [], []
+    for upload in uploads:
+        try:
+            ticket = signing.loads(
+                upload.get('ticket') or '',
+                salt=UPLOAD_TICKET_SALT,
+                max_age=UPLOAD_TICKET_MAX_AGE,
+            )
+        except signing.BadSignature:
+            errors.append("Upload ticket is invalid or expired")
+            continue
+
+        name, key = ticket['name'], ticket['key']
+        if not key.startswith(f"{folder}/"):
+            errors.append(f"{name}: Upload belongs to another conversation type")
+            continue
+        if (ticket.get('conversation_id') != conversation_id
+                or ticket.get('staff_id') != staff_id):
+            errors.append(f"{name}: Upload was issued for another conversation")
+            continue
+        try:
+            ref, size, ext = backend.verify_upload(key, upload.get('result') or {})
+        except UploadRejected as e:
+            errors.append(f"{name}: {e}")
+            continue
+
+        # Stored size and format, checked like an incoming file of that type
+        error = validate_attachment(f"{os.path.splitext(name)[0]}{ext}", size)
+        if error:
+            backend.delete(ref)
+            errors.append(error)
+            continue
+
+        # Each ticket is finalized once: a replay would attach the same
+        # file again. cache.add only succeeds for the first caller.
+        if not cache.add(f"{UPLOAD_TICKET_SALT}:used:{key}", True, UPLOAD_TICKET_MAX_AGE):
+            errors.append(f"{name}: Upload was already attached")
+            continue
+        stored.append(StoredFile(ref, name, size, ticket['content_type']))
+    return stored, errors
+
+
+# ---------------------------------------------------------------------------
+# Legacy multipart uploads
+# ---------------------------------------------------------------------------
+
+def store_files(folder, files):
+    """
+    Validate uploaded files and push them to storage in parallel.
+
+    Args:
+        folder: storage folder
+        files: Django UploadedFile objects
+
+    Returns:
+        (stored, errors): StoredFile per stored file, in request order, and
+        error messages for files that were rejected or failed to upload
+    """
+    backend = get_upload_backend()
+    accepted, errors = [], []
+    for file in files:
+        error = validate_attachment(file.name, file.size)
+        if error:
+            errors.append(error)
+        else:
+            accepted.append(file)
+
+    def _upload(file):
+        return backend.upload(backend.new_key(folder, file.name), file)
+
+    stored = []
+    if accepted:
+        workers = min(PARALLEL_UPLOADS, len(accepted))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [(file, pool.submit(_upload, file)) for file in accepted]
+            for file, future in futures:
+                try:
+                    ref, size = future.result()
+                except Exception as e:
+                    errors.append(f"{file.name}: Upload failed - {str(e)}")
+                    logger.error(f"Failed to upload {file.name}: {e}")
+                    continue
+                stored.append(
+                    StoredFile(ref, file.name, size, file.content_type or '')
+                )
+    return stored, errors
+
+
+def create_attachments(model, message, stored):
+    """Attachment rows for stored files, with thumbnails queued for images."""
+    attachments = [
+        model.objects.create(
+            message=message,
+            file=item.ref,
+            file_name=item.file_name,
+            file_size=item.file_size,
+            mime_type=item.mime_type,
+        )
+        for item in stored
+    ]
+    queue_thumbnails(attachments, [item.ref for item in stored])
+    return attachments
+
+
+# ---------------------------------------------------------------------------
+# Thumbnails
+# ---------------------------------------------------------------------------
+
+def make_thumbnail(source):
+    """JPEG thumbnail (ContentFile) of an image file object."""
+    from PIL import Image, ImageOps
+
+    with Image.open(BytesIO(source.read())) as image:
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail(THUMBNAIL_SIZE)
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        buffer = BytesIO()
+        image.save(buffer, 'JPEG', quality=80, optimize=True)
+    return ContentFile(buffer.getvalue())
+
+
+def generate_thumbnails(model_label, items):
+    """
+    Store thumbnails for image attachments.
+
+    Args:
+        model_label: e.g. "chat.MessageAttachment"
+        items: (attachment id, storage ref) pairs
+    """
+    model = apps.get_model(model_label)
+    backend = get_upload_backend()
+    attachments = model.objects.select_related('message').in_bulk(
+        [pk for pk, _ in items]
+    )
+    for pk, ref in items:
+        attachment = attachments.get(pk)
+        if attachment is None or attachment.thumbnail:
+            continue
+        try:
+            with backend.open(ref) as source:
+                content = make_thumbnail(source)
+        except Exception:
+            logger.exception(f"Could not build thumbnail for {model_label} {pk}")
+            continue
+        stem = os.path.splitext(os.path.basename(attachment.file_name))[0]
+        attachment.thumbnail.save(f"{stem}_thumb.jpg", content, save=False)
+        attachment.save(update_fields=['thumbnail'])
+
+
+_thumbnail_queue = WorkerQueue(
+    "attachment-thumbnails", lambda job: generate_thumbnails(*job)
+)
+
+
+def queue_thumbnails(attachments, refs):
+    """
+    Generate thumbnails for the image attachments after the transaction commits.
+
+    Runs synchronously when ATTACHMENT_ASYNC_PROCESSING is False.
+    """
+    items = [
+        (attachment.pk, ref)
+        for attachment, ref in zip(attachments, refs)
+        if is_image(attachment.file_name)
+    ]
+    if not items:
+        return
+    model_label = attachments[0]._meta.label
+
+    if not getattr(settings, 'ATTACHMENT_ASYNC_PROCESSING', False):
+        generate_thumbnails(model_label, items)
+        return
+
+    _thumbnail_queue.put_on_commit((model_label, items))
+
+
+def wait_for_thumbnails():
+    """Block until every queued thumbnail job has been processed."""
+    _thumbnail_queue.wait()
@@ -0,0 +1,189 @@
+"""
+Shared helpers for cache versioning and background work.
+
+- get_cache_version / bump_cache_version: version counters kept in the
+  shared cache, used to orphan every cached entry of a scope at once
+  (menus, leaderboards, voice matcher indexes). A bump stores a fresh
+  clock value with a single cache.set() instead of cache.incr(), which
+  is a read-then-write on the database cache: two concurrent bumps
+  always leave a version no reader has seen, and a counter evicted from
+  the cache never restarts at a value old entries still use.
+- on_commit_once: run work once per transaction however many saves ask
+  for it (version bumps and recalculations triggered by row signals).
+- WorkerQueue: a queue served by one daemon thread per process, started
+  on the first job, so slow work (SMTP, exports, thumbnails) stays off
+  the request path.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------------
+# Cache version counters
+# ---------------------------------------------------------------------------
+
+def get_cache_version(key):
+    """Current version stored under a cache key (seeded on first use)."""
+    return get_cache_versions([key])[0]
+
+
+def get_cache_versions(keys):
+    """
+    Current versions for several cache keys in one cache round trip.
+
+    Returns:
+        tuple: Versions in the order of ``keys``
+    """
+    versions = cache.get_many(keys)
+    for key in keys:
+        if versions.get(key) is None:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return tuple(versions[key] for key in keys)
+
+
+def bump_cache_version(key):
+    """Invalidate everything cached under the version stored at ``key``."""
+    cache.set(key, time.time_ns(), timeout=None)
+
+
+# ---------------------------------------------------------------------------
+# Work deduplicated per transaction
+# ---------------------------------------------------------------------------
+
+class _PendingCommitCall:
+    """One on-commit call shared by every request for the same key."""
+
+    def __init__(self, pending, key, func):
+        self.pending = pending
+        self.key = key
+        self.func = func
+        self.done = False
+
+    def run(self):
+        if self.done:
+            return
+        self.func()
+        self.done = True
+        if self.pending.get(self.key) is self:
+            del self.pending[self.key]
+
+
+def on_commit_once(key, func):
+    """
+    Call ``func`` once the transaction commits, once per ``key``.
+
+    Every call registers its own on_commit callback (so a rolled back
+    savepoint drops exactly its own), but calls with the same key share one
+    pending call: a bulk edit of hundreds of rows runs the work once per
+    commit instead of once per row. ``key`` must identify what ``func``
+    does; the last func registered for a pending key is the one called.
+    """
+    connection = transaction.get_connection()
+    pending = getattr(connection, 'pending_commit_calls', None)
+    if pending is None:
+        pending = connection.pending_commit_calls = {}
+    call = pending.get(key)
+    if call is None or call.done:
+        call = pending[key] = _PendingCommitCall(pending, key, func)
+    else:
+        # Left over from a rolled back transaction, or shared with
+        # earlier saves of this one
+        call.func = func
+    transaction.on_commit(call.run)
+
+
+# ---------------------------------------------------------------------------
+# Background worker queues
+# ---------------------------------------------------------------------------
+
+class WorkerQueue:
+    """
+    Jobs handled in order by a daemon thread, started on the first put().
+
+    Args:
+        name: Thread name (also used in log messages)
+        handle: Called with each job, or with the list of every job
+            waiting when ``batch`` is True
+        batch: Hand the worker everything already queued at once
+        exit_timeout: Seconds to wait for queued jobs when the process
+            exits (None: jobs still queued at exit are dropped)
+    """
+
+    def __init__(self, name, handle, batch=False, exit_timeout=None):
+        self.name = name
+        self._handle = handle
+        self._batch = batch
+        self._queue = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        if exit_timeout is not None:
+            atexit.register(self._drain_on_exit, exit_timeout)
+
+    @property
+    def pending(self):
+        """Jobs queued or in progress."""
+        return self._queue.unfinished_tasks
+
+    def put(self, job):
+        """Queue a job now."""
+        self._ensure_worker()
+        self._queue.put(job)
+
+    def put_on_commit(self, job):
+        """Queue a job once the current transaction commits."""
+        transaction.on_commit(lambda: self.put(job))
+
+    def wait(self, timeout=None):
+        """
+        Block until every queued job has been processed.
+
+        Returns:
+            bool: False if the timeout expired first
+        """
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(
+                lambda: not self._queue.unfinished_tasks, timeout
+            )
+
+    def _ensure_worker(self):
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._worker_loop, name=self.name, daemon=True
+                )
+                self._worker.start()
+
+    def _worker_loop(self):
+        while True:
+            jobs = [self._queue.get()]
+            if self._batch:
+                while True:
+                    try:
+                        jobs.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+            try:
+                close_old_connections()
+                self._handle(jobs if self._batch else jobs[0])
+            except Exception:
+                logger.exception(f"{self.name} worker failed on {jobs}")
+            finally:
+                close_old_connections()
+                for _ in jobs:
+                    self._queue.task_done()
+
+    def _drain_on_exit(self, timeout):
+        # The worker is a daemon thread: without this, jobs queued just
+        # before the process exits (end of a management command, worker
+        # restart) are lost
+        if self.pending and not self.wait(timeout):
+            logger.error(f"Exiting with {self.pending} {self.name} job(s) unfinished")
@@ -1,11 +1,10 @@
 """
 Common mixins for Django REST framework views
 """
-from django.shortcuts import get_object_or_404
 from rest_framework import exceptions
 from rest_framework.permissions import IsAuthenticated
 
-from hotel.models import Hotel
+from hotel.hotel_cache import get_cached_hotel_by_id, get_hotel_or_404
 from staff_chat.permissions import IsStaffMember, IsSameHotel
 
 
@@ -78,7 +77,7 @@ class HotelScopedViewSetMixin:
         hotel_slug = self.kwargs.get("hotel_slug")
         if not hotel_slug:
             raise exceptions.ValidationError("hotel_slug parameter is required in the URL")
-        return get_object_or_404(Hotel, slug=hotel_slug)
+        return get_hotel_or_404(hotel_slug)
     
     def get_staff_hotel(self):
         """
@@ -92,7 +91,7 @@ class HotelScopedViewSetMixin:
         """
         if not hasattr(self.request.user, 'staff_profile'):
             raise exceptions.PermissionDenied("User must have a staff profile")
-        return self.request.user.staff_profile.hotel
+        return get_cached_hotel_by_id(self.request.user.staff_profile.hotel_id)
     
     def validate_hotel_access(self):
         """
@@ -0,0 +1,35 @@
+"""
+Storage backends for files generated by the app.
+
+Imported only when configured (see STOCK_EXPORT_STORAGE in settings):
+cloudinary_storage refuses to import without Cloudinary credentials.
+"""
+import cloudinary.uploader
+from cloudinary_storage.storage import RawMediaCloudinaryStorage
+
+
+class RawFileCloudinaryStorage(RawMediaCloudinaryStorage):
+    """
+    Raw-file Cloudinary storage that keeps files at the name they are saved under.
+
+    MediaCloudinaryStorage lets Cloudinary add a random suffix to each
+    upload and lists / deletes without the media prefix, so a file can't be
+    found again by its path. Used for generated files that every process
+    looks up by a known path (stock exports).
+    """
+
+    def _upload(self, name, content):
+        return cloudinary.uploader.upload(
+            content,
+            public_id=name,
+            resource_type=self._get_resource_type(name),
+            tags=self.TAG,
+            overwrite=True,
+            invalidate=True,
+        )
+
+    def delete(self, name):
+        return super().delete(self._prepend_prefix(name))
+
+    def listdir(self, path):
+        return super().listdir(self._prepend_prefix(self._normalize_path(path)))
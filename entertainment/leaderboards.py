@@ -0,0 +1,149 @@
+"""
+Leaderboard ranking cache for memory game and quiz boards.
+
+Boards are polled by every guest in a tournament lobby but only change when a
+score is submitted, so reads are served from a versioned cache:
+
+- Each board (a memory tournament, a quiz tournament, the general quiz
+  leaderboard) has a version number in the cache. Saving or deleting a
+  completed score bumps it (see entertainment/signals.py), which orphans every
+  cached entry for that board at once - no key scanning needed.
+- Per version we cache the board's scores in rank order. "My rank" is a
+  bisect over that list (O(log n)) instead of a COUNT over the table.
+- On a cold cache the scores come from one query served by the
+  (tournament, completed, -score, time_seconds) composite indexes.
+
+Ranking rule matches the existing endpoints: rank = 1 + number of entries with
+a strictly higher score (ties share a rank).
+"""
+import bisect
+
+from django.core.cache import cache
+
+from common.concurrency import bump_cache_version, get_cache_version
+
+from .models import MemoryGameSession, QuizLeaderboard, QuizSession
+
+LEADERBOARD_CACHE_TIMEOUT = 60 * 60  # Versions change on every new score
+QUIZ_GENERAL_BOARD = 'quiz_general'
+
+
+def memory_tournament_board(tournament_id):
+    """Board identifier for a memory game tournament"""
+    return f"memory_tournament:{tournament_id}"
+
+
+def quiz_tournament_board(tournament_id):
+    """Board identifier for a quiz tournament"""
+    return f"quiz_tournament:{tournament_id}"
+
+
+def _version_key(board):
+    return f"leaderboard_version:{board}"
+
+
+def get_board_version(board):
+    """Current cache version for a board"""
+    return get_cache_version(_version_key(board))
+
+
+def bump_board_version(board):
+    """Invalidate everything cached for a board"""
+    bump_cache_version(_version_key(board))
+
+
+def _board_sessions(board):
+    """Ordered queryset backing a board"""
+    kind, _, pk = board.partition(':')
+
+    if kind == 'memory_tournament':
+        return (MemoryGameSession.objects
+                .filter(tournament_id=pk, completed=True)
+                .order_by('-score', 'time_seconds'))
+    if kind == 'quiz_tournament':
+        return (QuizSession.objects
+                .filter(tournament_id=pk, completed=True)
+                .order_by('-score', 'time_seconds'))
+    if board == QUIZ_GENERAL_BOARD:
+        return QuizLeaderboard.objects.order_by('-best_score')
+
+    raise ValueError(f"Unknown leaderboard: {board}")
+
+
+def _cached(board, name, build):
+    key = f"leaderboard:{board}:v{get_board_version(board)}:{name}"
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        cache.set(key, value, LEADERBOARD_CACHE_TIMEOUT)
+    return value
+
+
+def get_ranked_scores(board):
+    """
+    Board scores in rank order, negated so the list is ascending.
+
+    Returns:
+        list[int]: e.g. scores 900, 850, 850 -> [-900, -850, -850]
+    """
+    score_field = 'best_score' if board == QUIZ_GENERAL_BOARD else 'score'
+
+    def build():
+        return [-score for score in _board_sessions(board).values_list(score_field, flat=True)]
+
+    return _cached(board, 'scores', build)
+
+
+def get_rank_for_score(board, score):
+    """
+    Rank a score would have on a board.
+
+    Args:
+        board: Board identifier
+        score: Score to rank
+
+    Returns:
+        int: 1 + number of entries with a higher score
+    """
+    return bisect.bisect_left(get_ranked_scores(board), -score) + 1
+
+
+def get_score_at_rank(board, rank):
+    """
+    Score held at a 1-based rank, or None if the board is shorter than that.
+    """
+    scores = get_ranked_scores(board)
+    if rank < 1 or rank > len(scores):
+        return None
+    return -scores[rank - 1]
+
+
+def get_memory_tournament_rows(tournament_id):
+    """
+    Memory tournament leaderboard rows as returned by the API, cached per version.
+
+    Returns:
+        list[dict]: Ordered rows (best first)
+    """
+    board = memory_tournament_board(tournament_id)
+
+    def build():
+        sessions = _board_sessions(board).only(
+            'id', 'player_name', 'room_number', 'score',
+            'time_seconds', 'moves_count', 'created_at',
+        )
+        return [
+            {
+                'session_id': session.id,
+                # Clean player name (before the | token separator)
+                'player_name': session.player_name.split('|')[0],
+                'room_number': session.room_number,
+                'score': session.score,
+                'time_seconds': session.time_seconds,
+                'moves_count': session.moves_count,
+                'created_at': session.created_at,
+            }
+            for session in sessions
+        ]
+
+    return _cached(board, 'rows', build)
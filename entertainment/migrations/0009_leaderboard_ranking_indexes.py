@@ -0,0 +1,44 @@
+# Generated by Django 5.2.4 on 2026-10-18 22:02
+
+from django.db import migrations, models
+
+
+def backfill_player_tokens(apps, schema_editor):
+    """Copy the token out of 'PlayerName|token' for existing sessions."""
+    MemoryGameSession = apps.get_model('entertainment', 'MemoryGameSession')
+
+    sessions = MemoryGameSession.objects.filter(player_name__contains='|').only('id', 'player_name')
+    updates = []
+    for session in sessions.iterator():
+        session.player_token = session.player_name.split('|', 1)[1]
+        updates.append(session)
+
+    MemoryGameSession.objects.bulk_update(updates, ['player_token'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('entertainment', '0008_quizcategory_quizquestion_quizsession_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='memorygamesession',
+            name='player_token',
+            field=models.CharField(blank=True, default='', help_text='Token part of player_name, kept for indexed lookups', max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='memorygamesession',
+            index=models.Index(fields=['tournament', 'completed', '-score', 'time_seconds'], name='entertainme_tournam_c8b6b6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='memorygamesession',
+            index=models.Index(fields=['tournament', 'player_token'], name='entertainme_tournam_850313_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizsession',
+            index=models.Index(fields=['tournament', 'completed', '-score', 'time_seconds'], name='entertainme_tournam_50039b_idx'),
+        ),
+        migrations.RunPython(backfill_player_tokens, migrations.RunPython.noop),
+    ]
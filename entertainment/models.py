@@ -254,6 +254,12 @@ class MemoryGameSession(models.Model):
         help_text="Calculated score based on time, moves, and difficulty"
     )
     completed = models.BooleanField(default=True)
+    player_token = models.CharField(
+        max_length=100,
+        blank=True,
+        default='',
+        help_text="Token part of player_name, kept for indexed lookups"
+    )
     
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
@@ -280,6 +286,8 @@ class MemoryGameSession(models.Model):
             models.Index(fields=['player_name', 'difficulty']),
             models.Index(fields=['hotel', 'created_at']),
             models.Index(fields=['tournament', 'score']),
+            models.Index(fields=['tournament', 'completed', '-score', 'time_seconds']),
+            models.Index(fields=['tournament', 'player_token']),
         ]
 
     def __str__(self):
@@ -307,9 +315,11 @@ class MemoryGameSession(models.Model):
         return max(0, calculated_score)  # Ensure score is not negative
 
     def save(self, *args, **kwargs):
-        """Auto-calculate score on save"""
+        """Auto-calculate score and extract player token on save"""
         if self.completed and self.time_seconds and self.moves_count:
             self.score = self.calculate_score()
+        if self.player_name and '|' in self.player_name:
+            self.player_token = self.player_name.split('|', 1)[1]
         super().save(*args, **kwargs)
 
 
@@ -545,6 +555,11 @@ class MemoryGameTournament(models.Model):
                         return qs[:limit]
                 return qs
 
+    def get_rank_for_score(self, score):
+        """Rank a score would have in this tournament (cached, ties share a rank)"""
+        from .leaderboards import get_rank_for_score, memory_tournament_board
+        return get_rank_for_score(memory_tournament_board(self.pk), score)
+
 
 class TournamentParticipation(models.Model):
     """
@@ -980,6 +995,7 @@ class QuizSession(models.Model):
             models.Index(fields=['player_name', 'completed']),
             models.Index(fields=['tournament', 'score']),
             models.Index(fields=['completed', '-score']),
+            models.Index(fields=['tournament', 'completed', '-score', 'time_seconds']),
         ]
 
     def __str__(self):
@@ -1251,15 +1267,20 @@ class QuizLeaderboard(models.Model):
     @classmethod
     def get_player_rank(cls, player_token):
         """Get player's current rank on leaderboard"""
-        try:
-            entry = cls.objects.get(player_token=player_token)
-            better_scores = cls.objects.filter(
-                best_score__gt=entry.best_score
-            ).count()
-            rank = better_scores + 1
-            return rank
-        except cls.DoesNotExist:
+        best_score = (
+            cls.objects.filter(player_token=player_token)
+            .values_list('best_score', flat=True)
+            .first()
+        )
+        if best_score is None:
             return None
+        return cls.get_rank_for_score(best_score)
+
+    @classmethod
+    def get_rank_for_score(cls, best_score):
+        """Rank for a best score, served from the cached sorted score list"""
+        from .leaderboards import QUIZ_GENERAL_BOARD, get_rank_for_score
+        return get_rank_for_score(QUIZ_GENERAL_BOARD, best_score)
 
 
 class QuizTournament(models.Model):
@@ -636,7 +636,7 @@ class QuizLeaderboardSerializer(serializers.ModelSerializer):
     
     def get_rank(self, obj):
         """Calculate player's rank"""
-        return QuizLeaderboard.get_player_rank(obj.player_token)
+        return QuizLeaderboard.get_rank_for_score(obj.best_score)
 
 
 class QuizTournamentSerializer(serializers.ModelSerializer):
@@ -685,11 +685,8 @@ class QuizTournamentLeaderboardSerializer(serializers.ModelSerializer):
     
     def get_rank(self, obj):
         """Calculate rank within tournament"""
-        if not obj.tournament:
+        if not obj.tournament_id:
             return None
-        better_scores = obj.tournament.sessions.filter(
-            completed=True,
-            score__gt=obj.score
-        ).count()
-        return better_scores + 1
+        from .leaderboards import get_rank_for_score, quiz_tournament_board
+        return get_rank_for_score(quiz_tournament_board(obj.tournament_id), obj.score)
 
@@ -0,0 +1,36 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .leaderboards import (
+    QUIZ_GENERAL_BOARD,
+    bump_board_version,
+    memory_tournament_board,
+    quiz_tournament_board,
+)
+from .models import MemoryGameSession, QuizLeaderboard, QuizSession
+
+
+def _bump_after_commit(board):
+    # Bump after commit so concurrent readers can't re-cache the old scores
+    # under the new version
+    transaction.on_commit(lambda: bump_board_version(board))
+
+
+@receiver([post_save, post_delete], sender=MemoryGameSession)
+def invalidate_memory_tournament_leaderboard(sender, instance, **kwargs):
+    """Completed tournament scores change the tournament's ranking"""
+    if instance.tournament_id and instance.completed:
+        _bump_after_commit(memory_tournament_board(instance.tournament_id))
+
+
+@receiver([post_save, post_delete], sender=QuizSession)
+def invalidate_quiz_tournament_leaderboard(sender, instance, **kwargs):
+    """In-progress quiz saves are ignored; only completed plays are ranked"""
+    if instance.tournament_id and instance.completed:
+        _bump_after_commit(quiz_tournament_board(instance.tournament_id))
+
+
+@receiver([post_save, post_delete], sender=QuizLeaderboard)
+def invalidate_quiz_general_leaderboard(sender, instance, **kwargs):
+    _bump_after_commit(QUIZ_GENERAL_BOARD)
@@ -1,3 +1,147 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+
+from hotel.models import Hotel
+from .leaderboards import (
+    QUIZ_GENERAL_BOARD,
+    get_board_version,
+    get_memory_tournament_rows,
+    memory_tournament_board,
+)
+from .models import (
+    MemoryGameSession,
+    MemoryGameTournament,
+    QuizLeaderboard,
+    QuizSession,
+)
+from .views import MemoryGameTournamentViewSet
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+})
+class LeaderboardRankingTests(TestCase):
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+        self.hotel = Hotel.objects.create(name="Game Hotel", slug="game-hotel")
+        now = timezone.now()
+        self.tournament = MemoryGameTournament.objects.create(
+            hotel=self.hotel,
+            name="Kids Cup",
+            slug="kids-cup",
+            start_date=now - timedelta(hours=1),
+            end_date=now + timedelta(hours=1),
+            registration_deadline=now,
+            status=MemoryGameTournament.TournamentStatus.ACTIVE,
+        )
+        self.submit_score = MemoryGameTournamentViewSet.as_view({'post': 'submit_score'})
+
+    def _add_session(self, name, token, time_seconds, moves_count=12):
+        with self.captureOnCommitCallbacks(execute=True):
+            return MemoryGameSession.objects.create(
+                player_name=f"{name}|{token}",
+                tournament=self.tournament,
+                hotel=self.hotel,
+                time_seconds=time_seconds,
+                moves_count=moves_count,
+            )
+
+    def test_session_save_extracts_player_token(self):
+        session = self._add_session("Alice", "tok_a", 10)
+
+        self.assertEqual(session.player_token, "tok_a")
+
+    def test_rank_for_score_shares_ties(self):
+        self._add_session("Alice", "tok_a", 10)  # 980
+        self._add_session("Bob", "tok_b", 20)    # 960
+        self._add_session("Cara", "tok_c", 20)   # 960
+
+        self.assertEqual(self.tournament.get_rank_for_score(980), 1)
+        self.assertEqual(self.tournament.get_rank_for_score(960), 2)
+        self.assertEqual(self.tournament.get_rank_for_score(500), 4)
+
+    def test_cached_rows_are_invalidated_by_new_scores(self):
+        self._add_session("Alice", "tok_a", 20)
+        board = memory_tournament_board(self.tournament.pk)
+        version = get_board_version(board)
+
+        self.assertEqual([row['player_name'] for row in get_memory_tournament_rows(self.tournament.pk)], ["Alice"])
+        with self.assertNumQueries(0):
+            get_memory_tournament_rows(self.tournament.pk)
+
+        self._add_session("Bob", "tok_b", 10)
+
+        self.assertGreater(get_board_version(board), version)
+        rows = get_memory_tournament_rows(self.tournament.pk)
+        self.assertEqual([row['player_name'] for row in rows], ["Bob", "Alice"])
+
+    def _post_score(self, factory, payload):
+        request = factory.post('/submit_score/', payload, format='json')
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.submit_score(request, pk=self.tournament.pk)
+
+    def test_submit_score_keeps_best_per_token_and_ranks(self):
+        factory = APIRequestFactory()
+        payload = {
+            'player_token': 'tok_a',
+            'player_name': 'Alice',
+            'room_number': '101',
+            'time_seconds': 30,
+            'moves_count': 12,
+        }
+        self._add_session("Bob", "tok_b", 10)  # 980
+
+        first = self._post_score(factory, payload)
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(first.data['rank'], 2)
+
+        worse = self._post_score(factory, {**payload, 'time_seconds': 60})
+        self.assertFalse(worse.data['updated'])
+
+        better = self._post_score(factory, {**payload, 'time_seconds': 5})
+        self.assertEqual(better.data['rank'], 1)
+        self.assertEqual(
+            MemoryGameSession.objects.filter(tournament=self.tournament, player_token='tok_a').count(),
+            1,
+        )
+
+    def test_is_high_score_keeps_under_fifty_and_ties_rules(self):
+        view = MemoryGameTournamentViewSet()
+
+        # Under 50 scores every score (even 0) is saved
+        self.assertTrue(view.is_high_score(self.tournament, 0))
+
+        for i in range(50):
+            self._add_session(f"P{i}", f"tok_{i}", 10 + i)
+        fiftieth = self.tournament.sessions.order_by('-score')[49].score
+
+        self.assertFalse(view.is_high_score(self.tournament, fiftieth))
+        self.assertTrue(view.is_high_score(self.tournament, fiftieth + 1))
+
+    def test_quiz_leaderboard_rank_tracks_new_best_scores(self):
+        for token, score in [('tok_a', 300), ('tok_b', 200)]:
+            session = QuizSession.objects.create(
+                player_name=f"Player|{token}",
+                selected_categories=[],
+                completed=True,
+                score=score,
+            )
+            with self.captureOnCommitCallbacks(execute=True):
+                QuizLeaderboard.update_or_create_entry(session)
+
+        self.assertEqual(QuizLeaderboard.get_player_rank('tok_b'), 2)
+        self.assertIsNone(QuizLeaderboard.get_player_rank('missing'))
+
+        entry = QuizLeaderboard.objects.get(player_token='tok_b')
+        entry.best_score = 400
+        with self.captureOnCommitCallbacks(execute=True):
+            entry.save()
+
+        self.assertEqual(QuizLeaderboard.get_player_rank('tok_b'), 1)
+        self.assertGreater(get_board_version(QUIZ_GENERAL_BOARD), 1)
@@ -366,29 +366,19 @@ class MemoryGameTournamentViewSet(viewsets.ModelViewSet):
         # Calculate score for this game
         calculated_score = self.calculate_score(int(time_seconds), int(moves_count))
         
-        # Check if player (by token) already has a score in this tournament
-        # We store the token in player_name field as "name|token"
-        existing_session = MemoryGameSession.objects.filter(
-            tournament=tournament,
-            player_name__endswith=f"|{player_token}"
-        ).first()
-        
-        is_new_personal_best = False
-        
-        if existing_session:
-            # Player exists - update only if new score is better
-            if calculated_score > existing_session.score:
-                # Update the session with new data
-                existing_session.player_name = f"{player_name}|{player_token}"
-                existing_session.room_number = room_number
-                existing_session.time_seconds = int(time_seconds)
-                existing_session.moves_count = int(moves_count)
-                existing_session.score = calculated_score
-                existing_session.save()
-                session = existing_session
-                is_new_personal_best = True
-                message = f'New personal best! Your score: {calculated_score}'
-            else:
+        with transaction.atomic():
+            # One session per player (by token) in this tournament.
+            # Lock the tournament row rather than the session: when the
+            # player has no session yet there is no row to lock, and two
+            # quick submissions would both create one.
+            tournament = MemoryGameTournament.objects.select_for_update().get(pk=tournament.pk)
+            existing_session = (
+                MemoryGameSession.objects
+                .filter(tournament=tournament, player_token=player_token)
+                .first()
+            )
+            
+            if existing_session and calculated_score <= existing_session.score:
                 # Not better than existing score
                 return Response({
                     'message': f'Good try! Your best remains {existing_session.score}',
@@ -399,36 +389,45 @@ class MemoryGameTournamentViewSet(viewsets.ModelViewSet):
                     'player_token': player_token,
                     'updated': False
                 }, status=status.HTTP_200_OK)
-        else:
-            # New player - create new session
-            session_data = {
-                'player_name': f"{player_name}|{player_token}",
-                'room_number': room_number,
-                'is_anonymous': True,
-                'difficulty': 'intermediate',  # Fixed for 3x4 grid
-                'time_seconds': int(time_seconds),
-                'moves_count': int(moves_count),
-                'completed': True,
-                'tournament': tournament,
-                'hotel': tournament.hotel
-            }
             
-            session = MemoryGameSession.objects.create(**session_data)
-            is_new_personal_best = True
-            message = f'Welcome to the tournament! Your score: {calculated_score}'
-        
-        # Extract clean name for response
-        clean_name = player_name
+            if existing_session:
+                # Player exists and beat their best - update the session
+                existing_session.player_name = f"{player_name}|{player_token}"
+                existing_session.room_number = room_number
+                existing_session.time_seconds = int(time_seconds)
+                existing_session.moves_count = int(moves_count)
+                existing_session.score = calculated_score
+                existing_session.save()
+                session = existing_session
+                message = f'New personal best! Your score: {calculated_score}'
+            else:
+                # New player - create new session
+                session_data = {
+                    'player_name': f"{player_name}|{player_token}",
+                    'room_number': room_number,
+                    'is_anonymous': True,
+                    'difficulty': 'intermediate',  # Fixed for 3x4 grid
+                    'time_seconds': int(time_seconds),
+                    'moves_count': int(moves_count),
+                    'completed': True,
+                    'tournament': tournament,
+                    'hotel': tournament.hotel
+                }
+                
+                session = MemoryGameSession.objects.create(**session_data)
+                message = f'Welcome to the tournament! Your score: {calculated_score}'
         
+        # Rank counts strictly higher scores, so it is right whether or not
+        # the cached board already holds this submission
         return Response({
             'message': message,
             'session_id': session.id,
             'score': calculated_score,
             'best_score': session.score,
-            'player_name': clean_name,
+            'player_name': player_name,
             'player_token': player_token,
             'rank': self.get_player_rank_by_score(tournament, session.score),
-            'is_personal_best': is_new_personal_best,
+            'is_personal_best': True,
             'updated': True
         }, status=status.HTTP_201_CREATED)
     
@@ -447,51 +446,36 @@ class MemoryGameTournamentViewSet(viewsets.ModelViewSet):
     
     def is_high_score(self, tournament, score):
         """Check if score qualifies as a high score worth saving"""
-        # Get current top scores (limit to top 50 to keep leaderboard manageable)
-        top_scores = MemoryGameSession.objects.filter(
-            tournament=tournament,
-            completed=True
-        ).order_by('-score')[:50]
+        from .leaderboards import get_score_at_rank, memory_tournament_board
         
-        # If less than 50 scores, always save
-        if top_scores.count() < 50:
+        # Top 50 keeps the leaderboard manageable; under 50 scores, always save
+        fiftieth_score = get_score_at_rank(memory_tournament_board(tournament.pk), 50)
+        if fiftieth_score is None:
             return True
         
-        # Check if score beats the 50th best score
-        lowest_top_score = top_scores.last().score
-        return score > lowest_top_score
+        # Must beat the 50th best score
+        return score > fiftieth_score
     
     def get_leaderboard_threshold(self, tournament):
         """Get the minimum score needed to make the leaderboard"""
-        top_scores = MemoryGameSession.objects.filter(
-            tournament=tournament,
-            completed=True
-        ).order_by('-score')[:50]
-        
-        if top_scores.count() < 50:
-            return 0  # Any score qualifies
+        from .leaderboards import get_score_at_rank, memory_tournament_board
         
-        return top_scores.last().score
+        fiftieth_score = get_score_at_rank(memory_tournament_board(tournament.pk), 50)
+        return fiftieth_score if fiftieth_score is not None else 0
 
     def get_player_best_score(self, tournament, player_name):
         """Get a player's best score in this tournament"""
-        best_session = MemoryGameSession.objects.filter(
+        best_score = MemoryGameSession.objects.filter(
             tournament=tournament,
             player_name=player_name,
             completed=True
-        ).order_by('-score').first()
+        ).order_by('-score').values_list('score', flat=True).first()
         
-        return best_session.score if best_session else 0
+        return best_score or 0
 
     def get_player_rank_by_score(self, tournament, player_score):
         """Calculate rank based on a specific score"""
-        better_scores = MemoryGameSession.objects.filter(
-            tournament=tournament,
-            completed=True,
-            score__gt=player_score
-        ).count()
-        
-        return better_scores + 1
+        return tournament.get_rank_for_score(player_score)
 
     def get_player_rank(self, tournament, session):
         """Calculate player's current rank in tournament"""
@@ -615,28 +599,11 @@ class MemoryGameTournamentViewSet(viewsets.ModelViewSet):
         """Get tournament leaderboard with clean player names"""
         tournament = self.get_object()
 
-        # Always return the full ordered tournament leaderboard (ignore 'limit')
-        sessions = MemoryGameSession.objects.filter(
-            tournament=tournament,
-            completed=True
-        ).order_by('-score', 'time_seconds')
-        
-        leaderboard_data = []
-        for session in sessions:
-            # Extract clean player name (before the | token separator)
-            clean_name = session.player_name.split('|')[0] if '|' in session.player_name else session.player_name
-            
-            leaderboard_data.append({
-                'session_id': session.id,
-                'player_name': clean_name,
-                'room_number': session.room_number,
-                'score': session.score,
-                'time_seconds': session.time_seconds,
-                'moves_count': session.moves_count,
-                'created_at': session.created_at
-            })
+        # Always return the full ordered tournament leaderboard (ignore 'limit').
+        # Served from the versioned leaderboard cache while guests poll it.
+        from .leaderboards import get_memory_tournament_rows
         
-        return Response(leaderboard_data)
+        return Response(get_memory_tournament_rows(tournament.pk))
     
     @action(detail=True, methods=['get'])
     def participants(self, request, pk=None):
@@ -6,14 +6,14 @@ Returns real hotel data including booking options.
 
 from django.urls import path
 from django.http import JsonResponse
-from django.shortcuts import get_object_or_404
 from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
 from datetime import datetime, timedelta
 from decimal import Decimal
 import json
 
-from hotel.models import Hotel, RoomBooking, PricingQuote
+from hotel.models import RoomBooking, PricingQuote
+from hotel.hotel_cache import get_hotel_or_404
 from rooms.models import RoomType, Room
 
 # Import guest portal views for token-authenticated endpoints
@@ -31,7 +31,7 @@ from room_services.views import RoomServiceItemViewSet, OrderViewSet
 
 def guest_home(request, hotel_slug):
     """Guest home page - returns hotel info with booking options"""
-    hotel = get_object_or_404(Hotel, slug=hotel_slug)
+    hotel = get_hotel_or_404(hotel_slug)
     
     # Get booking options if they exist
     booking_options = None
@@ -76,7 +76,7 @@ def guest_home(request, hotel_slug):
 
 def guest_rooms(request, hotel_slug):
     """Guest rooms page - returns room types with photos"""
-    hotel = get_object_or_404(Hotel, slug=hotel_slug)
+    hotel = get_hotel_or_404(hotel_slug)
     rooms = RoomType.objects.filter(hotel=hotel)
     
     def get_photo_url(room_photo):
@@ -110,7 +110,7 @@ def guest_rooms(request, hotel_slug):
 
 def check_availability(request, hotel_slug):
     """Check room availability for given dates and occupancy"""
-    hotel = get_object_or_404(Hotel, slug=hotel_slug)
+    hotel = get_hotel_or_404(hotel_slug)
     
     # Get query parameters
     check_in_str = request.GET.get('check_in')
@@ -203,7 +203,7 @@ def check_availability(request, hotel_slug):
 
 def get_cancellation_policy_details(request, hotel_slug):
     """Get detailed cancellation policy information for a hotel"""
-    hotel = get_object_or_404(Hotel, slug=hotel_slug)
+    hotel = get_hotel_or_404(hotel_slug)
     
     if not hotel.default_cancellation_policy:
         return JsonResponse({
@@ -247,7 +247,7 @@ def get_pricing_quote(request, hotel_slug):
     if request.method != 'POST':
         return JsonResponse({'error': 'POST required'}, status=405)
     
-    hotel = get_object_or_404(Hotel, slug=hotel_slug)
+    hotel = get_hotel_or_404(hotel_slug)
     
     try:
         data = json.loads(request.body)
@@ -374,7 +374,7 @@ def create_booking(request, hotel_slug):
     if request.method != 'POST':
         return JsonResponse({'error': 'POST required'}, status=405)
     
-    hotel = get_object_or_404(Hotel, slug=hotel_slug)
+    hotel = get_hotel_or_404(hotel_slug)
     
     try:
         data = json.loads(request.body)
@@ -11,8 +11,8 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
-from django.shortcuts import get_object_or_404
 
+from .hotel_cache import get_hotel_or_404
 from .models import Hotel
 from .base_serializers import HotelSerializer
 from staff.permissions import IsAdminTier, CanConfigureHotel
@@ -44,5 +44,4 @@ class HotelBySlugView(generics.RetrieveAPIView):
 
     def get_object(self):
         slug = self.kwargs.get("slug")
-        hotel = get_object_or_404(Hotel, slug=slug)
-        return hotel
+        return get_hotel_or_404(slug)
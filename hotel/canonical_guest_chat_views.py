@@ -21,12 +21,12 @@ import logging
 from bookings.services import resolve_chat_context_from_grant
 from common.guest_access import resolve_guest_access, GuestAccessError
 from common.guest_chat_grant import (
-    issue_guest_chat_grant,
     validate_guest_chat_grant,
     GuestChatGrantError,
 )
 from common.guest_chat_config import guest_chat_channel, GUEST_CHAT_EVENTS
-from chat.models import Conversation, RoomMessage
+from hotel.services.guest_portal import guest_chat_context
+from chat.models import RoomMessage
 from notifications.notification_manager import NotificationManager
 from django.conf import settings
 import json
@@ -127,44 +127,9 @@ class GuestChatContextView(APIView, TokenAuthenticationMixin):
                 status=e.status_code,
             )
 
-        booking = ctx.booking
-        room = ctx.room
-
-        # Issue signed session grant
-        chat_session = issue_guest_chat_grant(booking, room)
-
-        # Resolve or create conversation (keyed by booking)
-        conversation, created = Conversation.objects.get_or_create(
-            booking=booking,
-            defaults={"room": room},
+        return Response(
+            guest_chat_context(ctx.booking, ctx.room, hotel_slug)
         )
-        if not created and room and conversation.room_id != getattr(room, 'id', None):
-            conversation.room = room
-            conversation.save(update_fields=["room"])
-
-        can_send = bool(
-            booking.checked_in_at
-            and not booking.checked_out_at
-            and room
-        )
-
-        channel = guest_chat_channel(hotel_slug, booking.booking_id)
-
-        return Response({
-            "conversation_id": conversation.id,
-            "chat_session": chat_session,
-            "channel_name": channel,
-            "events": GUEST_CHAT_EVENTS,
-            "pusher": {
-                "key": settings.PUSHER_KEY,
-                "cluster": settings.PUSHER_CLUSTER,
-                "auth_endpoint": f"/api/guest/hotel/{hotel_slug}/chat/pusher/auth",
-            },
-            "permissions": {
-                "can_send": can_send,
-                "can_read": True,
-            },
-        })
 
 
 @method_decorator(never_cache, name='dispatch')
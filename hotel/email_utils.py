@@ -2,9 +2,10 @@
 Email utilities for hotel bookings.
 """
 import logging
-from django.core.mail import send_mail
 from django.conf import settings
 
+from notifications.email_delivery import build_email, deliver_email
+
 logger = logging.getLogger(__name__)
 
 
@@ -78,13 +79,12 @@ Best regards,
 """
         
         # Send email
-        send_mail(
+        deliver_email(build_email(
             subject=subject,
-            message=message,
+            text_body=message,
+            recipients=[booking.guest_email],
             from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[booking.guest_email],
-            fail_silently=False,
-        )
+        ))
         
         logger.info(
             f"Confirmation email sent successfully for booking "
@@ -23,7 +23,11 @@ from common.guest_auth import (
     GuestTokenBurstThrottle,
     GuestTokenSustainedThrottle,
 )
-from common.guest_chat_grant import issue_guest_chat_grant
+from hotel.services.guest_portal import (
+    build_sections,
+    guest_context,
+    parse_sections,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +60,11 @@ class GuestContextView(APIView, TokenAuthenticationMixin):
         "is_checked_out": false,
         "allowed_actions": ["chat", "room_service", "view_booking"]
     }
+
+    App bootstrap: ?sections=chat,booking_status,room_service_menu,
+    breakfast_menu,hotel_info (or ?sections=all) adds a "sections" object
+    with those payloads, so the app opens with a single request. Menus and
+    hotel info are cached per hotel (see hotel/services/guest_portal.py).
     """
     authentication_classes = []  # Disable DRF's default TokenAuthentication — we do our own token validation
     permission_classes = [AllowAny]
@@ -63,6 +72,14 @@ class GuestContextView(APIView, TokenAuthenticationMixin):
     
     def get(self, request):
         """Get booking context for authenticated guest"""
+        try:
+            sections = parse_sections(request.query_params.get('sections'))
+        except ValueError as e:
+            return Response(
+                {'error': 'INVALID_SECTIONS', 'detail': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
         try:
             # Extract and validate token
             raw_token = self.get_token_from_request(request)
@@ -76,73 +93,18 @@ class GuestContextView(APIView, TokenAuthenticationMixin):
             # GuestContextView doesn't have hotel_slug in URL, so we need a
             # two-step approach: first try without slug constraint.
             ctx = resolve_guest_access_without_slug(raw_token)
-            
-            booking = ctx.booking
-            room_info = None
-            if booking.assigned_room:
-                room_info = {
-                    'room_number': booking.assigned_room.room_number,
-                    'room_type_name': booking.assigned_room.room_type.name,
-                }
+            context = guest_context(ctx)
+            room_info = context['assigned_room']
 
-            # Determine allowed actions
-            allowed_actions = []
-            if 'STATUS_READ' in ctx.scopes:
-                allowed_actions.append('view_booking')
-            if 'CHAT' in ctx.scopes and booking.status in ('CONFIRMED', 'CHECKED_IN'):
-                allowed_actions.append('chat')
-            if ('ROOM_SERVICE' in ctx.scopes
-                    and booking.status == 'CHECKED_IN'
-                    and booking.assigned_room):
-                allowed_actions.append('room_service')
-
-            # Issue guest chat session if chat is allowed
-            chat_eligible = 'chat' in allowed_actions
-            chat_session = None
-            chat_disabled_reason = None
-            if chat_eligible:
-                chat_session = issue_guest_chat_grant(
-                    booking, booking.assigned_room,
+            # Optional bootstrap sections, built from the same resolution
+            if sections:
+                context['sections'] = build_sections(
+                    ctx, sections,
+                    chat_session=context['guest_chat']['session'],
                 )
-            else:
-                if not booking.checked_in_at:
-                    chat_disabled_reason = (
-                        "Check-in required to access chat"
-                    )
-                elif booking.checked_out_at:
-                    chat_disabled_reason = (
-                        "Chat unavailable after checkout"
-                    )
-                elif not booking.assigned_room:
-                    chat_disabled_reason = (
-                        "Room assignment required"
-                    )
-                elif 'CHAT' not in ctx.scopes:
-                    chat_disabled_reason = (
-                        "Chat not available for this booking"
-                    )
-
-            context = {
-                'booking_id': booking.booking_id,
-                'hotel_slug': booking.hotel.slug,
-                'assigned_room': room_info,
-                'guest_name': booking.primary_guest_name,
-                'check_in': booking.check_in,
-                'check_out': booking.check_out,
-                'status': booking.status,
-                'party_size': booking.adults + booking.children,
-                'is_checked_in': booking.status == 'CHECKED_IN',
-                'is_checked_out': booking.status == 'CHECKED_OUT',
-                'allowed_actions': allowed_actions,
-                'guest_chat': {
-                    'enabled': chat_eligible,
-                    'disabled_reason': chat_disabled_reason,
-                    'session': chat_session,
-                },
-            }
 
             logger.info(
-                f"Guest context accessed: booking_id={booking.booking_id}, "
+                f"Guest context accessed: booking_id={ctx.booking.booking_id}, "
                 f"room={room_info['room_number'] if room_info else 'unassigned'}"
             )
             return Response(context, status=status.HTTP_200_OK)
@@ -0,0 +1,175 @@
+"""
+Process-local hotel registry.
+
+Nearly every request resolves a hotel from a slug or subdomain (or from
+staff_profile.hotel) before doing any real work. Hotels change rarely, so
+resolved hotels are kept in a small in-process registry:
+
+- get_hotel_record(slug) returns a lightweight HotelRecord (id, slug,
+  timezone, portal flags) for checks that don't need a model instance.
+- get_cached_hotel(slug), get_cached_hotel_by_id(pk) and get_hotel_or_404(slug)
+  return a Hotel instance rebuilt from cached field values, so FK filters and
+  serializers work without a Hotel query.
+
+Entries expire after HOTEL_CACHE_TTL seconds and are dropped immediately in
+this process when a Hotel or its HotelAccessConfig is saved or deleted (see
+hotel/signals.py). Other workers pick up changes when their entries expire,
+so keep the TTL short. Unknown slugs and ids are remembered for
+HOTEL_MISS_TTL seconds, so repeated requests for a missing hotel don't
+query on every call either.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from django.http import Http404
+
+from .models import Hotel
+
+HOTEL_CACHE_TTL = 60  # seconds
+HOTEL_MISS_TTL = 10  # seconds
+
+
+@dataclass(frozen=True)
+class HotelRecord:
+    """Lightweight, immutable view of a hotel for request routing."""
+    id: int
+    slug: str
+    subdomain: Optional[str]
+    name: str
+    is_active: bool
+    timezone: str
+    guest_portal_enabled: bool
+    staff_portal_enabled: bool
+
+
+class _Entry:
+    __slots__ = ('record', 'field_names', 'values', 'expires_at')
+
+    def __init__(self, record, field_names, values, expires_at):
+        self.record = record
+        self.field_names = field_names
+        self.values = values
+        self.expires_at = expires_at
+
+
+_lock = threading.Lock()
+_by_slug = {}
+_by_id = {}
+
+
+def _load(**lookup):
+    """Load one hotel from the database and register it."""
+    hotel = (
+        Hotel.objects
+        .select_related('access_config')
+        .filter(**lookup)
+        .first()
+    )
+    if hotel is None:
+        return None
+
+    access_config = getattr(hotel, 'access_config', None)
+    record = HotelRecord(
+        id=hotel.id,
+        slug=hotel.slug,
+        subdomain=hotel.subdomain,
+        name=hotel.name,
+        is_active=hotel.is_active,
+        timezone=hotel.timezone,
+        guest_portal_enabled=access_config.guest_portal_enabled if access_config else True,
+        staff_portal_enabled=access_config.staff_portal_enabled if access_config else True,
+    )
+    fields = Hotel._meta.concrete_fields
+    entry = _Entry(
+        record=record,
+        field_names=[f.attname for f in fields],
+        values=tuple(getattr(hotel, f.attname) for f in fields),
+        expires_at=time.monotonic() + HOTEL_CACHE_TTL,
+    )
+
+    with _lock:
+        _by_slug[record.slug] = entry
+        _by_id[record.id] = entry
+    return entry
+
+
+def _get_entry(index, key, **lookup):
+    if not key:
+        return None
+    entry = index.get(key)
+    if entry is None or entry.expires_at <= time.monotonic():
+        entry = _load(**lookup)
+        if entry is None:
+            # Remember the miss; a hotel created with this slug drops it
+            entry = _Entry(None, None, None, time.monotonic() + HOTEL_MISS_TTL)
+            with _lock:
+                index[key] = entry
+    return entry if entry.record is not None else None
+
+
+def _to_instance(entry):
+    if entry is None:
+        return None
+    # Fresh instance per call so request code can't mutate a shared object
+    return Hotel.from_db('default', entry.field_names, entry.values)
+
+
+def get_hotel_record(slug):
+    """
+    Resolve a hotel slug to a HotelRecord.
+
+    Args:
+        slug: Hotel slug
+
+    Returns:
+        HotelRecord or None if no such hotel
+    """
+    entry = _get_entry(_by_slug, slug, slug=slug)
+    return entry.record if entry else None
+
+
+def get_cached_hotel(slug):
+    """
+    Resolve a hotel slug to a Hotel instance without a query on cache hits.
+
+    Returns:
+        Hotel or None if no such hotel
+    """
+    return _to_instance(_get_entry(_by_slug, slug, slug=slug))
+
+
+def get_cached_hotel_by_id(pk):
+    """Resolve a hotel id (e.g. staff_profile.hotel_id) to a Hotel instance."""
+    return _to_instance(_get_entry(_by_id, pk, pk=pk))
+
+
+def get_hotel_or_404(slug):
+    """Cached replacement for get_object_or_404(Hotel, slug=slug)."""
+    hotel = get_cached_hotel(slug)
+    if hotel is None:
+        raise Http404("No Hotel matches the given query.")
+    return hotel
+
+
+def invalidate_hotel(hotel_id, slug=None):
+    """
+    Drop a hotel from this process's registry.
+
+    Removes every slug the hotel was cached under (it may have been renamed)
+    plus ``slug`` itself, in case another hotel held it before.
+    """
+    with _lock:
+        _by_id.pop(hotel_id, None)
+        _by_slug.pop(slug, None)
+        for cached_slug, entry in list(_by_slug.items()):
+            if entry.record is not None and entry.record.id == hotel_id:
+                del _by_slug[cached_slug]
+
+
+def clear_hotel_cache():
+    """Empty the registry (used by tests)."""
+    with _lock:
+        _by_slug.clear()
+        _by_id.clear()
@@ -5,6 +5,7 @@ Usage:
     python manage.py heal_booking_integrity --hotel hotel-slug
     python manage.py heal_booking_integrity --all-hotels
     python manage.py heal_booking_integrity --hotel hotel-slug --dry-run
+    python manage.py heal_booking_integrity --all-hotels --dirty-only
 """
 
 from django.core.management.base import BaseCommand, CommandError
@@ -37,6 +38,12 @@ class Command(BaseCommand):
             help='Show what would be fixed without making changes'
         )
         
+        parser.add_argument(
+            '--dirty-only',
+            action='store_true',
+            help='Only process bookings changed since the last heal (nightly mode)'
+        )
+        
         parser.add_argument(
             '--verbose',
             action='store_true',
@@ -47,6 +54,7 @@ class Command(BaseCommand):
         hotel_slug = options.get('hotel')
         all_hotels = options.get('all_hotels')
         dry_run = options.get('dry_run')
+        dirty_only = options.get('dirty_only')
         verbose = options.get('verbose')
         
         if not hotel_slug and not all_hotels:
@@ -85,7 +93,7 @@ class Command(BaseCommand):
             
             if dry_run:
                 # In dry-run mode, just check for issues
-                issues = check_hotel_integrity(hotel)
+                issues = check_hotel_integrity(hotel, dirty_only=dirty_only)
                 
                 if not issues:
                     self.stdout.write(
@@ -107,7 +115,7 @@ class Command(BaseCommand):
                 try:
                     with transaction.atomic():
                         # Disable notifications in dry-run mode
-                        report = heal_all_bookings_for_hotel(hotel, notify=True)
+                        report = heal_all_bookings_for_hotel(hotel, notify=True, dirty_only=dirty_only)
                         
                         # Update totals
                         total_stats["hotels_processed"] += 1
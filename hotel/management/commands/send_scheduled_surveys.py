@@ -11,17 +11,18 @@ Usage:
     python manage.py send_scheduled_surveys --hotel-slug hotel-name
 """
 
-from django.core.management.base import BaseCommand, CommandError
+from django.core.management.base import BaseCommand
 from django.utils import timezone
 from django.db import transaction
 from hotel.models import RoomBooking, HotelSurveyConfig, BookingSurveyToken
 from django.conf import settings
-from django.core.mail import send_mail
 from datetime import timedelta
 import hashlib
 import secrets
 import logging
 
+from notifications.email_delivery import EmailBatch, build_email
+
 logger = logging.getLogger(__name__)
 
 
@@ -77,17 +78,24 @@ class Command(BaseCommand):
         success_count = 0
         error_count = 0
         
-        for booking in due_bookings:
-            try:
-                self._send_scheduled_survey(booking)
-                success_count += 1
-                self.stdout.write(f'✓ Sent survey for booking {booking.booking_id}')
-            except Exception as e:
-                error_count += 1
-                self.stdout.write(
-                    self.style.ERROR(f'✗ Failed to send survey for booking {booking.booking_id}: {e}')
-                )
-                logger.error(f'Failed to send scheduled survey for {booking.booking_id}: {e}')
+        # Survey config is loaded once per hotel, not once per booking
+        hotel_configs = {}
+        
+        # One SMTP connection for the whole run
+        with EmailBatch() as batch:
+            for booking in due_bookings:
+                try:
+                    if booking.hotel_id not in hotel_configs:
+                        hotel_configs[booking.hotel_id] = HotelSurveyConfig.get_or_create_default(booking.hotel)
+                    self._send_scheduled_survey(booking, hotel_configs[booking.hotel_id], batch)
+                    success_count += 1
+                    self.stdout.write(f'✓ Sent survey for booking {booking.booking_id}')
+                except Exception as e:
+                    error_count += 1
+                    self.stdout.write(
+                        self.style.ERROR(f'✗ Failed to send survey for booking {booking.booking_id}: {e}')
+                    )
+                    logger.error(f'Failed to send scheduled survey for {booking.booking_id}: {e}')
         
         self.stdout.write(
             self.style.SUCCESS(
@@ -95,11 +103,8 @@ class Command(BaseCommand):
             )
         )
     
-    def _send_scheduled_survey(self, booking):
-        """Send survey email for a single booking"""
-        # Get hotel survey configuration
-        hotel_config = HotelSurveyConfig.get_or_create_default(booking.hotel)
-        
+    def _send_scheduled_survey(self, booking, hotel_config, batch):
+        """Send survey email for a single booking over the run's shared connection"""
         # Check if survey should still be sent (config might have changed)
         if hotel_config.send_mode not in ['AUTO_DELAYED', 'AUTO_IMMEDIATE']:
             logger.info(f'Skipping survey for {booking.booking_id}: send_mode is {hotel_config.send_mode}')
@@ -146,7 +151,7 @@ class Command(BaseCommand):
             base_domain = getattr(settings, 'FRONTEND_BASE_URL', 'https://hotelsmates.com')
             survey_url = f"{base_domain}/guest/hotel/{booking.hotel.slug}/survey?token={raw_token}"
             
-            subject = hotel_config.email_subject_template or f\"Share your experience at {booking.hotel.name}\"
+            subject = hotel_config.email_subject_template or f"Share your experience at {booking.hotel.name}"
             
             if hotel_config.email_body_template:
                 message = hotel_config.email_body_template.format(
@@ -176,13 +181,12 @@ Best regards,
                 """
             
             try:
-                send_mail(
+                batch.send(build_email(
                     subject=subject,
-                    message=message,
+                    text_body=message,
+                    recipients=[target_email],
                     from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[target_email],
-                    fail_silently=False,
-                )
+                ))
             except Exception as e:
                 # If email fails, revoke the token for security
                 token.revoked_at = timezone.now()
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 21:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel', '0058_add_booking_filter_performance_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='roombooking',
+            name='integrity_dirty_at',
+            field=models.DateTimeField(blank=True, db_index=True, help_text='When party, guests, room assignment or status last changed since the last integrity heal (null = clean)', null=True),
+        ),
+    ]
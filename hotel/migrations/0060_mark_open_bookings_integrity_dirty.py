@@ -0,0 +1,31 @@
+from django.db import migrations
+from django.db.models import Q
+from django.utils import timezone
+
+ACTIVE_STATUSES = ['PENDING_PAYMENT', 'PENDING_APPROVAL', 'CONFIRMED', 'IN_HOUSE']
+
+
+def mark_open_bookings_dirty(apps, schema_editor):
+    """
+    Flag active and upcoming bookings for the next integrity heal.
+
+    Dirty tracking only flags bookings that change after 0059, so a
+    dirty_only heal would never visit bookings that were already broken
+    before it. One pass over the bookings that still matter catches them.
+    """
+    RoomBooking = apps.get_model('hotel', 'RoomBooking')
+
+    RoomBooking.objects.filter(
+        Q(status__in=ACTIVE_STATUSES) | Q(check_out__gte=timezone.now().date())
+    ).update(integrity_dirty_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel', '0059_roombooking_integrity_dirty_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(mark_open_bookings_dirty, migrations.RunPython.noop),
+    ]
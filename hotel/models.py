@@ -942,6 +942,28 @@ class RoomBooking(models.Model):
         help_text="Additional notes about room move"
     )
 
+    # Integrity healing dirty tracking (see hotel.services.booking_integrity)
+    integrity_dirty_at = models.DateTimeField(
+        null=True, blank=True,
+        db_index=True,
+        help_text="When party, guests, room assignment or status last changed "
+                  "since the last integrity heal (null = clean)"
+    )
+
+    # Fields whose changes require the booking to be re-healed
+    INTEGRITY_TRACKED_FIELDS = (
+        'status',
+        'assigned_room',
+        'checked_in_at',
+        'checked_out_at',
+        'check_in',
+        'check_out',
+        'primary_first_name',
+        'primary_last_name',
+        'primary_email',
+        'primary_phone',
+    )
+
     class Meta:
         ordering = ['-created_at']
         verbose_name = "Room Booking"
@@ -957,6 +979,39 @@ class RoomBooking(models.Model):
             models.Index(fields=['hotel', 'status', 'check_out']),  # For overstay detection
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._integrity_state = instance._get_integrity_state()
+        return instance
+
+    def _get_integrity_state(self):
+        """Snapshot of the integrity-relevant fields (deferred fields are skipped)."""
+        state = {}
+        for name in self.INTEGRITY_TRACKED_FIELDS:
+            attname = self._meta.get_field(name).attname
+            if attname in self.__dict__:
+                state[name] = self.__dict__[attname]
+        return state
+
+    def _changed_integrity_fields(self, update_fields=None):
+        """Return the tracked fields that changed since the booking was loaded."""
+        loaded_state = getattr(self, '_integrity_state', None)
+        if self._state.adding or loaded_state is None:
+            changed = set(self.INTEGRITY_TRACKED_FIELDS)
+        else:
+            current_state = self._get_integrity_state()
+            changed = {
+                name for name, value in current_state.items()
+                if name in loaded_state and loaded_state[name] != value
+            }
+        if update_fields is not None:
+            update_names = {
+                self._meta.get_field(name).name for name in update_fields
+            }
+            changed &= update_names
+        return changed
+
     def save(self, *args, **kwargs):
         if not self.booking_id:
             self.booking_id = self._generate_unique_booking_id()
@@ -964,7 +1019,15 @@ class RoomBooking(models.Model):
         if not self.confirmation_number:
             self.confirmation_number = self._generate_unique_confirmation_number()
 
+        # Mark booking dirty for incremental integrity healing
+        update_fields = kwargs.get('update_fields')
+        if self._changed_integrity_fields(update_fields):
+            self.integrity_dirty_at = timezone.now()
+            if update_fields is not None:
+                kwargs['update_fields'] = list(update_fields) + ['integrity_dirty_at']
+
         super().save(*args, **kwargs)
+        self._integrity_state = self._get_integrity_state()
         
         # Phase 3: Sync PRIMARY BookingGuest with booking primary_* fields
         self._sync_primary_booking_guest()
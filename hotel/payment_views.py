@@ -24,10 +24,15 @@ stripe.api_key = settings.STRIPE_SECRET_KEY
 
 
 def send_payment_received_email(booking, status_url, customer_email):
-    """Send payment received confirmation email with guest status link."""
+    """
+    Send payment received confirmation email with guest status link.
+
+    Returns the number of messages sent or queued (1), like send_mail did,
+    or False on error.
+    """
     try:
-        from django.core.mail import send_mail
         from django.utils.html import strip_tags
+        from notifications.email_delivery import build_email, queue_emails
         
         subject = (f"💳 Payment Received - Under Review - "
                   f"{booking.confirmation_number}")
@@ -106,14 +111,14 @@ def send_payment_received_email(booking, status_url, customer_email):
         
         plain_message = strip_tags(html_content)
         
-        return send_mail(
+        # Queued off the webhook request path
+        return queue_emails([build_email(
             subject=subject,
-            message=plain_message,
-            html_message=html_content,
+            text_body=plain_message,
+            recipients=[customer_email],
+            html_body=html_content,
             from_email=f"{booking.hotel.name} <{settings.EMAIL_HOST_USER}>",
-            recipient_list=[customer_email],
-            fail_silently=False,
-        )
+        )])
         
     except Exception as e:
         print(f"Error sending payment received email: {e}")
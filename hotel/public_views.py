@@ -1128,8 +1128,7 @@ class BookingStatusView(APIView):
 
     def get(self, request, hotel_slug, booking_id):
         """Return booking status and details with mandatory token validation"""
-        from .models import RoomBooking, Hotel
-        from hotel.services.cancellation import CancellationCalculator
+        from hotel.services.guest_portal import booking_status
         from common.guest_access import resolve_guest_access, GuestAccessError
         
         # Token is REQUIRED - no access without it
@@ -1161,72 +1160,7 @@ class BookingStatusView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Eager-load room_type and cancellation_policy if not already loaded
-        if not hasattr(booking, '_room_type_cache'):
-            booking = RoomBooking.objects.select_related(
-                'hotel', 'room_type', 'cancellation_policy'
-            ).get(pk=booking.pk)
-        
-        # Get cancellation policy information
-        cancellation_policy_data = None
-        if booking.cancellation_policy:
-            policy = booking.cancellation_policy
-            cancellation_policy_data = {
-                'id': policy.id,
-                'code': policy.code,
-                'name': policy.name,
-                'description': policy.description,
-                'template_type': policy.template_type,
-                'free_until_hours': policy.free_until_hours,
-                'penalty_type': policy.penalty_type,
-                'no_show_penalty_type': policy.no_show_penalty_type
-            }
-        
-        # Calculate cancellation fees if booking can be cancelled
-        cancellation_preview = None
-        can_cancel = booking.status in ['CONFIRMED', 'PENDING_PAYMENT', 'PENDING_APPROVAL'] and not booking.cancelled_at
-        
-        if can_cancel:
-            try:
-                calculator = CancellationCalculator(booking)
-                cancellation_preview = calculator.calculate()
-            except Exception:
-                can_cancel = False
-        
-        return Response({
-            'booking': {
-                'id': booking.booking_id,
-                'confirmation_number': booking.confirmation_number,
-                'status': booking.status,
-                'check_in': str(booking.check_in),
-                'check_out': str(booking.check_out),
-                'room_type_name': booking.room_type.name,
-                'hotel_name': booking.hotel.name,
-                'nights': booking.nights,
-                'adults': booking.adults,
-                'children': booking.children,
-                'total_amount': str(booking.total_amount),
-                'currency': booking.currency,
-                'special_requests': booking.special_requests or '',
-                'primary_guest_name': booking.primary_guest_name,
-                'primary_email': booking.primary_email,
-                'created_at': booking.created_at.isoformat(),
-                'cancelled_at': booking.cancelled_at.isoformat() if booking.cancelled_at else None,
-                'cancellation_reason': booking.cancellation_reason or '',
-                'checked_in_at': booking.checked_in_at.isoformat() if booking.checked_in_at else None,
-                'checked_out_at': booking.checked_out_at.isoformat() if booking.checked_out_at else None,
-                'assigned_room_number': booking.assigned_room.room_number if booking.assigned_room else None
-            },
-            'hotel': {
-                'name': booking.hotel.name,
-                'slug': booking.hotel.slug,
-                'phone': booking.hotel.phone,
-                'email': booking.hotel.email
-            },
-            'cancellation_policy': cancellation_policy_data,
-            'can_cancel': can_cancel,
-            'cancellation_preview': cancellation_preview,
-        }, status=status.HTTP_200_OK)
+        return Response(booking_status(booking), status=status.HTTP_200_OK)
     
     def post(self, request, hotel_slug, booking_id):
         """Cancel booking with token validation and hotel verification using guest cancellation service"""
@@ -8,12 +8,24 @@ This service provides functions to detect and repair broken data states:
 3. Room occupancy flag integrity
 
 All operations are hotel-scoped and use database transactions for atomicity.
+
+Incremental healing:
+Bookings are flagged via RoomBooking.integrity_dirty_at whenever their
+party, in-house guests, room assignment or status change (see
+RoomBooking.save and hotel.signals). Passing dirty_only=True to
+heal_all_bookings_for_hotel / check_hotel_integrity restricts the work to
+those bookings, so nightly healing scales with daily change volume.
+Migration 0060 flags active and upcoming bookings so the first dirty-only
+run also covers bookings that were broken before tracking began.
 """
 
 import logging
-from typing import Dict, List, Any, Optional
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Any, Iterable, Optional
 from django.db import transaction
-from django.db.models import Q, Count
+from django.db.models import Q, Count, Exists, F, OuterRef
 from django.utils import timezone
 
 from hotel.models import Hotel, RoomBooking, BookingGuest
@@ -32,6 +44,47 @@ class BookingIntegrityService:
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
 
 
+_dirty_tracking = threading.local()
+
+
+@contextmanager
+def suppress_dirty_tracking():
+    """
+    Do not flag bookings as dirty while the block runs.
+
+    Used while healing so that the healer's own party/guest writes do not
+    immediately re-flag the booking it just repaired.
+    """
+    previous = getattr(_dirty_tracking, 'suppressed', False)
+    _dirty_tracking.suppressed = True
+    try:
+        yield
+    finally:
+        _dirty_tracking.suppressed = previous
+
+
+def mark_bookings_dirty(booking_ids: Iterable[Optional[int]]) -> int:
+    """
+    Flag bookings for the next incremental integrity heal.
+    
+    Args:
+        booking_ids: RoomBooking primary keys (None values are ignored)
+        
+    Returns:
+        int: Number of bookings flagged
+    """
+    if getattr(_dirty_tracking, 'suppressed', False):
+        return 0
+
+    ids = {booking_id for booking_id in booking_ids if booking_id}
+    if not ids:
+        return 0
+
+    return RoomBooking.objects.filter(pk__in=ids).update(
+        integrity_dirty_at=timezone.now()
+    )
+
+
 def heal_booking_party(booking: RoomBooking, notify: bool = True) -> Dict[str, Any]:
     """
     Fix BookingGuest party issues for a single booking.
@@ -302,7 +355,8 @@ def heal_room_occupancy(hotel: Hotel, notify: bool = True) -> Dict[str, Any]:
     Fix room.is_occupied flags for all rooms in a hotel.
     
     Sets room.is_occupied = room.guests_in_room.exists() for each room,
-    saving only if the value changed.
+    saving only if the value changed. Occupancy is computed for all rooms
+    in a single annotated query.
     
     Args:
         hotel: Hotel instance to heal rooms for
@@ -320,11 +374,13 @@ def heal_room_occupancy(hotel: Hotel, notify: bool = True) -> Dict[str, Any]:
     }
     
     with transaction.atomic():
-        # Get all rooms for this hotel with their guest count
-        rooms = Room.objects.filter(hotel=hotel).prefetch_related('guests_in_room')
+        # Get all rooms for this hotel with their occupancy state
+        rooms = Room.objects.filter(hotel=hotel).annotate(
+            has_guests=Exists(Guest.objects.filter(room=OuterRef('pk')))
+        )
         
         for room in rooms:
-            should_be_occupied = room.guests_in_room.exists()
+            should_be_occupied = room.has_guests
             
             if room.is_occupied != should_be_occupied:
                 room.is_occupied = should_be_occupied
@@ -346,13 +402,16 @@ def heal_room_occupancy(hotel: Hotel, notify: bool = True) -> Dict[str, Any]:
     return report
 
 
-def heal_all_bookings_for_hotel(hotel: Hotel, notify: bool = True) -> Dict[str, Any]:
+def heal_all_bookings_for_hotel(
+    hotel: Hotel, notify: bool = True, dirty_only: bool = False
+) -> Dict[str, Any]:
     """
     Heal all booking integrity issues for a hotel.
     
     Args:
         hotel: Hotel instance to heal
         notify: Whether to send realtime notifications (default True)
+        dirty_only: Only heal bookings flagged by dirty tracking (default False)
         
     Returns:
         dict: Combined report for all operations
@@ -364,24 +423,35 @@ def heal_all_bookings_for_hotel(hotel: Hotel, notify: bool = True) -> Dict[str,
         "demoted": 0,
         "notes": [],
         "bookings_processed": 0,
+        "dirty_only": dirty_only,
         "party_reports": [],
         "inhouse_reports": [],
         "room_report": {}
     }
     
-    # Get all bookings for this hotel
-    bookings = RoomBooking.objects.filter(hotel=hotel).select_related('hotel', 'assigned_room').prefetch_related('party', 'guests')
+    # Changes committed after this point keep their booking dirty for the next run
+    run_started_at = timezone.now()
     
+    # Get all (or only dirty) bookings for this hotel
+    bookings = RoomBooking.objects.filter(hotel=hotel)
+    if dirty_only:
+        bookings = bookings.filter(integrity_dirty_at__isnull=False)
+    bookings = bookings.select_related('hotel', 'assigned_room').prefetch_related('party', 'guests')
+    
+    processed_ids = []
     for booking in bookings:
-        # Heal party integrity (individual notifications handled within function)
-        party_report = heal_booking_party(booking, notify=notify)
+        with suppress_dirty_tracking():
+            # Heal party integrity (individual notifications handled within function)
+            party_report = heal_booking_party(booking, notify=notify)
+            
+            # Heal in-house guests integrity (individual notifications handled within function)
+            inhouse_report = heal_booking_inhouse_guests(booking, notify=notify)
+        
+        processed_ids.append(booking.pk)
         total_report["party_reports"].append({
             "booking_id": booking.booking_id,
             "report": party_report
         })
-        
-        # Heal in-house guests integrity (individual notifications handled within function)
-        inhouse_report = heal_booking_inhouse_guests(booking, notify=notify)
         total_report["inhouse_reports"].append({
             "booking_id": booking.booking_id,
             "report": inhouse_report
@@ -396,6 +466,13 @@ def heal_all_bookings_for_hotel(hotel: Hotel, notify: bool = True) -> Dict[str,
         
         total_report["bookings_processed"] += 1
     
+    # Clear dirty flags for everything healed in this run
+    if processed_ids:
+        RoomBooking.objects.filter(
+            pk__in=processed_ids,
+            integrity_dirty_at__lte=run_started_at
+        ).update(integrity_dirty_at=None)
+    
     # Heal room occupancy (individual room notifications handled within function)
     room_report = heal_room_occupancy(hotel, notify=notify)
     total_report["room_report"] = room_report
@@ -481,32 +558,124 @@ def assert_booking_integrity(booking: RoomBooking) -> None:
                 errors.append(f"Guest {guest} has wrong check_out_date")
     
     if errors:
-        error_msg = f"Booking {booking.booking_id} integrity issues:\n" + "\n".join(f"- {error}" for error in errors)
-        raise AssertionError(error_msg)
+        raise AssertionError(_format_integrity_errors(booking.booking_id, errors))
+
 
+def _format_integrity_errors(booking_id: str, errors: List[str]) -> str:
+    """Format integrity errors for a booking as a single message."""
+    return f"Booking {booking_id} integrity issues:\n" + "\n".join(f"- {error}" for error in errors)
 
-def check_hotel_integrity(hotel: Hotel) -> List[Dict[str, Any]]:
+
+def check_hotel_integrity(hotel: Hotel, dirty_only: bool = False) -> List[Dict[str, Any]]:
     """
     Check integrity for all bookings in a hotel without fixing anything.
     Returns a list of integrity issues found.
     
+    Detects the same issues as assert_booking_integrity, but with one
+    aggregate query per check instead of loading every booking's party
+    and guests into Python.
+    
     Args:
         hotel: Hotel instance to check
+        dirty_only: Only check bookings flagged by dirty tracking (default False)
         
     Returns:
         List of dictionaries describing integrity issues found
     """
-    issues = []
+    bookings = RoomBooking.objects.filter(hotel=hotel)
+    if dirty_only:
+        bookings = bookings.filter(integrity_dirty_at__isnull=False)
+    
+    errors = defaultdict(list)
+    
+    # Party: missing or multiple PRIMARY BookingGuests
+    party_counts = bookings.annotate(
+        primary_count=Count('party', filter=Q(party__role='PRIMARY'))
+    ).exclude(primary_count=1).values_list('pk', 'primary_count')
+    
+    for booking_pk, primary_count in party_counts:
+        if primary_count == 0:
+            errors[booking_pk].append("Missing PRIMARY BookingGuest")
+        else:
+            errors[booking_pk].append(f"Multiple PRIMARY BookingGuests found: {primary_count}")
+    
+    # Party: PRIMARY name mismatch with booking primary_* fields
+    mismatched_primaries = BookingGuest.objects.filter(
+        booking__in=bookings, role='PRIMARY'
+    ).filter(
+        ~Q(first_name=F('booking__primary_first_name')) |
+        ~Q(last_name=F('booking__primary_last_name'))
+    ).values_list(
+        'booking_id', 'first_name', 'last_name',
+        'booking__primary_first_name', 'booking__primary_last_name'
+    )
+    
+    for booking_pk, first_name, last_name, primary_first_name, primary_last_name in mismatched_primaries:
+        if first_name != primary_first_name:
+            errors[booking_pk].append(f"PRIMARY guest first_name '{first_name}' != booking.primary_first_name '{primary_first_name}'")
+        if last_name != primary_last_name:
+            errors[booking_pk].append(f"PRIMARY guest last_name '{last_name}' != booking.primary_last_name '{primary_last_name}'")
+    
+    # Party: members not staying
+    not_staying = BookingGuest.objects.filter(
+        booking__in=bookings, is_staying=False
+    ).values_list('booking_id', 'first_name', 'last_name')
+    
+    for booking_pk, first_name, last_name in not_staying:
+        full_name = f"{first_name} {last_name}".strip()
+        errors[booking_pk].append(f"Party member {full_name} has is_staying=False")
+    
+    # In-house guests (checked-in bookings only)
+    checked_in = bookings.filter(assigned_room__isnull=False, checked_in_at__isnull=False)
+    
+    inhouse_counts = checked_in.annotate(
+        primary_count=Count('guests', filter=Q(guests__guest_type='PRIMARY'))
+    ).exclude(primary_count=1).values_list('pk', 'primary_count')
+    
+    for booking_pk, primary_count in inhouse_counts:
+        if primary_count == 0:
+            errors[booking_pk].append("Missing PRIMARY in-house Guest for checked-in booking")
+        else:
+            errors[booking_pk].append(f"Multiple PRIMARY in-house Guests: {primary_count}")
+    
+    unlinked_companions = Guest.objects.filter(
+        booking__in=checked_in, guest_type='COMPANION'
+    ).filter(
+        Q(primary_guest__isnull=True) |
+        ~Q(primary_guest__booking_id=F('booking_id')) |
+        ~Q(primary_guest__guest_type='PRIMARY')
+    ).values_list('booking_id', 'first_name', 'last_name')
+    
+    for booking_pk, first_name, last_name in unlinked_companions:
+        errors[booking_pk].append(f"Companion {first_name} {last_name} not linked to primary guest")
+    
+    # Only the mismatching guests are loaded to build detailed messages
+    mismatched_guests = Guest.objects.filter(booking__in=checked_in).filter(
+        ~Q(hotel_id=F('booking__hotel_id')) |
+        ~Q(room_id=F('booking__assigned_room_id')) |
+        ~Q(check_in_date=F('booking__check_in')) |
+        ~Q(check_out_date=F('booking__check_out'))
+    ).select_related('hotel', 'room', 'booking__hotel', 'booking__assigned_room')
+    
+    for guest in mismatched_guests:
+        booking = guest.booking
+        if guest.hotel_id != booking.hotel_id:
+            errors[booking.pk].append(f"Guest {guest} has wrong hotel: {guest.hotel} != {booking.hotel}")
+        if guest.room_id != booking.assigned_room_id:
+            errors[booking.pk].append(f"Guest {guest} has wrong room: {guest.room} != {booking.assigned_room}")
+        if guest.check_in_date != booking.check_in:
+            errors[booking.pk].append(f"Guest {guest} has wrong check_in_date")
+        if guest.check_out_date != booking.check_out:
+            errors[booking.pk].append(f"Guest {guest} has wrong check_out_date")
+    
+    if not errors:
+        return []
     
-    bookings = RoomBooking.objects.filter(hotel=hotel).select_related('hotel', 'assigned_room').prefetch_related('party', 'guests')
+    issues = []
+    for booking_pk, booking_id in RoomBooking.objects.filter(pk__in=errors.keys()).values_list('pk', 'booking_id'):
+        issues.append({
+            "booking_id": booking_id,
+            "error": _format_integrity_errors(booking_id, errors[booking_pk])
+        })
     
-    for booking in bookings:
-        try:
-            assert_booking_integrity(booking)
-        except AssertionError as e:
-            issues.append({
-                "booking_id": booking.booking_id,
-                "error": str(e)
-            })
-    
-    return issues
\ No newline at end of file
+    return issues
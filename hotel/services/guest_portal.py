@@ -0,0 +1,334 @@
+"""
+Guest portal sections.
+
+On opening, the guest app needs the booking context, the chat bootstrap,
+the booking status, both menus and the hotel info categories. Each used
+to be its own request, each resolving the guest token and reloading the
+booking and hotel. GuestContextView now takes ?sections=... and returns
+the requested sections from one token resolution.
+
+The builders here are shared with the single-purpose views
+(GuestContextView, GuestChatContextView, BookingStatusView), so both paths
+return the same shapes.
+
+Menus and hotel info are the same for every guest of a hotel. Menus come
+from the guest menu cache (room_services/menu_cache.py); hotel info is
+cached per hotel (SHARED_SECTION_TTL) and dropped by the hotel info
+signals in hotel/signals.py. Guest-specific sections are always built
+fresh.
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+from common.guest_chat_grant import issue_guest_chat_grant
+from common.guest_chat_config import guest_chat_channel, GUEST_CHAT_EVENTS
+
+logger = logging.getLogger(__name__)
+
+SHARED_SECTION_TTL = 60 * 5
+
+CHAT = 'chat'
+BOOKING_STATUS = 'booking_status'
+ROOM_SERVICE_MENU = 'room_service_menu'
+BREAKFAST_MENU = 'breakfast_menu'
+HOTEL_INFO = 'hotel_info'
+
+SECTIONS = (CHAT, BOOKING_STATUS, ROOM_SERVICE_MENU, BREAKFAST_MENU, HOTEL_INFO)
+SHARED_SECTIONS = (ROOM_SERVICE_MENU, BREAKFAST_MENU, HOTEL_INFO)
+
+# Section name -> room_services.menu_cache menu kind
+_MENU_KINDS = {ROOM_SERVICE_MENU: 'room_service', BREAKFAST_MENU: 'breakfast'}
+
+
+def parse_sections(value):
+    """
+    Parse a ?sections= value ("chat,hotel_info" or "all").
+
+    Returns:
+        list of section names, in SECTIONS order
+    Raises:
+        ValueError for unknown section names
+    """
+    names = {name.strip() for name in (value or '').split(',') if name.strip()}
+    if 'all' in names:
+        return list(SECTIONS)
+    unknown = names - set(SECTIONS)
+    if unknown:
+        raise ValueError(
+            f"Unknown sections: {', '.join(sorted(unknown))}. "
+            f"Available: {', '.join(SECTIONS)}"
+        )
+    return [name for name in SECTIONS if name in names]
+
+
+# ---------------------------------------------------------------------------
+# Guest-specific sections
+# ---------------------------------------------------------------------------
+
+def guest_context(ctx):
+    """Booking context returned by GuestContextView."""
+    booking = ctx.booking
+    room_info = None
+    if booking.assigned_room:
+        room_info = {
+            'room_number': booking.assigned_room.room_number,
+            'room_type_name': booking.assigned_room.room_type.name,
+        }
+
+    # Determine allowed actions
+    allowed_actions = []
+    if 'STATUS_READ' in ctx.scopes:
+        allowed_actions.append('view_booking')
+    if 'CHAT' in ctx.scopes and booking.status in ('CONFIRMED', 'CHECKED_IN'):
+        allowed_actions.append('chat')
+    if ('ROOM_SERVICE' in ctx.scopes
+            and booking.status == 'CHECKED_IN'
+            and booking.assigned_room):
+        allowed_actions.append('room_service')
+
+    # Issue guest chat session if chat is allowed
+    chat_eligible = 'chat' in allowed_actions
+    chat_session = None
+    chat_disabled_reason = None
+    if chat_eligible:
+        chat_session = issue_guest_chat_grant(
+            booking, booking.assigned_room,
+        )
+    else:
+        if not booking.checked_in_at:
+            chat_disabled_reason = (
+                "Check-in required to access chat"
+            )
+        elif booking.checked_out_at:
+            chat_disabled_reason = (
+                "Chat unavailable after checkout"
+            )
+        elif not booking.assigned_room:
+            chat_disabled_reason = (
+                "Room assignment required"
+            )
+        elif 'CHAT' not in ctx.scopes:
+            chat_disabled_reason = (
+                "Chat not available for this booking"
+            )
+
+    return {
+        'booking_id': booking.booking_id,
+        'hotel_slug': booking.hotel.slug,
+        'assigned_room': room_info,
+        'guest_name': booking.primary_guest_name,
+        'check_in': booking.check_in,
+        'check_out': booking.check_out,
+        'status': booking.status,
+        'party_size': booking.adults + booking.children,
+        'is_checked_in': booking.status == 'CHECKED_IN',
+        'is_checked_out': booking.status == 'CHECKED_OUT',
+        'allowed_actions': allowed_actions,
+        'guest_chat': {
+            'enabled': chat_eligible,
+            'disabled_reason': chat_disabled_reason,
+            'session': chat_session,
+        },
+    }
+
+
+def guest_chat_context(booking, room, hotel_slug, chat_session=None):
+    """
+    Chat bootstrap returned by GuestChatContextView: session grant,
+    conversation (created on first use) and realtime config.
+    The caller checks the CHAT scope.
+    """
+    from chat.models import Conversation
+
+    # Issue signed session grant
+    if chat_session is None:
+        chat_session = issue_guest_chat_grant(booking, room)
+
+    # Resolve or create conversation (keyed by booking)
+    conversation, created = Conversation.objects.get_or_create(
+        booking=booking,
+        defaults={"room": room},
+    )
+    if not created and room and conversation.room_id != getattr(room, 'id', None):
+        conversation.room = room
+        conversation.save(update_fields=["room"])
+
+    can_send = bool(
+        booking.checked_in_at
+        and not booking.checked_out_at
+        and room
+    )
+
+    return {
+        "conversation_id": conversation.id,
+        "chat_session": chat_session,
+        "channel_name": guest_chat_channel(hotel_slug, booking.booking_id),
+        "events": GUEST_CHAT_EVENTS,
+        "pusher": {
+            "key": settings.PUSHER_KEY,
+            "cluster": settings.PUSHER_CLUSTER,
+            "auth_endpoint": f"/api/guest/hotel/{hotel_slug}/chat/pusher/auth",
+        },
+        "permissions": {
+            "can_send": can_send,
+            "can_read": True,
+        },
+    }
+
+
+def booking_status(booking):
+    """Booking status and cancellation preview returned by BookingStatusView."""
+    from hotel.models import RoomBooking
+    from hotel.services.cancellation import CancellationCalculator
+
+    # Eager-load room_type and cancellation_policy if not already loaded
+    if not hasattr(booking, '_room_type_cache'):
+        booking = RoomBooking.objects.select_related(
+            'hotel', 'room_type', 'cancellation_policy', 'assigned_room'
+        ).get(pk=booking.pk)
+
+    # Get cancellation policy information
+    cancellation_policy_data = None
+    if booking.cancellation_policy:
+        policy = booking.cancellation_policy
+        cancellation_policy_data = {
+            'id': policy.id,
+            'code': policy.code,
+            'name': policy.name,
+            'description': policy.description,
+            'template_type': policy.template_type,
+            'free_until_hours': policy.free_until_hours,
+            'penalty_type': policy.penalty_type,
+            'no_show_penalty_type': policy.no_show_penalty_type
+        }
+
+    # Calculate cancellation fees if booking can be cancelled
+    cancellation_preview = None
+    can_cancel = booking.status in ['CONFIRMED', 'PENDING_PAYMENT', 'PENDING_APPROVAL'] and not booking.cancelled_at
+
+    if can_cancel:
+        try:
+            calculator = CancellationCalculator(booking)
+            cancellation_preview = calculator.calculate()
+        except Exception:
+            can_cancel = False
+
+    return {
+        'booking': {
+            'id': booking.booking_id,
+            'confirmation_number': booking.confirmation_number,
+            'status': booking.status,
+            'check_in': str(booking.check_in),
+            'check_out': str(booking.check_out),
+            'room_type_name': booking.room_type.name,
+            'hotel_name': booking.hotel.name,
+            'nights': booking.nights,
+            'adults': booking.adults,
+            'children': booking.children,
+            'total_amount': str(booking.total_amount),
+            'currency': booking.currency,
+            'special_requests': booking.special_requests or '',
+            'primary_guest_name': booking.primary_guest_name,
+            'primary_email': booking.primary_email,
+            'created_at': booking.created_at.isoformat(),
+            'cancelled_at': booking.cancelled_at.isoformat() if booking.cancelled_at else None,
+            'cancellation_reason': booking.cancellation_reason or '',
+            'checked_in_at': booking.checked_in_at.isoformat() if booking.checked_in_at else None,
+            'checked_out_at': booking.checked_out_at.isoformat() if booking.checked_out_at else None,
+            'assigned_room_number': booking.assigned_room.room_number if booking.assigned_room else None
+        },
+        'hotel': {
+            'name': booking.hotel.name,
+            'slug': booking.hotel.slug,
+            'phone': booking.hotel.phone,
+            'email': booking.hotel.email
+        },
+        'cancellation_policy': cancellation_policy_data,
+        'can_cancel': can_cancel,
+        'cancellation_preview': cancellation_preview,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Shared (per-hotel) sections
+# ---------------------------------------------------------------------------
+
+def _hotel_info(hotel_id):
+    from hotel_info.models import HotelInfoCategory
+    from hotel_info.serializers import HotelInfoCategorySerializer
+
+    # Same categories as PublicHotelInfoCategoryListView
+    categories = HotelInfoCategory.objects.filter(infos__hotel_id=hotel_id).distinct()
+    return HotelInfoCategorySerializer(categories, many=True).data
+
+
+_SHARED_BUILDERS = {
+    HOTEL_INFO: _hotel_info,
+}
+
+
+def _shared_key(hotel_id, name):
+    return f"guest_portal:{name}:{hotel_id}"
+
+
+def shared_section(hotel_id, name):
+    """A per-hotel section, cached for every guest of the hotel."""
+    if name in _MENU_KINDS:
+        from room_services.menu_cache import get_menu_data
+
+        return get_menu_data(hotel_id, _MENU_KINDS[name])
+
+    key = _shared_key(hotel_id, name)
+    data = cache.get(key)
+    if data is None:
+        # Plain lists/dicts, not ReturnList, so the cached value pickles cleanly
+        data = [dict(row) for row in _SHARED_BUILDERS[name](hotel_id)]
+        cache.set(key, data, SHARED_SECTION_TTL)
+    return data
+
+
+def invalidate_shared_section(hotel_id, name):
+    if hotel_id is not None:
+        cache.delete(_shared_key(hotel_id, name))
+
+
+# ---------------------------------------------------------------------------
+# Bootstrap
+# ---------------------------------------------------------------------------
+
+def build_sections(ctx, names, chat_session=None):
+    """
+    Build the requested sections for a resolved guest.
+
+    A section the token can't use is returned as {'error', 'detail'}
+    instead of failing the whole bootstrap.
+
+    Args:
+        ctx: GuestAccessContext from the guest access resolver
+        names: section names from parse_sections()
+        chat_session: grant already issued for this request, if any
+
+    Returns:
+        dict: section name -> section data
+    """
+    booking = ctx.booking
+    hotel = booking.hotel
+    sections = {}
+    for name in names:
+        if name == CHAT:
+            if 'CHAT' not in ctx.scopes:
+                sections[name] = {
+                    'error': 'MISSING_SCOPE',
+                    'detail': 'Chat not available for this booking',
+                }
+                continue
+            sections[name] = guest_chat_context(
+                booking, ctx.room, hotel.slug, chat_session=chat_session,
+            )
+        elif name == BOOKING_STATUS:
+            sections[name] = booking_status(booking)
+        else:
+            sections[name] = shared_section(hotel.id, name)
+    return sections
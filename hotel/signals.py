@@ -1,10 +1,15 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
+from guests.models import Guest
 from .models import (
     Hotel, HotelAccessConfig, HotelPublicPage,
     BookingOptions, AttendanceSettings,
     HotelPrecheckinConfig, HotelSurveyConfig,
+    BookingGuest,
 )
+from .hotel_cache import invalidate_hotel
+from .services.guest_portal import HOTEL_INFO, invalidate_shared_section
+from hotel_info.models import HotelInfo, HotelInfoCategory
 
 
 @receiver(post_save, sender=Hotel)
@@ -18,6 +23,9 @@ def create_hotel_related_objects(sender, instance, created, **kwargs):
     """
     from common.models import ThemePreference
 
+    # Drop this hotel from the in-process registry (hotel/hotel_cache.py)
+    invalidate_hotel(instance.pk, slug=instance.slug)
+
     # HotelAccessConfig
     if not hasattr(instance, 'access_config'):
         HotelAccessConfig.objects.create(hotel=instance)
@@ -61,3 +69,47 @@ def create_hotel_related_objects(sender, instance, created, **kwargs):
                     'is_active': True,
                 },
             )
+
+
+@receiver(post_delete, sender=Hotel)
+def invalidate_deleted_hotel(sender, instance, **kwargs):
+    invalidate_hotel(instance.pk, slug=instance.slug)
+
+
+@receiver(post_save, sender=HotelAccessConfig)
+@receiver(post_delete, sender=HotelAccessConfig)
+def invalidate_hotel_access_flags(sender, instance, **kwargs):
+    """Portal flags are part of the cached hotel record"""
+    invalidate_hotel(instance.hotel_id)
+
+
+@receiver(post_save, sender=BookingGuest)
+@receiver(post_delete, sender=BookingGuest)
+@receiver(post_save, sender=Guest)
+@receiver(post_delete, sender=Guest)
+def mark_booking_integrity_dirty(sender, instance, **kwargs):
+    """
+    Flag the owning booking for incremental integrity healing whenever a
+    party member or in-house guest linked to it changes.
+    """
+    from hotel.services.booking_integrity import mark_bookings_dirty
+
+    mark_bookings_dirty([instance.booking_id])
+
+
+@receiver(post_save, sender=HotelInfo)
+@receiver(post_delete, sender=HotelInfo)
+def invalidate_guest_hotel_info(sender, instance, **kwargs):
+    """Hotel info is cached per hotel for the guest portal bootstrap"""
+    invalidate_shared_section(instance.hotel_id, HOTEL_INFO)
+
+
+@receiver(post_save, sender=HotelInfoCategory)
+def invalidate_guest_hotel_info_category(sender, instance, **kwargs):
+    """Categories are shared: drop every hotel that lists this one"""
+    hotel_ids = (
+        HotelInfo.objects.filter(category=instance)
+        .values_list('hotel_id', flat=True).distinct()
+    )
+    for hotel_id in hotel_ids:
+        invalidate_shared_section(hotel_id, HOTEL_INFO)
@@ -35,6 +35,7 @@ from notifications.notification_manager import notification_manager
 from notifications.email_service import send_booking_confirmation_email, send_booking_cancellation_email
 from notifications.fcm_service import send_booking_confirmation_notification, send_booking_cancellation_notification
 from room_bookings.services.room_assignment import RoomAssignmentService
+from room_bookings.services.auto_assignment import AutoAssignmentService
 from room_bookings.exceptions import RoomAssignmentError
 from room_bookings.services.room_move import RoomMoveService, RoomMoveError
 from rest_framework.pagination import PageNumberPagination
@@ -2126,6 +2127,84 @@ class SafeAssignRoomView(APIView):
             )
 
 
+class AutoAssignRoomsInputSerializer(serializers.Serializer):
+    """Input serializer for whole-day auto assignment"""
+    start_date = serializers.DateField(required=False, help_text="First arrival date (default today)")
+    end_date = serializers.DateField(required=False, help_text="Last arrival date (default start_date)")
+    dry_run = serializers.BooleanField(required=False, default=True, help_text="Preview only, assign nothing")
+    notes = serializers.CharField(required=False, allow_blank=True, default="", help_text="Assignment notes")
+
+    def validate(self, data):
+        data.setdefault('start_date', timezone.localdate())
+        data.setdefault('end_date', data['start_date'])
+        if data['end_date'] < data['start_date']:
+            raise serializers.ValidationError("end_date must not be before start_date")
+        return data
+
+
+class AutoAssignRoomsView(APIView):
+    """POST /api/staff/hotels/{hotel_slug}/room-bookings/auto-assign-rooms/
+
+    Assigns rooms to all unassigned arrivals in the date range.
+    dry_run (default true) returns the proposed plan; dry_run=false applies it.
+    """
+
+    permission_classes = [
+        IsAuthenticated,
+        IsStaffMember,
+        IsSameHotel,
+        CanViewBookings,
+        CanReadBookings,
+        CanAssignBookingRoom,
+    ]
+
+    def post(self, request, hotel_slug):
+        serializer = AutoAssignRoomsInputSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                {'error': {'code': 'INVALID_INPUT', 'message': 'Invalid input data', 'details': serializer.errors}},
+                status=400
+            )
+        data = serializer.validated_data
+        hotel = get_object_or_404(Hotel, slug=hotel_slug)
+
+        if data['dry_run']:
+            plan = AutoAssignmentService.plan(hotel, data['start_date'], data['end_date'])
+            return Response({'dry_run': True, **plan})
+
+        staff_user = get_staff_or_403(request.user, hotel)
+        try:
+            result = AutoAssignmentService.apply(
+                hotel,
+                data['start_date'],
+                data['end_date'],
+                staff_user=staff_user,
+                notes=data['notes']
+            )
+        except RoomAssignmentError as e:
+            return Response(
+                {'error': {'code': e.code, 'message': e.message, 'details': e.details}},
+                status=409
+            )
+
+        bookings = result.pop('bookings')
+
+        # Emit realtime events so other staff clients see the assignments
+        def _emit_assign_events():
+            for booking in bookings:
+                try:
+                    notification_manager.realtime_booking_updated(booking)
+                except Exception as exc:
+                    logger.error(f"Failed to emit room-assign realtime for {booking.booking_id}: {exc}")
+        transaction.on_commit(_emit_assign_events)
+
+        return Response({
+            'dry_run': False,
+            'message': f'Assigned rooms to {len(bookings)} bookings',
+            **result
+        })
+
+
 class UnassignRoomView(APIView):
     """POST /api/staff/hotels/{hotel_slug}/bookings/{booking_id}/unassign-room/"""
 
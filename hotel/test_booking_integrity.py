@@ -685,6 +685,103 @@ class ManagementCommandTests(BookingIntegrityTestCase):
         self.assertIn("DRY RUN", output)
 
 
+class DirtyTrackingTests(TestCase):
+    """Tests for incremental (dirty-only) integrity healing."""
+    
+    def setUp(self):
+        self.hotel = Hotel.objects.create(name="Dirty Hotel", slug="dirty-hotel")
+        self.room_type = RoomType.objects.create(
+            hotel=self.hotel,
+            name="Standard Room",
+            starting_price_from=100.00
+        )
+        self.room = Room.objects.create(
+            hotel=self.hotel,
+            room_number=201,
+            room_type=self.room_type
+        )
+        self.booking = self._create_booking("Ann", "Lee")
+    
+    def _create_booking(self, first_name, last_name, **extra):
+        return RoomBooking.objects.create(
+            hotel=self.hotel,
+            room_type=self.room_type,
+            check_in=timezone.now().date(),
+            check_out=(timezone.now() + timezone.timedelta(days=2)).date(),
+            adults=1,
+            total_amount=200,
+            primary_first_name=first_name,
+            primary_last_name=last_name,
+            **extra
+        )
+    
+    def _dirty_ids(self):
+        return set(
+            RoomBooking.objects.filter(integrity_dirty_at__isnull=False).values_list('pk', flat=True)
+        )
+    
+    def test_new_booking_is_dirty_and_cleared_by_heal(self):
+        self.assertIn(self.booking.pk, self._dirty_ids())
+        
+        report = heal_all_bookings_for_hotel(self.hotel, notify=False, dirty_only=True)
+        
+        self.assertEqual(report["bookings_processed"], 1)
+        self.assertEqual(self._dirty_ids(), set())
+    
+    def test_only_changed_bookings_are_processed(self):
+        other = self._create_booking("Bob", "Ray")
+        heal_all_bookings_for_hotel(self.hotel, notify=False)
+        self.assertEqual(self._dirty_ids(), set())
+        
+        # Unrelated field change does not dirty the booking
+        other = RoomBooking.objects.get(pk=other.pk)
+        other.internal_notes = "VIP"
+        other.save()
+        self.assertEqual(self._dirty_ids(), set())
+        
+        # Party change dirties only its booking
+        self.booking.party.all().delete()
+        self.assertEqual(self._dirty_ids(), {self.booking.pk})
+        
+        report = heal_all_bookings_for_hotel(self.hotel, notify=False, dirty_only=True)
+        self.assertEqual(report["bookings_processed"], 1)
+        self.assertEqual(report["created"], 1)
+        assert_booking_integrity(self.booking)
+        self.assertEqual(self._dirty_ids(), set())
+    
+    def test_status_change_dirties_booking(self):
+        heal_all_bookings_for_hotel(self.hotel, notify=False)
+        
+        booking = RoomBooking.objects.get(pk=self.booking.pk)
+        booking.status = 'CONFIRMED'
+        booking.save(update_fields=['status'])
+        
+        self.assertEqual(self._dirty_ids(), {self.booking.pk})
+    
+    def test_check_hotel_integrity_aggregates(self):
+        self.booking.party.all().delete()
+        checked_in = self._create_booking(
+            "Cat", "Moe", assigned_room=self.room, checked_in_at=timezone.now()
+        )
+        checked_in.party.update(is_staying=False)
+        
+        issues = {issue["booking_id"]: issue["error"] for issue in check_hotel_integrity(self.hotel)}
+        
+        self.assertIn("Missing PRIMARY BookingGuest", issues[self.booking.booking_id])
+        self.assertIn("has is_staying=False", issues[checked_in.booking_id])
+        self.assertIn("Missing PRIMARY in-house Guest", issues[checked_in.booking_id])
+    
+    def test_check_hotel_integrity_dirty_only(self):
+        heal_all_bookings_for_hotel(self.hotel, notify=False)
+        RoomBooking.objects.filter(pk=self.booking.pk).update(primary_last_name="Changed")
+        
+        # Bulk updates bypass dirty tracking, so only a full check sees the issue
+        self.assertEqual(check_hotel_integrity(self.hotel, dirty_only=True), [])
+        issues = check_hotel_integrity(self.hotel)
+        self.assertEqual(len(issues), 1)
+        self.assertIn("last_name 'Lee' != booking.primary_last_name 'Changed'", issues[0]["error"])
+
+
 # Additional test utilities for developers
 class TestUtilities:
     """Utility functions for creating test scenarios with broken booking states."""
@@ -0,0 +1,77 @@
+"""
+Tests for the process-local hotel registry (hotel/hotel_cache.py).
+"""
+from django.http import Http404
+from django.test import TestCase
+
+from hotel.hotel_cache import (
+    clear_hotel_cache,
+    get_cached_hotel,
+    get_cached_hotel_by_id,
+    get_hotel_or_404,
+    get_hotel_record,
+)
+from hotel.models import Hotel
+
+
+class HotelCacheTests(TestCase):
+
+    def setUp(self):
+        clear_hotel_cache()
+        self.hotel = Hotel.objects.create(
+            name="Cache Hotel", slug="cache-hotel", timezone="Europe/Paris"
+        )
+
+    def tearDown(self):
+        clear_hotel_cache()
+
+    def test_second_lookup_hits_no_database(self):
+        get_cached_hotel("cache-hotel")
+
+        with self.assertNumQueries(0):
+            hotel = get_cached_hotel("cache-hotel")
+            by_id = get_cached_hotel_by_id(self.hotel.id)
+            record = get_hotel_record("cache-hotel")
+
+        self.assertEqual(hotel.pk, self.hotel.pk)
+        self.assertEqual(by_id.slug, "cache-hotel")
+        self.assertEqual(record.timezone, "Europe/Paris")
+        self.assertTrue(record.guest_portal_enabled)
+
+    def test_cached_hotel_is_a_fresh_instance(self):
+        first = get_cached_hotel("cache-hotel")
+        first.name = "Mutated"
+
+        self.assertEqual(get_cached_hotel("cache-hotel").name, "Cache Hotel")
+
+    def test_save_invalidates_and_renames(self):
+        get_cached_hotel("cache-hotel")
+
+        self.hotel.slug = "renamed-hotel"
+        self.hotel.save()
+
+        self.assertIsNone(get_cached_hotel("cache-hotel"))
+        self.assertEqual(get_cached_hotel("renamed-hotel").pk, self.hotel.pk)
+
+    def test_access_config_change_invalidates_flags(self):
+        self.assertTrue(get_hotel_record("cache-hotel").guest_portal_enabled)
+
+        access_config = self.hotel.access_config
+        access_config.guest_portal_enabled = False
+        access_config.save()
+
+        self.assertFalse(get_hotel_record("cache-hotel").guest_portal_enabled)
+
+    def test_unknown_slug_raises_404(self):
+        with self.assertRaises(Http404):
+            get_hotel_or_404("missing-hotel")
+
+    def test_unknown_slug_is_remembered_until_created(self):
+        self.assertIsNone(get_cached_hotel("new-hotel"))
+
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_hotel_record("new-hotel"))
+
+        hotel = Hotel.objects.create(name="New Hotel", slug="new-hotel")
+
+        self.assertEqual(get_cached_hotel("new-hotel").pk, hotel.pk)
@@ -0,0 +1,109 @@
+"""
+Tests for the guest app bootstrap (GuestContextView ?sections=) and the
+per-hotel section cache in hotel/services/guest_portal.py.
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from hotel.models import GuestBookingToken, Hotel, RoomBooking
+from hotel.services.guest_portal import ROOM_SERVICE_MENU, SECTIONS, shared_section
+from hotel_info.models import HotelInfo, HotelInfoCategory
+from room_services.models import RoomServiceItem
+from rooms.models import Room, RoomType
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+)
+class GuestPortalBootstrapTests(TestCase):
+    """One token resolution returns every requested section."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.hotel = Hotel.objects.create(name="Portal Hotel", slug="portal-hotel")
+        room_type = RoomType.objects.create(
+            hotel=self.hotel, code="STD", name="Standard Room", starting_price_from=100
+        )
+        self.room = Room.objects.create(
+            hotel=self.hotel, room_type=room_type, room_number=101
+        )
+        self.booking = RoomBooking.objects.create(
+            hotel=self.hotel,
+            room_type=room_type,
+            check_in=timezone.localdate(),
+            check_out=timezone.localdate() + timedelta(days=2),
+            primary_first_name="Mary",
+            primary_last_name="Walsh",
+            adults=1,
+            children=0,
+            total_amount=200,
+            status="CONFIRMED",
+            assigned_room=self.room,
+            checked_in_at=timezone.now(),
+        )
+        RoomServiceItem.objects.create(
+            hotel=self.hotel, name="Soup", price="6.50", description="Soup"
+        )
+        category = HotelInfoCategory.objects.create(slug="spa", name="Spa")
+        HotelInfo.objects.create(
+            hotel=self.hotel, category=category, title="Sauna", description="Open 9-5"
+        )
+
+    def _bootstrap(self, sections, purpose='FULL_ACCESS'):
+        _, raw_token = GuestBookingToken.generate_token(self.booking, purpose=purpose)
+        return self.client.get(
+            reverse('guest-context'), {'token': raw_token, 'sections': sections}
+        )
+
+    def test_all_sections_in_one_response(self):
+        response = self._bootstrap('all')
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['booking_id'], self.booking.booking_id)
+        self.assertEqual(set(data['sections']), set(SECTIONS))
+
+        sections = data['sections']
+        # The chat section reuses the grant issued for the context
+        self.assertEqual(sections['chat']['chat_session'], data['guest_chat']['session'])
+        self.assertEqual(sections['booking_status']['booking']['id'], self.booking.booking_id)
+        self.assertEqual([item['name'] for item in sections['room_service_menu']], ["Soup"])
+        self.assertEqual(sections['breakfast_menu'], [])
+        self.assertEqual(sections['hotel_info'], [{'slug': 'spa', 'name': 'Spa'}])
+
+    def test_sections_are_optional_and_validated(self):
+        _, raw_token = GuestBookingToken.generate_token(self.booking, purpose='FULL_ACCESS')
+
+        response = self.client.get(reverse('guest-context'), {'token': raw_token})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('sections', response.json())
+
+        response = self._bootstrap('chat,wifi')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], 'INVALID_SECTIONS')
+
+    def test_chat_section_needs_chat_scope(self):
+        response = self._bootstrap('chat,hotel_info', purpose='STATUS')
+
+        sections = response.json()['sections']
+        self.assertEqual(sections['chat']['error'], 'MISSING_SCOPE')
+        self.assertEqual(len(sections['hotel_info']), 1)
+
+    def test_menus_are_cached_per_hotel_until_an_item_changes(self):
+        shared_section(self.hotel.id, ROOM_SERVICE_MENU)
+
+        with self.assertNumQueries(0):
+            shared_section(self.hotel.id, ROOM_SERVICE_MENU)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            RoomServiceItem.objects.create(
+                hotel=self.hotel, name="Club", price="12.00", description="Sandwich"
+            )
+        menu = shared_section(self.hotel.id, ROOM_SERVICE_MENU)
+        self.assertEqual([item['name'] for item in menu], ["Soup", "Club"])
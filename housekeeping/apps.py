@@ -16,6 +16,4 @@ class HousekeepingConfig(AppConfig):
     
     def ready(self):
         """Import signal handlers when app is ready"""
-        # Future: Import signal handlers for checkout/checkin hooks
-        # from . import signals
-        pass
\ No newline at end of file
+        from . import signals  # noqa: F401
\ No newline at end of file
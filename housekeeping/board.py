@@ -0,0 +1,258 @@
+"""
+Cached housekeeping board.
+
+get_room_dashboard_data used to regroup every active room of the hotel on
+each dashboard poll, and every status change made the tablets refetch
+the whole board. Each hotel now has a cached board snapshot:
+
+- one row per active room, plus the version at which the row last
+  changed; versions come from a per-hotel counter row
+  (HousekeepingBoardVersion) that only grows, so they stay comparable
+  across snapshot rebuilds;
+- patched in place when rooms change (signals.py on Room saves,
+  refresh_board() for bulk writes), after the transaction commits, and a
+  realtime "board_delta" event carries just the changed rows. Patches and
+  rebuilds lock the counter row, so concurrent writers can't overwrite
+  each other's rows or hand out the same version;
+- get_board_delta(since_version) answers a tablet's poll with the rows
+  changed since the version it holds. When that version predates the
+  snapshot (rebuilt after expiry), the full board is returned instead.
+"""
+from django.core.cache import cache
+from django.db import transaction
+
+BOARD_TTL = 60 * 60 * 24
+# Room fields shown on the board; saves touching only others are ignored
+BOARD_FIELDS = {
+    'room_number', 'room_type', 'room_status', 'is_active', 'is_out_of_order',
+    'maintenance_required', 'last_cleaned_at', 'last_inspected_at',
+    'cleaned_by_staff', 'inspected_by_staff',
+}
+
+_ROW_VALUES = (
+    'id', 'room_number', 'room_status', 'is_active', 'room_type__name',
+    'maintenance_required', 'last_cleaned_at', 'last_inspected_at',
+    'is_out_of_order',
+    'cleaned_by_staff__first_name', 'cleaned_by_staff__last_name',
+    'cleaned_by_staff__email',
+    'inspected_by_staff__first_name', 'inspected_by_staff__last_name',
+    'inspected_by_staff__email',
+)
+
+
+def _board_key(hotel_id):
+    return f"housekeeping:board:{hotel_id}"
+
+
+def _lock_board(hotel_id):
+    """
+    The hotel's board version row, locked until the transaction ends.
+    Must be called inside transaction.atomic().
+    """
+    from .models import HousekeepingBoardVersion
+
+    counter, _ = HousekeepingBoardVersion.objects.select_for_update().get_or_create(
+        hotel_id=hotel_id
+    )
+    return counter
+
+
+def _next_version(counter):
+    counter.version += 1
+    counter.save(update_fields=['version'])
+    return counter.version
+
+
+def _staff_name(first_name, last_name, email):
+    if first_name is None and email is None:
+        return None
+    full_name = f"{first_name or ''} {last_name or ''}".strip()
+    return full_name or email or "Staff"
+
+
+def _load_rows(hotel_id, room_ids=None):
+    """room id -> board row for active rooms, None for inactive ones."""
+    from rooms.models import Room
+
+    rooms = Room.objects.filter(hotel_id=hotel_id)
+    if room_ids is not None:
+        rooms = rooms.filter(id__in=room_ids)
+    else:
+        rooms = rooms.filter(is_active=True)
+
+    rows = {}
+    for values in rooms.values(*_ROW_VALUES):
+        if not values['is_active']:
+            rows[values['id']] = None
+            continue
+        rows[values['id']] = {
+            'id': values['id'],
+            'room_number': values['room_number'],
+            'room_status': values['room_status'],
+            'room_type': values['room_type__name'],
+            'maintenance_required': values['maintenance_required'],
+            'last_cleaned_at': values['last_cleaned_at'],
+            'last_inspected_at': values['last_inspected_at'],
+            'is_out_of_order': values['is_out_of_order'],
+            'cleaned_by_staff_name': _staff_name(
+                values['cleaned_by_staff__first_name'],
+                values['cleaned_by_staff__last_name'],
+                values['cleaned_by_staff__email'],
+            ),
+            'inspected_by_staff_name': _staff_name(
+                values['inspected_by_staff__first_name'],
+                values['inspected_by_staff__last_name'],
+                values['inspected_by_staff__email'],
+            ),
+        }
+    return rows
+
+
+def get_board(hotel_id):
+    """
+    The hotel's cached board snapshot, built on first use.
+
+    Returns:
+        dict: version, base_version (version the snapshot was built at),
+        rooms (id -> row), room_versions (id -> version last changed),
+        removed (id -> version removed)
+    """
+    board = cache.get(_board_key(hotel_id))
+    if board is None:
+        with transaction.atomic():
+            counter = _lock_board(hotel_id)
+            # Another request may have rebuilt or patched it while we waited
+            board = cache.get(_board_key(hotel_id))
+            if board is None:
+                version = _next_version(counter)
+                rows = _load_rows(hotel_id)
+                board = {
+                    'version': version,
+                    'base_version': version,
+                    'rooms': rows,
+                    'room_versions': dict.fromkeys(rows, version),
+                    'removed': {},
+                }
+                cache.set(_board_key(hotel_id), board, BOARD_TTL)
+    return board
+
+
+def _summary(rows):
+    counts = {}
+    for row in rows:
+        counts[row['room_status']] = counts.get(row['room_status'], 0) + 1
+    return counts
+
+
+def board_dashboard(hotel_id):
+    """Counts and rooms grouped by status, from the cached board."""
+    board = get_board(hotel_id)
+    rows = sorted(board['rooms'].values(), key=lambda row: row['room_number'])
+
+    rooms_by_status = {}
+    for row in rows:
+        rooms_by_status.setdefault(row['room_status'], []).append(row)
+    return {
+        'version': board['version'],
+        'counts': _summary(rows),
+        'rooms_by_status': rooms_by_status,
+        'total_rooms': len(rows),
+    }
+
+
+def get_board_delta(hotel_id, since_version):
+    """
+    Rooms changed after since_version.
+
+    Returns:
+        dict: version, full (True when the whole board is returned),
+        rooms (changed rows), removed (ids of rooms no longer on the
+        board), counts, total_rooms
+    """
+    board = get_board(hotel_id)
+    rows = board['rooms']
+    full = since_version < board['base_version']
+    changed = [
+        row for room_id, row in rows.items()
+        if full or board['room_versions'][room_id] > since_version
+    ]
+    removed = [] if full else [
+        room_id for room_id, version in board['removed'].items()
+        if version > since_version
+    ]
+    return {
+        'version': board['version'],
+        'full': full,
+        'rooms': sorted(changed, key=lambda row: row['room_number']),
+        'removed': removed,
+        'counts': _summary(rows.values()),
+        'total_rooms': len(rows),
+    }
+
+
+def patch_board(hotel_id, room_ids):
+    """
+    Re-read the given rooms into the cached board.
+
+    Runs under the hotel's board lock: the rows are read and the cached
+    board is updated by one writer at a time.
+
+    Returns:
+        dict delta (version, rooms, removed) of what changed, or None
+    """
+    room_ids = set(room_ids)
+    if not room_ids:
+        return None
+
+    with transaction.atomic():
+        counter = _lock_board(hotel_id)
+        rows = _load_rows(hotel_id, room_ids)
+        board = cache.get(_board_key(hotel_id))
+
+        changed, removed = [], []
+        for room_id in room_ids:
+            row = rows.get(room_id)
+            # Without a cached board there is nothing to compare with: every
+            # room is reported
+            if row is None:
+                if board is None or room_id in board['rooms']:
+                    removed.append(room_id)
+            elif board is None or board['rooms'].get(room_id) != row:
+                changed.append(row)
+        if not changed and not removed:
+            return None
+
+        version = _next_version(counter)
+        if board is not None:
+            for row in changed:
+                board['rooms'][row['id']] = row
+                board['room_versions'][row['id']] = version
+                board['removed'].pop(row['id'], None)
+            for room_id in removed:
+                board['rooms'].pop(room_id, None)
+                board['room_versions'].pop(room_id, None)
+                board['removed'][room_id] = version
+            board['version'] = version
+            cache.set(_board_key(hotel_id), board, BOARD_TTL)
+
+    return {
+        'version': version,
+        'rooms': sorted(changed, key=lambda row: row['room_number']),
+        'removed': removed,
+    }
+
+
+def refresh_board(hotel, room_ids):
+    """
+    Patch the board and broadcast the delta once the transaction commits.
+    """
+    room_ids = list(room_ids)
+
+    def patch():
+        from notifications.notification_manager import notification_manager
+
+        delta = patch_board(hotel.id, room_ids)
+        if delta:
+            notification_manager.realtime_housekeeping_board_delta(hotel, delta)
+
+    transaction.on_commit(patch)
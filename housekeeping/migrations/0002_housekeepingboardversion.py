@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-19 00:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel', '0059_roombooking_integrity_dirty_at'),
+        ('housekeeping', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HousekeepingBoardVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('hotel', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='housekeeping_board_version', to='hotel.hotel')),
+            ],
+            options={
+                'verbose_name': 'Housekeeping Board Version',
+                'verbose_name_plural': 'Housekeeping Board Versions',
+            },
+        ),
+    ]
@@ -230,3 +230,26 @@ class HousekeepingTask(models.Model):
         }
         
         return hours_since_created > sla_hours.get(self.priority, 4)
+
+
+class HousekeepingBoardVersion(models.Model):
+    """
+    Version counter for a hotel's cached housekeeping board (board.py).
+
+    The row is locked while the board is patched or rebuilt, so board
+    updates for a hotel are applied one at a time and every update gets
+    its own version.
+    """
+    hotel = models.OneToOneField(
+        'hotel.Hotel',
+        on_delete=models.CASCADE,
+        related_name='housekeeping_board_version',
+    )
+    version = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Housekeeping Board Version'
+        verbose_name_plural = 'Housekeeping Board Versions'
+
+    def __str__(self):
+        return f"Housekeeping board v{self.version} (hotel {self.hotel_id})"
@@ -81,6 +81,58 @@ def _can_front_desk_change_status(from_status, to_status, source):
 # Public policy API — capability + hotel scope + business rules.
 # ---------------------------------------------------------------------------
 
+def room_status_checker(staff, source="HOUSEKEEPING", note=""):
+    """
+    can_change_room_status for many rooms by the same staff member.
+
+    The staff member's capabilities are resolved once; the returned
+    check(room, to_status) -> (can_change, error_message) then only applies
+    hotel scope and the transition rules per room.
+    """
+    if not staff:
+        return lambda room, to_status: (False, "Staff and room are required")
+
+    user = staff.user
+    if has_capability(user, 'housekeeping.room_status.override'):
+        tier = 'override'
+    elif has_capability(user, 'housekeeping.room_status.transition'):
+        tier = 'transition'
+    elif has_capability(user, 'housekeeping.room_status.front_desk'):
+        tier = 'front_desk'
+    else:
+        tier = None
+
+    def check(room, to_status):
+        if not room:
+            return False, "Staff and room are required"
+
+        # Hotel scope
+        if staff.hotel_id != room.hotel_id:
+            return False, "Staff member must belong to the same hotel as the room"
+
+        # Business rule: transition must be valid on the room's state machine.
+        if not room.can_transition_to(to_status):
+            return False, f"Room cannot transition from {room.room_status} to {to_status}"
+
+        # 1. Override capability — full reach, requires note on MANAGER_OVERRIDE.
+        if tier == 'override':
+            if source == "MANAGER_OVERRIDE" and not note.strip():
+                return False, "Manager override requires a note explaining the reason"
+            return True, ""
+
+        # 2. Housekeeping workflow capability.
+        if tier == 'transition':
+            return _can_housekeeping_change_status(room.room_status, to_status, source)
+
+        # 3. Front desk capability.
+        if tier == 'front_desk':
+            return _can_front_desk_change_status(room.room_status, to_status, source)
+
+        return False, "You do not have permission to change room status"
+
+    return check
+
+
 def can_change_room_status(staff, room, to_status, source="HOUSEKEEPING", note=""):
     """
     Determine if staff can change room status.
@@ -98,31 +150,7 @@ def can_change_room_status(staff, room, to_status, source="HOUSEKEEPING", note="
     if not staff or not room:
         return False, "Staff and room are required"
 
-    # Hotel scope
-    if staff.hotel_id != room.hotel_id:
-        return False, "Staff member must belong to the same hotel as the room"
-
-    # Business rule: transition must be valid on the room's state machine.
-    if not room.can_transition_to(to_status):
-        return False, f"Room cannot transition from {room.room_status} to {to_status}"
-
-    user = staff.user
-
-    # 1. Override capability — full reach, requires note on MANAGER_OVERRIDE.
-    if has_capability(user, 'housekeeping.room_status.override'):
-        if source == "MANAGER_OVERRIDE" and not note.strip():
-            return False, "Manager override requires a note explaining the reason"
-        return True, ""
-
-    # 2. Housekeeping workflow capability.
-    if has_capability(user, 'housekeeping.room_status.transition'):
-        return _can_housekeeping_change_status(room.room_status, to_status, source)
-
-    # 3. Front desk capability.
-    if has_capability(user, 'housekeeping.room_status.front_desk'):
-        return _can_front_desk_change_status(room.room_status, to_status, source)
-
-    return False, "You do not have permission to change room status"
+    return room_status_checker(staff, source, note)(room, to_status)
 
 
 def can_assign_task(staff, task):
@@ -3,91 +3,77 @@ Housekeeping Services
 
 Canonical business logic for room status management.
 Single source of truth for all room status changes.
+
+set_room_status changes one room; set_room_statuses moves many rooms to
+the same status (e.g. the morning mass checkout) with one permission
+resolution, one bulk_create of audit events, one bulk_update of the rooms
+and one aggregated realtime event.
 """
 
+import logging
+
 from django.db import transaction
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 
 from .models import RoomStatusEvent
-from .policy import can_change_room_status
+from .policy import room_status_checker
 
+logger = logging.getLogger(__name__)
 
-@transaction.atomic
-def set_room_status(*, room, to_status, staff=None, source="HOUSEKEEPING", note=""):
-    """
-    Canonical function for all room status changes.
-    
-    This is the ONLY function that should modify room.room_status.
-    All status changes must flow through this function to ensure:
-    - Validation of transitions
-    - Permission enforcement
-    - Audit trail creation
-    - Consistent field updates
-    
-    Args:
-        room: Room instance to update
-        to_status: Target room status (must be valid ROOM_STATUS_CHOICES key)
-        staff: Staff member initiating the change (optional for system changes)
-        source: Source of the change (HOUSEKEEPING, FRONT_DESK, SYSTEM, MANAGER_OVERRIDE)
-        note: Additional notes about the change
-    
-    Returns:
-        Room: Updated room instance
-    
-    Raises:
-        ValidationError: If transition is invalid or permissions are insufficient
-    """
-    if not room:
-        raise ValidationError("Room is required")
-    
+
+def _validate_to_status(to_status):
     # Import here to avoid circular imports
     from rooms.models import Room
     
-    # Validate to_status is valid
     valid_statuses = dict(Room.ROOM_STATUS_CHOICES)
     if to_status not in valid_statuses:
         raise ValidationError(f"Invalid room status: {to_status}. Must be one of: {list(valid_statuses.keys())}")
-    
-    # Store original status for audit
-    from_status = room.room_status
-    
-    # Skip validation if status is not changing
-    if from_status == to_status:
-        return room
-    
+
+
+def _transition_error(room, to_status, check):
+    """Why room cannot move to to_status (None if it can)."""
     # Validate room can transition to new status
     if not room.can_transition_to(to_status):
-        raise ValidationError(
-            f"Room {room.room_number} cannot transition from {from_status} to {to_status}. "
+        return (
+            f"Room {room.room_number} cannot transition from {room.room_status} to {to_status}. "
             f"Current state does not allow this transition."
         )
     
     # Enforce permissions if staff is provided
-    if staff:
-        can_change, error_msg = can_change_room_status(
-            staff=staff, 
-            room=room, 
-            to_status=to_status, 
-            source=source, 
-            note=note
-        )
+    if check:
+        can_change, error_msg = check(room, to_status)
         if not can_change:
-            raise ValidationError(f"Permission denied: {error_msg}")
-    
-    # Create audit record BEFORE making changes
-    RoomStatusEvent.objects.create(
-        hotel=room.hotel,
-        room=room,
-        from_status=from_status,
-        to_status=to_status,
-        changed_by=staff,
-        source=source,
-        note=note
+            return f"Permission denied: {error_msg}"
+    return None
+
+
+def _staff_name(staff):
+    if staff:
+        return f"{staff.first_name} {staff.last_name}".strip() or staff.email or "Staff"
+    return "System"
+
+
+def _rooms_with_guests_in_house(rooms):
+    """Ids of the rooms that have a checked-in, not checked-out booking."""
+    from hotel.models import RoomBooking
+    
+    return set(
+        RoomBooking.objects.filter(
+            assigned_room__in=rooms,
+            checked_in_at__isnull=False,
+            checked_out_at__isnull=True
+        ).values_list('assigned_room_id', flat=True)
     )
+
+
+def _apply_status(room, to_status, staff, note, now, rooms_in_house):
+    """
+    Set to_status and its status-specific fields on room (not saved).
     
-    # Update room fields based on new status
-    now = timezone.now()
+    Returns:
+        list: names of the fields changed
+    """
     fields_to_update = ['room_status']
     
     # Set the new status
@@ -97,11 +83,10 @@ def set_room_status(*, room, to_status, staff=None, source="HOUSEKEEPING", note=
     if to_status == 'CLEANING_IN_PROGRESS':
         # Optional: Add turnover note when cleaning starts
         if hasattr(room, 'add_turnover_note'):
-            if staff:
-                staff_name = f"{staff.first_name} {staff.last_name}".strip() or staff.email or "Staff"
-            else:
-                staff_name = "System"
-            room.add_turnover_note(f"Cleaning started by {staff_name}", staff_member=staff)
+            room.add_turnover_note(
+                f"Cleaning started by {_staff_name(staff)}", staff_member=staff, save=False
+            )
+            fields_to_update.append('turnover_notes')
     
     elif to_status == 'CLEANED_UNINSPECTED':
         # Mark as cleaned
@@ -126,15 +111,8 @@ def set_room_status(*, room, to_status, staff=None, source="HOUSEKEEPING", note=
         room.is_out_of_order = False
         
         # Clear occupancy if no active bookings
-        if hasattr(room, 'is_occupied'):
-            # Check for active bookings with check-in
-            active_bookings = room.room_bookings.filter(
-                checked_in_at__isnull=False,
-                checked_out_at__isnull=True
-            ).exists()
-            
-            if not active_bookings:
-                room.is_occupied = False
+        if hasattr(room, 'is_occupied') and room.id not in rooms_in_house:
+            room.is_occupied = False
         
         fields_to_update.extend([
             'last_inspected_at', 
@@ -156,11 +134,7 @@ def set_room_status(*, room, to_status, staff=None, source="HOUSEKEEPING", note=
         if note and hasattr(room, 'maintenance_notes'):
             existing_notes = room.maintenance_notes or ""
             timestamp = now.strftime("%Y-%m-%d %H:%M")
-            if staff:
-                staff_name = f"{staff.first_name} {staff.last_name}".strip() or staff.email or "Staff"
-            else:
-                staff_name = "System"
-            new_note = f"[{timestamp}] {staff_name}: {note}"
+            new_note = f"[{timestamp}] {_staff_name(staff)}: {note}"
             
             if existing_notes:
                 room.maintenance_notes = f"{existing_notes}\n{new_note}"
@@ -168,6 +142,70 @@ def set_room_status(*, room, to_status, staff=None, source="HOUSEKEEPING", note=
                 room.maintenance_notes = new_note
             fields_to_update.append('maintenance_notes')
     
+    return fields_to_update
+
+
+@transaction.atomic
+def set_room_status(*, room, to_status, staff=None, source="HOUSEKEEPING", note=""):
+    """
+    Canonical function for all room status changes.
+    
+    This is the ONLY function that should modify room.room_status
+    (set_room_statuses is its bulk form).
+    All status changes must flow through this function to ensure:
+    - Validation of transitions
+    - Permission enforcement
+    - Audit trail creation
+    - Consistent field updates
+    
+    Args:
+        room: Room instance to update
+        to_status: Target room status (must be valid ROOM_STATUS_CHOICES key)
+        staff: Staff member initiating the change (optional for system changes)
+        source: Source of the change (HOUSEKEEPING, FRONT_DESK, SYSTEM, MANAGER_OVERRIDE)
+        note: Additional notes about the change
+    
+    Returns:
+        Room: Updated room instance
+    
+    Raises:
+        ValidationError: If transition is invalid or permissions are insufficient
+    """
+    if not room:
+        raise ValidationError("Room is required")
+    
+    _validate_to_status(to_status)
+    
+    # Store original status for audit
+    from_status = room.room_status
+    
+    # Skip validation if status is not changing
+    if from_status == to_status:
+        return room
+    
+    check = room_status_checker(staff, source, note) if staff else None
+    error = _transition_error(room, to_status, check)
+    if error:
+        raise ValidationError(error)
+    
+    # Create audit record BEFORE making changes
+    RoomStatusEvent.objects.create(
+        hotel=room.hotel,
+        room=room,
+        from_status=from_status,
+        to_status=to_status,
+        changed_by=staff,
+        source=source,
+        note=note
+    )
+    
+    rooms_in_house = (
+        _rooms_with_guests_in_house([room]) if to_status == 'READY_FOR_GUEST' else set()
+    )
+    fields_to_update = _apply_status(
+        room, to_status, staff, note, timezone.now(), rooms_in_house
+    )
+    
     # Save only the fields we've modified
     room.save(update_fields=fields_to_update)
     
@@ -176,7 +214,6 @@ def set_room_status(*, room, to_status, staff=None, source="HOUSEKEEPING", note=
     notification_manager = NotificationManager()
     
     # Use transaction.on_commit to ensure the update is sent after database commit
-    from django.db import transaction
     transaction.on_commit(
         lambda: notification_manager.realtime_room_updated(
             room=room,
@@ -188,6 +225,104 @@ def set_room_status(*, room, to_status, staff=None, source="HOUSEKEEPING", note=
     return room
 
 
+@transaction.atomic
+def set_room_statuses(*, rooms, to_status, staff=None, source="HOUSEKEEPING", note="",
+                      skip_invalid=False):
+    """
+    Move many rooms of one hotel to the same status.
+    
+    Same rules, audit trail and field updates as set_room_status, but every
+    transition and permission is validated before anything is written,
+    audit events are written with one bulk_create, rooms with one
+    bulk_update, and a single aggregated realtime event is emitted.
+    
+    Args:
+        rooms: Room instances (one hotel)
+        to_status: Target room status
+        staff, source, note: as for set_room_status
+        skip_invalid: leave out rooms that cannot make the transition
+            instead of rejecting the whole batch
+    
+    Returns:
+        list: the rooms now in to_status (changed, or already there)
+    
+    Raises:
+        ValidationError: listing every room that cannot make the transition
+            (unless skip_invalid); nothing is written
+    """
+    _validate_to_status(to_status)
+    
+    rooms = list(rooms)
+    if not rooms:
+        return []
+    if len({room.hotel_id for room in rooms}) > 1:
+        raise ValidationError("All rooms must belong to the same hotel")
+    
+    check = room_status_checker(staff, source, note) if staff else None
+    accepted, errors = [], []
+    for room in rooms:
+        if room.room_status == to_status:
+            accepted.append(room)
+            continue
+        error = _transition_error(room, to_status, check)
+        if error:
+            errors.append(error)
+        else:
+            accepted.append(room)
+    
+    if errors:
+        if not skip_invalid:
+            raise ValidationError(errors)
+        logger.warning(
+            f"Skipped {len(errors)} room(s) in bulk change to {to_status}: {errors}"
+        )
+    
+    changing = [room for room in accepted if room.room_status != to_status]
+    if not changing:
+        return accepted
+    
+    RoomStatusEvent.objects.bulk_create([
+        RoomStatusEvent(
+            hotel_id=room.hotel_id,
+            room=room,
+            from_status=room.room_status,
+            to_status=to_status,
+            changed_by=staff,
+            source=source,
+            note=note
+        )
+        for room in changing
+    ])
+    
+    now = timezone.now()
+    rooms_in_house = (
+        _rooms_with_guests_in_house(changing) if to_status == 'READY_FOR_GUEST' else set()
+    )
+    fields_to_update = []
+    for room in changing:
+        fields_to_update = _apply_status(room, to_status, staff, note, now, rooms_in_house)
+    
+    from rooms.models import Room
+    Room.objects.bulk_update(changing, fields_to_update)
+    
+    # bulk_update sends no post_save: patch the housekeeping board directly
+    from .board import refresh_board
+    hotel = changing[0].hotel
+    refresh_board(hotel, [room.id for room in changing])
+    
+    from notifications.notification_manager import notification_manager
+    transaction.on_commit(
+        lambda: notification_manager.realtime_rooms_bulk_updated(
+            hotel=hotel,
+            rooms=changing,
+            changed_fields=fields_to_update,
+            source=source.lower()
+        )
+    )
+    
+    return accepted
+
+
 def get_room_status_history(room, limit=50):
     """
     Get status change history for a room.
@@ -206,54 +341,19 @@ def get_room_dashboard_data(hotel):
     """
     Get dashboard data for housekeeping overview.
     
+    Served from the cached housekeeping board (board.py), which is patched
+    as rooms change instead of being regrouped on every poll.
+    
     Args:
         hotel: Hotel instance
     
     Returns:
-        dict: Dashboard data with room counts and status groupings
+        dict: Dashboard data with room counts, status groupings and the
+        board version (for ?since_version= polling)
     """
-    from rooms.models import Room
-    from collections import defaultdict
-    
-    # Get all rooms for this hotel with staff relationships for performance
-    rooms = Room.objects.filter(
-        hotel=hotel, 
-        is_active=True
-    ).select_related('room_type', 'cleaned_by_staff', 'inspected_by_staff')
+    from .board import board_dashboard
     
-    # Count rooms by status
-    status_counts = defaultdict(int)
-    rooms_by_status = defaultdict(list)
-    
-    for room in rooms:
-        status = room.room_status
-        status_counts[status] += 1
-        
-        # Helper function to get staff name
-        def get_staff_name(staff):
-            if not staff:
-                return None
-            full_name = f"{staff.first_name} {staff.last_name}".strip()
-            return full_name or staff.email or "Staff"
-        
-        # Add room data for grouping with staff information
-        rooms_by_status[status].append({
-            'id': room.id,
-            'room_number': room.room_number,
-            'room_type': room.room_type.name if room.room_type else None,
-            'maintenance_required': room.maintenance_required,
-            'last_cleaned_at': room.last_cleaned_at,
-            'last_inspected_at': room.last_inspected_at,
-            'is_out_of_order': room.is_out_of_order,
-            'cleaned_by_staff_name': get_staff_name(room.cleaned_by_staff),
-            'inspected_by_staff_name': get_staff_name(room.inspected_by_staff),
-        })
-    
-    return {
-        'counts': dict(status_counts),
-        'rooms_by_status': dict(rooms_by_status),
-        'total_rooms': len(rooms),
-    }
+    return board_dashboard(hotel.id)
 
 
 def create_turnover_task(room, booking=None, staff=None, priority='MED', note=""):
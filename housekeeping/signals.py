@@ -0,0 +1,15 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from rooms.models import Room
+
+from .board import BOARD_FIELDS, refresh_board
+
+
+@receiver(post_save, sender=Room)
+@receiver(post_delete, sender=Room)
+def refresh_board_room(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Patch the cached housekeeping board (set_room_status and other writers)."""
+    if raw or (update_fields and not BOARD_FIELDS & set(update_fields)):
+        return
+    refresh_board(instance.hotel, [instance.pk])
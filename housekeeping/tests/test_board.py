@@ -0,0 +1,109 @@
+"""
+Tests for the cached housekeeping board (housekeeping/board.py).
+"""
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from hotel.models import Hotel
+from rooms.models import Room, RoomType
+from housekeeping.board import get_board_delta
+from housekeeping.services import get_room_dashboard_data, set_room_status
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+)
+@patch('notifications.notification_manager.notification_manager.realtime_housekeeping_board_delta')
+@patch('notifications.notification_manager.NotificationManager.realtime_room_updated')
+class HousekeepingBoardTests(TestCase):
+    """The board is cached, patched on room changes and served as deltas."""
+
+    def setUp(self):
+        cache.clear()
+        self.hotel = Hotel.objects.create(name="Board Hotel", slug="board-hotel")
+        room_type = RoomType.objects.create(
+            hotel=self.hotel, code="STD", name="Standard Room", starting_price_from=100
+        )
+        self.rooms = [
+            Room.objects.create(
+                hotel=self.hotel,
+                room_type=room_type,
+                room_number=number,
+                room_status="CHECKOUT_DIRTY",
+            )
+            for number in (101, 102, 103)
+        ]
+
+    def _set_status(self, room, to_status):
+        with self.captureOnCommitCallbacks(execute=True):
+            set_room_status(room=room, to_status=to_status)
+
+    def test_dashboard_is_served_from_the_cache(self, *mocks):
+        data = get_room_dashboard_data(self.hotel)
+
+        self.assertEqual(data['counts'], {'CHECKOUT_DIRTY': 3})
+        self.assertEqual(data['total_rooms'], 3)
+        self.assertEqual(
+            [row['room_number'] for row in data['rooms_by_status']['CHECKOUT_DIRTY']],
+            [101, 102, 103],
+        )
+        self.assertEqual(
+            data['rooms_by_status']['CHECKOUT_DIRTY'][0]['room_type'], "Standard Room"
+        )
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_room_dashboard_data(self.hotel), data)
+
+    def test_status_changes_patch_the_board_and_emit_deltas(self, room_updated, board_delta):
+        version = get_room_dashboard_data(self.hotel)['version']
+
+        self._set_status(self.rooms[1], "CLEANED_UNINSPECTED")
+
+        data = get_room_dashboard_data(self.hotel)
+        self.assertGreater(data['version'], version)
+        self.assertEqual(data['counts'], {'CHECKOUT_DIRTY': 2, 'CLEANED_UNINSPECTED': 1})
+
+        delta = get_board_delta(self.hotel.id, version)
+        self.assertFalse(delta['full'])
+        self.assertEqual([row['id'] for row in delta['rooms']], [self.rooms[1].id])
+        self.assertEqual(delta['rooms'][0]['room_status'], "CLEANED_UNINSPECTED")
+
+        event = board_delta.call_args.args[1]
+        self.assertEqual(event['version'], data['version'])
+        self.assertEqual([row['id'] for row in event['rooms']], [self.rooms[1].id])
+
+        self.assertEqual(get_board_delta(self.hotel.id, data['version'])['rooms'], [])
+
+    def test_deactivated_rooms_are_reported_as_removed(self, *mocks):
+        version = get_room_dashboard_data(self.hotel)['version']
+
+        room = self.rooms[0]
+        room.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            room.save()
+
+        delta = get_board_delta(self.hotel.id, version)
+        self.assertEqual(delta['removed'], [room.id])
+        self.assertEqual(delta['total_rooms'], 2)
+
+    def test_versions_older_than_the_snapshot_get_the_full_board(self, *mocks):
+        version = get_room_dashboard_data(self.hotel)['version']
+        cache.delete(f"housekeeping:board:{self.hotel.id}")
+
+        delta = get_board_delta(self.hotel.id, version)
+
+        self.assertTrue(delta['full'])
+        self.assertGreater(delta['version'], version)
+        self.assertEqual(len(delta['rooms']), 3)
+
+    def test_versions_keep_growing_when_the_cache_is_lost(self, *mocks):
+        version = get_room_dashboard_data(self.hotel)['version']
+        self._set_status(self.rooms[0], "CLEANED_UNINSPECTED")
+        cache.clear()
+
+        data = get_room_dashboard_data(self.hotel)
+        self.assertEqual(data['version'], version + 2)
+        self.assertEqual(self.hotel.housekeeping_board_version.version, version + 2)
+        self.assertTrue(get_board_delta(self.hotel.id, version + 1)['full'])
@@ -0,0 +1,137 @@
+"""
+Tests for bulk room status transitions (housekeeping.services.set_room_statuses).
+"""
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.test import TestCase, override_settings
+
+from chat.utils import PUSHER_MESSAGE_LIMIT, payload_size
+from hotel.models import Hotel
+from rooms.models import Room
+from staff.models import Staff
+from housekeeping.models import RoomStatusEvent
+from housekeeping.services import set_room_statuses
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+)
+@patch('notifications.notification_manager.notification_manager.realtime_housekeeping_board_delta')
+@patch('notifications.notification_manager.notification_manager.realtime_rooms_bulk_updated')
+class BulkRoomStatusTests(TestCase):
+    """Many rooms change status in a fixed number of statements."""
+
+    def setUp(self):
+        cache.clear()
+        self.hotel = Hotel.objects.create(name="Bulk Hotel", slug="bulk-hotel")
+        self.rooms = [
+            Room.objects.create(
+                hotel=self.hotel, room_number=100 + i, room_status="OCCUPIED", is_occupied=True
+            )
+            for i in range(10)
+        ]
+
+    def test_mass_checkout_is_a_few_statements(self, bulk_updated, board_delta):
+        # Savepoint, one INSERT of all events, one UPDATE of all rooms, release
+        with self.assertNumQueries(4):
+            with self.captureOnCommitCallbacks() as callbacks:
+                changed = set_room_statuses(
+                    rooms=self.rooms, to_status="CHECKOUT_DIRTY", source="SYSTEM"
+                )
+
+        self.assertEqual(len(changed), 10)
+        self.assertEqual(
+            set(Room.objects.values_list('room_status', flat=True)), {"CHECKOUT_DIRTY"}
+        )
+        self.assertEqual(
+            RoomStatusEvent.objects.filter(
+                from_status="OCCUPIED", to_status="CHECKOUT_DIRTY", source="SYSTEM"
+            ).count(),
+            10,
+        )
+
+        for callback in callbacks:
+            callback()
+        bulk_updated.assert_called_once()
+        self.assertEqual(len(bulk_updated.call_args.kwargs['rooms']), 10)
+        board_delta.assert_called_once()
+
+    def test_invalid_transition_rejects_the_whole_batch(self, *mocks):
+        self.rooms[3].room_status = "READY_FOR_GUEST"
+        self.rooms[3].save()
+
+        with self.assertRaises(ValidationError) as raised:
+            set_room_statuses(rooms=self.rooms, to_status="CHECKOUT_DIRTY")
+
+        self.assertEqual(len(raised.exception.messages), 1)
+        self.assertIn("Room 103", raised.exception.messages[0])
+        self.assertFalse(RoomStatusEvent.objects.exists())
+        self.assertEqual(Room.objects.filter(room_status="CHECKOUT_DIRTY").count(), 0)
+
+    def test_skip_invalid_changes_the_rest(self, *mocks):
+        self.rooms[3].room_status = "READY_FOR_GUEST"
+        self.rooms[3].save()
+
+        changed = set_room_statuses(
+            rooms=self.rooms, to_status="CHECKOUT_DIRTY", skip_invalid=True
+        )
+
+        self.assertEqual(len(changed), 9)
+        self.assertNotIn(self.rooms[3], changed)
+        self.assertEqual(RoomStatusEvent.objects.count(), 9)
+
+    def test_permissions_are_checked_up_front(self, *mocks):
+        user = User.objects.create_user(username="nocaps", password="pass")
+        staff = Staff.objects.create(
+            user=user, hotel=self.hotel, first_name="No", last_name="Caps"
+        )
+
+        with self.assertRaises(ValidationError) as raised:
+            set_room_statuses(rooms=self.rooms, to_status="CHECKOUT_DIRTY", staff=staff)
+
+        self.assertEqual(len(raised.exception.messages), 10)
+        self.assertTrue(raised.exception.messages[0].startswith("Permission denied"))
+        self.assertFalse(RoomStatusEvent.objects.exists())
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+)
+@patch('notifications.notification_manager.pusher_client')
+class BulkRoomStatusEventSizeTests(TestCase):
+    """Events for a large bulk change stay under Pusher's message limit."""
+
+    def setUp(self):
+        cache.clear()
+        self.hotel = Hotel.objects.create(name="Bulk Hotel", slug="bulk-hotel")
+        Room.objects.bulk_create([
+            Room(hotel=self.hotel, room_number=100 + i, room_status="OCCUPIED", is_occupied=True)
+            for i in range(80)
+        ])
+
+    def test_mass_checkout_events_fit_pusher_messages(self, pusher):
+        with self.captureOnCommitCallbacks(execute=True):
+            set_room_statuses(
+                rooms=Room.objects.filter(hotel=self.hotel), to_status="CHECKOUT_DIRTY"
+            )
+
+        events = {}
+        for (channel, event, data), _ in pusher.trigger.call_args_list:
+            self.assertLessEqual(payload_size(data), PUSHER_MESSAGE_LIMIT)
+            events.setdefault(event, []).append(data['payload'])
+
+        bulk = events['rooms_bulk_updated']
+        self.assertEqual(
+            sorted(row['room_number'] for payload in bulk for row in payload['rooms']),
+            list(range(100, 180)),
+        )
+        self.assertEqual(bulk[0]['rooms'][0]['room_status'], "CHECKOUT_DIRTY")
+
+        deltas = events['board_delta']
+        self.assertGreater(len(deltas), 1)
+        self.assertEqual({payload['chunks'] for payload in deltas}, {len(deltas)})
+        self.assertEqual(len({payload['version'] for payload in deltas}), 1)
+        self.assertEqual(sum(len(payload['rooms']) for payload in deltas), 80)
@@ -43,6 +43,7 @@ from .serializers import (
     RoomSummarySerializer
 )
 from .services import set_room_status, get_room_dashboard_data
+from .board import get_board_delta
 
 
 # Writable fields on HousekeepingTaskSerializer (excluding `hotel`,
@@ -303,9 +304,24 @@ class HousekeepingDashboardViewSet(viewsets.ViewSet):
     ]
 
     def list(self, request, hotel_slug=None):
+        """
+        Full dashboard, or with ?since_version=<n> only the rooms changed
+        since board version n (no task lists).
+        """
         staff = request.user.staff_profile
         hotel = staff.hotel
 
+        since_version = request.query_params.get('since_version')
+        if since_version is not None:
+            try:
+                since_version = int(since_version)
+            except ValueError:
+                return Response(
+                    {'error': 'since_version must be an integer'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            return Response(get_board_delta(hotel.id, since_version))
+
         dashboard_data = get_room_dashboard_data(hotel)
 
         my_tasks = HousekeepingTask.objects.filter(
@@ -327,6 +343,7 @@ class HousekeepingDashboardViewSet(viewsets.ViewSet):
             'my_open_tasks': HousekeepingTaskSerializer(my_tasks, many=True).data,
             'open_tasks': HousekeepingTaskSerializer(open_tasks, many=True).data,
             'total_rooms': dashboard_data['total_rooms'],
+            'version': dashboard_data['version'],
         })
 
 
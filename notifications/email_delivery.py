@@ -0,0 +1,195 @@
+"""
+Email delivery service.
+
+All outgoing mail should go through this module instead of calling
+send_mail directly:
+
+- EmailBatch / send_emails reuse a single backend connection (one SMTP
+  login) for many messages.
+- deliver_email / queue_emails hand messages to a background worker once
+  the current transaction commits, so SMTP latency stays off the request
+  path. Set EMAIL_ASYNC_DELIVERY = False to deliver synchronously (tests,
+  management commands that need the result). Messages still queued when
+  the process exits are delivered before it does (EXIT_DRAIN_TIMEOUT).
+
+Works with any Django email backend, so tests can use the locmem or file
+backends.
+"""
+import logging
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+
+from common.concurrency import WorkerQueue
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for queued mail when the process exits
+EXIT_DRAIN_TIMEOUT = 30
+
+
+def build_email(subject, text_body, recipients, html_body=None, from_email=None):
+    """
+    Build an email message (plain text with optional HTML alternative).
+
+    Args:
+        subject: Email subject
+        text_body: Plain text body
+        recipients: List of recipient addresses (empty values are dropped)
+        html_body: Optional HTML body
+        from_email: Sender (defaults to DEFAULT_FROM_EMAIL)
+
+    Returns:
+        EmailMultiAlternatives instance
+    """
+    message = EmailMultiAlternatives(
+        subject=subject,
+        body=text_body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=[address for address in recipients if address],
+    )
+    if html_body:
+        message.attach_alternative(html_body, "text/html")
+    return message
+
+
+class EmailBatch:
+    """
+    Send many messages over one backend connection.
+
+    Usage:
+        with EmailBatch() as batch:
+            for message in messages:
+                batch.send(message)
+
+    If the shared connection can't be opened, the batch falls back to
+    sending each message on its own connection, so one SMTP hiccup fails
+    messages one by one instead of the whole batch.
+    """
+
+    def __init__(self, fail_silently=False, connection=None):
+        self.fail_silently = fail_silently
+        self.connection = connection or get_connection(fail_silently=fail_silently)
+        self.pooled = False
+        self.sent = 0
+        self.failed = 0
+
+    def __enter__(self):
+        try:
+            self.connection.open()
+        except Exception:
+            logger.exception("Could not open the email connection, sending messages one by one")
+        else:
+            self.pooled = True
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.pooled:
+            self.connection.close()
+        return False
+
+    def send(self, message):
+        """
+        Send one message on the shared connection.
+
+        Returns:
+            bool: True if the backend accepted the message
+
+        Raises:
+            Exception: Backend errors, unless fail_silently is set
+        """
+        if not message.recipients():
+            return False
+
+        connection = (
+            self.connection if self.pooled
+            else get_connection(fail_silently=self.fail_silently)
+        )
+        message.connection = connection
+        try:
+            sent = connection.send_messages([message])
+        except Exception:
+            self.failed += 1
+            if not self.fail_silently:
+                raise
+            logger.exception(f"Failed to send email '{message.subject}' to {message.to}")
+            return False
+
+        if sent:
+            self.sent += 1
+            return True
+        self.failed += 1
+        return False
+
+
+def send_emails(messages, fail_silently=False):
+    """
+    Send messages synchronously over a single connection.
+
+    Returns:
+        int: Number of messages sent
+    """
+    messages = [message for message in messages if message.recipients()]
+    if not messages:
+        return 0
+
+    with EmailBatch(fail_silently=fail_silently) as batch:
+        for message in messages:
+            batch.send(message)
+    return batch.sent
+
+
+# ---------------------------------------------------------------------------
+# Queued (asynchronous) delivery
+# ---------------------------------------------------------------------------
+
+def _deliver_queued(batches):
+    # Everything already waiting is delivered over one connection
+    messages = [message for batch in batches for message in batch]
+    sent = send_emails(messages, fail_silently=True)
+    logger.info(f"Email worker delivered {sent}/{len(messages)} queued messages")
+
+
+_email_queue = WorkerQueue(
+    "email-delivery", _deliver_queued, batch=True, exit_timeout=EXIT_DRAIN_TIMEOUT
+)
+
+
+def queue_emails(messages):
+    """
+    Deliver messages off the request path after the current transaction commits.
+
+    Falls back to synchronous delivery when EMAIL_ASYNC_DELIVERY is False.
+
+    Returns:
+        int: Number of messages queued (or sent, when synchronous)
+    """
+    messages = [message for message in messages if message.recipients()]
+    if not messages:
+        return 0
+
+    if not getattr(settings, 'EMAIL_ASYNC_DELIVERY', False):
+        return send_emails(messages)
+
+    _email_queue.put_on_commit(messages)
+    return len(messages)
+
+
+def deliver_email(message):
+    """
+    Deliver a single message (queued when EMAIL_ASYNC_DELIVERY is enabled).
+
+    Returns:
+        bool: True if the message was sent or queued
+    """
+    return queue_emails([message]) > 0
+
+
+def wait_for_queued_emails(timeout=None):
+    """
+    Block until every queued message has been processed (used on shutdown/tests).
+
+    Returns:
+        bool: False if the timeout expired first
+    """
+    return _email_queue.wait(timeout)
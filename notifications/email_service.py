@@ -1,13 +1,17 @@
 """
 Email notification service for booking confirmations and cancellations
+
+Messages are delivered through notifications.email_delivery, which queues
+them off the request path and reuses one SMTP connection per batch.
 """
-from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 from django.conf import settings
 from urllib.parse import quote
 import logging
 
+from .email_delivery import build_email, deliver_email
+
 logger = logging.getLogger(__name__)
 
 
@@ -193,14 +197,13 @@ def send_booking_received_email(booking, status_url=None, guest_token=None):
         """
         
         # Send email
-        send_mail(
+        deliver_email(build_email(
             subject=subject,
-            message=text_content,
+            text_body=text_content,
+            recipients=[booking.primary_email],
+            html_body=html_content,
             from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[booking.primary_email],
-            html_message=html_content,
-            fail_silently=False,
-        )
+        ))
         
         logger.info(f"Booking received email sent to {booking.primary_email} for booking {booking.booking_id}")
         return True
@@ -362,14 +365,13 @@ def send_booking_confirmation_email(booking, raw_token=None):
             logger.warning(f"❌ No email address for booking {booking.booking_id}, skipping email")
             return False
             
-        result = send_mail(
+        deliver_email(build_email(
             subject=subject,
-            message=plain_content,
+            text_body=plain_content,
+            recipients=[booking.guest_contact_email],
+            html_body=html_content,
             from_email=settings.EMAIL_HOST_USER,
-            recipient_list=[booking.guest_contact_email],
-            html_message=html_content,
-            fail_silently=False
-        )
+        ))
         
         logger.info(f"📧 Confirmation email sent to {booking.guest_contact_email} for booking {booking.booking_id}")
         return True
@@ -533,14 +535,13 @@ def send_booking_cancellation_email(booking, reason=None, cancelled_by=None, raw
             logger.warning(f"❌ No email address for booking {booking.booking_id}, skipping email")
             return False
             
-        result = send_mail(
+        deliver_email(build_email(
             subject=subject,
-            message=plain_content,
+            text_body=plain_content,
+            recipients=[booking.guest_contact_email],
+            html_body=html_content,
             from_email=settings.EMAIL_HOST_USER,
-            recipient_list=[booking.guest_contact_email],
-            html_message=html_content,
-            fail_silently=False
-        )
+        ))
         
         logger.info(f"📧 Cancellation email sent to {booking.guest_contact_email} for booking {booking.booking_id}")
         return True
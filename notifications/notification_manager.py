@@ -48,7 +48,13 @@ from .fcm_service import (
 )
 
 # Pusher imports
-from chat.utils import pusher_client
+from chat.utils import (
+    PUSHER_MESSAGE_LIMIT,
+    chunk_event_payloads,
+    payload_size,
+    pusher_client,
+    pusher_trigger_batch,
+)
 from .pusher_utils import (
     notify_staff_by_department,
     notify_staff_by_role,
@@ -129,6 +135,23 @@ class NotificationManager:
             self.logger.error(f"❌ Pusher failed: {channel} → {event}: {e}")
             return False
     
+    def _trigger_chunked(self, channel: str, category: str, event_type: str,
+                         payload: dict, key: str, hotel) -> bool:
+        """
+        Send a normalized event whose payload[key] list may not fit one
+        Pusher message, split over several events when it doesn't ('chunk'
+        / 'chunks' in each payload; see chat.utils.chunk_event_payloads).
+        """
+        envelope = payload_size(self._create_normalized_event(category, event_type, {}, hotel))
+        results = [
+            self._safe_pusher_trigger(
+                channel, event_type,
+                self._create_normalized_event(category, event_type, chunk, hotel),
+            )
+            for chunk in chunk_event_payloads(payload, key, PUSHER_MESSAGE_LIMIT - envelope)
+        ]
+        return all(results)
+
     # -------------------------------------------------------------------------
     # GUEST BOOKING REALTIME METHODS
     # -------------------------------------------------------------------------
@@ -359,8 +382,49 @@ class NotificationManager:
         """
         self.logger.info(f"🕐 Realtime attendance: {staff.id} - {action}")
         
+        channel, event_data = self._build_attendance_clock_status_event(staff, action, clock_log)
+        return self._safe_pusher_trigger(channel, "clock_status_updated", event_data)
+    
+    def realtime_attendance_clock_status_updated_bulk(self, staff_members, action: str,
+                                                      clock_logs=None) -> int:
+        """
+        Emit clock status events for many staff at once (e.g. auto clock-out sweeps).
+        
+        Payloads are identical to realtime_attendance_clock_status_updated but
+        are sent with Pusher batch calls instead of one request per staff.
+        
+        Args:
+            staff_members: Iterable of Staff instances
+            action: 'clock_in', 'clock_out', 'start_break', 'end_break'
+            clock_logs: Optional {staff_id: ClockLog} already loaded by the
+                caller; each staff's status is built from its log instead
+                of being looked up per staff
+            
+        Returns:
+            int: Number of events sent successfully
+        """
+        clock_logs = clock_logs or {}
+        events = []
+        for staff in staff_members:
+            channel, event_data = self._build_attendance_clock_status_event(
+                staff, action, clock_logs.get(staff.id)
+            )
+            events.append({'channel': channel, 'name': "clock_status_updated", 'data': event_data})
+        
+        if not events:
+            return 0
+        
+        self.logger.info(f"🕐 Realtime attendance bulk: {len(events)} staff - {action}")
+        failed = pusher_trigger_batch(events)
+        return len(events) - failed
+    
+    def _build_attendance_clock_status_event(self, staff, action: str, clock_log=None):
+        """Build (channel, normalized event) for an attendance clock status change."""
         # Get current status
-        current_status = staff.get_current_status() if hasattr(staff, 'get_current_status') else {}
+        current_status = (
+            staff.get_current_status(clock_log=clock_log)
+            if hasattr(staff, 'get_current_status') else {}
+        )
         
         # Determine duty status from action
         duty_status = staff.duty_status
@@ -402,7 +466,7 @@ class NotificationManager:
         
         # Send to hotel attendance channel
         channel = f"{staff.hotel.slug}.attendance"
-        return self._safe_pusher_trigger(channel, "clock_status_updated", event_data)
+        return channel, event_data
     
     # -------------------------------------------------------------------------
     # STAFF CHAT REALTIME METHODS
@@ -1653,6 +1717,39 @@ class NotificationManager:
         
         return self._safe_pusher_trigger(channel, "room_occupancy_updated", event_data)
 
+    def _room_snapshot(self, room, changed_fields=None):
+        """Full room snapshot payload used by room update events."""
+        # Build full room snapshot payload
+        payload = {
+            'room_number': room.room_number,
+            'room_status': room.room_status,
+            'is_occupied': room.is_occupied,
+            'is_out_of_order': room.is_out_of_order,
+            'maintenance_required': room.maintenance_required,
+            'maintenance_priority': room.maintenance_priority,
+            'maintenance_notes': room.maintenance_notes,
+            'last_cleaned_at': room.last_cleaned_at.isoformat() if room.last_cleaned_at else None,
+            'last_inspected_at': room.last_inspected_at.isoformat() if room.last_inspected_at else None,
+            'changed_fields': changed_fields or []
+        }
+        
+        # Add room type info if available (without extra queries)
+        if hasattr(room, 'room_type') and room.room_type:
+            payload['room_type'] = room.room_type.name
+            payload['max_occupancy'] = room.room_type.max_occupancy
+        
+        # Add guests count if available (from prefetch or existing query)
+        if hasattr(room, '_prefetched_objects_cache') and 'guests_in_room' in room._prefetched_objects_cache:
+            payload['guests_in_room'] = room.guests_in_room.count()
+        elif hasattr(room, 'guests_in_room'):
+            # Only count if it won't trigger a new query
+            try:
+                payload['guests_in_room'] = len(room.guests_in_room.all())
+            except:
+                pass
+        
+        return payload
+
     def realtime_room_updated(self, room, changed_fields=None, source="system"):
         """
         Emit normalized room updated event for operational updates.
@@ -1684,34 +1781,7 @@ class NotificationManager:
         """
         self.logger.info(f"🏨 Realtime room updated: Room {room.room_number} - {changed_fields or 'unknown fields'}")
         
-        # Build full room snapshot payload
-        payload = {
-            'room_number': room.room_number,
-            'room_status': room.room_status,
-            'is_occupied': room.is_occupied,
-            'is_out_of_order': room.is_out_of_order,
-            'maintenance_required': room.maintenance_required,
-            'maintenance_priority': room.maintenance_priority,
-            'maintenance_notes': room.maintenance_notes,
-            'last_cleaned_at': room.last_cleaned_at.isoformat() if room.last_cleaned_at else None,
-            'last_inspected_at': room.last_inspected_at.isoformat() if room.last_inspected_at else None,
-            'changed_fields': changed_fields or []
-        }
-        
-        # Add room type info if available (without extra queries)
-        if hasattr(room, 'room_type') and room.room_type:
-            payload['room_type'] = room.room_type.name
-            payload['max_occupancy'] = room.room_type.max_occupancy
-        
-        # Add guests count if available (from prefetch or existing query)
-        if hasattr(room, '_prefetched_objects_cache') and 'guests_in_room' in room._prefetched_objects_cache:
-            payload['guests_in_room'] = room.guests_in_room.count()
-        elif hasattr(room, 'guests_in_room'):
-            # Only count if it won't trigger a new query
-            try:
-                payload['guests_in_room'] = len(room.guests_in_room.all())
-            except:
-                pass
+        payload = self._room_snapshot(room, changed_fields)
         
         event_data = self._create_normalized_event(
             category="rooms",
@@ -1727,6 +1797,61 @@ class NotificationManager:
         
         return self._safe_pusher_trigger(channel, "room_updated", event_data)
 
+    def realtime_rooms_bulk_updated(self, hotel, rooms, changed_fields=None, source="system"):
+        """
+        Emit the new status of many rooms updated together (bulk status changes).
+
+        Only id, number and status per room, so a mass checkout fits a few
+        Pusher messages (split further when it doesn't) instead of one
+        room_updated snapshot per room; clients wanting more refetch.
+
+        Args:
+            hotel: Hotel instance
+            rooms: Room instances, already holding their new status
+            changed_fields: List of field names that were changed (optional)
+            source: Source of the change
+        """
+        self.logger.info(f"🏨 Realtime rooms bulk updated: {len(rooms)} rooms - {changed_fields or 'unknown fields'}")
+
+        payload = {
+            'rooms': [
+                {'id': room.id, 'room_number': room.room_number, 'room_status': room.room_status}
+                for room in sorted(rooms, key=lambda room: room.room_number)
+            ],
+            'changed_fields': changed_fields or [],
+            'source': source,
+        }
+        return self._trigger_chunked(
+            f"{hotel.slug}.rooms", "rooms", "rooms_bulk_updated", payload, 'rooms', hotel
+        )
+
+    def realtime_housekeeping_board_delta(self, hotel, delta):
+        """
+        Emit the rooms that changed on a hotel's housekeeping board.
+
+        Tablets apply the rows on top of the board version they hold; on a
+        gap in versions they refetch the dashboard with ?since_version=.
+        A large delta arrives as several chunks of the same version.
+
+        Args:
+            hotel: Hotel instance
+            delta: dict from housekeeping.board.patch_board (version,
+                rooms, removed)
+        """
+        import json
+        from django.core.serializers.json import DjangoJSONEncoder
+
+        self.logger.info(
+            f"🧹 Realtime housekeeping board delta: {hotel.slug} v{delta['version']} - "
+            f"{len(delta['rooms'])} changed, {len(delta['removed'])} removed"
+        )
+        # A bulk change can touch most of the board: the rows are split over
+        # several events of the same version when they don't fit one message
+        payload = json.loads(json.dumps(delta, cls=DjangoJSONEncoder))
+        return self._trigger_chunked(
+            f"{hotel.slug}.housekeeping", "housekeeping", "board_delta", payload, 'rooms', hotel
+        )
+
     # -------------------------------------------------------------------------
     # PHASE 3.5: BOOKING INTEGRITY HEALING REALTIME METHODS
     # -------------------------------------------------------------------------
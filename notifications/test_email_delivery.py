@@ -0,0 +1,80 @@
+"""
+Tests for notifications.email_delivery (pooled and queued email sending).
+"""
+from unittest.mock import patch
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase, override_settings
+
+from notifications.email_delivery import (
+    EmailBatch,
+    build_email,
+    queue_emails,
+    send_emails,
+    wait_for_queued_emails,
+)
+
+
+class EmailDeliveryTests(TestCase):
+
+    def _messages(self, count):
+        return [
+            build_email(
+                subject=f"Subject {i}",
+                text_body="Plain body",
+                recipients=[f"guest{i}@example.com"],
+                html_body="<p>HTML body</p>",
+            )
+            for i in range(count)
+        ]
+
+    def test_build_email_attaches_html_and_drops_empty_recipients(self):
+        message = build_email("Hi", "Plain", ["a@example.com", ""], html_body="<b>Hi</b>")
+
+        self.assertEqual(message.to, ["a@example.com"])
+        self.assertEqual(message.alternatives[0][1], "text/html")
+
+    def test_send_emails_reuses_one_connection(self):
+        connection = EmailBackend()
+        with patch('notifications.email_delivery.get_connection', return_value=connection) as mock_get:
+            sent = send_emails(self._messages(3))
+
+        self.assertEqual(sent, 3)
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_batch_fail_silently_counts_failures(self):
+        connection = EmailBackend()
+        with patch.object(connection, 'send_messages', side_effect=OSError("SMTP down")):
+            with EmailBatch(fail_silently=True, connection=connection) as batch:
+                self.assertFalse(batch.send(self._messages(1)[0]))
+
+        self.assertEqual(batch.failed, 1)
+        self.assertEqual(batch.sent, 0)
+
+    def test_batch_sends_one_by_one_when_the_connection_cannot_open(self):
+        connection = EmailBackend()
+        with patch.object(connection, 'open', side_effect=OSError("SMTP down")):
+            with EmailBatch(connection=connection) as batch:
+                for message in self._messages(2):
+                    self.assertTrue(batch.send(message))
+
+        self.assertFalse(batch.pooled)
+        self.assertEqual(batch.sent, 2)
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_queue_emails_is_synchronous_when_async_disabled(self):
+        with override_settings(EMAIL_ASYNC_DELIVERY=False):
+            self.assertEqual(queue_emails(self._messages(2)), 2)
+
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_queue_emails_delivers_after_commit(self):
+        with override_settings(EMAIL_ASYNC_DELIVERY=True):
+            with self.captureOnCommitCallbacks(execute=True):
+                queue_emails(self._messages(2))
+                self.assertEqual(len(mail.outbox), 0)
+            wait_for_queued_emails()
+
+        self.assertEqual(len(mail.outbox), 2)
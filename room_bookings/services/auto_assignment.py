@@ -0,0 +1,223 @@
+"""
+Auto Room Assignment Service - whole-day batch assignment
+
+Front desk used to assign arrivals one by one (SafeAssignRoomView), each
+call running its own conflict subquery. This service assigns every
+unassigned arrival in a date range at once:
+
+- arrivals, bookable rooms and the rooms' existing assignments are loaded
+  once;
+- stays are packed per room type, interval-scheduling style: arrivals in
+  check-out order, each placed in the room where it fits the tightest,
+  i.e. closest to the stay before it (then the stay after it). With plain
+  free rooms this places as many arrivals as the rooms can hold; empty
+  rooms are used last, so they stay free for long stays;
+- a stay is never split across rooms and existing assignments are never
+  moved, so the plan introduces no room moves;
+- plan() is a dry run; apply() re-plans under row locks and writes all
+  assignments in one transaction, using assign_room_atomic's validation
+  rules (RoomAssignmentService.assert_room_can_be_assigned).
+"""
+
+import bisect
+from collections import defaultdict
+
+from django.db import transaction, models
+from django.utils import timezone
+from room_bookings.constants import ASSIGNABLE_BOOKING_STATUSES, NON_BLOCKING_STATUSES
+from room_bookings.services.room_assignment import RoomAssignmentService
+
+
+class _RoomSchedule:
+    """A room's assigned stays, as sorted non-overlapping (check_in, check_out)."""
+
+    def __init__(self, room):
+        self.room = room
+        self.stays = []
+
+    def add(self, check_in, check_out):
+        bisect.insort(self.stays, (check_in, check_out))
+
+    def fit(self, check_in, check_out):
+        """
+        Days left free before and after the stay if placed in this room,
+        None when it overlaps an existing stay. An open side counts as
+        unbounded.
+        """
+        pos = bisect.bisect_left(self.stays, (check_out,))
+        if pos and self.stays[pos - 1][1] > check_in:
+            return None
+        before = (check_in - self.stays[pos - 1][1]).days if pos else float('inf')
+        after = (self.stays[pos][0] - check_out).days if pos < len(self.stays) else float('inf')
+        return before, after
+
+
+class AutoAssignmentService:
+    """Assign all unassigned arrivals in a date range in one pass"""
+
+    @staticmethod
+    def _load(hotel, start_date, end_date, lock=False):
+        from hotel.models import RoomBooking, BookingGuest
+        from rooms.models import Room
+
+        arrivals = RoomBooking.objects.filter(
+            hotel=hotel,
+            status__in=ASSIGNABLE_BOOKING_STATUSES,
+            assigned_room__isnull=True,
+            checked_in_at__isnull=True,
+            check_in__gte=start_date,
+            check_in__lte=end_date,
+        ).select_related('hotel', 'room_type__hotel')
+        if lock:
+            arrivals = arrivals.select_for_update(of=('self',))
+        arrivals = list(arrivals)
+        if not arrivals:
+            return [], [], []
+
+        # Same conditions as Room.is_bookable() / find_available_rooms_for_booking
+        rooms = Room.objects.filter(
+            hotel=hotel,
+            room_type_id__in={booking.room_type_id for booking in arrivals},
+            room_status__in=['READY_FOR_GUEST'],
+            is_active=True,
+            is_out_of_order=False,
+            maintenance_required=False
+        ).select_related('hotel', 'room_type').order_by('room_number')
+        if lock:
+            rooms = rooms.select_for_update(of=('self',))
+        rooms = list(rooms)
+
+        existing = RoomBooking.objects.filter(
+            assigned_room__in=rooms,
+            # Stays that just touch the window are kept: they decide the best fit
+            check_in__lte=max(booking.check_out for booking in arrivals),
+            check_out__gte=min(booking.check_in for booking in arrivals)
+        ).filter(
+            RoomAssignmentService.inventory_blocking_filter()
+        ).exclude(
+            status__in=NON_BLOCKING_STATUSES
+        ).values_list('assigned_room_id', 'check_in', 'check_out')
+
+        staying = dict(
+            BookingGuest.objects.filter(
+                booking__in=arrivals, is_staying=True
+            ).values('booking').annotate(
+                count=models.Count('id')
+            ).values_list('booking', 'count')
+        )
+        for booking in arrivals:
+            booking.staying_count = staying.get(booking.id, 0)
+
+        return arrivals, rooms, list(existing)
+
+    @staticmethod
+    def _pack(arrivals, rooms, existing):
+        schedules = defaultdict(list)
+        by_room = {}
+        for room in rooms:
+            by_room[room.id] = _RoomSchedule(room)
+            schedules[room.room_type_id].append(by_room[room.id])
+        for room_id, check_in, check_out in existing:
+            by_room[room_id].add(check_in, check_out)
+
+        assignments, unassigned = [], []
+        arrivals = sorted(
+            arrivals,
+            key=lambda b: (b.check_out, b.check_in, b.booking_id)
+        )
+        for booking in arrivals:
+            # Same requirement as SafeAssignRoomView
+            if booking.staying_count != booking.adults + booking.children:
+                unassigned.append((booking, 'PARTY_INCOMPLETE',
+                                   'Staying guest names are missing'))
+                continue
+
+            best, best_fit = None, None
+            for schedule in schedules[booking.room_type_id]:
+                fit = schedule.fit(booking.check_in, booking.check_out)
+                if fit is not None and (best_fit is None or fit < best_fit):
+                    best, best_fit = schedule, fit
+            if best is None:
+                unassigned.append((booking, 'NO_ROOM_AVAILABLE',
+                                   f'No bookable {booking.room_type.name} room is free for the stay'))
+                continue
+
+            best.add(booking.check_in, booking.check_out)
+            assignments.append((booking, best.room))
+
+        return assignments, unassigned
+
+    @staticmethod
+    def _result(start_date, end_date, assignments, unassigned):
+        return {
+            'start_date': start_date,
+            'end_date': end_date,
+            'assignments': [{
+                'booking_id': booking.booking_id,
+                'room_id': room.id,
+                'room_number': room.room_number,
+                'room_type': room.room_type.name,
+                'check_in': booking.check_in,
+                'check_out': booking.check_out,
+            } for booking, room in assignments],
+            'unassigned': [{
+                'booking_id': booking.booking_id,
+                'code': code,
+                'message': message,
+            } for booking, code, message in unassigned],
+        }
+
+    @classmethod
+    def plan(cls, hotel, start_date, end_date):
+        """
+        Dry run: propose rooms for the unassigned arrivals checking in
+        between start_date and end_date (inclusive). Nothing is written.
+
+        Returns: dict with 'assignments' and 'unassigned' (booking_id, code, message)
+        """
+        assignments, unassigned = cls._pack(*cls._load(hotel, start_date, end_date))
+        return cls._result(start_date, end_date, assignments, unassigned)
+
+    @classmethod
+    @transaction.atomic
+    def apply(cls, hotel, start_date, end_date, staff_user, notes=None):
+        """
+        Plan under lock and assign every placeable arrival atomically.
+
+        The arrivals and candidate rooms are locked (rooms are also what
+        assign_room_atomic locks), so a concurrent single assignment waits
+        for this one and then sees its result.
+
+        Returns: same shape as plan(), plus 'bookings' (the updated RoomBooking instances)
+        Raises: RoomAssignmentError if a planned assignment fails validation;
+        nothing is assigned in that case
+        """
+        from hotel.models import RoomBooking
+
+        assignments, unassigned = cls._pack(
+            *cls._load(hotel, start_date, end_date, lock=True)
+        )
+
+        now = timezone.now()
+        bookings = []
+        for booking, room in assignments:
+            # Overlaps were ruled out by the plan against the locked rooms
+            RoomAssignmentService.assert_room_can_be_assigned(
+                booking, room, check_overlap=False
+            )
+            booking.assigned_room = room
+            booking.room_assigned_at = now
+            booking.room_assigned_by = staff_user
+            booking.assignment_notes = notes or ''
+            booking.assignment_version += 1
+            booking.integrity_dirty_at = now
+            bookings.append(booking)
+
+        RoomBooking.objects.bulk_update(bookings, [
+            'assigned_room', 'room_assigned_at', 'room_assigned_by',
+            'assignment_notes', 'assignment_version', 'integrity_dirty_at',
+        ])
+
+        result = cls._result(start_date, end_date, assignments, unassigned)
+        result['bookings'] = bookings
+        return result
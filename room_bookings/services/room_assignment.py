@@ -5,6 +5,22 @@ from room_bookings.exceptions import RoomAssignmentError
 
 class RoomAssignmentService:
     
+    @staticmethod
+    def inventory_blocking_filter():
+        """
+        Q for bookings that hold their assigned room.
+        
+        Blocks inventory if: status='CONFIRMED' AND checked_out_at IS NULL
+        OR checked_in_at IS NOT NULL AND checked_out_at IS NULL (in-house guest)
+        """
+        return models.Q(
+            status__in=INVENTORY_BLOCKING_STATUSES,  # CONFIRMED
+            checked_out_at__isnull=True  # Not checked out
+        ) | models.Q(
+            checked_in_at__isnull=False,  # Checked in
+            checked_out_at__isnull=True   # Not checked out
+        )
+    
     @staticmethod
     def find_available_rooms_for_booking(booking):
         """
@@ -22,15 +38,7 @@ class RoomAssignmentService:
         from hotel.models import RoomBooking
         
         # Get conflicting room IDs (rooms with overlapping bookings)
-        # Blocks inventory if: status='CONFIRMED' AND checked_out_at IS NULL
-        # OR checked_in_at IS NOT NULL AND checked_out_at IS NULL (in-house guest)
-        blocking_filter = models.Q(
-            status__in=INVENTORY_BLOCKING_STATUSES,  # CONFIRMED
-            checked_out_at__isnull=True  # Not checked out
-        ) | models.Q(
-            checked_in_at__isnull=False,  # Checked in
-            checked_out_at__isnull=True   # Not checked out
-        )
+        blocking_filter = RoomAssignmentService.inventory_blocking_filter()
         
         conflicting_rooms = RoomBooking.objects.filter(
             assigned_room__isnull=False,
@@ -58,10 +66,13 @@ class RoomAssignmentService:
         ).order_by('room_number')
     
     @staticmethod 
-    def assert_room_can_be_assigned(booking, room):
+    def assert_room_can_be_assigned(booking, room, check_overlap=True):
         """
         Validates that room can be safely assigned to booking.
         Raises RoomAssignmentError with structured error codes.
+        
+        check_overlap=False skips the overlap query, for callers that have
+        already checked the room's bookings under lock (auto assignment).
         """
         # Hotel scope validation
         if booking.hotel != room.hotel:
@@ -106,15 +117,12 @@ class RoomAssignmentService:
                 message=f'Room {room.room_number} is not bookable (status: {room.room_status})'
             )
             
+        if not check_overlap:
+            return
+            
         # Overlap conflict validation (using timestamp-based blocking)
         from hotel.models import RoomBooking
-        blocking_filter = models.Q(
-            status__in=INVENTORY_BLOCKING_STATUSES,  # CONFIRMED
-            checked_out_at__isnull=True  # Not checked out
-        ) | models.Q(
-            checked_in_at__isnull=False,  # Checked in
-            checked_out_at__isnull=True   # Not checked out
-        )
+        blocking_filter = RoomAssignmentService.inventory_blocking_filter()
         
         conflicting_bookings = RoomBooking.objects.filter(
             assigned_room=room,
@@ -157,13 +165,7 @@ class RoomAssignmentService:
         
         # CRITICAL: Also lock potentially conflicting bookings to prevent race conditions
         # This ensures two concurrent assignments serialize on the conflict check
-        blocking_filter = models.Q(
-            status__in=INVENTORY_BLOCKING_STATUSES,
-            checked_out_at__isnull=True
-        ) | models.Q(
-            checked_in_at__isnull=False,
-            checked_out_at__isnull=True
-        )
+        blocking_filter = cls.inventory_blocking_filter()
         
         potentially_conflicting = RoomBooking.objects.select_for_update().filter(
             assigned_room=room,
@@ -19,6 +19,7 @@ from hotel.staff_views import (
     # Safe Room Assignment System Views
     AvailableRoomsView,
     SafeAssignRoomView,
+    AutoAssignRoomsView,
     UnassignRoomView,
     MoveRoomView,
     # Check-in/Check-out Views
@@ -48,6 +49,13 @@ urlpatterns = [
         name='room-bookings-staff-list'
     ),
     
+    # Assign rooms to all unassigned arrivals in a date range (dry run by default)
+    path(
+        'auto-assign-rooms/',
+        AutoAssignRoomsView.as_view(),
+        name='room-bookings-auto-assign-rooms'
+    ),
+    
     # Get detailed information about a specific booking
     path(
         '<str:booking_id>/',
@@ -1087,3 +1087,139 @@ class RoomMoveAPITests(APITestCase):
         response = self.client.post(self.url, data)
         
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class AutoAssignmentServiceTests(TestCase):
+    """Test whole-day batch assignment (AutoAssignmentService)"""
+    
+    def setUp(self):
+        self.hotel = Hotel.objects.create(
+            name="Auto Hotel",
+            slug="auto-hotel",
+            is_active=True
+        )
+        self.room_type = RoomType.objects.create(
+            hotel=self.hotel,
+            code="STD",
+            name="Standard",
+            starting_price_from=100
+        )
+        self.rooms = [
+            Room.objects.create(
+                hotel=self.hotel,
+                room_type=self.room_type,
+                room_number=number,
+                room_status='READY_FOR_GUEST'
+            )
+            for number in (101, 102)
+        ]
+        self.user = User.objects.create_user('auto_staff', 'auto@test.com', 'password')
+        self.staff = Staff.objects.create(
+            user=self.user,
+            hotel=self.hotel,
+            first_name="Auto",
+            last_name="Staff"
+        )
+        self.today = date.today()
+    
+    def _booking(self, first_day, last_day, room=None, adults=1):
+        return RoomBooking.objects.create(
+            hotel=self.hotel,
+            room_type=self.room_type,
+            check_in=self.today + timedelta(days=first_day),
+            check_out=self.today + timedelta(days=last_day),
+            primary_first_name="Guest",
+            primary_last_name=f"Day{first_day}",
+            adults=adults,
+            children=0,
+            total_amount=100.00,
+            status='CONFIRMED',
+            assigned_room=room
+        )
+    
+    def test_plan_packs_next_to_existing_stays_and_writes_nothing(self):
+        from room_bookings.services.auto_assignment import AutoAssignmentService
+        
+        self._booking(0, 2, room=self.rooms[1])
+        arrival = self._booking(2, 4)
+        
+        # Arrivals, rooms, existing assignments, party counts
+        with self.assertNumQueries(4):
+            plan = AutoAssignmentService.plan(
+                self.hotel, self.today + timedelta(days=2), self.today + timedelta(days=2)
+            )
+        
+        # Room 102 turns over that day; 101 stays free for a longer stay
+        self.assertEqual(plan['unassigned'], [])
+        self.assertEqual(
+            [(a['booking_id'], a['room_number']) for a in plan['assignments']],
+            [(arrival.booking_id, 102)]
+        )
+        arrival.refresh_from_db()
+        self.assertIsNone(arrival.assigned_room)
+    
+    def test_plan_reports_arrivals_that_cannot_be_placed(self):
+        from room_bookings.services.auto_assignment import AutoAssignmentService
+        
+        placed = [self._booking(1, 3), self._booking(1, 2), self._booking(2, 4)]
+        crowded = self._booking(1, 4)
+        incomplete = self._booking(1, 2, adults=2)
+        
+        plan = AutoAssignmentService.plan(
+            self.hotel, self.today, self.today + timedelta(days=2)
+        )
+        
+        self.assertEqual(
+            {a['booking_id'] for a in plan['assignments']},
+            {booking.booking_id for booking in placed}
+        )
+        self.assertEqual(
+            {(u['booking_id'], u['code']) for u in plan['unassigned']},
+            {(crowded.booking_id, 'NO_ROOM_AVAILABLE'),
+             (incomplete.booking_id, 'PARTY_INCOMPLETE')}
+        )
+    
+    def test_apply_assigns_all_arrivals(self):
+        from room_bookings.services.auto_assignment import AutoAssignmentService
+        
+        first, second = self._booking(1, 3), self._booking(1, 2)
+        
+        result = AutoAssignmentService.apply(
+            self.hotel, self.today + timedelta(days=1), self.today + timedelta(days=1),
+            staff_user=self.staff, notes="Night audit"
+        )
+        
+        self.assertEqual(len(result['bookings']), 2)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertNotEqual(first.assigned_room, second.assigned_room)
+        self.assertEqual(first.room_assigned_by, self.staff)
+        self.assertEqual(first.assignment_notes, "Night audit")
+        self.assertEqual(first.assignment_version, 1)
+        self.assertIsNotNone(first.integrity_dirty_at)
+        
+        # The assigned rooms now block single assignment for overlapping stays
+        late = self._booking(1, 2)
+        self.assertFalse(RoomAssignmentService.find_available_rooms_for_booking(late).exists())
+    
+    def test_apply_is_all_or_nothing(self):
+        from unittest.mock import patch
+        from room_bookings.services.auto_assignment import AutoAssignmentService
+        
+        self._booking(1, 3)
+        self._booking(1, 2)
+        checks = []
+        
+        def fail_second(booking, room, check_overlap=True):
+            checks.append(booking)
+            if len(checks) == 2:
+                raise RoomAssignmentError(code='ROOM_NOT_BOOKABLE', message='Room changed')
+        
+        with patch.object(RoomAssignmentService, 'assert_room_can_be_assigned', side_effect=fail_second):
+            with self.assertRaises(RoomAssignmentError):
+                AutoAssignmentService.apply(
+                    self.hotel, self.today, self.today + timedelta(days=1),
+                    staff_user=self.staff
+                )
+        
+        self.assertFalse(RoomBooking.objects.filter(assigned_room__isnull=False).exists())
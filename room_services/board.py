@@ -0,0 +1,129 @@
+"""
+Cached order board for kitchen and porter screens.
+
+The screens used to poll all-orders-summary (count, page, a second status
+aggregate, room grouping in Python, plus a total_price aggregate per
+order), pending-count and the breakfast pending-count separately. The
+board returns, per order kind (room service / breakfast):
+
+- status counts, from one conditionally aggregated query;
+- the open (pending/accepted) orders with their items, from one orders
+  query and one prefetched items query;
+- the open orders grouped by room.
+
+Each kind is cached per hotel for ORDER_BOARD_TTL seconds and dropped by
+the order and order item signals in signals.py, so screens see changes on
+their next poll and the TTL only bounds a board rebuilt concurrently with
+a write.
+"""
+from django.core.cache import cache
+from django.db.models import Count, Prefetch, Q
+
+from .models import BreakfastOrder, BreakfastOrderItem, Order, OrderItem
+
+ORDER_BOARD_TTL = 10
+OPEN_STATUSES = ('pending', 'accepted')
+
+ROOM_SERVICE = 'room_service'
+BREAKFAST = 'breakfast'
+
+_ORDER_MODELS = {
+    ROOM_SERVICE: (Order, OrderItem, 'orderitem_set'),
+    BREAKFAST: (BreakfastOrder, BreakfastOrderItem, 'breakfastorderitem_set'),
+}
+
+
+def _board_key(hotel_id, kind):
+    return f"room_services:order_board:{hotel_id}:{kind}"
+
+
+def _item_row(order_item):
+    return {
+        'id': order_item.id,
+        'item_id': order_item.item_id,
+        'name': order_item.item.name,
+        'category': order_item.item.category,
+        'quantity': order_item.quantity,
+        'notes': order_item.notes,
+    }
+
+
+def _order_row(kind, order, items):
+    row = {
+        'id': order.id,
+        'room_number': order.room_number,
+        'status': order.status,
+        'created_at': order.created_at.isoformat(),
+        'updated_at': order.updated_at.isoformat(),
+        'items': [_item_row(order_item) for order_item in items],
+    }
+    if kind == ROOM_SERVICE:
+        for item_row, order_item in zip(row['items'], items):
+            item_row['price'] = float(order_item.item.price)
+        # Same as Order.total_price, from the prefetched items
+        row['total_price'] = sum(
+            order_item.quantity * float(order_item.item.price) for order_item in items
+        )
+    else:
+        row['delivery_time'] = order.delivery_time
+    return row
+
+
+def _build_section(hotel_id, kind):
+    model, item_model, items_attr = _ORDER_MODELS[kind]
+    orders = model.objects.filter(hotel_id=hotel_id)
+
+    counts = orders.aggregate(**{
+        status: Count('id', filter=Q(status=status))
+        for status, _ in model.STATUS_CHOICES
+    })
+
+    open_orders = orders.filter(status__in=OPEN_STATUSES).order_by(
+        'created_at'
+    ).prefetch_related(
+        Prefetch(items_attr, queryset=item_model.objects.select_related('item').order_by('id'))
+    )
+    rows = [
+        _order_row(kind, order, list(getattr(order, items_attr).all()))
+        for order in open_orders
+    ]
+
+    rooms = {}
+    for row in rows:
+        room = rooms.setdefault(row['room_number'], {
+            'room_number': row['room_number'],
+            'order_count': 0,
+            'order_ids': [],
+        })
+        room['order_count'] += 1
+        room['order_ids'].append(row['id'])
+
+    return {
+        'counts': counts,
+        'orders': rows,
+        'orders_by_room': sorted(rooms.values(), key=lambda room: room['room_number']),
+    }
+
+
+def get_order_board_section(hotel_id, kind):
+    """One kind's board (counts, orders, orders_by_room), cached."""
+    key = _board_key(hotel_id, kind)
+    section = cache.get(key)
+    if section is None:
+        section = _build_section(hotel_id, kind)
+        cache.set(key, section, ORDER_BOARD_TTL)
+    return section
+
+
+def get_order_board(hotel_id, kinds=(ROOM_SERVICE, BREAKFAST)):
+    """
+    The hotel's order board.
+
+    Returns:
+        dict: kind -> {counts, orders, orders_by_room} for each requested kind
+    """
+    return {kind: get_order_board_section(hotel_id, kind) for kind in kinds}
+
+
+def invalidate_order_board(hotel_id, kind):
+    cache.delete(_board_key(hotel_id, kind))
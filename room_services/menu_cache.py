@@ -0,0 +1,85 @@
+"""
+Cached guest menus.
+
+Every guest in every room loads the same per-hotel room service and
+breakfast menus. Each (hotel, menu) is cached as the serialized JSON body
+plus an ETag:
+
+- entries are keyed by a per-hotel, per-menu version; item saves and
+  deletes bump the version once their transaction commits (signals.py).
+  A menu read before the commit is cached under the version it was read
+  at, which stops being served as soon as the bump lands;
+- the ETag is a hash of the body, so it survives cache rebuilds and a
+  client holding an unchanged menu keeps getting 304 Not Modified;
+- the menu views resolve the hotel through hotel_cache, so a warm menu
+  load serves the stored, precomputed body without querying or
+  serializing menu items. The cache backend itself may be the database
+  (DatabaseCache): a warm load is then two cache-table reads, one for
+  the version and one for the menu.
+"""
+import hashlib
+import json
+
+from django.core.cache import cache
+from rest_framework.utils.encoders import JSONEncoder
+
+from common.concurrency import bump_cache_version, get_cache_version
+
+from .board import ROOM_SERVICE
+
+MENU_TTL = 60 * 60 * 24
+
+
+def _version_key(hotel_id, kind):
+    return f"room_services:menu_version:{kind}:{hotel_id}"
+
+
+def _menu_key(hotel_id, kind, version):
+    return f"room_services:menu:{kind}:{hotel_id}:{version}"
+
+
+def bump_menu_version(hotel_id, kind):
+    """Invalidate the hotel's cached menu."""
+    if hotel_id is None:
+        return
+    bump_cache_version(_version_key(hotel_id, kind))
+
+
+def _build_menu(hotel_id, kind):
+    from .models import BreakfastItem, RoomServiceItem
+    from .serializers import BreakfastItemSerializer, RoomServiceItemSerializer
+
+    if kind == ROOM_SERVICE:
+        items = RoomServiceItem.objects.filter(hotel_id=hotel_id).order_by('id')
+        return RoomServiceItemSerializer(items, many=True).data
+    items = BreakfastItem.objects.filter(hotel_id=hotel_id).order_by('id')
+    return BreakfastItemSerializer(items, many=True).data
+
+
+def get_menu(hotel_id, kind):
+    """
+    The hotel's menu as served to guests.
+
+    Args:
+        hotel_id: Hotel id
+        kind: ROOM_SERVICE or BREAKFAST
+
+    Returns:
+        dict: etag (quoted, for the ETag header), content (JSON string)
+    """
+    key = _menu_key(hotel_id, kind, get_cache_version(_version_key(hotel_id, kind)))
+    menu = cache.get(key)
+    if menu is None:
+        content = json.dumps(_build_menu(hotel_id, kind), cls=JSONEncoder)
+        menu = {
+            'etag': '"%s"' % hashlib.md5(content.encode()).hexdigest(),
+            'content': content,
+        }
+        cache.set(key, menu, MENU_TTL)
+    return menu
+
+
+def get_menu_data(hotel_id, kind):
+    """The cached menu as a list of item dicts."""
+    return json.loads(get_menu(hotel_id, kind)['content'])
+
@@ -1,10 +1,13 @@
 # room_services/signals.py
 
 from django.db import transaction
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
-from .models import Order, BreakfastOrder
+from .models import (
+    Order, OrderItem, BreakfastOrder, BreakfastOrderItem,
+    RoomServiceItem, BreakfastItem,
+)
 from notifications.notification_manager import notification_manager
 
 
@@ -65,3 +68,53 @@ def send_porter_notification_on_breakfast_order(sender, instance, created, **kwa
 
     transaction.on_commit(_do_breakfast_notify)
     transaction.on_commit(_do_bcount_notify)
+
+
+def _invalidate_board_on_commit(hotel_id, kind):
+    from .board import invalidate_order_board
+
+    if hotel_id is None:
+        return
+    invalidate_order_board(hotel_id, kind)
+    # Again after commit, in case a screen rebuilt the board mid-transaction
+    transaction.on_commit(lambda: invalidate_order_board(hotel_id, kind))
+
+
+@receiver([post_save, post_delete], sender=Order)
+def invalidate_board_on_order_change(sender, instance, **kwargs):
+    _invalidate_board_on_commit(instance.hotel_id, 'room_service')
+
+
+@receiver([post_save, post_delete], sender=OrderItem)
+def invalidate_board_on_order_item_change(sender, instance, **kwargs):
+    _invalidate_board_on_commit(
+        instance.hotel_id or instance.order.hotel_id, 'room_service'
+    )
+
+
+@receiver([post_save, post_delete], sender=BreakfastOrder)
+def invalidate_board_on_breakfast_order_change(sender, instance, **kwargs):
+    _invalidate_board_on_commit(instance.hotel_id, 'breakfast')
+
+
+@receiver([post_save, post_delete], sender=BreakfastOrderItem)
+def invalidate_board_on_breakfast_item_change(sender, instance, **kwargs):
+    _invalidate_board_on_commit(instance.order.hotel_id, 'breakfast')
+
+
+def _bump_menu_version(hotel_id, kind):
+    from .menu_cache import bump_menu_version
+
+    # After commit: a guest reading the menu before then still sees the
+    # old items, and must cache them under the old version
+    transaction.on_commit(lambda: bump_menu_version(hotel_id, kind))
+
+
+@receiver([post_save, post_delete], sender=RoomServiceItem)
+def invalidate_room_service_menu(sender, instance, **kwargs):
+    _bump_menu_version(instance.hotel_id, 'room_service')
+
+
+@receiver([post_save, post_delete], sender=BreakfastItem)
+def invalidate_breakfast_menu(sender, instance, **kwargs):
+    _bump_menu_version(instance.hotel_id, 'breakfast')
@@ -1,3 +1,172 @@
-from django.test import TestCase
+"""
+Tests for the cached order board (room_services/board.py) and the cached
+guest menus (room_services/menu_cache.py).
+"""
+import json
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from hotel.hotel_cache import clear_hotel_cache
+from hotel.models import Hotel
+from staff.models import Staff
+from .board import BREAKFAST, ROOM_SERVICE, get_order_board, get_order_board_section
+from .models import (
+    BreakfastItem,
+    BreakfastOrder,
+    BreakfastOrderItem,
+    Order,
+    OrderItem,
+    RoomServiceItem,
+)
+from .views import BreakfastItemViewSet, OrderViewSet, RoomServiceItemViewSet
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+)
+class OrderBoardTests(TestCase):
+    """The board is built in a fixed number of queries and dropped on writes."""
+
+    def setUp(self):
+        cache.clear()
+        self.hotel = Hotel.objects.create(name="Board Hotel", slug="board-hotel")
+        self.soup = RoomServiceItem.objects.create(
+            hotel=self.hotel, name="Soup", price="6.50", description="Soup"
+        )
+        self.club = RoomServiceItem.objects.create(
+            hotel=self.hotel, name="Club", price="12.00", description="Sandwich"
+        )
+        self.eggs = BreakfastItem.objects.create(
+            hotel=self.hotel, name="Eggs", description="Scrambled"
+        )
+
+    def _order(self, room_number, status="pending"):
+        order = Order.objects.create(
+            hotel=self.hotel, room_number=room_number, status=status
+        )
+        OrderItem.objects.create(hotel=self.hotel, order=order, item=self.soup, quantity=2)
+        OrderItem.objects.create(hotel=self.hotel, order=order, item=self.club)
+        return order
+
+    def test_board_is_built_in_constant_queries_and_cached(self):
+        for room_number in (101, 101, 102, 103, 104):
+            self._order(room_number)
+        self._order(105, status="completed")
+        cache.clear()
+
+        # Status counts, open orders, their items
+        with self.assertNumQueries(3):
+            board = get_order_board_section(self.hotel.id, ROOM_SERVICE)
+
+        self.assertEqual(board['counts'], {'pending': 5, 'accepted': 0, 'completed': 1})
+        self.assertEqual(len(board['orders']), 5)
+        self.assertEqual(board['orders'][0]['total_price'], 25.0)
+        self.assertEqual(
+            [item['name'] for item in board['orders'][0]['items']], ["Soup", "Club"]
+        )
+        self.assertEqual(
+            [(room['room_number'], room['order_count']) for room in board['orders_by_room']],
+            [(101, 2), (102, 1), (103, 1), (104, 1)],
+        )
+
+        with self.assertNumQueries(0):
+            get_order_board_section(self.hotel.id, ROOM_SERVICE)
+
+    def test_order_and_item_writes_drop_the_cached_board(self):
+        order = self._order(101)
+        get_order_board(self.hotel.id)
+
+        order.status = "accepted"
+        order.save()
+        board = get_order_board_section(self.hotel.id, ROOM_SERVICE)
+        self.assertEqual(board['counts']['accepted'], 1)
+
+        breakfast = BreakfastOrder.objects.create(hotel=self.hotel, room_number=201)
+        self.assertEqual(
+            get_order_board_section(self.hotel.id, BREAKFAST)['orders'][0]['items'], []
+        )
+        BreakfastOrderItem.objects.create(order=breakfast, item=self.eggs, quantity=2)
+        items = get_order_board_section(self.hotel.id, BREAKFAST)['orders'][0]['items']
+        self.assertEqual([(item['name'], item['quantity']) for item in items], [("Eggs", 2)])
+
+    def test_order_board_endpoint_returns_both_sections(self):
+        self._order(101)
+        BreakfastOrder.objects.create(hotel=self.hotel, room_number=201)
+        user = User.objects.create_user("kitchen", password="x", is_superuser=True)
+        Staff.objects.create(
+            user=user, hotel=self.hotel, first_name="Kit", last_name="Chen"
+        )
+
+        request = APIRequestFactory().get('/')
+        force_authenticate(request, user=user)
+        response = OrderViewSet.as_view({'get': 'order_board'})(
+            request, hotel_slug=self.hotel.slug
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[ROOM_SERVICE]['counts']['pending'], 1)
+        self.assertEqual(response.data[BREAKFAST]['counts']['pending'], 1)
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+)
+class GuestMenuCacheTests(TestCase):
+    """Guest menus are served from the cache with ETag revalidation."""
+
+    def setUp(self):
+        cache.clear()
+        clear_hotel_cache()
+        self.hotel = Hotel.objects.create(name="Menu Hotel", slug="menu-hotel")
+        self.soup = RoomServiceItem.objects.create(
+            hotel=self.hotel, name="Soup", price="6.50", description="Soup"
+        )
+        BreakfastItem.objects.create(hotel=self.hotel, name="Eggs", description="Scrambled")
+
+    def _get(self, viewset, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        request = APIRequestFactory().get('/', **headers)
+        return viewset.as_view({'get': 'menu'})(
+            request, hotel_slug=self.hotel.slug, room_number='101'
+        )
+
+    def test_warm_menu_is_served_without_queries_and_revalidated(self):
+        response = self._get(RoomServiceItemViewSet)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['name'] for item in json.loads(response.content)], ["Soup"])
+        etag = response['ETag']
+
+        with self.assertNumQueries(0):
+            response = self._get(RoomServiceItemViewSet, etag=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        # A menu rebuilt after the cache is lost keeps its ETag
+        cache.clear()
+        self.assertEqual(self._get(RoomServiceItemViewSet, etag=etag).status_code, 304)
+
+    def test_item_changes_invalidate_only_that_menu(self):
+        room_service_etag = self._get(RoomServiceItemViewSet)['ETag']
+        breakfast_etag = self._get(BreakfastItemViewSet)['ETag']
+
+        self.soup.is_on_stock = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.soup.save()
+            # The version is only bumped once the edit commits
+            self.assertEqual(
+                self._get(RoomServiceItemViewSet, etag=room_service_etag).status_code, 304
+            )
+
+        response = self._get(RoomServiceItemViewSet, etag=room_service_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(json.loads(response.content)[0]['is_on_stock'])
+        self.assertEqual(
+            self._get(BreakfastItemViewSet, etag=breakfast_etag).status_code, 304
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.soup.delete()
+        self.assertEqual(json.loads(self._get(RoomServiceItemViewSet).content), [])
@@ -19,6 +19,10 @@ order_history = OrderViewSet.as_view({
     'get': 'order_history'
 })
 
+order_board = OrderViewSet.as_view({
+    'get': 'order_board'
+})
+
 breakfast_order_pending_count = BreakfastOrderViewSet.as_view({
     'get': 'pending_count'
 })
@@ -56,6 +60,7 @@ urlpatterns = [
     path('<str:hotel_slug>/orders/<int:pk>/', order_detail,name='hotel-order-detail'),
     path('<str:hotel_slug>/orders/all-orders-summary/', order_summary, name='hotel-orders-summary'),
     path('<str:hotel_slug>/orders/order-history/', order_history, name='hotel-order-history'),
+    path('<str:hotel_slug>/order-board/', order_board, name='hotel-order-board'),
     path('<str:hotel_slug>/orders/pending-count/', order_pending_count, name='hotel-order-pending-count'),
     path('<str:hotel_slug>/orders/pending-count.<str:format>/', order_pending_count, name='hotel-order-pending-count-format'),
     path('<str:hotel_slug>/room/<int:room_number>/menu/', room_service_items, name='room-service-menu'),
@@ -6,7 +6,10 @@ from hotel.models import Hotel  # Assuming you have a Hotel model
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from .models import RoomServiceItem, BreakfastItem, Order, BreakfastOrder
-from django.http import Http404
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from hotel.hotel_cache import get_hotel_record
 # All notifications now handled by NotificationManager
 from notifications.notification_manager import NotificationManager
 from django.db import transaction
@@ -71,6 +74,8 @@ def _staff_hotel_matches(request, hotel):
 
 logger = logging.getLogger(__name__)
 
+from .board import BREAKFAST, ROOM_SERVICE, get_order_board, get_order_board_section
+from .menu_cache import get_menu
 from .serializers import (
     RoomServiceItemSerializer,
     BreakfastItemSerializer,
@@ -93,6 +98,27 @@ def get_hotel_from_request(request):
 
     return get_object_or_404(Hotel, slug=hotel_slug)
 
+def _menu_response(request, kind):
+    """
+    Serve a guest menu from the menu cache (see menu_cache.py): the stored
+    body when warm, with no menu queries or serialization, and 304 when
+    the client's If-None-Match still matches.
+    """
+    record = get_hotel_record(request.parser_context['kwargs'].get('hotel_slug'))
+    if record is None:
+        raise Http404("No Hotel matches the given query.")
+
+    menu = get_menu(record.id, kind)
+    if menu['etag'] in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(menu['content'], content_type='application/json')
+    response['ETag'] = menu['etag']
+    # Clients keep the menu but revalidate it on every load
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
 class RoomServiceItemViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
     serializer_class = RoomServiceItemSerializer
     permission_classes = [permissions.AllowAny]  # Guest-facing: guests browse menu from room tablet
@@ -103,10 +129,7 @@ class RoomServiceItemViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
 
     @action(detail=False, methods=['get'], url_path=r'room/(?P<room_number>[^/.]+)/menu')
     def menu(self, request, hotel_slug=None, room_number=None):
-        hotel = get_hotel_from_request(request)
-        items = RoomServiceItem.objects.filter(hotel=hotel)
-        serializer = self.get_serializer(items, many=True)
-        return Response(serializer.data)
+        return _menu_response(request, ROOM_SERVICE)
 
 class BreakfastItemViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
     serializer_class = BreakfastItemSerializer
@@ -118,10 +141,7 @@ class BreakfastItemViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
 
     @action(detail=False, methods=['get'], url_path=r'room/(?P<room_number>[^/.]+)/breakfast')
     def menu(self, request, hotel_slug=None, room_number=None):
-        hotel = get_hotel_from_request(request)
-        items = self.get_queryset()
-        serializer = self.get_serializer(items, many=True)
-        return Response(serializer.data)
+        return _menu_response(request, BREAKFAST)
 
 class OrderViewSet(TokenAuthenticationMixin, viewsets.ModelViewSet):
     serializer_class = OrderSerializer
@@ -141,6 +161,9 @@ class OrderViewSet(TokenAuthenticationMixin, viewsets.ModelViewSet):
         'pending_count': [CanReadRoomServiceOrder],
         'all_orders_summary': [CanReadRoomServiceOrder],
         'order_history': [CanReadRoomServiceOrder],
+        # order_board: each section is gated by its own read capability
+        # inside the action body.
+        'order_board': [],
         'update': [CanUpdateRoomServiceOrder],
         # partial_update: status transitions (accept/complete) are
         # enforced with their own capabilities inside the action body.
@@ -267,8 +290,8 @@ class OrderViewSet(TokenAuthenticationMixin, viewsets.ModelViewSet):
         Returns JSON: { "count": <int> }
         """
         hotel = get_hotel_from_request(request)
-        count = Order.objects.filter(hotel=hotel).filter(status="pending").count()
-        return Response({"count": count})
+        board = get_order_board_section(hotel.id, ROOM_SERVICE)
+        return Response({"count": board['counts']['pending']})
 
     @action(detail=False, methods=["get"], url_path="room-history")
     def room_order_history(self, request):
@@ -434,6 +457,30 @@ class OrderViewSet(TokenAuthenticationMixin, viewsets.ModelViewSet):
             'orders': serializer.data
         })
 
+    @action(detail=False, methods=["get"], url_path="order-board")
+    def order_board(self, request, hotel_slug=None):
+        """
+        GET /room_services/{hotel_slug}/order-board/
+        Kitchen/porter board: status counts, open orders with items and
+        open orders grouped by room, for room service and breakfast.
+        Served from a short-lived cache (see room_services/board.py).
+        Each section is only included with its read capability.
+        """
+        hotel = get_hotel_from_request(request)
+
+        kinds = []
+        if has_capability(request.user, ROOM_SERVICE_ORDER_READ):
+            kinds.append(ROOM_SERVICE)
+        if has_capability(request.user, ROOM_SERVICE_BREAKFAST_ORDER_READ):
+            kinds.append(BREAKFAST)
+        if not kinds:
+            return Response(
+                {"error": "You do not have permission to read orders."},
+                status=403,
+            )
+
+        return Response(get_order_board(hotel.id, kinds))
+
     @action(detail=False, methods=["get"], url_path="order-history")
     def order_history(self, request, hotel_slug=None):
         """
@@ -765,8 +812,8 @@ class BreakfastOrderViewSet(TokenAuthenticationMixin, viewsets.ModelViewSet):
     @action(detail=False, methods=["get"], url_path="breakfast-pending-count")
     def pending_count(self, request, hotel_slug=None):
         hotel = get_object_or_404(Hotel, slug=hotel_slug)
-        count = BreakfastOrder.objects.filter(hotel=hotel, status="pending").count()
-        return Response({"count": count})
+        board = get_order_board_section(hotel.id, BREAKFAST)
+        return Response({"count": board['counts']['pending']})
 
 
 
@@ -135,8 +135,8 @@ class Room(models.Model):
         }
         return new_status in valid_transitions.get(self.room_status, [])
     
-    def add_turnover_note(self, note, staff_member=None):
-        """Add timestamped note to turnover history"""
+    def add_turnover_note(self, note, staff_member=None, save=True):
+        """Add timestamped note to turnover history (save=False leaves saving to the caller)"""
         from django.utils import timezone
         timestamp = timezone.now().strftime('%Y-%m-%d %H:%M')
         if staff_member:
@@ -151,8 +151,8 @@ class Room(models.Model):
         else:
             self.turnover_notes = new_note
 
-
-        self.save()
+        if save:
+            self.save()
 
     def get_current_price(self, date=None):
         """Get current price for this room on given date (defaults to today)"""
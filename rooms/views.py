@@ -200,110 +200,99 @@ def checkout_rooms(request, hotel_slug):
         "destructive_mode": destructive
     }
     
+    from housekeeping.services import set_room_statuses
+    
     with transaction.atomic():
-        for room in rooms:
-            if destructive:
-                # DESTRUCTIVE MODE: Old behavior (nuclear option)
-                # Delete all Guest objects linked to this room
-                Guest.objects.filter(room=room).delete()
-                
-                # Note: GuestChatSession removed - using token-based auth now
-                
-                # Delete all conversations & their messages for this room
-                Conversation.objects.filter(room=room).delete()
-                RoomMessage.objects.filter(room=room).delete()
-                
-                # Delete any open room-service & breakfast orders
-                Order.objects.filter(
-                    hotel=room.hotel,
-                    room_number=room.room_number
-                ).delete()
-                BreakfastOrder.objects.filter(
-                    hotel=room.hotel,
-                    room_number=room.room_number
-                ).delete()
-                
-                # Use canonical housekeeping service for room status
-                from housekeeping.services import set_room_status
-                staff = getattr(request.user, 'staff_profile', None)
-                
-                # Clear occupancy and FCM token manually (not handled by housekeeping service)
-                room.is_occupied = False
-                room.guest_fcm_token = None
-                room.save(update_fields=['is_occupied', 'guest_fcm_token'])
-                
-                # Set status through canonical service
+        rooms = list(rooms)
+        
+        if destructive:
+            # DESTRUCTIVE MODE: Old behavior (nuclear option)
+            room_numbers = [room.room_number for room in rooms]
+            
+            # Delete all Guest objects linked to these rooms
+            Guest.objects.filter(room__in=rooms).delete()
+            
+            # Note: GuestChatSession removed - using token-based auth now
+            
+            # Delete all conversations & their messages for these rooms
+            Conversation.objects.filter(room__in=rooms).delete()
+            RoomMessage.objects.filter(room__in=rooms).delete()
+            
+            # Delete any open room-service & breakfast orders
+            Order.objects.filter(
+                hotel=hotel,
+                room_number__in=room_numbers
+            ).delete()
+            BreakfastOrder.objects.filter(
+                hotel=hotel,
+                room_number__in=room_numbers
+            ).delete()
+            
+            # Use canonical housekeeping service for room status
+            staff = getattr(request.user, 'staff_profile', None)
+            to_clear = rooms
+            note = 'Destructive bulk checkout'
+            
+        else:
+            # NON-DESTRUCTIVE MODE: Use booking-driven checkout
+            # Find active bookings in these rooms
+            active_bookings = list(RoomBooking.objects.filter(
+                assigned_room__in=rooms,
+                checked_out_at__isnull=True,
+                hotel=hotel
+            ))
+            
+            for booking in active_bookings:
                 try:
-                    set_room_status(
-                        room=room,
-                        to_status='CHECKOUT_DIRTY',
-                        staff=staff,
-                        source='SYSTEM',
-                        note='Destructive bulk checkout'
+                    checkout_booking(
+                        booking=booking,
+                        performed_by=staff_user,
+                        source="bulk_room_checkout",
                     )
-                except ValidationError as e:
-                    logger.error(f"Failed to set room status for room {room.room_number} during destructive checkout: {e}")
-                    # Continue with bulk operation but log the failure
-                    continue
-                
-                results["rooms_cleared"].append(room.room_number)
-                
+                    results["checked_out_bookings"].append(booking.booking_id)
+                except ValueError as e:
+                    logger.warning(f"Could not checkout booking {booking.booking_id}: {e}")
+            
+            # Rooms with no bookings but marked occupied are cleared directly
+            booked_room_ids = {booking.assigned_room_id for booking in active_bookings}
+            to_clear = [
+                room for room in rooms
+                if room.is_occupied and room.id not in booked_room_ids
+            ]
+            staff = None
+            staff_name = f"{staff_user.first_name} {staff_user.last_name}".strip() or staff_user.email
+            note = f"Room cleared (no active bookings) at {now().strftime('%Y-%m-%d %H:%M')} by {staff_name}"
+        
+        if to_clear:
+            # Clear occupancy and FCM token manually (not handled by housekeeping service)
+            Room.objects.filter(id__in=[room.id for room in to_clear]).update(
+                is_occupied=False, guest_fcm_token=None
+            )
+            for room in to_clear:
+                room.is_occupied = False
+                room.guest_fcm_token = None
+            
+            # Set status through canonical service: one bulk write and one
+            # realtime event; rooms that cannot transition are logged and skipped
+            cleared = set_room_statuses(
+                rooms=to_clear,
+                to_status='CHECKOUT_DIRTY',
+                staff=staff,
+                source='SYSTEM',
+                note=note,
+                skip_invalid=True
+            )
+            results["rooms_cleared"] = [room.room_number for room in cleared]
+            
+            if destructive:
                 # Log destructive action
                 logger.warning(
-                    f"DESTRUCTIVE bulk checkout on room {room.room_number} "
+                    f"DESTRUCTIVE bulk checkout on rooms {results['rooms_cleared']} "
                     f"by {staff_user.email} at hotel {hotel.name}"
                 )
-                
-            else:
-                # NON-DESTRUCTIVE MODE: Use booking-driven checkout
-                # Find active bookings in this room
-                active_bookings = RoomBooking.objects.filter(
-                    assigned_room=room,
-                    checked_out_at__isnull=True,
-                    hotel=hotel
-                )
-                
-                for booking in active_bookings:
-                    try:
-                        checkout_booking(
-                            booking=booking,
-                            performed_by=staff_user,
-                            source="bulk_room_checkout",
-                        )
-                        results["checked_out_bookings"].append(booking.booking_id)
-                    except ValueError as e:
-                        logger.warning(f"Could not checkout booking {booking.booking_id}: {e}")
-                
-                # If room has no bookings but is marked occupied, clear it
-                if room.is_occupied and not active_bookings.exists():
-                    # Use canonical housekeeping service
-                    from housekeeping.services import set_room_status
-                    
-                    # Clear occupancy and FCM token manually
-                    room.is_occupied = False
-                    room.guest_fcm_token = None
-                    room.save(update_fields=['is_occupied', 'guest_fcm_token'])
-                    
-                    # Set status through canonical service
-                    staff_name = f"{staff_user.first_name} {staff_user.last_name}".strip() or staff_user.email
-                    try:
-                        set_room_status(
-                            room=room,
-                            to_status='CHECKOUT_DIRTY',
-                            staff=staff_user if hasattr(staff_user, 'staff_profile') else None,
-                            source='SYSTEM',
-                            note=f"Room cleared (no active bookings) at {now().strftime('%Y-%m-%d %H:%M')} by {staff_name}"
-                        )
-                    except ValidationError as e:
-                        logger.error(f"Failed to set room status for room {room.room_number} during bulk checkout: {e}")
-                        # Continue with bulk operation but log the failure
-                        continue
-                    results["rooms_cleared"].append(room.room_number)
-            
-            # Real-time notification handled by canonical service
     
     return Response({
-        "detail": f"Processed {rooms.count()} room(s) in hotel '{hotel_slug}'",
+        "detail": f"Processed {len(rooms)} room(s) in hotel '{hotel_slug}'",
         "results": results
     }, status=status.HTTP_200_OK)
 
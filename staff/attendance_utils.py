@@ -343,6 +343,58 @@ def count_attendance_issues(staff, from_date, to_date, clock_logs=None, roster_s
     return issue_count
 
 
+def attach_attendance_totals(staff_members, from_date, to_date) -> None:
+    """
+    Attach summed daily attendance rollups to staff as `attendance_totals`.
+
+    Two queries for the whole list (see attendance/daily_rollup.py); the
+    summary serializer uses the totals instead of scanning each staff
+    member's clock logs and roster shifts.
+    """
+    from attendance.daily_rollup import SUMMARY_FIELDS, attendance_totals
+
+    totals = attendance_totals(
+        [staff.id for staff in staff_members], from_date, to_date
+    )
+    empty = dict.fromkeys(SUMMARY_FIELDS + ('stale_open_logs',), 0)
+    for staff in staff_members:
+        staff.attendance_totals = totals.get(staff.id, empty)
+
+
+def count_issues_from_totals(totals) -> int:
+    """count_attendance_issues() for an `attendance_totals` dict."""
+    return (
+        totals['stale_open_logs']
+        + totals['excessive_logs_count']
+        + totals['rejected_logs_count']
+        + totals['unapproved_unrostered_count']
+    )
+
+
+def worked_minutes_from_totals(totals) -> int:
+    """calculate_worked_minutes() for an `attendance_totals` dict."""
+    if totals['worked_hours']:
+        return int(float(totals['worked_hours']) * 60)
+    return 0
+
+
+def attendance_status_from_totals(staff, totals) -> str:
+    """calculate_attendance_status() for an `attendance_totals` dict."""
+    if totals['open_logs_count'] and staff.duty_status == 'on_duty':
+        return 'active'
+
+    planned = totals['shifts_count']
+    if count_issues_from_totals(totals) or (
+        planned > 0 and totals['worked_shifts'] < planned * 0.5
+    ):
+        return 'issue'
+
+    if totals['worked_shifts']:
+        return 'completed'
+
+    return 'no_log' if planned else 'completed'
+
+
 def get_status_badge_info(duty_status: str) -> Dict[str, Any]:
     """
     Get consistent status badge information for UI rendering.
@@ -421,7 +473,8 @@ def get_attendance_status_badge_info(attendance_status: str) -> Dict[str, Any]:
     return badge_map.get(attendance_status, badge_map['no_log'])
 
 
-def optimize_attendance_queryset(base_queryset, from_date=None, to_date=None):
+def optimize_attendance_queryset(base_queryset, from_date=None, to_date=None,
+                                 prefetch_logs=True):
     """
     Optimize staff queryset with attendance-related prefetching for dashboard performance.
     
@@ -429,6 +482,8 @@ def optimize_attendance_queryset(base_queryset, from_date=None, to_date=None):
         base_queryset: Staff queryset to optimize
         from_date: Optional date range start
         to_date: Optional date range end
+        prefetch_logs: Prefetch clock logs and roster shifts; not needed
+            when attach_attendance_totals() is used
     
     Returns:
         Optimized queryset with prefetched relations
@@ -443,6 +498,9 @@ def optimize_attendance_queryset(base_queryset, from_date=None, to_date=None):
         'allowed_navigation_items'
     )
     
+    if not prefetch_logs:
+        return qs
+    
     # If date range provided, prefetch filtered attendance data
     if from_date and to_date:
         # Prefetch clock logs for the period using proper Prefetch objects
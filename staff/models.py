@@ -230,9 +230,12 @@ class Staff(models.Model):
     is_on_duty = models.BooleanField(default=False, null=True, blank=True)
     has_registered_face = models.BooleanField(default=False, null=True)
 
-    def get_current_status(self):
+    def get_current_status(self, clock_log=None):
         """
         Returns current attendance status based on duty_status field.
+
+        clock_log: the staff's current ClockLog when the caller already
+        has it loaded; its break details are used instead of a lookup.
         """
         status_labels = {
             'off_duty': 'Off Duty',
@@ -243,15 +246,17 @@ class Staff(models.Model):
         # Get additional break information if on break
         break_info = {}
         if self.duty_status == 'on_break':
-            from django.utils.timezone import now
-            from attendance.models import ClockLog
-            
-            today = now().date()
-            current_log = ClockLog.objects.filter(
-                staff=self,
-                time_in__date=today,
-                time_out__isnull=True
-            ).first()
+            current_log = clock_log
+            if current_log is None:
+                from django.utils.timezone import now
+                from attendance.models import ClockLog
+                
+                today = now().date()
+                current_log = ClockLog.objects.filter(
+                    staff=self,
+                    time_in__date=today,
+                    time_out__isnull=True
+                ).first()
             
             if current_log:
                 break_info = {
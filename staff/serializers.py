@@ -11,7 +11,9 @@ from django.utils import timezone
 from .attendance_utils import (
     calculate_attendance_status, calculate_worked_minutes,
     count_planned_shifts, count_worked_shifts, count_attendance_issues,
-    get_status_badge_info, get_attendance_status_badge_info
+    get_status_badge_info, get_attendance_status_badge_info,
+    attendance_status_from_totals, count_issues_from_totals,
+    worked_minutes_from_totals,
 )
 from datetime import datetime, date
 
@@ -455,30 +457,40 @@ class StaffAttendanceSummarySerializer(StaffSerializer):
         """Count planned shifts (roster entries) in date range"""
         if not (self.from_date and self.to_date):
             return 0
+        if hasattr(obj, 'attendance_totals'):
+            return obj.attendance_totals['shifts_count']
         return count_planned_shifts(obj, self.from_date, self.to_date)
     
     def get_worked_shifts(self, obj):
         """Count completed shifts (approved clock logs) in date range"""
         if not (self.from_date and self.to_date):
             return 0
+        if hasattr(obj, 'attendance_totals'):
+            return obj.attendance_totals['worked_shifts']
         return count_worked_shifts(obj, self.from_date, self.to_date)
     
     def get_total_worked_minutes(self, obj):
         """Calculate total worked minutes in date range"""
         if not (self.from_date and self.to_date):
             return 0
+        if hasattr(obj, 'attendance_totals'):
+            return worked_minutes_from_totals(obj.attendance_totals)
         return calculate_worked_minutes(obj, self.from_date, self.to_date)
     
     def get_issues_count(self, obj):
         """Count attendance issues in date range"""
         if not (self.from_date and self.to_date):
             return 0
+        if hasattr(obj, 'attendance_totals'):
+            return count_issues_from_totals(obj.attendance_totals)
         return count_attendance_issues(obj, self.from_date, self.to_date)
     
     def get_attendance_status(self, obj):
         """Calculate attendance status for dashboard"""
         if not (self.from_date and self.to_date):
             return 'no_log'
+        if hasattr(obj, 'attendance_totals'):
+            return attendance_status_from_totals(obj, obj.attendance_totals)
         return calculate_attendance_status(obj, self.from_date, self.to_date)
     
     def get_duty_status_badge(self, obj):
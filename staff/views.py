@@ -29,7 +29,7 @@ from .pusher_utils import (
     trigger_navigation_permission_update,
     trigger_department_role_update
 )
-from .attendance_utils import optimize_attendance_queryset
+from .attendance_utils import attach_attendance_totals, optimize_attendance_queryset
 from datetime import datetime, date
 
 from django.contrib.auth.tokens import default_token_generator
@@ -890,12 +890,15 @@ class StaffViewSet(viewsets.ModelViewSet):
             else:
                 staff_qs = staff_qs.filter(department__slug=department_param)
         
-        # Optimize queryset with attendance prefetching
-        staff_qs = optimize_attendance_queryset(staff_qs, from_date, to_date)
+        # Attendance figures come from the daily rollup, attached below
+        staff_qs = optimize_attendance_queryset(
+            staff_qs, from_date, to_date, prefetch_logs=False
+        )
         
         # Apply pagination
         page = self.paginate_queryset(staff_qs)
         if page is not None:
+            attach_attendance_totals(page, from_date, to_date)
             serializer = StaffAttendanceSummarySerializer(
                 page, 
                 many=True, 
@@ -916,6 +919,8 @@ class StaffViewSet(viewsets.ModelViewSet):
             return paginated_response
         
         # No pagination case
+        staff_qs = list(staff_qs)
+        attach_attendance_totals(staff_qs, from_date, to_date)
         serializer = StaffAttendanceSummarySerializer(
             staff_qs, 
             many=True, 
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-19 01:26
+
+import common.attachment_uploads
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('staff_chat', '0004_alter_staffmessagereaction_unique_together'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='staffchatattachment',
+            name='thumbnail',
+            field=models.ImageField(blank=True, help_text='Auto-generated thumbnail for images', null=True, storage=common.attachment_uploads.thumbnail_storage, upload_to='staff_chat_thumbnails/'),
+        ),
+    ]
@@ -2,6 +2,7 @@ from django.db import models
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from cloudinary.models import CloudinaryField
+from common.attachment_uploads import thumbnail_storage
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 import os
@@ -474,6 +475,7 @@ class StaffChatAttachment(models.Model):
     # Optional thumbnail for images
     thumbnail = models.ImageField(
         upload_to='staff_chat_thumbnails/',
+        storage=thumbnail_storage,
         null=True,
         blank=True,
         help_text="Auto-generated thumbnail for images"
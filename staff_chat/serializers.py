@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from common.attachment_uploads import attachment_file_url
 from .models import (
     StaffConversation, StaffChatMessage, StaffChatAttachment
 )
@@ -102,7 +103,7 @@ class StaffChatAttachmentSerializer(serializers.ModelSerializer):
 
     def get_file_url(self, obj):
         if obj.file:
-            return str(obj.file.url)
+            return str(attachment_file_url(obj.file))
         return None
 
 
@@ -3,6 +3,7 @@ Serializers for Staff Chat Attachments
 """
 from rest_framework import serializers
 from .models import StaffChatAttachment
+from common.attachment_uploads import attachment_file_url
 
 
 class StaffChatAttachmentSerializer(serializers.ModelSerializer):
@@ -39,8 +40,8 @@ class StaffChatAttachmentSerializer(serializers.ModelSerializer):
 
     def get_file_url(self, obj):
         """Get absolute URL for file"""
-        if obj.file and hasattr(obj.file, 'url'):
-            file_url = obj.file.url
+        if obj.file:
+            file_url = attachment_file_url(obj.file)
             # Cloudinary URLs are already absolute
             if file_url.startswith(('http://', 'https://')):
                 return file_url
@@ -143,3 +144,61 @@ class AttachmentUploadSerializer(serializers.Serializer):
                 )
 
         return files
+
+
+class AttachmentUploadParamsSerializer(serializers.Serializer):
+    """
+    Files the client wants to upload directly to storage
+    """
+    files = serializers.ListField(
+        child=serializers.DictField(),
+        required=True,
+        help_text="List of {name, size, content_type}"
+    )
+
+    def validate_files(self, files):
+        if not files:
+            raise serializers.ValidationError(
+                "At least one file is required"
+            )
+        if len(files) > 10:
+            raise serializers.ValidationError(
+                "Maximum 10 files can be uploaded at once"
+            )
+        return files
+
+
+class AttachmentFinalizeSerializer(serializers.Serializer):
+    """
+    Finished direct uploads to record as attachments
+    """
+    uploads = serializers.ListField(
+        child=serializers.DictField(),
+        required=True,
+        help_text="List of {ticket, result} for each finished upload"
+    )
+    message_id = serializers.IntegerField(
+        required=False,
+        help_text="Existing message ID to attach files to"
+    )
+    message = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        help_text="Optional message text if creating new message"
+    )
+    reply_to = serializers.IntegerField(
+        required=False,
+        allow_null=True,
+        help_text="Message ID this is replying to"
+    )
+
+    def validate_uploads(self, uploads):
+        if not uploads:
+            raise serializers.ValidationError(
+                "At least one upload is required"
+            )
+        if len(uploads) > 10:
+            raise serializers.ValidationError(
+                "Maximum 10 files can be uploaded at once"
+            )
+        return uploads
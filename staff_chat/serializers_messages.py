@@ -6,6 +6,7 @@ from django.utils import timezone
 from .models import StaffChatMessage, StaffMessageReaction
 from .serializers_staff import StaffBasicSerializer
 from .serializers_attachments import StaffChatAttachmentSerializer
+from common.attachment_uploads import attachment_file_url
 
 
 class MessageReactionSerializer(serializers.ModelSerializer):
@@ -88,8 +89,7 @@ class ReplyToMessageSerializer(serializers.ModelSerializer):
                 'file_name': att.file_name,
                 'file_type': att.file_type,
                 'file_url': (
-                    att.file.url if att.file and
-                    hasattr(att.file, 'url') else None
+                    attachment_file_url(att.file) if att.file else None
                 ),
                 'thumbnail_url': (
                     att.thumbnail.url if att.thumbnail and
@@ -1,3 +1,123 @@
-from django.test import TestCase
+"""
+Tests for staff chat attachment uploads (views_attachments.py).
 
-# Create your tests here.
+Uses the local storage stand-in instead of Cloudinary.
+"""
+import shutil
+import tempfile
+from io import BytesIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from hotel.models import Hotel
+from staff.models import Staff
+from .models import StaffChatAttachment, StaffConversation
+from .views_attachments import (
+    attachment_upload_params,
+    finalize_upload,
+    upload_attachments,
+)
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def png_bytes():
+    buffer = BytesIO()
+    Image.new('RGB', (800, 800), (20, 120, 200)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    ATTACHMENT_UPLOAD_BACKEND='common.attachment_uploads.LocalUploadBackend',
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+)
+@patch('staff_chat.views_attachments.send_file_attachment_notification')
+@patch('staff_chat.views_attachments.notification_manager')
+class AttachmentUploadViewTests(TestCase):
+    """Direct and legacy uploads record attachments with thumbnails."""
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.hotel = Hotel.objects.create(name='Chat Hotel', slug='chat-hotel')
+        self.user = User.objects.create_user(
+            'ann', password='x', is_superuser=True
+        )
+        self.staff = Staff.objects.create(
+            user=self.user, hotel=self.hotel,
+            first_name='Ann', last_name='Byrne', email='ann@example.com',
+        )
+        self.conversation = StaffConversation.objects.create(hotel=self.hotel)
+        self.conversation.participants.add(self.staff)
+
+    def _post(self, view, data, format='json'):
+        request = self.factory.post('/', data, format=format)
+        force_authenticate(request, user=self.user)
+        return view(
+            request,
+            hotel_slug=self.hotel.slug,
+            conversation_id=self.conversation.id,
+        )
+
+    def test_direct_upload_is_signed_then_finalized(self, *mocks):
+        response = self._post(attachment_upload_params, {'files': [
+            {'name': 'photo.png', 'size': 1000, 'content_type': 'image/png'},
+        ]})
+        self.assertEqual(response.status_code, 200)
+        upload = response.data['uploads'][0]
+
+        # The client uploads straight to storage; Django never sees the file
+        default_storage.save(upload['fields']['key'], ContentFile(png_bytes()))
+
+        response = self._post(finalize_upload, {
+            'uploads': [{'ticket': upload['ticket'], 'result': {}}],
+            'message': 'Room photo',
+        })
+
+        self.assertEqual(response.status_code, 201)
+        attachment = StaffChatAttachment.objects.get()
+        self.assertEqual(attachment.file_name, 'photo.png')
+        self.assertEqual(attachment.file_type, 'image')
+        self.assertEqual(attachment.message.message, 'Room photo')
+        self.assertTrue(attachment.thumbnail.name.startswith('staff_chat_thumbnails/'))
+        self.assertTrue(
+            response.data['attachments'][0]['file_url'].endswith(
+                upload['fields']['key']
+            )
+        )
+
+    def test_finalize_with_bad_ticket_creates_nothing(self, *mocks):
+        response = self._post(finalize_upload, {
+            'uploads': [{'ticket': 'forged', 'result': {}}],
+        })
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(self.conversation.messages.exists())
+
+    def test_legacy_multipart_upload(self, *mocks):
+        response = self._post(upload_attachments, {
+            'files': [
+                SimpleUploadedFile('rota.pdf', b'%PDF-1.4', 'application/pdf'),
+                SimpleUploadedFile('photo.png', png_bytes(), 'image/png'),
+            ],
+        }, format='multipart')
+
+        self.assertEqual(response.status_code, 201)
+        attachments = list(StaffChatAttachment.objects.order_by('id'))
+        self.assertEqual(
+            [a.file_name for a in attachments], ['rota.pdf', 'photo.png']
+        )
+        self.assertFalse(attachments[0].thumbnail)
+        self.assertTrue(attachments[1].thumbnail)
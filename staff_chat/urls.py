@@ -130,6 +130,18 @@ urlpatterns = [
         name='upload-attachments'
     ),
     
+    # Direct-to-storage uploads: signed parameters, then record the files
+    path(
+        'conversations/<int:conversation_id>/upload-params/',
+        views_attachments.attachment_upload_params,
+        name='attachment-upload-params'
+    ),
+    path(
+        'conversations/<int:conversation_id>/finalize-upload/',
+        views_attachments.finalize_upload,
+        name='finalize-upload'
+    ),
+    
     # Delete attachment
     path(
         'attachments/<int:attachment_id>/delete/',
@@ -20,7 +20,9 @@ from .models import (
 from .serializers_messages import StaffChatMessageSerializer
 from .serializers_attachments import (
     StaffChatAttachmentSerializer,
-    AttachmentUploadSerializer
+    AttachmentUploadSerializer,
+    AttachmentUploadParamsSerializer,
+    AttachmentFinalizeSerializer,
 )
 from .permissions import IsStaffMember, IsSameHotel
 from staff.permissions import (
@@ -31,34 +33,24 @@ from staff.permissions import (
 )
 from notifications.notification_manager import notification_manager
 from .fcm_utils import send_file_attachment_notification
+from common.attachment_uploads import (
+    attachment_file_url,
+    create_attachments,
+    finalize_uploads,
+    sign_uploads,
+    store_files,
+)
 
 logger = logging.getLogger(__name__)
 
 
-@api_view(['POST'])
-@permission_classes([
-    IsAuthenticated, IsStaffMember, IsSameHotel,
-    CanViewStaffChatModule, CanReadStaffChatConversation,
-    CanUploadStaffChatAttachment,
-])
-def upload_attachments(request, hotel_slug, conversation_id):
+# Storage folder for staff chat attachments (StaffChatAttachment.file)
+ATTACHMENT_FOLDER = 'staff_chat_attachments'
+
+
+def _upload_context(request, hotel_slug, conversation_id):
     """
-    Upload file attachment(s) to a message
-    POST /api/staff-chat/<hotel_slug>/conversations/<id>/upload/
-    
-    Supports:
-    - Multiple files per request
-    - Attach to existing message or create new message
-    - Optional message text with files
-    - Reply-to functionality
-    
-    Body (multipart/form-data):
-    {
-        "files": [File, File, ...],
-        "message_id": <optional_existing_message_id>,
-        "message": "Optional text",
-        "reply_to": <optional_reply_to_message_id>
-    }
+    Conversation and uploading staff member, or an error Response.
     """
     conversation = get_object_or_404(
         StaffConversation,
@@ -70,109 +62,99 @@ def upload_attachments(request, hotel_slug, conversation_id):
     try:
         staff = request.user.staff_profile
     except AttributeError:
-        return Response(
+        return None, None, Response(
             {'error': 'Staff profile not found'},
             status=status.HTTP_404_NOT_FOUND
         )
     
     if not conversation.participants.filter(id=staff.id).exists():
-        return Response(
+        return None, None, Response(
             {'error': 'You are not a participant in this conversation'},
             status=status.HTTP_403_FORBIDDEN
         )
+    return conversation, staff, None
+
+
+def _existing_message(conversation, staff, message_id):
+    """
+    The sender's own message to attach files to, or an error Response.
+    """
+    message = get_object_or_404(
+        StaffChatMessage,
+        id=message_id,
+        conversation=conversation
+    )
     
-    # Validate upload data
-    serializer = AttachmentUploadSerializer(data=request.data)
-    if not serializer.is_valid():
+    # Verify sender
+    if message.sender.id != staff.id:
+        return None, Response(
+            {'error': 'You can only attach files to your own messages'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    return message, None
+
+
+def _new_message(conversation, staff, message_text, reply_to_id):
+    """Create the message that carries the uploaded files."""
+    if not message_text:
+        message_text = "[File shared]"
+    
+    # Get reply_to message if provided
+    reply_to_message = None
+    if reply_to_id:
+        try:
+            reply_to_message = StaffChatMessage.objects.get(
+                id=reply_to_id,
+                conversation=conversation
+            )
+        except StaffChatMessage.DoesNotExist:
+            logger.warning(
+                f"Reply target message {reply_to_id} not found"
+            )
+    
+    return StaffChatMessage.objects.create(
+        conversation=conversation,
+        sender=staff,
+        message=message_text,
+        reply_to=reply_to_message
+    )
+
+
+def _record_attachments(request, conversation, staff, data, stored, errors):
+    """
+    Attach stored files to the existing or a new message, broadcast and
+    notify, and build the response.
+    """
+    if not stored:
         return Response(
-            serializer.errors,
+            {'error': 'No valid files uploaded', 'details': errors},
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    files = serializer.validated_data['files']
-    message_id = serializer.validated_data.get('message_id')
-    message_text = serializer.validated_data.get('message', '').strip()
-    reply_to_id = serializer.validated_data.get('reply_to')
-    
-    # Get or create message
+    message_id = data.get('message_id')
     if message_id:
         # Attach to existing message
-        message = get_object_or_404(
-            StaffChatMessage,
-            id=message_id,
-            conversation=conversation
-        )
-        
-        # Verify sender
-        if message.sender.id != staff.id:
-            return Response(
-                {'error': 'You can only attach files to your own messages'},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
+        message, error = _existing_message(conversation, staff, message_id)
+        if error:
+            return error
         logger.info(
-            f"📎 Attaching {len(files)} file(s) to existing "
+            f"📎 Attaching {len(stored)} file(s) to existing "
             f"message {message_id}"
         )
     else:
         # Create new message with attachments
-        if not message_text:
-            message_text = "[File shared]"
-        
-        # Get reply_to message if provided
-        reply_to_message = None
-        if reply_to_id:
-            try:
-                reply_to_message = StaffChatMessage.objects.get(
-                    id=reply_to_id,
-                    conversation=conversation
-                )
-            except StaffChatMessage.DoesNotExist:
-                logger.warning(
-                    f"Reply target message {reply_to_id} not found"
-                )
-        
-        message = StaffChatMessage.objects.create(
-            conversation=conversation,
-            sender=staff,
-            message=message_text,
-            reply_to=reply_to_message
+        message = _new_message(
+            conversation,
+            staff,
+            data.get('message', '').strip(),
+            data.get('reply_to')
         )
-        
         logger.info(
             f"📎 Created new message {message.id} with "
-            f"{len(files)} file(s)"
+            f"{len(stored)} file(s)"
         )
     
-    # Process uploaded files
-    attachments = []
-    errors = []
-    
-    for file in files:
-        try:
-            # Create attachment
-            attachment = StaffChatAttachment.objects.create(
-                message=message,
-                file=file,
-                file_name=file.name,
-                file_size=file.size,
-                mime_type=file.content_type or ''
-            )
-            attachments.append(attachment)
-            
-            logger.info(
-                f"✅ File uploaded: {file.name} "
-                f"({file.size} bytes) by staff {staff.id}"
-            )
-        except Exception as e:
-            errors.append(f"{file.name}: Upload failed - {str(e)}")
-            logger.error(f"❌ Failed to upload {file.name}: {e}")
-    
-    if not attachments and errors:
-        return Response(
-            {'error': 'No valid files uploaded', 'details': errors},
-            status=status.HTTP_400_BAD_REQUEST
-        )
+    attachments = create_attachments(StaffChatAttachment, message, stored)
     
     # Serialize attachments
     attachment_serializer = StaffChatAttachmentSerializer(
@@ -256,6 +238,152 @@ def upload_attachments(request, hotel_slug, conversation_id):
     return Response(response_data, status=status.HTTP_201_CREATED)
 
 
+@api_view(['POST'])
+@permission_classes([
+    IsAuthenticated, IsStaffMember, IsSameHotel,
+    CanViewStaffChatModule, CanReadStaffChatConversation,
+    CanUploadStaffChatAttachment,
+])
+def upload_attachments(request, hotel_slug, conversation_id):
+    """
+    Upload file attachment(s) to a message
+    POST /api/staff-chat/<hotel_slug>/conversations/<id>/upload/
+    
+    Supports:
+    - Multiple files per request
+    - Attach to existing message or create new message
+    - Optional message text with files
+    - Reply-to functionality
+    
+    Body (multipart/form-data):
+    {
+        "files": [File, File, ...],
+        "message_id": <optional_existing_message_id>,
+        "message": "Optional text",
+        "reply_to": <optional_reply_to_message_id>
+    }
+    
+    Legacy path: the files are pushed to storage in parallel. New clients
+    upload directly to storage (upload-params/ + finalize-upload/).
+    """
+    conversation, staff, error = _upload_context(
+        request, hotel_slug, conversation_id
+    )
+    if error:
+        return error
+    
+    # Validate upload data
+    serializer = AttachmentUploadSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(
+            serializer.errors,
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    data = serializer.validated_data
+    if data.get('message_id'):
+        # Check ownership before anything is uploaded
+        _, error = _existing_message(conversation, staff, data['message_id'])
+        if error:
+            return error
+    
+    stored, errors = store_files(ATTACHMENT_FOLDER, data['files'])
+    return _record_attachments(
+        request, conversation, staff, data, stored, errors
+    )
+
+
+@api_view(['POST'])
+@permission_classes([
+    IsAuthenticated, IsStaffMember, IsSameHotel,
+    CanViewStaffChatModule, CanReadStaffChatConversation,
+    CanUploadStaffChatAttachment,
+])
+def attachment_upload_params(request, hotel_slug, conversation_id):
+    """
+    Signed parameters for uploading files directly to storage
+    POST /api/staff-chat/<hotel_slug>/conversations/<id>/upload-params/
+    
+    Body (JSON):
+    {
+        "files": [{"name": "rota.pdf", "size": 123456, "content_type": "application/pdf"}]
+    }
+    
+    The client posts each file with its fields to upload_url, then sends
+    {"ticket": ..., "result": <storage response>} per file to finalize-upload/.
+    """
+    conversation, staff, error = _upload_context(
+        request, hotel_slug, conversation_id
+    )
+    if error:
+        return error
+    
+    serializer = AttachmentUploadParamsSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(
+            serializer.errors,
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    uploads, errors = sign_uploads(
+        ATTACHMENT_FOLDER, serializer.validated_data['files'],
+        conversation.id, staff.id
+    )
+    if not uploads:
+        return Response(
+            {'error': 'No valid files', 'details': errors},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    response_data = {'uploads': uploads}
+    if errors:
+        response_data['warnings'] = errors
+    return Response(response_data)
+
+
+@api_view(['POST'])
+@permission_classes([
+    IsAuthenticated, IsStaffMember, IsSameHotel,
+    CanViewStaffChatModule, CanReadStaffChatConversation,
+    CanUploadStaffChatAttachment,
+])
+def finalize_upload(request, hotel_slug, conversation_id):
+    """
+    Record files the client uploaded directly to storage
+    POST /api/staff-chat/<hotel_slug>/conversations/<id>/finalize-upload/
+    
+    Body (JSON):
+    {
+        "uploads": [{"ticket": "...", "result": {...}}],
+        "message_id": <optional_existing_message_id>,
+        "message": "Optional text",
+        "reply_to": <optional_reply_to_message_id>
+    }
+    
+    Responds like upload/.
+    """
+    conversation, staff, error = _upload_context(
+        request, hotel_slug, conversation_id
+    )
+    if error:
+        return error
+    
+    serializer = AttachmentFinalizeSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(
+            serializer.errors,
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    data = serializer.validated_data
+    stored, errors = finalize_uploads(
+        ATTACHMENT_FOLDER, data['uploads'], conversation.id, staff.id
+    )
+    return _record_attachments(
+        request, conversation, staff, data, stored, errors
+    )
+
+
 @api_view(['DELETE'])
 @permission_classes([
     IsAuthenticated, IsStaffMember, IsSameHotel,
@@ -417,8 +545,8 @@ def get_attachment_url(request, hotel_slug, attachment_id):
     
     # Get file URL
     file_url = None
-    if attachment.file and hasattr(attachment.file, 'url'):
-        file_url = attachment.file.url
+    if attachment.file:
+        file_url = attachment_file_url(attachment.file)
         
         # For Cloudinary, URL is already absolute
         if not file_url.startswith(('http://', 'https://')):
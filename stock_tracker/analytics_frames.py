@@ -0,0 +1,334 @@
+"""
+Columnar stock analytics (pandas/NumPy).
+
+The multi-period comparison endpoints used to walk per-item rows in nested
+Python loops, accumulating Decimals into dicts. Here the period facts for
+all requested periods are loaded into a DataFrame in one query and the
+statistics (trend direction, volatility, movers, heatmap variance) are
+computed with vectorized group-bys.
+
+Frames are built from the fact tables (see period_facts.py): stored rows
+for closed periods with built facts, rows built in memory for the others. Money columns are
+kept as integer cents alongside the float values so differences match the
+Decimal arithmetic the endpoints used before.
+
+Every public function returns plain Python structures in the same shape the
+views already respond with.
+"""
+import numpy as np
+import pandas as pd
+
+from .models import StockPeriodCategoryFact, StockPeriodItemFact
+from .period_facts import build_period_facts, stored_fact_periods
+
+ITEM_COLUMNS = [
+    'period_id', 'item_id', 'sku', 'name', 'category',
+    'has_snapshot', 'value', 'servings', 'waste',
+]
+
+CATEGORY_COLUMNS = [
+    'period_id', 'category', 'item_count', 'value', 'purchases', 'waste',
+]
+
+
+def _to_frame(rows, columns, money_columns):
+    frame = pd.DataFrame.from_records(rows, columns=columns)
+    for column in money_columns:
+        frame[column] = frame[column].astype(float)
+    # Exact cents for differences (facts are stored with 2 decimal places)
+    frame['value_cents'] = np.rint(frame['value'] * 100).astype('int64')
+    return frame
+
+
+def load_item_frame(periods):
+    """
+    Load item facts for the given periods into a DataFrame.
+
+    Args:
+        periods: iterable of StockPeriod
+
+    Returns:
+        DataFrame: one row per (period, item) with ITEM_COLUMNS + value_cents
+    """
+    periods = list(periods)
+    stored = stored_fact_periods(periods)
+
+    rows = list(
+        StockPeriodItemFact.objects.filter(period__in=stored).values_list(
+            'period_id', 'item_id', 'item__sku', 'item__name', 'category_id',
+            'has_snapshot', 'closing_stock_value', 'closing_servings',
+            'waste_value',
+        )
+    ) if stored else []
+
+    for period in periods:
+        if period not in stored:
+            rows.extend(
+                (
+                    period.id, fact.item_id, fact.item.sku, fact.item.name,
+                    fact.category_id, fact.has_snapshot,
+                    fact.closing_stock_value, fact.closing_servings,
+                    fact.waste_value,
+                )
+                for fact in build_period_facts(period)[0]
+            )
+
+    frame = _to_frame(rows, ITEM_COLUMNS, ('value', 'servings', 'waste'))
+    frame['has_snapshot'] = frame['has_snapshot'].astype(bool)
+    return frame
+
+
+def load_category_frame(periods):
+    """
+    Load category facts for the given periods into a DataFrame.
+
+    Returns:
+        DataFrame: one row per (period, category) with CATEGORY_COLUMNS +
+        value_cents
+    """
+    periods = list(periods)
+    stored = stored_fact_periods(periods)
+
+    rows = list(
+        StockPeriodCategoryFact.objects.filter(period__in=stored).values_list(
+            'period_id', 'category_id', 'item_count', 'closing_stock_value',
+            'purchases_value', 'waste_value',
+        )
+    ) if stored else []
+
+    for period in periods:
+        if period not in stored:
+            rows.extend(
+                (
+                    period.id, fact.category_id, fact.item_count,
+                    fact.closing_stock_value, fact.purchases_value,
+                    fact.waste_value,
+                )
+                for fact in build_period_facts(period)[1]
+            )
+
+    return _to_frame(rows, CATEGORY_COLUMNS, ('value', 'purchases', 'waste'))
+
+
+def trend_items(frame, periods, category_code=None, item_ids=None):
+    """
+    Per-item trend data, direction and volatility across periods.
+
+    Items are listed in snapshot order (latest period first, then SKU);
+    each item's trend_data is ordered by period id.
+
+    Args:
+        frame: DataFrame from load_item_frame
+        periods: the StockPeriods in the frame
+        category_code: optional category filter
+        item_ids: optional collection of item ids to keep
+
+    Returns:
+        list: item dicts as returned by TrendAnalysisView
+    """
+    frame = frame[frame['has_snapshot']]
+    if category_code:
+        frame = frame[frame['category'] == category_code]
+    if item_ids is not None:
+        frame = frame[frame['item_id'].isin(list(item_ids))]
+    if frame.empty:
+        return []
+
+    end_dates = {p.id: p.end_date for p in periods}
+    item_order = (
+        frame.assign(end_date=frame['period_id'].map(end_dates))
+        .sort_values(['end_date', 'sku'], ascending=[False, True], kind='stable')
+        .drop_duplicates('item_id')['item_id']
+    )
+
+    frame = frame.sort_values(['item_id', 'period_id'], kind='stable')
+    by_item = frame.groupby('item_id', sort=False)['value']
+
+    count = by_item.transform('size')
+    half = count // 2
+    position = frame.groupby('item_id', sort=False).cumcount()
+
+    stats = pd.DataFrame({
+        'count': by_item.size(),
+        'average': by_item.mean(),
+        'std_dev': by_item.std(ddof=0),
+        'first_half': frame['value'].where(position < half).groupby(frame['item_id']).mean(),
+        'second_half': frame['value'].where(position >= half).groupby(frame['item_id']).mean(),
+    })
+
+    multi = stats['count'] >= 2
+    stats['trend_direction'] = np.select(
+        [
+            multi & (stats['second_half'] > stats['first_half'] * 1.1),
+            multi & (stats['second_half'] < stats['first_half'] * 0.9),
+        ],
+        ['increasing', 'decreasing'],
+        default='stable',
+    )
+
+    # Coefficient of variation (%)
+    has_spread = (stats['average'] > 0) & (stats['count'] > 1)
+    cv = (stats['std_dev'] / stats['average'] * 100).where(has_spread, 0)
+    stats['volatility'] = np.select(
+        [has_spread & (cv > 30), has_spread & (cv > 15)],
+        ['high', 'medium'],
+        default='low',
+    )
+
+    trend_data = {
+        item_id: rows[['period_id', 'value', 'servings', 'waste']].to_dict('records')
+        for item_id, rows in frame.groupby('item_id', sort=False)
+    }
+    info = frame.drop_duplicates('item_id').set_index('item_id')
+
+    items = []
+    for item_id in item_order.tolist():
+        row = stats.loc[item_id]
+        items.append({
+            'item_id': item_id,
+            'sku': info.at[item_id, 'sku'],
+            'name': info.at[item_id, 'name'],
+            'category': info.at[item_id, 'category'],
+            'trend_data': trend_data[item_id],
+            'trend_direction': str(row['trend_direction']),
+            'average_value': round(float(row['average']), 2),
+            'volatility': str(row['volatility']),
+        })
+    return items
+
+
+def _mover_reason(percentage_change):
+    return np.select(
+        [
+            np.abs(percentage_change) > 100,
+            percentage_change > 50,
+            percentage_change > 20,
+            percentage_change < -50,
+            percentage_change < -20,
+        ],
+        [
+            'significant_change',
+            'stock_buildup',
+            'increased_stock',
+            'major_reduction',
+            'decreased_stock',
+        ],
+        default='normal_variance',
+    )
+
+
+def top_movers(frame, period1_id, period2_id, limit=10):
+    """
+    Biggest value changes between two periods.
+
+    Args:
+        frame: DataFrame from load_item_frame (containing both periods)
+        period1_id: earlier period id
+        period2_id: later period id
+        limit: max increases / decreases returned
+
+    Returns:
+        dict: biggest_increases, biggest_decreases, new_items,
+        discontinued_items as returned by TopMoversView
+    """
+    snapshots = frame[frame['has_snapshot']]
+    first = snapshots[snapshots['period_id'] == period1_id].set_index('item_id')
+    second = snapshots[snapshots['period_id'] == period2_id].set_index('item_id')
+
+    both = first.join(second[['value', 'value_cents']], how='inner', rsuffix='_2')
+    both = both.sort_index()
+    both['absolute_change'] = (both['value_cents_2'] - both['value_cents']) / 100
+    both['percentage_change'] = np.where(
+        both['value_cents'] > 0,
+        both['absolute_change'] / both['value'].where(both['value'] > 0, 1) * 100,
+        0.0,
+    )
+    both['reason'] = _mover_reason(both['percentage_change'].to_numpy())
+    both = both.iloc[
+        np.argsort(-both['absolute_change'].abs().to_numpy(), kind='stable')
+    ]
+
+    def change_rows(changes):
+        return [
+            {
+                'item_id': item_id,
+                'sku': row.sku,
+                'name': row.name,
+                'category': row.category,
+                'period1_value': float(row.value),
+                'period2_value': float(row.value_2),
+                'absolute_change': float(row.absolute_change),
+                'percentage_change': round(float(row.percentage_change), 2),
+                'reason': str(row.reason),
+            }
+            for item_id, row in zip(changes.index.tolist(), changes.itertuples(index=False))
+        ]
+
+    new = second.loc[second.index.difference(first.index)]
+    discontinued = first.loc[first.index.difference(second.index)]
+
+    return {
+        'biggest_increases': change_rows(both[both['absolute_change'] > 0].head(limit)),
+        'biggest_decreases': change_rows(both[both['absolute_change'] < 0].head(limit)),
+        'new_items': [
+            {
+                'item_id': item_id,
+                'sku': row.sku,
+                'name': row.name,
+                'category': row.category,
+                'value': float(row.value),
+            }
+            for item_id, row in zip(new.index.tolist(), new.itertuples(index=False))
+        ],
+        'discontinued_items': [
+            {
+                'item_id': item_id,
+                'sku': row.sku,
+                'name': row.name,
+                'category': row.category,
+                'last_value': float(row.value),
+            }
+            for item_id, row in zip(
+                discontinued.index.tolist(), discontinued.itertuples(index=False)
+            )
+        ],
+    }
+
+
+def variance_heatmap(frame, periods, category_codes):
+    """
+    Period-over-period category value variance cells.
+
+    Args:
+        frame: DataFrame from load_category_frame
+        periods: StockPeriods in display order
+        category_codes: category codes in display order
+
+    Returns:
+        list: [period_index, category_index, variance_pct, severity] cells
+    """
+    period_ids = [p.id for p in periods]
+    cents = (
+        frame.pivot_table(
+            index='period_id', columns='category', values='value_cents',
+            aggfunc='sum', fill_value=0,
+        )
+        .reindex(index=period_ids, columns=category_codes, fill_value=0)
+        .astype('int64')
+    )
+
+    previous = cents.shift(1)
+    variance = ((cents - previous) / previous * 100).where(previous > 0, 0.0)
+    variance = variance.fillna(0.0).to_numpy()
+
+    magnitude = np.abs(variance)
+    severity = np.select(
+        [magnitude > 30, magnitude > 15], ['high', 'medium'], default='low'
+    )
+
+    return [
+        [period_idx, cat_idx, round(float(variance[period_idx, cat_idx]), 2),
+         str(severity[period_idx, cat_idx])]
+        for period_idx in range(len(period_ids))
+        for cat_idx in range(len(category_codes))
+    ]
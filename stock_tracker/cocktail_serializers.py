@@ -88,7 +88,11 @@ class CocktailRecipeSerializer(serializers.ModelSerializer):
 class CocktailConsumptionSerializer(serializers.ModelSerializer):
     cocktail = serializers.StringRelatedField(read_only=True)
     cocktail_id = serializers.PrimaryKeyRelatedField(
-        queryset=CocktailRecipe.objects.all(),
+        # Recipe ingredients are prefetched for the consumption records
+        # created on save
+        queryset=CocktailRecipe.objects.prefetch_related(
+            'ingredients__ingredient__linked_stock_item'
+        ),
         source='cocktail',
         write_only=True
     )
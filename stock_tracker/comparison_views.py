@@ -6,19 +6,17 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from django.shortcuts import get_object_or_404
-from django.db.models import Sum, Q, F, DecimalField
 from decimal import Decimal
-from collections import defaultdict
 
 from hotel.models import Hotel
 from hotel.permissions import IsHotelStaff
 from .models import (
     StockPeriod,
-    StockSnapshot,
-    StockMovement,
     StockCategory
 )
 from .views import get_periods_from_request, _get_staff_hotel
+from .period_facts import get_category_facts, period_totals
+from . import analytics_frames
 
 
 class CompareCategoriesView(APIView):
@@ -47,6 +45,9 @@ class CompareCategoriesView(APIView):
         # Get all categories
         categories = StockCategory.objects.all()
         
+        # Pre-aggregated per-(period, category) rows
+        category_facts = get_category_facts(periods)
+        
         # Build category data for each period
         category_data = []
         
@@ -58,39 +59,12 @@ class CompareCategoriesView(APIView):
             }
             
             for period in periods:
-                # Get snapshots for this category and period
-                snapshots = StockSnapshot.objects.filter(
-                    hotel=hotel,
-                    period=period,
-                    item__category=category
-                )
-                
-                # Get movements for this category and period
-                movements = StockMovement.objects.filter(
-                    hotel=hotel,
-                    item__category=category,
-                    timestamp__gte=period.start_date,
-                    timestamp__lte=period.end_date
-                )
-                
-                # Aggregate data
-                total_value = snapshots.aggregate(
-                    total=Sum('closing_stock_value')
-                )['total'] or Decimal('0')
+                fact = category_facts[period.id].get(category.code)
                 
-                item_count = snapshots.count()
-                
-                purchases = movements.filter(
-                    movement_type=StockMovement.PURCHASE
-                ).aggregate(
-                    total=Sum(F('quantity') * F('unit_cost'), output_field=DecimalField())
-                )['total'] or Decimal('0')
-                
-                waste = movements.filter(
-                    movement_type=StockMovement.WASTE
-                ).aggregate(
-                    total=Sum(F('quantity') * F('unit_cost'), output_field=DecimalField())
-                )['total'] or Decimal('0')
+                total_value = fact.closing_stock_value if fact else Decimal('0')
+                item_count = fact.item_count if fact else 0
+                purchases = fact.purchases_value if fact else Decimal('0')
+                waste = fact.waste_value if fact else Decimal('0')
                 
                 waste_percentage = float(
                     (waste / purchases * 100) if purchases > 0 else 0
@@ -242,79 +216,13 @@ class TopMoversView(APIView):
                 "period2": period2_id
             }, status=status.HTTP_404_NOT_FOUND)
         
-        # Get snapshots
-        snapshots1 = {
-            s.item_id: s for s in
-            StockSnapshot.objects.filter(hotel=hotel, period=period1)
-            .select_related('item', 'item__category')
-        }
-        snapshots2 = {
-            s.item_id: s for s in
-            StockSnapshot.objects.filter(hotel=hotel, period=period2)
-            .select_related('item', 'item__category')
-        }
-        
-        # Calculate changes
-        changes = []
-        all_item_ids = set(snapshots1.keys()) | set(snapshots2.keys())
-        
-        for item_id in all_item_ids:
-            s1 = snapshots1.get(item_id)
-            s2 = snapshots2.get(item_id)
-            
-            if s1 and s2:
-                value_change = float(
-                    s2.closing_stock_value - s1.closing_stock_value
-                )
-                percentage_change = (
-                    (value_change / float(s1.closing_stock_value) * 100)
-                    if s1.closing_stock_value > 0 else 0
-                )
-                
-                # Determine reason
-                reason = self._determine_reason(
-                    s1, s2, value_change, percentage_change
-                )
-                
-                changes.append({
-                    'item_id': item_id,
-                    'sku': s1.item.sku,
-                    'name': s1.item.name,
-                    'category': s1.item.category.code,
-                    'period1_value': float(s1.closing_stock_value),
-                    'period2_value': float(s2.closing_stock_value),
-                    'absolute_change': value_change,
-                    'percentage_change': round(percentage_change, 2),
-                    'reason': reason
-                })
-        
-        # Sort and split
-        changes.sort(key=lambda x: abs(x['absolute_change']), reverse=True)
-        increases = [c for c in changes if c['absolute_change'] > 0][:limit]
-        decreases = [c for c in changes if c['absolute_change'] < 0][:limit]
-        
-        # Find new and discontinued items
-        new_items = [
-            {
-                'item_id': item_id,
-                'sku': snapshots2[item_id].item.sku,
-                'name': snapshots2[item_id].item.name,
-                'category': snapshots2[item_id].item.category.code,
-                'value': float(snapshots2[item_id].closing_stock_value)
-            }
-            for item_id in (set(snapshots2.keys()) - set(snapshots1.keys()))
-        ]
-        
-        discontinued_items = [
-            {
-                'item_id': item_id,
-                'sku': snapshots1[item_id].item.sku,
-                'name': snapshots1[item_id].item.name,
-                'category': snapshots1[item_id].item.category.code,
-                'last_value': float(snapshots1[item_id].closing_stock_value)
-            }
-            for item_id in (set(snapshots1.keys()) - set(snapshots2.keys()))
-        ]
+        # Columnar per-(period, item) frame for both periods
+        movers = analytics_frames.top_movers(
+            analytics_frames.load_item_frame([period1, period2]),
+            period1.id,
+            period2.id,
+            limit=limit,
+        )
         
         return Response({
             'period1': {
@@ -329,26 +237,8 @@ class TopMoversView(APIView):
                 'start_date': period2.start_date,
                 'end_date': period2.end_date
             },
-            'biggest_increases': increases,
-            'biggest_decreases': decreases,
-            'new_items': new_items,
-            'discontinued_items': discontinued_items
+            **movers
         })
-    
-    def _determine_reason(self, s1, s2, value_change, percentage_change):
-        """Determine likely reason for change"""
-        if abs(percentage_change) > 100:
-            return 'significant_change'
-        elif percentage_change > 50:
-            return 'stock_buildup'
-        elif percentage_change > 20:
-            return 'increased_stock'
-        elif percentage_change < -50:
-            return 'major_reduction'
-        elif percentage_change < -20:
-            return 'decreased_stock'
-        else:
-            return 'normal_variance'
 
 
 class CostAnalysisView(APIView):
@@ -444,77 +334,23 @@ class CostAnalysisView(APIView):
         """Calculate cost metrics for a period"""
         # Get opening stock (from previous period's closing)
         prev_period = period.get_previous_period()
-        opening_stock = Decimal('0')
         
-        if prev_period:
-            opening_stock = StockSnapshot.objects.filter(
-                hotel=hotel,
-                period=prev_period
-            ).aggregate(
-                total=Sum('closing_stock_value')
-            )['total'] or Decimal('0')
-        
-        # Get closing stock
-        closing_stock = StockSnapshot.objects.filter(
-            hotel=hotel,
-            period=period
-        ).aggregate(
-            total=Sum('closing_stock_value')
-        )['total'] or Decimal('0')
+        fact_periods = [period, prev_period] if prev_period else [period]
+        category_facts = get_category_facts(fact_periods)
         
-        # Get movements
-        movements = StockMovement.objects.filter(
-            hotel=hotel,
-            timestamp__gte=period.start_date,
-            timestamp__lte=period.end_date
-        )
+        opening_stock = Decimal('0')
+        if prev_period:
+            opening_stock = period_totals(
+                category_facts[prev_period.id].values()
+            )['closing_stock_value']
         
-        purchases = movements.filter(
-            movement_type=StockMovement.PURCHASE
-        ).aggregate(
-            total=Sum(
-                F('quantity') * F('unit_cost'),
-                output_field=DecimalField()
-            )
-        )['total'] or Decimal('0')
-        
-        waste = movements.filter(
-            movement_type=StockMovement.WASTE
-        ).aggregate(
-            total=Sum(
-                F('quantity') * F('unit_cost'),
-                output_field=DecimalField()
-            )
-        )['total'] or Decimal('0')
-        
-        transfers_in = movements.filter(
-            movement_type=StockMovement.TRANSFER_IN
-        ).aggregate(
-            total=Sum(
-                F('quantity') * F('unit_cost'),
-                output_field=DecimalField()
-            )
-        )['total'] or Decimal('0')
-        
-        transfers_out = movements.filter(
-            movement_type=StockMovement.TRANSFER_OUT
-        ).aggregate(
-            total=Sum(
-                F('quantity') * F('unit_cost'),
-                output_field=DecimalField()
-            )
-        )['total'] or Decimal('0')
-        
-        adjustments = movements.filter(
-            movement_type=StockMovement.ADJUSTMENT
-        ).aggregate(
-            total=Sum(
-                F('quantity') * F('unit_cost'),
-                output_field=DecimalField()
-            )
-        )['total'] or Decimal('0')
+        totals = period_totals(category_facts[period.id].values())
         
-        transfer_net = transfers_in - transfers_out
+        closing_stock = totals['closing_stock_value']
+        purchases = totals['purchases_value']
+        waste = totals['waste_value']
+        adjustments = totals['adjustments_value']
+        transfer_net = totals['transfers_in_value'] - totals['transfers_out_value']
         
         # Theoretical usage: Opening + Purchases - Closing
         theoretical_usage = opening_stock + purchases - closing_stock
@@ -629,113 +465,23 @@ class TrendAnalysisView(APIView):
         category_code = request.query_params.get('category')
         item_ids_str = request.query_params.get('items')
         
-        # Build base queryset
-        snapshots_base = StockSnapshot.objects.filter(
-            hotel=hotel,
-            period__in=periods
-        ).select_related('item', 'item__category', 'period')
-        
-        if category_code:
-            snapshots_base = snapshots_base.filter(
-                item__category__code=category_code
-            )
-        
+        item_ids = None
         if item_ids_str:
             try:
-                item_ids = [int(iid) for iid in item_ids_str.split(',')]
-                snapshots_base = snapshots_base.filter(item_id__in=item_ids)
+                item_ids = {int(iid) for iid in item_ids_str.split(',')}
             except ValueError:
                 return Response(
                     {"error": "Invalid item IDs format"},
                     status=status.HTTP_400_BAD_REQUEST
                 )
         
-        # Group by item
-        items_data = defaultdict(lambda: {
-            'item_info': None,
-            'trend_data': []
-        })
-        
-        for snapshot in snapshots_base:
-            item_id = snapshot.item_id
-            
-            if items_data[item_id]['item_info'] is None:
-                items_data[item_id]['item_info'] = {
-                    'item_id': item_id,
-                    'sku': snapshot.item.sku,
-                    'name': snapshot.item.name,
-                    'category': snapshot.item.category.code
-                }
-            
-            # Get waste for this item in this period
-            waste = StockMovement.objects.filter(
-                hotel=hotel,
-                item_id=item_id,
-                movement_type=StockMovement.WASTE,
-                timestamp__gte=snapshot.period.start_date,
-                timestamp__lte=snapshot.period.end_date
-            ).aggregate(
-                total=Sum(
-                    F('quantity') * F('unit_cost'),
-                    output_field=DecimalField()
-                )
-            )['total'] or Decimal('0')
-            
-            items_data[item_id]['trend_data'].append({
-                'period_id': snapshot.period_id,
-                'value': float(snapshot.closing_stock_value),
-                'servings': float(snapshot.total_servings),
-                'waste': float(waste)
-            })
-        
-        # Calculate trends and volatility
-        items_list = []
-        for item_id, data in items_data.items():
-            # Sort trend data by period
-            data['trend_data'].sort(key=lambda x: x['period_id'])
-            
-            # Calculate statistics
-            values = [td['value'] for td in data['trend_data']]
-            avg_value = sum(values) / len(values) if values else 0
-            
-            # Determine trend direction
-            if len(values) >= 2:
-                first_half_avg = sum(values[:len(values)//2]) / (len(values)//2)
-                second_half_avg = sum(values[len(values)//2:]) / (
-                    len(values) - len(values)//2
-                )
-                
-                if second_half_avg > first_half_avg * 1.1:
-                    trend_direction = 'increasing'
-                elif second_half_avg < first_half_avg * 0.9:
-                    trend_direction = 'decreasing'
-                else:
-                    trend_direction = 'stable'
-            else:
-                trend_direction = 'stable'
-            
-            # Calculate volatility (coefficient of variation)
-            if avg_value > 0 and len(values) > 1:
-                variance = sum((v - avg_value) ** 2 for v in values) / len(values)
-                std_dev = variance ** 0.5
-                cv = (std_dev / avg_value) * 100
-                
-                if cv > 30:
-                    volatility = 'high'
-                elif cv > 15:
-                    volatility = 'medium'
-                else:
-                    volatility = 'low'
-            else:
-                volatility = 'low'
-            
-            items_list.append({
-                **data['item_info'],
-                'trend_data': data['trend_data'],
-                'trend_direction': trend_direction,
-                'average_value': round(avg_value, 2),
-                'volatility': volatility
-            })
+        # Columnar per-(period, item) frame; stats via vectorized group-bys
+        items_list = analytics_frames.trend_items(
+            analytics_frames.load_item_frame(periods),
+            periods,
+            category_code=category_code,
+            item_ids=item_ids,
+        )
         
         return Response({
             'periods': [
@@ -809,57 +555,12 @@ class VarianceHeatmapView(APIView):
         # Get all categories
         categories = list(StockCategory.objects.all())
         
-        # Build heatmap data
-        heatmap_data = []
-        
-        for period_idx, period in enumerate(periods):
-            for cat_idx, category in enumerate(categories):
-                # Get value for this period and category
-                current_value = StockSnapshot.objects.filter(
-                    hotel=hotel,
-                    period=period,
-                    item__category=category
-                ).aggregate(
-                    total=Sum('closing_stock_value')
-                )['total'] or Decimal('0')
-                
-                # Get previous period value (if not first period)
-                if period_idx > 0:
-                    prev_period = periods[period_idx - 1]
-                    prev_value = StockSnapshot.objects.filter(
-                        hotel=hotel,
-                        period=prev_period,
-                        item__category=category
-                    ).aggregate(
-                        total=Sum('closing_stock_value')
-                    )['total'] or Decimal('0')
-                    
-                    # Calculate variance
-                    if prev_value > 0:
-                        variance = float(
-                            (current_value - prev_value) / prev_value * 100
-                        )
-                    else:
-                        variance = 0
-                else:
-                    variance = 0
-                
-                # Determine severity
-                abs_variance = abs(variance)
-                if abs_variance > 30:
-                    severity = 'high'
-                elif abs_variance > 15:
-                    severity = 'medium'
-                else:
-                    severity = 'low'
-                
-                # [period_index, category_index, variance_value, severity]
-                heatmap_data.append([
-                    period_idx,
-                    cat_idx,
-                    round(variance, 2),
-                    severity
-                ])
+        # [period_index, category_index, variance_value, severity] cells
+        heatmap_data = analytics_frames.variance_heatmap(
+            analytics_frames.load_category_frame(periods),
+            periods,
+            [c.code for c in categories],
+        )
         
         return Response({
             'periods': [p.period_name for p in periods],
@@ -1005,38 +706,11 @@ class PerformanceScorecardView(APIView):
     
     def _calculate_scores(self, period, hotel):
         """Calculate performance scores (0-100) for a period"""
-        # Get stock value
-        total_stock_value = StockSnapshot.objects.filter(
-            hotel=hotel,
-            period=period
-        ).aggregate(
-            total=Sum('closing_stock_value')
-        )['total'] or Decimal('0')
-        
-        # Get movements
-        movements = StockMovement.objects.filter(
-            hotel=hotel,
-            timestamp__gte=period.start_date,
-            timestamp__lte=period.end_date
-        )
+        totals = period_totals(get_category_facts([period])[period.id].values())
         
-        purchases = movements.filter(
-            movement_type=StockMovement.PURCHASE
-        ).aggregate(
-            total=Sum(
-                F('quantity') * F('unit_cost'),
-                output_field=DecimalField()
-            )
-        )['total'] or Decimal('0')
-        
-        waste = movements.filter(
-            movement_type=StockMovement.WASTE
-        ).aggregate(
-            total=Sum(
-                F('quantity') * F('unit_cost'),
-                output_field=DecimalField()
-            )
-        )['total'] or Decimal('0')
+        total_stock_value = totals['closing_stock_value']
+        purchases = totals['purchases_value']
+        waste = totals['waste_value']
         
         # Calculate waste percentage first (needed by multiple scores)
         waste_pct = float(waste / purchases * 100) if purchases > 0 else 0
@@ -0,0 +1,360 @@
+"""
+Stocktake / period export jobs.
+
+Building a workbook or PDF for a large stocktake can take longer than a
+request should. Exports are therefore:
+
+- keyed by (kind, object ids, options, content version) - the content
+  version is a StockExportVersion row bumped by signals.py whenever the
+  stocktake, period or hotel stock data changes, so an artifact is reused
+  until the underlying data changes;
+- generated once and stored as a file in export_storage(), one directory
+  per export; storing a newer version deletes the superseded files. Every
+  web process and worker must see the same files, so production sets
+  STOCK_EXPORT_STORAGE to shared storage (Cloudinary raw files); locally
+  default_storage is used. A ready job whose file has gone missing is
+  queued again instead of being reported as ready;
+- requested as jobs: request_export() returns immediately and a background
+  worker generates the file after the transaction commits. Clients poll
+  the job (job state is kept in the cache) and download the artifact when
+  it is ready. Set STOCK_EXPORT_ASYNC = False to generate synchronously
+  (tests, scripts).
+
+The legacy download-* endpoints use get_or_build_export(), so repeat
+downloads are served straight from storage.
+"""
+import hashlib
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import F, Q
+from django.utils.module_loading import import_string
+
+from common.concurrency import WorkerQueue
+
+logger = logging.getLogger(__name__)
+
+EXPORT_ARTIFACT_DIR = 'stock_exports'
+EXPORT_JOB_TIMEOUT = 60 * 60 * 24
+# Pending/running jobs not updated for this long are re-queued (worker restarted)
+EXPORT_JOB_STALE_AFTER = 60 * 10
+
+PENDING = 'pending'
+RUNNING = 'running'
+READY = 'ready'
+FAILED = 'failed'
+
+PDF = 'application/pdf'
+XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# kind -> (content type, extension, needs stocktake, needs period)
+EXPORT_KINDS = {
+    'stocktake_pdf': (PDF, 'pdf', True, False),
+    'stocktake_excel': (XLSX, 'xlsx', True, False),
+    'period_pdf': (PDF, 'pdf', False, True),
+    'period_excel': (XLSX, 'xlsx', False, True),
+    'combined_pdf': (PDF, 'pdf', True, True),
+}
+
+
+# ---------------------------------------------------------------------------
+# Content versions
+# ---------------------------------------------------------------------------
+
+def get_content_versions(objects):
+    """
+    Current content versions for stocktakes, periods or hotels.
+
+    Args:
+        objects: (scope, pk) pairs, scope being 'stocktake', 'period' or
+            'hotel'
+
+    Returns:
+        dict: (scope, pk) -> version (1 until first bumped)
+    """
+    from .models import StockExportVersion
+
+    condition = Q()
+    for scope, pk in objects:
+        condition |= Q(scope=scope, object_id=pk)
+    versions = dict.fromkeys(objects, 1)
+    versions.update({
+        (scope, object_id): version
+        for scope, object_id, version in StockExportVersion.objects.filter(
+            condition
+        ).values_list('scope', 'object_id', 'version')
+    })
+    return versions
+
+
+def bump_content_version(scope, pk):
+    """Invalidate every cached export that includes this object."""
+    from .models import StockExportVersion
+
+    versions = StockExportVersion.objects.filter(scope=scope, object_id=pk)
+    if versions.update(version=F('version') + 1):
+        return
+    _, created = StockExportVersion.objects.get_or_create(
+        scope=scope, object_id=pk, defaults={'version': 2}
+    )
+    if not created:
+        # Created by a concurrent bump in the meantime
+        versions.update(version=F('version') + 1)
+
+
+# ---------------------------------------------------------------------------
+# Export specs
+# ---------------------------------------------------------------------------
+
+def build_export_spec(kind, hotel, stocktake=None, period=None, include_cocktails=True):
+    """
+    Describe an export and the storage path of its artifact.
+
+    Args:
+        kind: One of EXPORT_KINDS
+        hotel: Hotel the export belongs to
+        stocktake: Stocktake (stocktake_* and combined_pdf)
+        period: StockPeriod (period_* and combined_pdf)
+        include_cocktails: Include cocktail data (period and combined exports)
+
+    Returns:
+        dict: Spec with job_id, artifact_path, filename, content_type, ...
+    """
+    content_type, extension, needs_stocktake, needs_period = EXPORT_KINDS[kind]
+
+    objects = [('hotel', hotel.id)]
+    if needs_stocktake:
+        objects.append(('stocktake', stocktake.id))
+    if needs_period:
+        objects.append(('period', period.id))
+    versions = get_content_versions(objects)
+
+    parts = [kind] + [f"{scope}={pk}" for scope, pk in objects]
+    if needs_period:
+        parts.append(f"cocktails={int(include_cocktails)}")
+    export_key = "|".join(parts)
+    versioned_key = export_key + "|" + ",".join(
+        str(versions[obj]) for obj in objects
+    )
+    export_id = hashlib.sha1(export_key.encode()).hexdigest()[:24]
+    job_id = hashlib.sha1(versioned_key.encode()).hexdigest()[:24]
+    # One directory per export; the file name changes with the versions
+    artifact_path = (
+        f"{EXPORT_ARTIFACT_DIR}/{hotel.id}/{export_id}/{job_id}.{extension}"
+    )
+
+    hotel_name = hotel.name.replace(' ', '_')
+    if kind.startswith('stocktake'):
+        filename = (
+            f"stocktake_{hotel_name}_"
+            f"{stocktake.period_start}_to_{stocktake.period_end}.{extension}"
+        )
+    elif kind.startswith('period'):
+        filename = (
+            f"period_{hotel_name}_"
+            f"{period.period_name.replace(' ', '_')}.{extension}"
+        )
+    else:
+        filename = (
+            f"combined_report_{hotel_name}_"
+            f"{stocktake.period_start}_to_{stocktake.period_end}.{extension}"
+        )
+
+    return {
+        'job_id': job_id,
+        'kind': kind,
+        'hotel_id': hotel.id,
+        'stocktake_id': stocktake.id if needs_stocktake else None,
+        'period_id': period.id if needs_period else None,
+        'include_cocktails': include_cocktails,
+        'artifact_path': artifact_path,
+        'filename': filename,
+        'content_type': content_type,
+    }
+
+
+def _generate(spec):
+    """Run the generator for a spec and return the file bytes."""
+    from .models import StockPeriod, Stocktake
+
+    stocktake = period = None
+    if spec['stocktake_id']:
+        stocktake = Stocktake.objects.select_related('hotel', 'approved_by').get(
+            pk=spec['stocktake_id']
+        )
+    if spec['period_id']:
+        period = StockPeriod.objects.select_related('hotel').get(
+            pk=spec['period_id']
+        )
+
+    kind = spec['kind']
+    if kind == 'stocktake_pdf':
+        from .utils.pdf_generator import generate_stocktake_pdf
+        buffer = generate_stocktake_pdf(stocktake)
+    elif kind == 'stocktake_excel':
+        from .utils.excel_generator import generate_stocktake_excel
+        buffer = generate_stocktake_excel(stocktake)
+    elif kind == 'period_pdf':
+        from .utils.pdf_generator import generate_period_pdf
+        buffer = generate_period_pdf(period, spec['include_cocktails'])
+    elif kind == 'period_excel':
+        from .utils.excel_generator import generate_period_excel
+        buffer = generate_period_excel(period, spec['include_cocktails'])
+    else:
+        from .utils.combined_pdf_generator import generate_combined_report_pdf
+        buffer = generate_combined_report_pdf(
+            stocktake, period, spec['include_cocktails']
+        )
+
+    return buffer.getvalue()
+
+
+def export_storage():
+    """Storage holding export artifacts (STOCK_EXPORT_STORAGE or default_storage)."""
+    path = getattr(settings, 'STOCK_EXPORT_STORAGE', None)
+    return import_string(path)() if path else default_storage
+
+
+def _read_artifact(path):
+    storage = export_storage()
+    if not storage.exists(path):
+        return None
+    with storage.open(path, 'rb') as artifact:
+        return artifact.read()
+
+
+def _store_artifact(path, content):
+    """Save an artifact and delete the export's superseded ones."""
+    storage = export_storage()
+    directory, name = os.path.split(path)
+    try:
+        _, previous = storage.listdir(directory)
+    except (FileNotFoundError, NotImplementedError):
+        previous = []
+    if not storage.exists(path):
+        storage.save(path, ContentFile(content))
+    for old_name in previous:
+        if old_name != name:
+            storage.delete(f"{directory}/{old_name}")
+
+
+def get_or_build_export(spec):
+    """
+    Return the artifact for a spec, generating it in-process if not stored.
+
+    Returns:
+        bytes: File content
+    """
+    content = _read_artifact(spec['artifact_path'])
+    if content is None:
+        content = _generate(spec)
+        _store_artifact(spec['artifact_path'], content)
+    return content
+
+
+# ---------------------------------------------------------------------------
+# Jobs
+# ---------------------------------------------------------------------------
+
+def _job_key(job_id):
+    return f"stock_export_job:{job_id}"
+
+
+def get_export_job(job_id):
+    """
+    Current state of an export job.
+
+    Returns:
+        dict or None: The spec plus 'status' and 'error'
+    """
+    job = cache.get(_job_key(job_id))
+    if job is None:
+        return None
+
+    stored = export_storage().exists(job['artifact_path'])
+    if stored and job['status'] != READY:
+        # Artifact produced by a download-* request or another worker
+        job = {**job, 'status': READY}
+    elif not stored and job['status'] == READY:
+        # Artifact removed since the job finished: build it again
+        job = _queue_job(job)
+    return job
+
+
+def _save_job(job):
+    job['updated_at'] = time.time()
+    cache.set(_job_key(job['job_id']), job, EXPORT_JOB_TIMEOUT)
+
+
+def get_export_content(job):
+    """Artifact bytes for a ready job (None once superseded or removed)."""
+    return _read_artifact(job['artifact_path'])
+
+
+def run_export_job(job_id):
+    """Generate the artifact for a queued job and record the outcome."""
+    job = cache.get(_job_key(job_id))
+    if job is None:
+        return None
+
+    _save_job({**job, 'status': RUNNING})
+    try:
+        get_or_build_export(job)
+    except Exception as exc:
+        logger.exception(f"Stock export job {job_id} ({job['kind']}) failed")
+        job = {**job, 'status': FAILED, 'error': str(exc)}
+    else:
+        job = {**job, 'status': READY, 'error': None}
+    _save_job(job)
+    return job
+
+
+def request_export(spec):
+    """
+    Request an export, generating it in the background.
+
+    Returns the existing job when the same export (same content version) was
+    already requested, and a ready job straight away when the artifact is
+    stored.
+
+    Returns:
+        dict: Job state
+    """
+    job = get_export_job(spec['job_id'])
+    if job and job['status'] == READY:
+        return job
+    if job and job['status'] in (PENDING, RUNNING):
+        if time.time() - job['updated_at'] < EXPORT_JOB_STALE_AFTER:
+            return job
+
+    if export_storage().exists(spec['artifact_path']):
+        job = {**spec, 'status': READY, 'error': None}
+        _save_job(job)
+        return job
+
+    return _queue_job(spec)
+
+
+def _queue_job(spec):
+    """Record a pending job and generate it (in the background when async)."""
+    job = {**spec, 'status': PENDING, 'error': None}
+    _save_job(job)
+
+    if not getattr(settings, 'STOCK_EXPORT_ASYNC', False):
+        return run_export_job(spec['job_id'])
+
+    _export_queue.put_on_commit(spec['job_id'])
+    return job
+
+
+_export_queue = WorkerQueue("stock-exports", run_export_job)
+
+
+def wait_for_export_jobs():
+    """Block until every queued export job has been processed."""
+    _export_queue.wait()
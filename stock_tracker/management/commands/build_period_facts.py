@@ -0,0 +1,49 @@
+"""
+Management command to store analytics facts for closed stock periods.
+
+Facts are built when a period closes and after edits to a closed period;
+analytics reads never store them. Use this for periods closed before the
+fact tables existed, or whose rebuild failed, so their analytics stop being
+aggregated on every request.
+
+Usage:
+    python manage.py build_period_facts
+    python manage.py build_period_facts --hotel=hotel-slug
+    python manage.py build_period_facts --all
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from stock_tracker.models import StockPeriod
+from stock_tracker.period_facts import rebuild_period_facts
+
+
+class Command(BaseCommand):
+    help = 'Store analytics facts for closed stock periods that have none'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hotel',
+            type=str,
+            help='Build a specific hotel slug only',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Rebuild every closed period, not only those without facts',
+        )
+
+    def handle(self, *args, **options):
+        periods = StockPeriod.objects.filter(is_closed=True).select_related('hotel')
+        if options['hotel']:
+            periods = periods.filter(hotel__slug=options['hotel'])
+            if not periods.exists():
+                raise CommandError(f"No closed periods for hotel '{options['hotel']}'")
+        if not options['all']:
+            periods = periods.filter(facts_built_at__isnull=True)
+
+        for period in periods:
+            rows = rebuild_period_facts(period)
+            self.stdout.write(self.style.SUCCESS(
+                f"{period.hotel.slug} {period.period_name}: "
+                f"{rows['items']} item / {rows['categories']} category facts"
+            ))
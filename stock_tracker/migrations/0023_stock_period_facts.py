@@ -0,0 +1,63 @@
+# Generated by Django 5.2.4 on 2026-10-18 22:20
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel', '0059_roombooking_integrity_dirty_at'),
+        ('stock_tracker', '0022_alter_stockitem_subcategory'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockPeriodCategoryFact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item_count', models.PositiveIntegerField(default=0, help_text='Items with a closing snapshot')),
+                ('closing_stock_value', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('gp_total', models.DecimalField(decimal_places=4, default=Decimal('0.0000'), help_text='Sum of item GP% over priced items (for averages)', max_digits=16)),
+                ('gp_count', models.PositiveIntegerField(default=0)),
+                ('purchases_value', models.DecimalField(decimal_places=4, default=Decimal('0.0000'), max_digits=14)),
+                ('waste_value', models.DecimalField(decimal_places=4, default=Decimal('0.0000'), max_digits=14)),
+                ('transfers_in_value', models.DecimalField(decimal_places=4, default=Decimal('0.0000'), max_digits=14)),
+                ('transfers_out_value', models.DecimalField(decimal_places=4, default=Decimal('0.0000'), max_digits=14)),
+                ('adjustments_value', models.DecimalField(decimal_places=4, default=Decimal('0.0000'), max_digits=14)),
+                ('built_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='period_facts', to='stock_tracker.stockcategory')),
+                ('hotel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_period_category_facts', to='hotel.hotel')),
+                ('period', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='category_facts', to='stock_tracker.stockperiod')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hotel', 'period'], name='stock_track_hotel_i_30910b_idx')],
+                'unique_together': {('period', 'category')},
+            },
+        ),
+        migrations.CreateModel(
+            name='StockPeriodItemFact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('has_snapshot', models.BooleanField(default=False)),
+                ('closing_stock_value', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('closing_servings', models.DecimalField(decimal_places=4, default=Decimal('0.0000'), max_digits=15)),
+                ('gp_percentage', models.DecimalField(blank=True, decimal_places=4, help_text='(menu price - cost per serving) / menu price, when priced', max_digits=12, null=True)),
+                ('purchases_value', models.DecimalField(decimal_places=4, default=Decimal('0.0000'), max_digits=14)),
+                ('waste_value', models.DecimalField(decimal_places=4, default=Decimal('0.0000'), max_digits=14)),
+                ('transfers_in_value', models.DecimalField(decimal_places=4, default=Decimal('0.0000'), max_digits=14)),
+                ('transfers_out_value', models.DecimalField(decimal_places=4, default=Decimal('0.0000'), max_digits=14)),
+                ('adjustments_value', models.DecimalField(decimal_places=4, default=Decimal('0.0000'), max_digits=14)),
+                ('built_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='period_item_facts', to='stock_tracker.stockcategory')),
+                ('hotel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_period_item_facts', to='hotel.hotel')),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='period_facts', to='stock_tracker.stockitem')),
+                ('period', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='item_facts', to='stock_tracker.stockperiod')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hotel', 'period'], name='stock_track_hotel_i_13deb7_idx')],
+                'unique_together': {('period', 'item')},
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-18 22:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stock_tracker', '0023_stock_period_facts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stocktake',
+            name='cached_total_cogs',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=15, null=True),
+        ),
+        migrations.AddField(
+            model_name='stocktake',
+            name='cached_total_revenue',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=15, null=True),
+        ),
+        migrations.AddField(
+            model_name='stocktake',
+            name='totals_calculated_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='stocktake',
+            name='totals_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-19 00:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stock_tracker', '0024_stocktake_financial_totals'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockExportVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('stocktake', 'Stocktake'), ('period', 'Period'), ('hotel', 'Hotel')], max_length=20)),
+                ('object_id', models.PositiveIntegerField()),
+                ('version', models.PositiveBigIntegerField(default=1)),
+            ],
+            options={
+                'unique_together': {('scope', 'object_id')},
+            },
+        ),
+    ]
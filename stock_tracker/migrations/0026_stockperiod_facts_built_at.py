@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-19 01:39
+
+from django.db import migrations, models
+from django.db.models import Q
+from django.utils import timezone
+
+
+def mark_stored_facts_built(apps, schema_editor):
+    """Closed periods whose facts are already stored keep using them."""
+    StockPeriod = apps.get_model('stock_tracker', 'StockPeriod')
+
+    StockPeriod.objects.filter(is_closed=True).filter(
+        Q(item_facts__isnull=False) | Q(category_facts__isnull=False)
+    ).update(facts_built_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stock_tracker', '0025_stock_export_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stockperiod',
+            name='facts_built_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(mark_stored_facts_built, migrations.RunPython.noop),
+    ]
@@ -212,28 +212,36 @@ class CocktailConsumption(models.Model):
         
         IMPORTANT: These records are for DISPLAY and optional manual merging.
         They do NOT automatically affect stocktake calculations.
+        
+        Uses the recipe's prefetched ingredients when available
+        (prefetch_related('ingredients__ingredient__linked_stock_item'))
+        and inserts every record in one bulk_create.
         """
-        for recipe_ingredient in self.cocktail.ingredients.all():
-            # Calculate total quantity used for this batch
-            total_quantity = (
-                Decimal(str(recipe_ingredient.quantity_per_cocktail)) *
-                Decimal(str(self.quantity_made))
+        recipe_ingredients = self.cocktail.ingredients.all()
+        prefetched = getattr(self.cocktail, '_prefetched_objects_cache', {})
+        if 'ingredients' not in prefetched:
+            recipe_ingredients = recipe_ingredients.select_related(
+                'ingredient__linked_stock_item'
             )
-            
-            # Get linked stock item if available
-            stock_item = recipe_ingredient.ingredient.linked_stock_item
-            
-            # Create consumption record
-            CocktailIngredientConsumption.objects.create(
+        
+        CocktailIngredientConsumption.objects.bulk_create([
+            CocktailIngredientConsumption(
                 cocktail_consumption=self,
                 ingredient=recipe_ingredient.ingredient,
-                stock_item=stock_item,  # May be None
-                quantity_used=total_quantity,
+                # Linked stock item may be None
+                stock_item=recipe_ingredient.ingredient.linked_stock_item,
+                # Total quantity used for this batch
+                quantity_used=(
+                    Decimal(str(recipe_ingredient.quantity_per_cocktail)) *
+                    Decimal(str(self.quantity_made))
+                ),
                 unit=recipe_ingredient.ingredient.unit,
                 # Cost tracking can be added later
                 unit_cost=None,
                 total_cost=None
             )
+            for recipe_ingredient in recipe_ingredients
+        ])
 
 
 class CocktailIngredientConsumption(models.Model):
@@ -1159,6 +1167,9 @@ class StockPeriod(models.Model):
 
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # When the analytics fact tables were last built for this closed period
+    # (see stock_tracker/period_facts.py); None while missing or stale
+    facts_built_at = models.DateTimeField(null=True, blank=True, editable=False)
     # Manual entry for total sales amount (when itemized sales are missing)
     manual_sales_amount = models.DecimalField(
         max_digits=12,
@@ -1844,6 +1855,152 @@ class StockMovement(models.Model):
         # If you need real-time inventory, create a separate CurrentInventory model
 
 
+class StockPeriodItemFact(models.Model):
+    """
+    Pre-aggregated analytics for one item in one period.
+
+    Built from the period's StockSnapshots and StockMovements when the period
+    is closed (see stock_tracker/period_facts.py) so the KPI and comparison
+    endpoints read a few hundred rows instead of recomputing per request.
+    """
+    hotel = models.ForeignKey(
+        'hotel.Hotel',
+        on_delete=models.CASCADE,
+        related_name='stock_period_item_facts'
+    )
+    period = models.ForeignKey(
+        StockPeriod,
+        on_delete=models.CASCADE,
+        related_name='item_facts'
+    )
+    item = models.ForeignKey(
+        StockItem,
+        on_delete=models.CASCADE,
+        related_name='period_facts'
+    )
+    category = models.ForeignKey(
+        StockCategory,
+        on_delete=models.PROTECT,
+        related_name='period_item_facts'
+    )
+
+    # From the closing snapshot (zero when the item has no snapshot)
+    has_snapshot = models.BooleanField(default=False)
+    closing_stock_value = models.DecimalField(
+        max_digits=12, decimal_places=2, default=Decimal('0.00')
+    )
+    closing_servings = models.DecimalField(
+        max_digits=15, decimal_places=4, default=Decimal('0.0000')
+    )
+    gp_percentage = models.DecimalField(
+        max_digits=12,
+        decimal_places=4,
+        null=True,
+        blank=True,
+        help_text="(menu price - cost per serving) / menu price, when priced"
+    )
+
+    # Movement values (quantity x unit cost) within the period dates
+    purchases_value = models.DecimalField(
+        max_digits=14, decimal_places=4, default=Decimal('0.0000')
+    )
+    waste_value = models.DecimalField(
+        max_digits=14, decimal_places=4, default=Decimal('0.0000')
+    )
+    transfers_in_value = models.DecimalField(
+        max_digits=14, decimal_places=4, default=Decimal('0.0000')
+    )
+    transfers_out_value = models.DecimalField(
+        max_digits=14, decimal_places=4, default=Decimal('0.0000')
+    )
+    adjustments_value = models.DecimalField(
+        max_digits=14, decimal_places=4, default=Decimal('0.0000')
+    )
+
+    built_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('period', 'item')
+        indexes = [
+            models.Index(fields=['hotel', 'period']),
+        ]
+
+    def __str__(self):
+        return f"{self.item_id} - period {self.period_id}"
+
+
+class StockPeriodCategoryFact(models.Model):
+    """
+    Pre-aggregated analytics for one category in one period.
+
+    Rolled up from StockPeriodItemFact rows in the same rebuild.
+    """
+    hotel = models.ForeignKey(
+        'hotel.Hotel',
+        on_delete=models.CASCADE,
+        related_name='stock_period_category_facts'
+    )
+    period = models.ForeignKey(
+        StockPeriod,
+        on_delete=models.CASCADE,
+        related_name='category_facts'
+    )
+    category = models.ForeignKey(
+        StockCategory,
+        on_delete=models.PROTECT,
+        related_name='period_facts'
+    )
+
+    item_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Items with a closing snapshot"
+    )
+    closing_stock_value = models.DecimalField(
+        max_digits=14, decimal_places=2, default=Decimal('0.00')
+    )
+    gp_total = models.DecimalField(
+        max_digits=16,
+        decimal_places=4,
+        default=Decimal('0.0000'),
+        help_text="Sum of item GP% over priced items (for averages)"
+    )
+    gp_count = models.PositiveIntegerField(default=0)
+
+    purchases_value = models.DecimalField(
+        max_digits=14, decimal_places=4, default=Decimal('0.0000')
+    )
+    waste_value = models.DecimalField(
+        max_digits=14, decimal_places=4, default=Decimal('0.0000')
+    )
+    transfers_in_value = models.DecimalField(
+        max_digits=14, decimal_places=4, default=Decimal('0.0000')
+    )
+    transfers_out_value = models.DecimalField(
+        max_digits=14, decimal_places=4, default=Decimal('0.0000')
+    )
+    adjustments_value = models.DecimalField(
+        max_digits=14, decimal_places=4, default=Decimal('0.0000')
+    )
+
+    built_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('period', 'category')
+        indexes = [
+            models.Index(fields=['hotel', 'period']),
+        ]
+
+    def __str__(self):
+        return f"{self.category_id} - period {self.period_id}"
+
+    @property
+    def average_gp_percentage(self):
+        """Mean item GP% in this category, or None if nothing is priced"""
+        if not self.gp_count:
+            return None
+        return self.gp_total / self.gp_count
+
+
 class Location(models.Model):
     """
     Physical storage locations/bins.
@@ -1871,9 +2028,7 @@ class Location(models.Model):
         return f"{self.hotel.name} - {self.name}"
 
 class Stocktake(models.Model):
-    from django.utils.functional import cached_property
-
-    @cached_property
+    @property
     def total_cogs(self):
         """
         Calculate total cost of goods sold.
@@ -1881,39 +2036,11 @@ class Stocktake(models.Model):
         1. StockPeriod.manual_purchases_amount (single total value)
         2. Sum of manual_purchases_value + manual_waste_value from lines
         3. Sum of total_cost from Sale records
-        """
-        from django.db.models import Sum
-        
-        # Priority 1: Check period manual_purchases_amount
-        period = None
-        try:
-            period = StockPeriod.objects.get(
-                hotel=self.hotel,
-                start_date=self.period_start,
-                end_date=self.period_end
-            )
-        except StockPeriod.DoesNotExist:
-            pass
-        
-        if period and period.manual_purchases_amount is not None:
-            return period.manual_purchases_amount
-        
-        # Priority 2: Check if any lines have manual values
-        manual_totals = self.lines.aggregate(
-            purchases=Sum('manual_purchases_value'),
-            waste=Sum('manual_waste_value')
-        )
-        
-        manual_purchases = manual_totals['purchases'] or 0
-        manual_waste = manual_totals['waste'] or 0
-        manual_total = manual_purchases + manual_waste
         
-        if manual_total > 0:
-            return manual_total
-        
-        # Priority 3: Fallback to Sale records
-        total = self.sales.aggregate(total=Sum('total_cost'))['total']
-        return total or 0
+        Stored on the stocktake; see stock_tracker/stocktake_totals.py.
+        """
+        from .stocktake_totals import get_financial_totals
+        return get_financial_totals(self)['total_cogs']
 
     @property
     def total_revenue(self):
@@ -1923,34 +2050,11 @@ class Stocktake(models.Model):
         1. Sum of manual_sales_value from lines
         2. StockPeriod.manual_sales_amount
         3. Sum of total_revenue from Sale records
-        """
-        from django.db.models import Sum
-        
-        # Check if any lines have manual sales values
-        manual_sales = self.lines.aggregate(
-            total=Sum('manual_sales_value')
-        )['total']
-        
-        if manual_sales and manual_sales > 0:
-            return manual_sales
-        
-        # Check period manual_sales_amount
-        period = None
-        try:
-            period = StockPeriod.objects.get(
-                hotel=self.hotel,
-                start_date=self.period_start,
-                end_date=self.period_end
-            )
-        except StockPeriod.DoesNotExist:
-            pass
         
-        if period and period.manual_sales_amount is not None:
-            return period.manual_sales_amount
-        
-        # Fallback to Sale records
-        total = self.sales.aggregate(total=Sum('total_revenue'))['total']
-        return total or 0
+        Stored on the stocktake; see stock_tracker/stocktake_totals.py.
+        """
+        from .stocktake_totals import get_financial_totals
+        return get_financial_totals(self)['total_revenue']
 
     @property
     def gross_profit_percentage(self):
@@ -2003,6 +2107,33 @@ class Stocktake(models.Model):
     )
     notes = models.TextField(blank=True)
 
+    # Stored financial totals (see stock_tracker/stocktake_totals.py).
+    # totals_calculated_at is None while they are stale or not yet stored.
+    cached_total_cogs = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        editable=False
+    )
+    cached_total_revenue = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        editable=False
+    )
+    totals_calculated_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False
+    )
+    totals_version = models.PositiveIntegerField(default=0, editable=False)
+
+    TOTALS_FIELDS = {
+        'cached_total_cogs', 'cached_total_revenue', 'totals_calculated_at', 'totals_version'
+    }
+
     class Meta:
         unique_together = ('hotel', 'period_start', 'period_end')
         ordering = ['-period_end']
@@ -2013,6 +2144,16 @@ class Stocktake(models.Model):
             f"{self.period_start} to {self.period_end}"
         )
 
+    def save(self, *args, **kwargs):
+        # Stored totals are only written by stocktake_totals: saving an
+        # instance loaded before a line/sale change must not restore them
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.TOTALS_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
     @property
     def is_locked(self):
         """Once approved, stocktake cannot be edited"""
@@ -2630,3 +2771,28 @@ class StocktakeLine(models.Model):
         Frontend uses this to show/hide the "Merge Cocktails" button.
         """
         return self.available_cocktail_consumption_qty > 0
+
+
+class StockExportVersion(models.Model):
+    """
+    Content version of a stocktake, period or hotel for cached exports.
+
+    Bumped by stock_tracker/signals.py when the data behind an export
+    changes; export artifacts are keyed by the versions they were built
+    from (see stock_tracker/export_jobs.py).
+    """
+    SCOPE_CHOICES = [
+        ('stocktake', 'Stocktake'),
+        ('period', 'Period'),
+        ('hotel', 'Hotel'),
+    ]
+
+    scope = models.CharField(max_length=20, choices=SCOPE_CHOICES)
+    object_id = models.PositiveIntegerField()
+    version = models.PositiveBigIntegerField(default=1)
+
+    class Meta:
+        unique_together = ('scope', 'object_id')
+
+    def __str__(self):
+        return f"{self.scope} {self.object_id} v{self.version}"
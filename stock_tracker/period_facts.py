@@ -0,0 +1,308 @@
+"""
+Pre-aggregated period analytics (fact tables).
+
+The KPI summary and comparison endpoints used to walk every StockSnapshot
+and StockMovement of every requested period on each request. Instead, each
+period is rolled up once into:
+
+- StockPeriodItemFact: one row per (period, item) - closing value/servings,
+  GP% and movement values (purchases, waste, transfers, adjustments)
+- StockPeriodCategoryFact: one row per (period, category) rolled up from the
+  item facts
+
+Facts are built when a period is saved as closed (approve_and_close and any
+other close path, see signals.py), once the close has committed, and the
+period records when (StockPeriod.facts_built_at). Snapshot and movement
+edits on a closed period, or an item moving to another category, mark its
+facts stale and rebuild them after the edit commits. Reopening drops them.
+
+Reads never write: open periods, and closed periods whose facts are not
+built (closed before the fact tables, a failed rebuild, a stale mark not yet
+rebuilt), are aggregated in memory per request. The build_period_facts
+management command stores facts for closed periods that have none.
+
+Movement values use the same window as the comparison endpoints:
+timestamp between period.start_date and period.end_date.
+"""
+import logging
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import DecimalField, F, Q, Sum
+from django.utils import timezone
+
+from common.concurrency import on_commit_once
+from .models import (
+    StockItem,
+    StockMovement,
+    StockPeriod,
+    StockPeriodCategoryFact,
+    StockPeriodItemFact,
+    StockSnapshot,
+)
+
+logger = logging.getLogger(__name__)
+
+# Movement type -> fact field holding its value (quantity x unit cost)
+MOVEMENT_FACT_FIELDS = {
+    StockMovement.PURCHASE: 'purchases_value',
+    StockMovement.WASTE: 'waste_value',
+    StockMovement.TRANSFER_IN: 'transfers_in_value',
+    StockMovement.TRANSFER_OUT: 'transfers_out_value',
+    StockMovement.ADJUSTMENT: 'adjustments_value',
+}
+
+# Summed when rolling facts up (category -> period totals)
+TOTAL_FIELDS = ('closing_stock_value', 'item_count') + tuple(MOVEMENT_FACT_FIELDS.values())
+
+
+def build_period_facts(period):
+    """
+    Compute facts for a period without saving them.
+
+    Args:
+        period: StockPeriod instance
+
+    Returns:
+        tuple: (item_facts, category_facts) lists of unsaved model instances
+    """
+    item_facts = {}
+
+    def fact_for(item):
+        if item.id not in item_facts:
+            item_facts[item.id] = StockPeriodItemFact(
+                hotel_id=period.hotel_id,
+                period=period,
+                item=item,
+                category_id=item.category_id,
+            )
+        return item_facts[item.id]
+
+    snapshots = StockSnapshot.objects.filter(
+        hotel_id=period.hotel_id,
+        period=period,
+    ).select_related('item', 'item__category')
+
+    for snapshot in snapshots:
+        fact = fact_for(snapshot.item)
+        fact.has_snapshot = True
+        fact.closing_stock_value = snapshot.closing_stock_value
+        fact.closing_servings = snapshot.total_servings
+        if snapshot.menu_price and snapshot.menu_price > 0:
+            fact.gp_percentage = (
+                (snapshot.menu_price - snapshot.cost_per_serving)
+                / snapshot.menu_price * 100
+            )
+
+    movement_totals = list(
+        StockMovement.objects.filter(
+            hotel_id=period.hotel_id,
+            movement_type__in=MOVEMENT_FACT_FIELDS.keys(),
+            timestamp__gte=period.start_date,
+            timestamp__lte=period.end_date,
+        )
+        .values('item_id', 'movement_type')
+        .annotate(
+            total=Sum(F('quantity') * F('unit_cost'), output_field=DecimalField())
+        )
+    )
+
+    # Items that moved but have no closing snapshot
+    missing_ids = {row['item_id'] for row in movement_totals} - set(item_facts)
+    if missing_ids:
+        for item in StockItem.objects.filter(id__in=missing_ids).select_related('category'):
+            fact_for(item)
+
+    for row in movement_totals:
+        field = MOVEMENT_FACT_FIELDS[row['movement_type']]
+        setattr(item_facts[row['item_id']], field, row['total'] or Decimal('0'))
+
+    return list(item_facts.values()), _roll_up_categories(period, item_facts.values())
+
+
+def _roll_up_categories(period, item_facts):
+    category_facts = {}
+
+    for fact in item_facts:
+        category_fact = category_facts.get(fact.category_id)
+        if category_fact is None:
+            category_fact = category_facts[fact.category_id] = StockPeriodCategoryFact(
+                hotel_id=period.hotel_id,
+                period=period,
+                category=fact.item.category,
+            )
+
+        if fact.has_snapshot:
+            category_fact.item_count += 1
+            category_fact.closing_stock_value += fact.closing_stock_value
+        if fact.gp_percentage is not None:
+            category_fact.gp_total += fact.gp_percentage
+            category_fact.gp_count += 1
+        for field in MOVEMENT_FACT_FIELDS.values():
+            setattr(category_fact, field, getattr(category_fact, field) + getattr(fact, field))
+
+    return list(category_facts.values())
+
+
+def rebuild_period_facts(period):
+    """
+    Replace the stored facts for a period and mark them built.
+
+    Args:
+        period: StockPeriod instance (normally closed)
+
+    Returns:
+        dict: {'items': int, 'categories': int} rows written
+    """
+    item_facts, category_facts = build_period_facts(period)
+    built_at = timezone.now()
+
+    with transaction.atomic():
+        StockPeriodItemFact.objects.filter(period=period).delete()
+        StockPeriodCategoryFact.objects.filter(period=period).delete()
+        StockPeriodItemFact.objects.bulk_create(item_facts, batch_size=500)
+        StockPeriodCategoryFact.objects.bulk_create(category_facts)
+        StockPeriod.objects.filter(pk=period.pk).update(facts_built_at=built_at)
+
+    period.facts_built_at = built_at
+    return {'items': len(item_facts), 'categories': len(category_facts)}
+
+
+def clear_period_facts(period):
+    """
+    Drop the stored facts for a period (e.g. when it is reopened).
+
+    Args:
+        period: StockPeriod instance or id
+    """
+    period_id = getattr(period, 'pk', period)
+    StockPeriod.objects.filter(pk=period_id).update(facts_built_at=None)
+    StockPeriodItemFact.objects.filter(period_id=period_id).delete()
+    StockPeriodCategoryFact.objects.filter(period_id=period_id).delete()
+    if isinstance(period, StockPeriod):
+        period.facts_built_at = None
+
+
+def rebuild_closed_period_facts(period_id):
+    """
+    Rebuild the facts of a period that is (still) closed.
+
+    Runs after a commit (close, edits): a failure must not turn the request
+    that committed into a 500, so it is logged and the period is left
+    without stored facts, which reads aggregate in memory instead.
+    """
+    period = StockPeriod.objects.filter(pk=period_id, is_closed=True).first()
+    if period is None:
+        return
+    try:
+        rebuild_period_facts(period)
+    except IntegrityError:
+        # A concurrent rebuild stored them first
+        pass
+    except Exception:
+        logger.exception(f"Could not rebuild analytics facts for period {period_id}")
+        try:
+            clear_period_facts(period)
+        except Exception:
+            logger.exception(f"Could not clear analytics facts for period {period_id}")
+
+
+def rebuild_facts_on_commit(period_id):
+    """Rebuild a closed period's facts once the transaction commits."""
+    on_commit_once(
+        ('stock_period_facts', period_id),
+        lambda: rebuild_closed_period_facts(period_id),
+    )
+
+
+def invalidate_period_facts(periods):
+    """
+    Mark the facts of the closed periods among ``periods`` stale and rebuild
+    them once the transaction commits (once per period however many rows
+    changed). Until then reads aggregate those periods in memory.
+
+    Args:
+        periods: StockPeriod queryset
+    """
+    period_ids = list(periods.filter(is_closed=True).values_list('pk', flat=True))
+    if not period_ids:
+        return
+    StockPeriod.objects.filter(pk__in=period_ids).update(facts_built_at=None)
+    for period_id in period_ids:
+        rebuild_facts_on_commit(period_id)
+
+
+def invalidate_facts_for_days(hotel_id, days):
+    """Invalidate the closed periods of a hotel covering any of ``days``."""
+    covering = Q()
+    for day in days:
+        covering |= Q(start_date__lte=day, end_date__gte=day)
+    if covering:
+        invalidate_period_facts(StockPeriod.objects.filter(covering, hotel_id=hotel_id))
+
+
+def stored_fact_periods(periods):
+    """The periods read from the fact tables: closed, with facts built."""
+    return [p for p in periods if p.is_closed and p.facts_built_at is not None]
+
+
+def _facts_by_period(periods, model, build_index, key):
+    """
+    Load facts for periods: stored rows for closed periods with built facts,
+    in-memory rows for the others.
+    """
+    periods = list({p.id: p for p in periods}.values())
+    facts = {p.id: {} for p in periods}
+
+    stored = stored_fact_periods(periods)
+    if stored:
+        rows = model.objects.filter(period__in=stored).select_related(
+            *(['item', 'category'] if model is StockPeriodItemFact else ['category'])
+        )
+        for fact in rows:
+            facts[fact.period_id][key(fact)] = fact
+
+    for period in periods:
+        if period not in stored:
+            for fact in build_period_facts(period)[build_index]:
+                facts[period.id][key(fact)] = fact
+
+    return facts
+
+
+def get_item_facts(periods):
+    """
+    Item facts for the given periods.
+
+    Returns:
+        dict: {period_id: {item_id: StockPeriodItemFact}}
+    """
+    return _facts_by_period(periods, StockPeriodItemFact, 0, lambda fact: fact.item_id)
+
+
+def get_category_facts(periods):
+    """
+    Category facts for the given periods.
+
+    Returns:
+        dict: {period_id: {category_code: StockPeriodCategoryFact}}
+    """
+    return _facts_by_period(periods, StockPeriodCategoryFact, 1, lambda fact: fact.category_id)
+
+
+def period_totals(category_facts):
+    """
+    Sum one period's category facts into period-wide totals.
+
+    Args:
+        category_facts: iterable of StockPeriodCategoryFact for one period
+
+    Returns:
+        dict: closing_stock_value, item_count and each movement value
+    """
+    totals = {field: Decimal('0') for field in TOTAL_FIELDS}
+    totals['item_count'] = 0
+    for fact in category_facts:
+        for field in TOTAL_FIELDS:
+            totals[field] += getattr(fact, field)
+    return totals
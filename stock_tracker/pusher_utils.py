@@ -3,7 +3,7 @@ Pusher utilities for Stock Tracker
 Real-time event broadcasting for stocktake changes
 """
 import logging
-from chat.utils import pusher_client
+from chat.utils import chunk_event_payloads, pusher_client
 
 logger = logging.getLogger(__name__)
 
@@ -184,17 +184,45 @@ def broadcast_stocktake_populated(
 # BULK UPDATE EVENTS
 # ============================================================================
 
+# Line fields that movements and sales change; bulk_lines_updated carries
+# only these (full serializer rows blow Pusher's message size limit)
+BULK_LINE_EVENT_FIELDS = [
+    'id', 'item',
+    'purchases', 'sales_qty', 'waste',
+    'expected_qty', 'variance_qty',
+    'expected_display_full_units', 'expected_display_partial_units',
+    'variance_display_full_units', 'variance_display_partial_units',
+    'variance_drink_servings',
+    'expected_value', 'variance_value',
+]
+
+
 def broadcast_bulk_lines_updated(hotel_identifier, stocktake_id, bulk_data):
     """
     Broadcast when multiple lines are updated at once
     Useful for batch imports or bulk edits
+
+    bulk_data["lines"] are serialized lines; only BULK_LINE_EVENT_FIELDS
+    are sent, split across several bulk_lines_updated events ("chunk" of
+    "chunks") when one would exceed Pusher's message limit.
     """
-    return trigger_stocktake_event(
-        hotel_identifier,
-        stocktake_id,
-        "bulk_lines_updated",
-        bulk_data
-    )
+    bulk_data = {
+        **bulk_data,
+        "lines": [
+            {field: line[field] for field in BULK_LINE_EVENT_FIELDS if field in line}
+            for line in bulk_data["lines"]
+        ]
+    }
+    results = [
+        trigger_stocktake_event(
+            hotel_identifier,
+            stocktake_id,
+            "bulk_lines_updated",
+            payload
+        )
+        for payload in chunk_event_payloads(bulk_data, "lines")
+    ]
+    return all(results)
 
 
 # ============================================================================
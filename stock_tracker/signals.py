@@ -0,0 +1,189 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from common.concurrency import on_commit_once
+from .models import (
+    CocktailConsumption,
+    Sale,
+    StockItem,
+    StockMovement,
+    StockPeriod,
+    StockSnapshot,
+    Stocktake,
+    StocktakeLine,
+)
+
+
+@receiver(post_save, sender=StockPeriod)
+def sync_period_facts(sender, instance, **kwargs):
+    """
+    Keep the analytics fact tables in step with the period's closed state.
+
+    Closing a period (approve_and_close or any other path) builds its facts
+    after the transaction commits, so snapshots created in the same
+    transaction are included. Reopening drops them; open periods are
+    aggregated live by stock_tracker/period_facts.py.
+    """
+    from .period_facts import clear_period_facts, rebuild_facts_on_commit
+
+    if instance.is_closed:
+        rebuild_facts_on_commit(instance.pk)
+    else:
+        clear_period_facts(instance)
+
+
+@receiver(post_save, sender=StockSnapshot)
+@receiver(post_delete, sender=StockSnapshot)
+def invalidate_facts_for_snapshot(sender, instance, **kwargs):
+    """Snapshot edits on a closed period make its stored facts stale."""
+    from .period_facts import invalidate_period_facts
+
+    if instance.period_id is not None:
+        invalidate_period_facts(StockPeriod.objects.filter(pk=instance.period_id))
+
+
+@receiver(pre_save, sender=StockMovement)
+def remember_movement_day(sender, instance, raw=False, **kwargs):
+    """Keep the movement's previous hotel/day so moving it refreshes both."""
+    if instance.pk and not raw:
+        instance._previous_facts_day = StockMovement.objects.filter(
+            pk=instance.pk
+        ).values_list('hotel_id', 'timestamp').first()
+
+
+@receiver(post_save, sender=StockMovement)
+@receiver(post_delete, sender=StockMovement)
+def invalidate_facts_for_movement(sender, instance, raw=False, **kwargs):
+    """Movement values of closed periods are part of their stored facts."""
+    from .period_facts import invalidate_facts_for_days
+
+    if raw:
+        return
+    days = [(instance.hotel_id, instance.timestamp)]
+    previous = getattr(instance, '_previous_facts_day', None)
+    if previous and previous != days[0]:
+        days.append(previous)
+    for hotel_id, timestamp in days:
+        if timestamp is not None:
+            invalidate_facts_for_days(hotel_id, [timezone.localdate(timestamp)])
+
+
+@receiver(post_save, sender=StockItem)
+def invalidate_facts_for_item_category(sender, instance, raw=False, **kwargs):
+    """
+    Item facts carry the item's category for the category roll-up: moving
+    an item to another category makes those periods' facts stale. (A
+    deleted item's snapshots and movements are deleted with it, and their
+    own signals invalidate the periods.)
+    """
+    from .models import StockPeriodItemFact
+    from .period_facts import invalidate_period_facts
+
+    if raw:
+        return
+    invalidate_period_facts(StockPeriod.objects.filter(
+        pk__in=StockPeriodItemFact.objects.filter(item=instance)
+        .exclude(category_id=instance.category_id)
+        .values('period_id')
+    ))
+
+
+def _bump_export_version(scope, pk):
+    """
+    Bump an export content version once the transaction commits.
+
+    Saves of the same scope share one bump (on_commit_once): a bulk edit
+    of hundreds of items writes the version once per commit instead of
+    once per row.
+    """
+    from .export_jobs import bump_content_version
+
+    if pk is None:
+        return
+    on_commit_once(
+        ('stock_export_version', scope, pk), lambda: bump_content_version(scope, pk)
+    )
+
+
+@receiver(post_save, sender=Stocktake)
+@receiver(post_delete, sender=Stocktake)
+def invalidate_stocktake_exports(sender, instance, **kwargs):
+    """Cached stocktake/combined exports are keyed by this version."""
+    _bump_export_version('stocktake', instance.pk)
+
+
+@receiver(post_save, sender=StocktakeLine)
+@receiver(post_delete, sender=StocktakeLine)
+@receiver(post_save, sender=Sale)
+@receiver(post_delete, sender=Sale)
+def invalidate_stocktake_exports_for_child(sender, instance, **kwargs):
+    _bump_export_version('stocktake', instance.stocktake_id)
+
+
+@receiver(post_save, sender=StockSnapshot)
+@receiver(post_delete, sender=StockSnapshot)
+def invalidate_period_exports(sender, instance, **kwargs):
+    _bump_export_version('period', instance.period_id)
+
+
+@receiver(post_save, sender=StockPeriod)
+@receiver(post_delete, sender=StockPeriod)
+@receiver(post_save, sender=StockItem)
+@receiver(post_delete, sender=StockItem)
+@receiver(post_save, sender=CocktailConsumption)
+@receiver(post_delete, sender=CocktailConsumption)
+def invalidate_hotel_exports(sender, instance, **kwargs):
+    """
+    Changes that can show up in any export of the hotel: period manual
+    amounts feed stocktake COGS/revenue, item names/costs appear on every
+    line, cocktail consumption feeds period and combined reports.
+    """
+    _bump_export_version('hotel', instance.hotel_id)
+
+
+# Inputs of Stocktake.total_cogs / total_revenue (see stocktake_totals.py)
+LINE_TOTAL_FIELDS = {
+    'manual_purchases_value', 'manual_waste_value', 'manual_sales_value'
+}
+
+
+@receiver(post_save, sender=Stocktake)
+def store_totals_for_new_stocktake(sender, instance, created=False, raw=False, **kwargs):
+    """Store the totals of a new stocktake once it's committed."""
+    from .stocktake_totals import invalidate_financial_totals
+
+    if created and not raw:
+        invalidate_financial_totals(pk=instance.pk)
+
+
+@receiver(post_save, sender=StocktakeLine)
+@receiver(post_delete, sender=StocktakeLine)
+def invalidate_totals_for_line(sender, instance, update_fields=None, **kwargs):
+    from .stocktake_totals import invalidate_financial_totals
+
+    if update_fields and not LINE_TOTAL_FIELDS & set(update_fields):
+        return
+    invalidate_financial_totals(pk=instance.stocktake_id)
+
+
+@receiver(post_save, sender=Sale)
+@receiver(post_delete, sender=Sale)
+def invalidate_totals_for_sale(sender, instance, **kwargs):
+    from .stocktake_totals import invalidate_financial_totals
+
+    if instance.stocktake_id is not None:
+        invalidate_financial_totals(pk=instance.stocktake_id)
+
+
+@receiver(post_save, sender=StockPeriod)
+@receiver(post_delete, sender=StockPeriod)
+def invalidate_totals_for_period(sender, instance, **kwargs):
+    """Period manual sales/purchases amounts override the line and sale totals."""
+    from .stocktake_totals import invalidate_financial_totals
+
+    invalidate_financial_totals(
+        hotel_id=instance.hotel_id,
+        period_start=instance.start_date,
+        period_end=instance.end_date,
+    )
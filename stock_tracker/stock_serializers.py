@@ -1403,12 +1403,17 @@ class SaleSerializer(serializers.ModelSerializer):
         ]
 
     def create(self, validated_data):
+        return super().create(self.prepare_sale_data(validated_data))
+
+    def prepare_sale_data(self, validated_data):
         """
         Auto-populate unit_cost and unit_price from StockItem.
         Calculate total_cost and total_revenue automatically.
         
         NEW: Support month parameter - if 'month' is in context,
         use it to set sale_date to first day of that month.
+        
+        Also used to build unsaved Sales for bulk_create.
         """
         from datetime import datetime
         
@@ -1442,7 +1447,7 @@ class SaleSerializer(serializers.ModelSerializer):
         if unit_price:
             validated_data['total_revenue'] = unit_price * quantity
         
-        return super().create(validated_data)
+        return validated_data
 
     def get_stocktake_period(self, obj):
         """Get stocktake period name for display"""
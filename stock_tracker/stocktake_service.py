@@ -4,10 +4,12 @@ Stocktake_Formulas.md.
 
 All calculations work in base units (ml, grams, pieces).
 """
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
+from django.db import transaction
 from django.db.models import Sum, Q
 from django.utils import timezone
 from .models import (
+    Sale,
     Stocktake,
     StocktakeLine,
     StockItem,
@@ -265,6 +267,11 @@ def approve_stocktake(stocktake, approved_by):
     stocktake.approved_by = approved_by
     stocktake.save()
 
+    # Approved stocktakes are read far more than written: make sure their
+    # totals are stored rather than computed on every read
+    from .stocktake_totals import store_financial_totals
+    store_financial_totals(pk=stocktake.pk)
+
     return adjustments_created
 
 
@@ -507,3 +514,421 @@ def _calculate_movements_between_periods(item, previous_end_date, current_start_
         'outflows': outflows,
         'adjustments': adjustments
     }
+
+
+# ============================================================================
+# LINE MOVEMENTS (single and bulk entry)
+# ============================================================================
+
+LINE_MOVEMENT_TYPES = [StockMovement.PURCHASE, StockMovement.WASTE]
+
+
+def parse_line_movement(item, movement_type, quantity):
+    """
+    Validate a PURCHASE/WASTE entered against a stocktake line and convert
+    it to servings.
+
+    Purchases must be full physical units (kegs, cases, bottles, boxes) and
+    are converted with the item's UOM; waste must be partial units.
+
+    Args:
+        item: StockItem of the line
+        movement_type: 'PURCHASE' or 'WASTE'
+        quantity: Quantity as entered (number or string)
+
+    Returns:
+        Decimal: Quantity in servings
+
+    Raises:
+        ValueError: With the message returned to the user
+    """
+    if not movement_type or quantity is None or quantity == '':
+        raise ValueError("movement_type and quantity are required")
+
+    if movement_type not in LINE_MOVEMENT_TYPES:
+        raise ValueError(
+            f"Invalid movement_type. "
+            f"Must be one of: {', '.join(LINE_MOVEMENT_TYPES)}"
+        )
+
+    try:
+        quantity = Decimal(str(quantity))
+    except (ValueError, InvalidOperation):
+        raise ValueError("Invalid quantity format")
+    if quantity <= 0:
+        raise ValueError("Quantity must be greater than 0")
+
+    category = item.category_id
+    uom = item.uom
+
+    if movement_type == StockMovement.PURCHASE:
+        if quantity % 1 != 0:
+            if uom == Decimal('1'):
+                # Spirits, Wine, Syrups, BIB, Bulk Juices: bottles/boxes
+                if category == 'M' and item.subcategory == 'SYRUPS':
+                    unit_name = 'bottles'
+                elif category == 'M':
+                    unit_name = 'boxes'
+                elif category in ['S', 'W']:
+                    unit_name = 'bottles'
+                else:
+                    unit_name = 'units'
+                raise ValueError(
+                    f"Purchases must be in full {unit_name} only "
+                    f"(whole numbers). Partial {unit_name} should "
+                    f"be recorded as waste."
+                )
+            unit_name = 'kegs' if category == 'D' else 'cases'
+            raise ValueError(
+                f"Purchases must be in full {unit_name} only. "
+                f"Partial {unit_name} should be recorded as waste."
+            )
+        # CONVERT: kegs/cases -> pints/bottles (no-op for UOM=1)
+        return quantity * uom if uom != Decimal('1') else quantity
+
+    # WASTE: partial physical units only
+    if uom == Decimal('1'):
+        if quantity >= 1:
+            if category == 'M' and item.subcategory == 'SYRUPS':
+                unit_name = 'bottle'
+            elif category == 'M':
+                unit_name = 'box'
+            elif category in ['S', 'W']:
+                unit_name = 'bottle'
+            else:
+                unit_name = 'unit'
+            raise ValueError(
+                f"Waste must be partial {unit_name}s only "
+                f"(less than 1 {unit_name}). "
+                f"Full {unit_name}s should be recorded as "
+                f"negative adjustments."
+            )
+    elif quantity >= uom:
+        if category == 'D':
+            unit_name = f'partial keg only (less than {int(uom)} pints)'
+        elif category == 'B' or (
+            category == 'M'
+            and item.subcategory in ('SOFT_DRINKS', 'CORDIALS')
+        ):
+            unit_name = (
+                f'partial case only (less than {int(uom)} bottles)'
+            )
+        else:
+            unit_name = f'partial unit (less than {int(uom)})'
+        raise ValueError(
+            f"Waste must be {unit_name}. "
+            f"Full kegs/cases should be recorded as "
+            f"negative adjustments."
+        )
+    return quantity
+
+
+def _bump_stocktake_exports(stocktake_id):
+    """bulk_create/bulk_update skip the signals that version cached exports."""
+    from .export_jobs import bump_content_version
+
+    transaction.on_commit(lambda: bump_content_version('stocktake', stocktake_id))
+
+
+def line_movement_timestamp(stocktake):
+    """
+    Timestamp for movements entered on a stocktake: now, or the end of the
+    stocktake period if it is already over, so the movement counts in it.
+    """
+    from datetime import datetime, time
+
+    period_end_dt = timezone.make_aware(
+        datetime.combine(stocktake.period_end, time.max)
+    )
+    return min(timezone.now(), period_end_dt)
+
+
+def recalculate_line_movements(stocktake, lines):
+    """
+    Refresh purchases/waste on several lines with one grouped aggregate
+    and one bulk update.
+
+    Args:
+        stocktake: Stocktake the lines belong to
+        lines: StocktakeLine instances (updated in place)
+    """
+    from datetime import datetime, time
+
+    lines = list(lines)
+    if not lines:
+        return lines
+
+    start_dt = timezone.make_aware(
+        datetime.combine(stocktake.period_start, time.min)
+    )
+    end_dt = timezone.make_aware(
+        datetime.combine(stocktake.period_end, time.max)
+    )
+    totals = {
+        row['item_id']: row
+        for row in StockMovement.objects.filter(
+            item_id__in={line.item_id for line in lines},
+            timestamp__gte=start_dt,
+            timestamp__lte=end_dt
+        ).values('item_id').annotate(
+            purchases=Sum(
+                'quantity',
+                filter=Q(movement_type=StockMovement.PURCHASE)
+            ),
+            waste=Sum(
+                'quantity',
+                filter=Q(movement_type=StockMovement.WASTE)
+            )
+        )
+    }
+
+    for line in lines:
+        row = totals.get(line.item_id, {})
+        line.purchases = row.get('purchases') or Decimal('0')
+        line.waste = row.get('waste') or Decimal('0')
+
+    StocktakeLine.objects.bulk_update(lines, ['purchases', 'waste'])
+    return lines
+
+
+def add_line_movements(stocktake, entries, staff=None):
+    """
+    Record many PURCHASE/WASTE movements against a stocktake at once
+    (e.g. a whole delivery docket).
+
+    Every entry is validated first; nothing is written unless all are
+    valid. Movements are inserted with bulk_create and each affected line
+    is recalculated once.
+
+    Args:
+        stocktake: Stocktake (must not be locked)
+        entries: list of dicts with line_id or sku, movement_type,
+            quantity and optional unit_cost, reference, notes
+        staff: Staff recording the movements
+
+    Returns:
+        dict: movements (created StockMovements), lines (updated
+        StocktakeLines) and errors ([{'index', 'error'}], nothing written
+        if not empty)
+    """
+    lines_by_id = {}
+    lines_by_sku = {}
+    for line in stocktake.lines.select_related('item', 'item__category'):
+        lines_by_id[line.id] = line
+        lines_by_sku[line.item.sku] = line
+
+    period = StockPeriod.objects.filter(
+        hotel=stocktake.hotel,
+        start_date=stocktake.period_start,
+        end_date=stocktake.period_end
+    ).first()
+    default_ref = f'Stocktake-{stocktake.id}'
+
+    movements = []
+    affected = {}
+    errors = []
+
+    for index, entry in enumerate(entries):
+        if entry.get('line_id') not in (None, ''):
+            try:
+                line = lines_by_id.get(int(entry['line_id']))
+            except (TypeError, ValueError):
+                line = None
+        else:
+            line = lines_by_sku.get(entry.get('sku'))
+        if line is None:
+            errors.append({
+                'index': index,
+                'error': "Line not found in this stocktake (line_id or sku)"
+            })
+            continue
+
+        try:
+            quantity = parse_line_movement(
+                line.item, entry.get('movement_type'), entry.get('quantity')
+            )
+            unit_cost = entry.get('unit_cost')
+            unit_cost = (
+                Decimal(str(unit_cost)) if unit_cost not in (None, '') else None
+            )
+        except ValueError as exc:
+            errors.append({'index': index, 'error': str(exc)})
+            continue
+        except InvalidOperation:
+            errors.append({'index': index, 'error': "Invalid unit_cost format"})
+            continue
+
+        movements.append(StockMovement(
+            hotel=stocktake.hotel,
+            item=line.item,
+            period=period,
+            movement_type=entry['movement_type'],
+            quantity=quantity,
+            unit_cost=unit_cost,
+            reference=entry.get('reference') or default_ref,
+            notes=entry.get('notes') or '',
+            staff=staff
+        ))
+        affected[line.id] = line
+
+    if errors:
+        return {'movements': [], 'lines': [], 'errors': errors}
+
+    timestamp = line_movement_timestamp(stocktake)
+    with transaction.atomic():
+        movements = StockMovement.objects.bulk_create(movements, batch_size=500)
+        # timestamp is auto_now_add; move it inside the stocktake period
+        StockMovement.objects.filter(
+            pk__in=[movement.pk for movement in movements]
+        ).update(timestamp=timestamp)
+        for movement in movements:
+            movement.timestamp = timestamp
+        lines = recalculate_line_movements(stocktake, affected.values())
+        _bump_stocktake_exports(stocktake.id)
+
+    return {'movements': movements, 'lines': lines, 'errors': []}
+
+
+def bulk_insert_sales(sales):
+    """
+    Insert unsaved Sales with one bulk_create.
+
+    Totals must already be set (SaleSerializer.prepare_sale_data). The
+    stocktakes' stored financial totals and cached exports are invalidated
+    here because bulk_create skips the Sale signals.
+
+    Returns:
+        list: the created Sales
+    """
+    from .stocktake_totals import invalidate_financial_totals
+
+    with transaction.atomic():
+        sales = Sale.objects.bulk_create(sales, batch_size=500)
+        for stocktake_id in {sale.stocktake_id for sale in sales}:
+            if stocktake_id is not None:
+                invalidate_financial_totals(pk=stocktake_id)
+                _bump_stocktake_exports(stocktake_id)
+    return sales
+
+
+# ============================================================================
+# COCKTAIL CONSUMPTION MERGE
+# ============================================================================
+
+def merge_cocktail_consumption(stocktake, staff=None, lines=None):
+    """
+    Merge unmerged cocktail ingredient consumption into stocktake lines.
+
+    Set-based: the unmerged records in the stocktake window are locked and
+    aggregated per stock item, one COCKTAIL_CONSUMPTION movement per item
+    is bulk-created, the records are flagged merged with one UPDATE and the
+    affected lines are recalculated together - all in one transaction.
+
+    Args:
+        stocktake: Stocktake (must not be locked)
+        staff: Staff performing the merge (audit trail)
+        lines: Optional StocktakeLines to limit the merge to (default: all)
+
+    Returns:
+        dict: lines (updated StocktakeLines), movements (created), total_items_merged,
+        total_quantity_merged, total_value_merged and per-line details
+    """
+    from datetime import datetime, time
+    from django.db.models import Count
+    from .models import CocktailIngredientConsumption
+
+    if lines is None:
+        lines = stocktake.lines.select_related('item')
+    lines_by_item = {line.item_id: line for line in lines}
+
+    start_dt = timezone.make_aware(
+        datetime.combine(stocktake.period_start, time.min)
+    )
+    end_dt = timezone.make_aware(
+        datetime.combine(stocktake.period_end, time.max)
+    )
+
+    summary = {
+        'lines': [],
+        'movements': [],
+        'total_items_merged': 0,
+        'total_quantity_merged': Decimal('0'),
+        'total_value_merged': Decimal('0'),
+        'details': [],
+    }
+    if not lines_by_item:
+        return summary
+
+    with transaction.atomic():
+        record_ids = list(
+            CocktailIngredientConsumption.objects.select_for_update().filter(
+                stock_item_id__in=lines_by_item.keys(),
+                is_merged_to_stocktake=False,
+                timestamp__gte=start_dt,
+                timestamp__lte=end_dt
+            ).values_list('id', flat=True)
+        )
+        if not record_ids:
+            return summary
+
+        per_item = list(
+            CocktailIngredientConsumption.objects.filter(id__in=record_ids)
+            .values('stock_item_id')
+            .annotate(
+                quantity=Sum('quantity_used'),
+                value=Sum('total_cost'),
+                records=Count('id')
+            )
+            .order_by('stock_item_id')
+        )
+
+        period = StockPeriod.objects.filter(
+            hotel=stocktake.hotel,
+            start_date=stocktake.period_start,
+            end_date=stocktake.period_end
+        ).first()
+
+        movements = []
+        for row in per_item:
+            line = lines_by_item[row['stock_item_id']]
+            movements.append(StockMovement(
+                hotel=stocktake.hotel,
+                item=line.item,
+                period=period,
+                movement_type=StockMovement.COCKTAIL_CONSUMPTION,
+                quantity=row['quantity'],
+                unit_cost=line.item.cost_per_serving,
+                reference=f'Cocktail-Merge-Stocktake-{stocktake.id}',
+                notes=f"Merged {row['records']} cocktail consumption records",
+                staff=staff
+            ))
+        summary['movements'] = StockMovement.objects.bulk_create(movements)
+
+        CocktailIngredientConsumption.objects.filter(id__in=record_ids).update(
+            is_merged_to_stocktake=True,
+            merged_at=timezone.now(),
+            merged_by=staff,
+            merged_to_stocktake=stocktake
+        )
+
+        summary['lines'] = recalculate_line_movements(
+            stocktake,
+            [lines_by_item[row['stock_item_id']] for row in per_item]
+        )
+        _bump_stocktake_exports(stocktake.id)
+
+    for row in per_item:
+        line = lines_by_item[row['stock_item_id']]
+        value = row['value'] or Decimal('0')
+        summary['total_items_merged'] += row['records']
+        summary['total_quantity_merged'] += row['quantity']
+        summary['total_value_merged'] += value
+        summary['details'].append({
+            'line_id': line.id,
+            'item_sku': line.item.sku,
+            'item_name': line.item.name,
+            'quantity_merged': str(row['quantity']),
+            'value_merged': str(value),
+            'records_merged': row['records']
+        })
+    return summary
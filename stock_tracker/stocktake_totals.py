@@ -0,0 +1,205 @@
+"""
+Stocktake financial totals (COGS and revenue).
+
+Stocktake.total_cogs / total_revenue combine three sources in priority
+order: the matching StockPeriod's manual amounts, manual values entered on
+lines, and Sale records. Each used to be looked up with separate queries
+on every access.
+
+The resolved totals are stored on the stocktake when its inputs are
+written: signals (signals.py) mark them stale when lines, sales or the
+period's manual amounts change and store_financial_totals recalculates
+them once the transaction commits (approval stores them too). Reads only
+use the stored columns; a stocktake without stored totals (never
+calculated, or a recalculation lost to a concurrent change) has them
+computed from every input in one query (correlated subqueries, so a list
+can be loaded in bulk with prefetch_financial_totals) without writing
+anything. totals_version guards against storing totals computed from data
+that changed while they were being calculated.
+"""
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum
+from django.utils import timezone
+
+from common.concurrency import on_commit_once
+
+from .models import Sale, StockPeriod, Stocktake, StocktakeLine
+
+MONEY = DecimalField(max_digits=15, decimal_places=2)
+
+# Annotations holding the inputs of the totals
+TOTAL_INPUTS = (
+    'fin_line_purchases',
+    'fin_line_waste',
+    'fin_line_sales',
+    'fin_sale_cost',
+    'fin_sale_revenue',
+    'fin_period_purchases',
+    'fin_period_sales',
+)
+
+
+def _child_sum(model, field):
+    return Subquery(
+        model.objects.filter(stocktake=OuterRef('pk'))
+        .order_by()
+        .values('stocktake')
+        .annotate(total=Sum(field))
+        .values('total')[:1],
+        output_field=MONEY,
+    )
+
+
+def _period_value(field):
+    return Subquery(
+        StockPeriod.objects.filter(
+            hotel=OuterRef('hotel'),
+            start_date=OuterRef('period_start'),
+            end_date=OuterRef('period_end'),
+        ).values(field)[:1],
+        output_field=MONEY,
+    )
+
+
+def annotate_financial_totals(queryset):
+    """
+    Annotate a Stocktake queryset with every input of the financial totals.
+
+    Stocktakes loaded from the annotated queryset compute missing totals
+    without further queries.
+    """
+    return queryset.annotate(
+        fin_line_purchases=_child_sum(StocktakeLine, 'manual_purchases_value'),
+        fin_line_waste=_child_sum(StocktakeLine, 'manual_waste_value'),
+        fin_line_sales=_child_sum(StocktakeLine, 'manual_sales_value'),
+        fin_sale_cost=_child_sum(Sale, 'total_cost'),
+        fin_sale_revenue=_child_sum(Sale, 'total_revenue'),
+        fin_period_purchases=_period_value('manual_purchases_amount'),
+        fin_period_sales=_period_value('manual_sales_amount'),
+    )
+
+
+def prefetch_financial_totals(stocktakes):
+    """
+    Load the inputs of every stocktake lacking stored totals in one query.
+
+    Stocktakes with stored totals (the usual case) cost nothing; the rest
+    then compute theirs without a query each.
+
+    Returns:
+        The given stocktakes
+    """
+    missing = [
+        stocktake for stocktake in stocktakes
+        if stocktake.totals_calculated_at is None
+        and not hasattr(stocktake, TOTAL_INPUTS[0])
+    ]
+    if missing:
+        rows = annotate_financial_totals(
+            Stocktake.objects.filter(pk__in=[stocktake.pk for stocktake in missing])
+        ).values('pk', *TOTAL_INPUTS)
+        inputs = {row['pk']: row for row in rows}
+        for stocktake in missing:
+            for name in TOTAL_INPUTS:
+                setattr(stocktake, name, inputs.get(stocktake.pk, {}).get(name))
+    return stocktakes
+
+
+def resolve_financial_totals(inputs):
+    """
+    Apply the COGS / revenue priority rules to the annotated inputs.
+
+    COGS: period manual_purchases_amount, else line manual purchases + waste
+    (if > 0), else Sale total_cost.
+    Revenue: line manual sales (if > 0), else period manual_sales_amount,
+    else Sale total_revenue.
+
+    Returns:
+        dict: total_cogs, total_revenue
+    """
+    if inputs['fin_period_purchases'] is not None:
+        cogs = inputs['fin_period_purchases']
+    else:
+        cogs = (inputs['fin_line_purchases'] or 0) + (inputs['fin_line_waste'] or 0)
+        if not cogs > 0:
+            cogs = inputs['fin_sale_cost'] or 0
+
+    revenue = inputs['fin_line_sales']
+    if not (revenue and revenue > 0):
+        if inputs['fin_period_sales'] is not None:
+            revenue = inputs['fin_period_sales']
+        else:
+            revenue = inputs['fin_sale_revenue'] or 0
+
+    return {'total_cogs': cogs, 'total_revenue': revenue}
+
+
+def get_financial_totals(stocktake):
+    """
+    Totals of a stocktake: the stored ones, else computed without storing.
+
+    Args:
+        stocktake: Stocktake instance (optionally from an annotated queryset
+            or prefetch_financial_totals)
+
+    Returns:
+        dict: total_cogs, total_revenue
+    """
+    if stocktake.totals_calculated_at is not None:
+        return {
+            'total_cogs': stocktake.cached_total_cogs,
+            'total_revenue': stocktake.cached_total_revenue,
+        }
+
+    totals = getattr(stocktake, '_computed_totals', None)
+    if totals is None:
+        if all(hasattr(stocktake, name) for name in TOTAL_INPUTS):
+            inputs = {name: getattr(stocktake, name) for name in TOTAL_INPUTS}
+        else:
+            inputs = annotate_financial_totals(
+                Stocktake.objects.filter(pk=stocktake.pk)
+            ).values(*TOTAL_INPUTS).get()
+        totals = stocktake._computed_totals = resolve_financial_totals(inputs)
+    return totals
+
+
+def store_financial_totals(**filters):
+    """
+    Calculate and store the totals of matching stocktakes.
+
+    One read for all of them, then one UPDATE each. A stocktake changed
+    again since the read keeps its stale mark; the change scheduled its own
+    recalculation.
+
+    Args:
+        **filters: Stocktake lookups, as for invalidate_financial_totals
+    """
+    rows = annotate_financial_totals(Stocktake.objects.filter(**filters)).values(
+        'pk', 'totals_version', *TOTAL_INPUTS
+    )
+    calculated_at = timezone.now()
+    for row in rows:
+        totals = resolve_financial_totals(row)
+        Stocktake.objects.filter(pk=row['pk'], totals_version=row['totals_version']).update(
+            cached_total_cogs=totals['total_cogs'],
+            cached_total_revenue=totals['total_revenue'],
+            totals_calculated_at=calculated_at,
+        )
+
+
+def invalidate_financial_totals(**filters):
+    """
+    Mark the stored totals of matching stocktakes stale and recalculate
+    them once the transaction commits (once per commit for a bulk edit).
+
+    Args:
+        **filters: Stocktake lookups, e.g. pk=... or hotel_id=...,
+            period_start=..., period_end=...
+    """
+    Stocktake.objects.filter(**filters).update(
+        totals_calculated_at=None,
+        totals_version=F('totals_version') + 1,
+    )
+    on_commit_once(
+        ('stocktake_totals', tuple(sorted(filters.items()))),
+        lambda: store_financial_totals(**filters),
+    )
@@ -0,0 +1,149 @@
+"""
+Tests for the columnar stock analytics (stock_tracker/analytics_frames.py).
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+
+from hotel.models import Hotel
+from . import analytics_frames
+from .models import StockCategory, StockItem, StockPeriod, StockSnapshot
+
+
+class AnalyticsFrameTests(TestCase):
+
+    def setUp(self):
+        self.hotel = Hotel.objects.create(name='Frames Hotel', slug='frames-hotel')
+        self.spirits, _ = StockCategory.objects.get_or_create(
+            code='S', defaults={'name': 'Spirits'}
+        )
+        self.wine, _ = StockCategory.objects.get_or_create(
+            code='W', defaults={'name': 'Wine'}
+        )
+        self.gin = self._item('S0001', 'Gin', self.spirits)
+        self.rum = self._item('S0002', 'Rum', self.spirits)
+        self.merlot = self._item('W0001', 'Merlot', self.wine)
+
+        self.periods = [
+            StockPeriod.objects.create(
+                hotel=self.hotel,
+                period_type=StockPeriod.MONTHLY,
+                start_date=date(2025, month, 1),
+                end_date=date(2025, month, 28),
+                year=2025,
+                month=month,
+                is_closed=True,
+            )
+            for month in (1, 2, 3, 4)
+        ]
+        values = {
+            self.gin: ['100.00', '100.00', '200.00', '200.00'],
+            self.rum: ['50.10', '50.10', '50.10', None],
+            self.merlot: [None, '30.00', '20.00', '10.00'],
+        }
+        for item, item_values in values.items():
+            for period, value in zip(self.periods, item_values):
+                if value is not None:
+                    self._snapshot(item, period, Decimal(value))
+
+    def _item(self, sku, name, category):
+        return StockItem.objects.create(
+            hotel=self.hotel,
+            sku=sku,
+            name=name,
+            category=category,
+            size='70cl',
+            size_value=Decimal('70'),
+            size_unit='cl',
+            uom=Decimal('20'),
+            unit_cost=Decimal('20.00'),
+        )
+
+    def _snapshot(self, item, period, value):
+        StockSnapshot.objects.create(
+            hotel=self.hotel,
+            item=item,
+            period=period,
+            closing_full_units=Decimal('1'),
+            closing_partial_units=Decimal('0'),
+            unit_cost=Decimal('20.00'),
+            cost_per_serving=Decimal('1.00'),
+            closing_stock_value=value,
+        )
+
+    def test_trend_items_direction_volatility_and_order(self):
+        frame = analytics_frames.load_item_frame(self.periods)
+
+        items = analytics_frames.trend_items(frame, self.periods)
+
+        # Latest period first (gin, merlot), then rum which stops in March
+        self.assertEqual([i['sku'] for i in items], ['S0001', 'W0001', 'S0002'])
+        gin, merlot, rum = items
+        self.assertEqual(gin['trend_direction'], 'increasing')
+        self.assertEqual(gin['average_value'], 150.0)
+        self.assertEqual(gin['volatility'], 'high')
+        self.assertEqual(merlot['trend_direction'], 'decreasing')
+        self.assertEqual(rum['trend_direction'], 'stable')
+        self.assertEqual(rum['volatility'], 'low')
+        self.assertEqual(
+            [row['period_id'] for row in gin['trend_data']],
+            sorted(p.id for p in self.periods),
+        )
+
+        wine_only = analytics_frames.trend_items(
+            frame, self.periods, category_code='W'
+        )
+        self.assertEqual([i['sku'] for i in wine_only], ['W0001'])
+        self.assertEqual(
+            analytics_frames.trend_items(frame, self.periods, item_ids=[]), []
+        )
+
+    def test_top_movers(self):
+        first, second = self.periods[0], self.periods[3]
+        frame = analytics_frames.load_item_frame([first, second])
+
+        movers = analytics_frames.top_movers(frame, first.id, second.id)
+
+        self.assertEqual(len(movers['biggest_increases']), 1)
+        increase = movers['biggest_increases'][0]
+        self.assertEqual(increase['sku'], 'S0001')
+        self.assertEqual(increase['absolute_change'], 100.0)
+        self.assertEqual(increase['percentage_change'], 100.0)
+        self.assertEqual(increase['reason'], 'stock_buildup')
+        self.assertEqual(movers['biggest_decreases'], [])
+        self.assertEqual([i['sku'] for i in movers['new_items']], ['W0001'])
+        self.assertEqual(movers['discontinued_items'][0]['last_value'], 50.1)
+
+    def test_variance_heatmap(self):
+        frame = analytics_frames.load_category_frame(self.periods)
+
+        cells = analytics_frames.variance_heatmap(frame, self.periods, ['S', 'W'])
+
+        self.assertEqual(len(cells), 8)
+        self.assertEqual(cells[0], [0, 0, 0, 'low'])
+        # March spirits: 150.10 -> 250.10
+        self.assertEqual(cells[4], [2, 0, 66.62, 'high'])
+        # February wine has no previous value
+        self.assertEqual(cells[3], [1, 1, 0, 'low'])
+        self.assertEqual(cells[5], [2, 1, -33.33, 'high'])
+
+    def test_periods_without_facts(self):
+        empty = StockPeriod.objects.create(
+            hotel=self.hotel,
+            period_type=StockPeriod.MONTHLY,
+            start_date=date(2025, 6, 1),
+            end_date=date(2025, 6, 30),
+            year=2025,
+            month=6,
+        )
+        frame = analytics_frames.load_item_frame([empty])
+
+        self.assertEqual(analytics_frames.trend_items(frame, [empty]), [])
+        movers = analytics_frames.top_movers(frame, empty.id, empty.id)
+        self.assertEqual(movers['biggest_increases'], [])
+        self.assertEqual(movers['new_items'], [])
+        cells = analytics_frames.variance_heatmap(
+            analytics_frames.load_category_frame([empty]), [empty], ['S']
+        )
+        self.assertEqual(cells, [[0, 0, 0, 'low']])
@@ -0,0 +1,151 @@
+"""
+Tests for bulk stocktake movement / sale entry (stock_tracker/stocktake_service.py).
+"""
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from chat.utils import PUSHER_MESSAGE_LIMIT, payload_size
+from hotel.models import Hotel
+from .models import (
+    Sale,
+    StockCategory,
+    StockItem,
+    StockMovement,
+    Stocktake,
+    StocktakeLine,
+)
+from .pusher_utils import broadcast_bulk_lines_updated
+from .stock_serializers import StocktakeLineSerializer
+from .stocktake_service import add_line_movements, bulk_insert_sales
+
+
+class BulkEntryTests(TestCase):
+    """Movements are validated up front, inserted in bulk, lines recalculated once."""
+
+    def setUp(self):
+        self.hotel = Hotel.objects.create(name='Bulk Hotel', slug='bulk-hotel')
+        draught, _ = StockCategory.objects.get_or_create(
+            code='D', defaults={'name': 'Draught Beer'}
+        )
+        spirits, _ = StockCategory.objects.get_or_create(
+            code='S', defaults={'name': 'Spirits'}
+        )
+        self.lager = self._item('D0001', 'Lager', draught, '50L', Decimal('88'))
+        self.gin = self._item('S0001', 'Gin', spirits, '70cl', Decimal('1'))
+
+        self.stocktake = Stocktake.objects.create(
+            hotel=self.hotel,
+            period_start=date(2025, 1, 1),
+            period_end=date(2025, 1, 31),
+        )
+        self.lager_line = self._line(self.lager)
+        self.gin_line = self._line(self.gin)
+
+    def _item(self, sku, name, category, size, uom):
+        return StockItem.objects.create(
+            hotel=self.hotel,
+            sku=sku,
+            name=name,
+            category=category,
+            size=size,
+            size_value=Decimal('50'),
+            size_unit='L',
+            uom=uom,
+            unit_cost=Decimal('20.00'),
+        )
+
+    def _line(self, item):
+        return StocktakeLine.objects.create(
+            stocktake=self.stocktake,
+            item=item,
+            opening_qty=Decimal('0'),
+            valuation_cost=Decimal('1.00'),
+        )
+
+    def test_docket_is_inserted_and_lines_recalculated(self):
+        result = add_line_movements(self.stocktake, [
+            {'sku': 'D0001', 'movement_type': 'PURCHASE', 'quantity': 2},
+            {'line_id': self.lager_line.id, 'movement_type': 'WASTE', 'quantity': '10'},
+            {'sku': 'S0001', 'movement_type': 'PURCHASE', 'quantity': '3'},
+            {'sku': 'S0001', 'movement_type': 'PURCHASE', 'quantity': 1},
+        ])
+
+        self.assertEqual(result['errors'], [])
+        self.assertEqual(len(result['movements']), 4)
+        self.assertEqual(len(result['lines']), 2)
+
+        self.lager_line.refresh_from_db()
+        self.gin_line.refresh_from_db()
+        # 2 kegs x 88 pints
+        self.assertEqual(self.lager_line.purchases, Decimal('176'))
+        self.assertEqual(self.lager_line.waste, Decimal('10'))
+        self.assertEqual(self.gin_line.purchases, Decimal('4'))
+
+        # Period is over, so movements are dated at its end
+        timestamps = set(
+            StockMovement.objects.values_list('timestamp', flat=True)
+        )
+        self.assertEqual(len(timestamps), 1)
+        self.assertEqual(timestamps.pop().date(), date(2025, 1, 31))
+
+    def test_invalid_entry_writes_nothing(self):
+        result = add_line_movements(self.stocktake, [
+            {'sku': 'D0001', 'movement_type': 'PURCHASE', 'quantity': 2},
+            {'sku': 'D0001', 'movement_type': 'PURCHASE', 'quantity': '1.5'},
+            {'sku': 'S0001', 'movement_type': 'WASTE', 'quantity': 2},
+            {'sku': 'X9999', 'movement_type': 'PURCHASE', 'quantity': 1},
+        ])
+
+        self.assertEqual([error['index'] for error in result['errors']], [1, 2, 3])
+        self.assertIn('full kegs', result['errors'][0]['error'])
+        self.assertFalse(StockMovement.objects.exists())
+
+    def test_bulk_sales_invalidate_stocktake_totals(self):
+        self.assertEqual(self.stocktake.total_cogs, 0)
+
+        bulk_insert_sales([
+            Sale(
+                stocktake=self.stocktake,
+                item=self.gin,
+                quantity=Decimal('10'),
+                unit_cost=Decimal('1.00'),
+                total_cost=Decimal('10.00'),
+                sale_date=date(2025, 1, 31),
+            )
+        ])
+
+        stocktake = Stocktake.objects.get(pk=self.stocktake.pk)
+        self.assertIsNone(stocktake.totals_calculated_at)
+        self.assertEqual(stocktake.total_cogs, Decimal('10.00'))
+
+    def test_large_batch_event_fits_pusher_message_limit(self):
+        spirits = self.gin.category
+        items = [
+            self._item(f'S1{n:03d}', f'Spirit number {n}', spirits, '70cl', Decimal('1'))
+            for n in range(80)
+        ]
+        for item in items:
+            self._line(item)
+        result = add_line_movements(self.stocktake, [
+            {'sku': item.sku, 'movement_type': 'PURCHASE', 'quantity': 2}
+            for item in items
+        ])
+        lines_data = StocktakeLineSerializer(result['lines'], many=True).data
+
+        with patch('stock_tracker.pusher_utils.pusher_client') as pusher:
+            sent = broadcast_bulk_lines_updated(
+                self.hotel.slug, self.stocktake.id,
+                {'movements_created': 80, 'sales_created': 0, 'lines': lines_data}
+            )
+
+        self.assertTrue(sent)
+        payloads = [call.args[2] for call in pusher.trigger.call_args_list]
+        for payload in payloads:
+            self.assertLessEqual(payload_size(payload), PUSHER_MESSAGE_LIMIT)
+            self.assertEqual(payload['chunks'], len(payloads))
+        sent_lines = [line for payload in payloads for line in payload['lines']]
+        self.assertEqual(len(sent_lines), 80)
+        self.assertEqual(sent_lines[0]['purchases'], '2.0000')
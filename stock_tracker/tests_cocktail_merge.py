@@ -0,0 +1,124 @@
+"""
+Tests for cocktail consumption records and the set-based stocktake merge.
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+
+from hotel.models import Hotel
+from .models import (
+    CocktailConsumption,
+    CocktailIngredientConsumption,
+    CocktailRecipe,
+    Ingredient,
+    RecipeIngredient,
+    StockCategory,
+    StockItem,
+    StockMovement,
+    Stocktake,
+    StocktakeLine,
+)
+from .stocktake_service import merge_cocktail_consumption
+
+
+class CocktailMergeTests(TestCase):
+    """Consumption rows are bulk-created and merged per item in one pass."""
+
+    def setUp(self):
+        self.hotel = Hotel.objects.create(name='Cocktail Hotel', slug='cocktail-hotel')
+        spirits, _ = StockCategory.objects.get_or_create(
+            code='S', defaults={'name': 'Spirits'}
+        )
+        self.gin = StockItem.objects.create(
+            hotel=self.hotel,
+            sku='S0001',
+            name='Gin',
+            category=spirits,
+            size='70cl',
+            size_value=Decimal('70'),
+            size_unit='cl',
+            uom=Decimal('20'),
+            unit_cost=Decimal('20.00'),
+        )
+        gin = Ingredient.objects.create(
+            name='Gin', unit='ml', hotel=self.hotel, linked_stock_item=self.gin
+        )
+        lime = Ingredient.objects.create(name='Lime', unit='wedge', hotel=self.hotel)
+        self.recipe = CocktailRecipe.objects.create(
+            name='Gimlet', hotel=self.hotel, price=Decimal('9.00')
+        )
+        RecipeIngredient.objects.create(
+            cocktail=self.recipe, ingredient=gin, quantity_per_cocktail=50
+        )
+        RecipeIngredient.objects.create(
+            cocktail=self.recipe, ingredient=lime, quantity_per_cocktail=1
+        )
+
+        self.stocktake = Stocktake.objects.create(
+            hotel=self.hotel,
+            period_start=date(2025, 1, 1),
+            period_end=date(2025, 1, 31),
+        )
+        self.line = StocktakeLine.objects.create(
+            stocktake=self.stocktake,
+            item=self.gin,
+            opening_qty=Decimal('0'),
+            valuation_cost=Decimal('1.00'),
+        )
+
+    def _make(self, quantity):
+        consumption = CocktailConsumption.objects.create(
+            cocktail=self.recipe, quantity_made=quantity, hotel=self.hotel
+        )
+        # timestamp is auto_now_add; move it into the stocktake window
+        CocktailIngredientConsumption.objects.filter(
+            cocktail_consumption=consumption
+        ).update(timestamp='2025-01-15T12:00:00Z')
+        return consumption
+
+    def test_consumption_creates_one_record_per_ingredient(self):
+        consumption = self._make(4)
+
+        records = {
+            record.ingredient.name: record
+            for record in consumption.ingredient_consumptions.all()
+        }
+        self.assertEqual(set(records), {'Gin', 'Lime'})
+        self.assertEqual(records['Gin'].quantity_used, Decimal('200'))
+        self.assertEqual(records['Gin'].stock_item, self.gin)
+        self.assertIsNone(records['Lime'].stock_item)
+
+    def test_merge_aggregates_per_item_and_flags_records(self):
+        self._make(4)
+        self._make(2)
+
+        result = merge_cocktail_consumption(self.stocktake)
+
+        self.assertEqual(result['total_items_merged'], 2)
+        self.assertEqual(result['total_quantity_merged'], Decimal('300'))
+        self.assertEqual([line.id for line in result['lines']], [self.line.id])
+
+        movement = StockMovement.objects.get()
+        self.assertEqual(movement.movement_type, StockMovement.COCKTAIL_CONSUMPTION)
+        self.assertEqual(movement.quantity, Decimal('300'))
+        self.assertFalse(
+            CocktailIngredientConsumption.objects.filter(
+                stock_item=self.gin, is_merged_to_stocktake=False
+            ).exists()
+        )
+        self.assertEqual(
+            CocktailIngredientConsumption.objects.filter(
+                merged_to_stocktake=self.stocktake
+            ).count(),
+            2,
+        )
+
+    def test_merge_again_is_a_no_op(self):
+        self._make(1)
+        merge_cocktail_consumption(self.stocktake)
+
+        result = merge_cocktail_consumption(self.stocktake)
+
+        self.assertEqual(result['total_items_merged'], 0)
+        self.assertEqual(StockMovement.objects.count(), 1)
@@ -0,0 +1,200 @@
+"""
+Tests for cached stocktake / period export jobs (stock_tracker/export_jobs.py).
+
+Artifacts are written to a temporary MEDIA_ROOT.
+"""
+import shutil
+import tempfile
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+
+from hotel.models import Hotel
+from .export_jobs import (
+    PENDING,
+    READY,
+    build_export_spec,
+    get_export_content,
+    get_export_job,
+    get_or_build_export,
+    request_export,
+)
+from .models import (
+    StockCategory,
+    StockItem,
+    StockPeriod,
+    StockSnapshot,
+    Stocktake,
+    StocktakeLine,
+)
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    MEDIA_ROOT=MEDIA_ROOT,
+    STOCK_EXPORT_ASYNC=False,
+)
+class ExportJobTests(TestCase):
+    """Exports are stored per content version and served through jobs."""
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.hotel = Hotel.objects.create(name='Export Hotel', slug='export-hotel')
+        spirits, _ = StockCategory.objects.get_or_create(
+            code='S', defaults={'name': 'Spirits'}
+        )
+        self.gin = StockItem.objects.create(
+            hotel=self.hotel,
+            sku='S0001',
+            name='Gin',
+            category=spirits,
+            size='70cl',
+            size_value=Decimal('70'),
+            size_unit='cl',
+            uom=Decimal('20'),
+            unit_cost=Decimal('20.00'),
+        )
+        self.period = StockPeriod.objects.create(
+            hotel=self.hotel,
+            period_type=StockPeriod.MONTHLY,
+            start_date=date(2025, 1, 1),
+            end_date=date(2025, 1, 31),
+            year=2025,
+            month=1,
+        )
+        self.snapshot = StockSnapshot.objects.create(
+            hotel=self.hotel,
+            item=self.gin,
+            period=self.period,
+            closing_full_units=Decimal('2'),
+            closing_partial_units=Decimal('0.5'),
+            unit_cost=Decimal('20.00'),
+            cost_per_serving=Decimal('1.00'),
+            closing_stock_value=Decimal('50.00'),
+        )
+        self.stocktake = Stocktake.objects.create(
+            hotel=self.hotel,
+            period_start=date(2025, 1, 1),
+            period_end=date(2025, 1, 31),
+        )
+        self.line = StocktakeLine.objects.create(
+            stocktake=self.stocktake,
+            item=self.gin,
+            opening_qty=Decimal('40'),
+            counted_full_units=Decimal('2'),
+            counted_partial_units=Decimal('0'),
+            valuation_cost=Decimal('1.00'),
+        )
+
+    def test_request_export_generates_and_reuses_job(self):
+        spec = build_export_spec('stocktake_excel', self.hotel, stocktake=self.stocktake)
+
+        job = request_export(spec)
+
+        self.assertEqual(job['status'], READY)
+        self.assertTrue(get_export_content(job).startswith(b'PK'))
+        self.assertEqual(request_export(spec)['job_id'], job['job_id'])
+        self.assertEqual(get_export_job(job['job_id'])['status'], READY)
+
+    def test_pdf_exports_are_generated(self):
+        for kind, kwargs in [
+            ('stocktake_pdf', {'stocktake': self.stocktake}),
+            ('period_pdf', {'period': self.period}),
+        ]:
+            job = request_export(build_export_spec(kind, self.hotel, **kwargs))
+            self.assertEqual(job['status'], READY, job.get('error'))
+            self.assertTrue(get_export_content(job).startswith(b'%PDF'))
+
+    def test_line_change_invalidates_stocktake_export(self):
+        spec = build_export_spec('stocktake_pdf', self.hotel, stocktake=self.stocktake)
+
+        self.line.counted_full_units = Decimal('3')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.line.save()
+
+        changed = build_export_spec('stocktake_pdf', self.hotel, stocktake=self.stocktake)
+        self.assertNotEqual(changed['job_id'], spec['job_id'])
+
+    def test_new_versions_replace_the_stored_artifact(self):
+        spec = build_export_spec('stocktake_excel', self.hotel, stocktake=self.stocktake)
+        get_or_build_export(spec)
+        self.assertTrue(default_storage.exists(spec['artifact_path']))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.line.save()
+        # Versions live in the database, not the cache
+        cache.clear()
+        changed = build_export_spec('stocktake_excel', self.hotel, stocktake=self.stocktake)
+        self.assertNotEqual(changed['artifact_path'], spec['artifact_path'])
+
+        get_or_build_export(changed)
+        self.assertTrue(default_storage.exists(changed['artifact_path']))
+        self.assertFalse(default_storage.exists(spec['artifact_path']))
+
+    def test_snapshot_change_invalidates_period_export_only(self):
+        period_spec = build_export_spec('period_excel', self.hotel, period=self.period)
+        stocktake_spec = build_export_spec(
+            'stocktake_excel', self.hotel, stocktake=self.stocktake
+        )
+
+        self.snapshot.closing_stock_value = Decimal('60.00')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.snapshot.save()
+
+        self.assertNotEqual(
+            build_export_spec('period_excel', self.hotel, period=self.period)['job_id'],
+            period_spec['job_id'],
+        )
+        self.assertEqual(
+            build_export_spec(
+                'stocktake_excel', self.hotel, stocktake=self.stocktake
+            )['job_id'],
+            stocktake_spec['job_id'],
+        )
+
+    def test_ready_job_with_missing_artifact_is_built_again(self):
+        spec = build_export_spec('stocktake_excel', self.hotel, stocktake=self.stocktake)
+        job = request_export(spec)
+        # Job state is shared, the file is not (another dyno, a restart)
+        default_storage.delete(job['artifact_path'])
+
+        job = get_export_job(job['job_id'])
+
+        self.assertEqual(job['status'], READY)
+        self.assertTrue(get_export_content(job).startswith(b'PK'))
+
+    def test_missing_artifact_is_requeued_when_async(self):
+        spec = build_export_spec('stocktake_excel', self.hotel, stocktake=self.stocktake)
+        job = request_export(spec)
+        default_storage.delete(job['artifact_path'])
+
+        with self.settings(STOCK_EXPORT_ASYNC=True), \
+                patch('stock_tracker.export_jobs._export_queue') as export_queue:
+            job = get_export_job(job['job_id'])
+
+        self.assertEqual(job['status'], PENDING)
+        export_queue.put_on_commit.assert_called_once_with(job['job_id'])
+
+    def test_bulk_item_edits_bump_the_hotel_version_once(self):
+        with patch('stock_tracker.export_jobs.bump_content_version') as bump:
+            with self.captureOnCommitCallbacks(execute=True):
+                for cost in ('21.00', '22.00', '23.00'):
+                    self.gin.unit_cost = Decimal(cost)
+                    self.gin.save()
+
+        self.assertEqual(
+            [call.args for call in bump.call_args_list].count(('hotel', self.hotel.id)),
+            1,
+        )
@@ -0,0 +1,248 @@
+"""
+Tests for the pre-aggregated period fact tables (stock_tracker/period_facts.py).
+"""
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from hotel.models import Hotel
+from .models import (
+    StockCategory,
+    StockItem,
+    StockMovement,
+    StockPeriod,
+    StockPeriodCategoryFact,
+    StockPeriodItemFact,
+    StockSnapshot,
+)
+from .period_facts import (
+    build_period_facts,
+    get_category_facts,
+    get_item_facts,
+    period_totals,
+)
+
+
+class PeriodFactTests(TestCase):
+    """Facts are built on close and after edits, never on read."""
+
+    def setUp(self):
+        self.hotel = Hotel.objects.create(name='Facts Hotel', slug='facts-hotel')
+        self.spirits, _ = StockCategory.objects.get_or_create(
+            code='S', defaults={'name': 'Spirits'}
+        )
+        self.wine, _ = StockCategory.objects.get_or_create(
+            code='W', defaults={'name': 'Wine'}
+        )
+        self.gin = self._item('S0001', 'Gin', self.spirits)
+        self.vodka = self._item('S0002', 'Vodka', self.spirits)
+        self.merlot = self._item('W0001', 'Merlot', self.wine)
+
+        self.period = StockPeriod.objects.create(
+            hotel=self.hotel,
+            period_type=StockPeriod.MONTHLY,
+            start_date=date(2025, 1, 1),
+            end_date=date(2025, 1, 31),
+            year=2025,
+            month=1,
+        )
+
+        self._snapshot(self.gin, Decimal('100.00'), menu_price=Decimal('5.00'))
+        self._snapshot(self.vodka, Decimal('50.00'))
+        self._snapshot(self.merlot, Decimal('30.00'))
+
+        for item, movement_type, quantity, unit_cost in [
+            (self.gin, StockMovement.PURCHASE, Decimal('10'), Decimal('2.00')),
+            (self.gin, StockMovement.WASTE, Decimal('1'), Decimal('2.00')),
+            (self.merlot, StockMovement.PURCHASE, Decimal('4'), Decimal('5.00')),
+        ]:
+            movement = StockMovement.objects.create(
+                hotel=self.hotel,
+                item=item,
+                period=self.period,
+                movement_type=movement_type,
+                quantity=quantity,
+                unit_cost=unit_cost,
+            )
+            # timestamp is auto_now_add; move it into the period window
+            StockMovement.objects.filter(pk=movement.pk).update(
+                timestamp='2025-01-15T12:00:00Z'
+            )
+
+    def _item(self, sku, name, category):
+        return StockItem.objects.create(
+            hotel=self.hotel,
+            sku=sku,
+            name=name,
+            category=category,
+            size='70cl',
+            size_value=Decimal('70'),
+            size_unit='cl',
+            uom=Decimal('20'),
+            unit_cost=Decimal('20.00'),
+        )
+
+    def _snapshot(self, item, value, menu_price=None):
+        return StockSnapshot.objects.create(
+            hotel=self.hotel,
+            item=item,
+            period=self.period,
+            closing_full_units=Decimal('1'),
+            closing_partial_units=Decimal('0'),
+            unit_cost=Decimal('20.00'),
+            cost_per_serving=Decimal('1.00'),
+            closing_stock_value=value,
+            menu_price=menu_price,
+        )
+
+    def _close(self):
+        self.period.is_closed = True
+        with self.captureOnCommitCallbacks(execute=True):
+            self.period.save()
+        self.period.refresh_from_db()
+
+    def _stored(self):
+        return StockPeriodItemFact.objects.filter(period=self.period)
+
+    def test_build_rolls_items_up_to_categories(self):
+        item_facts, category_facts = build_period_facts(self.period)
+
+        self.assertEqual(len(item_facts), 3)
+        by_code = {fact.category_id: fact for fact in category_facts}
+        self.assertEqual(by_code['S'].item_count, 2)
+        self.assertEqual(by_code['S'].closing_stock_value, Decimal('150.00'))
+        self.assertEqual(by_code['S'].purchases_value, Decimal('20'))
+        self.assertEqual(by_code['S'].waste_value, Decimal('2'))
+        self.assertEqual(by_code['S'].average_gp_percentage, Decimal('80'))
+
+        totals = period_totals(category_facts)
+        self.assertEqual(totals['closing_stock_value'], Decimal('180.00'))
+        self.assertEqual(totals['purchases_value'], Decimal('40'))
+        self.assertEqual(totals['item_count'], 3)
+
+    def test_open_period_facts_are_not_stored(self):
+        facts = get_category_facts([self.period])
+
+        self.assertEqual(set(facts[self.period.id]), {'S', 'W'})
+        self.assertFalse(StockPeriodCategoryFact.objects.exists())
+
+    def test_closing_stores_facts_and_reads_skip_raw_tables(self):
+        self._close()
+
+        self.assertEqual(self._stored().count(), 3)
+        self.assertIsNotNone(self.period.facts_built_at)
+        # Only the fact rows
+        with self.assertNumQueries(1):
+            facts = get_item_facts([self.period])
+        self.assertEqual(
+            facts[self.period.id][self.gin.id].closing_stock_value,
+            Decimal('100.00'),
+        )
+
+    def test_reopening_drops_facts(self):
+        self._close()
+
+        self.period.is_closed = False
+        self.period.save()
+
+        self.assertFalse(
+            StockPeriodCategoryFact.objects.filter(period=self.period).exists()
+        )
+        self.period.refresh_from_db()
+        self.assertIsNone(self.period.facts_built_at)
+
+    def test_closed_period_without_facts_is_read_without_writing(self):
+        StockPeriod.objects.filter(pk=self.period.pk).update(is_closed=True)
+        self.period.refresh_from_db()
+
+        facts = get_category_facts([self.period])
+
+        self.assertEqual(
+            facts[self.period.id]['W'].closing_stock_value, Decimal('30.00')
+        )
+        self.assertFalse(StockPeriodCategoryFact.objects.exists())
+
+        call_command('build_period_facts', stdout=StringIO())
+        self.period.refresh_from_db()
+        self.assertIsNotNone(self.period.facts_built_at)
+        self.assertEqual(
+            StockPeriodCategoryFact.objects.filter(period=self.period).count(), 2
+        )
+
+    def test_empty_closed_period_is_built_once(self):
+        StockSnapshot.objects.filter(period=self.period).delete()
+        StockMovement.objects.all().delete()
+        self._close()
+
+        self.assertIsNotNone(self.period.facts_built_at)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_category_facts([self.period]), {self.period.id: {}})
+
+    def test_failed_rebuild_does_not_fail_the_close(self):
+        with patch(
+            'stock_tracker.period_facts.rebuild_period_facts',
+            side_effect=RuntimeError('boom'),
+        ), self.assertLogs('stock_tracker.period_facts', level='ERROR'):
+            self._close()
+
+        self.assertFalse(self._stored().exists())
+        self.assertIsNone(self.period.facts_built_at)
+        facts = get_item_facts([self.period])
+        self.assertEqual(len(facts[self.period.id]), 3)
+        self.assertFalse(self._stored().exists())
+
+    def test_snapshot_edit_on_closed_period_rebuilds_facts(self):
+        self._close()
+        snapshot = StockSnapshot.objects.get(period=self.period, item=self.gin)
+
+        snapshot.closing_stock_value = Decimal('120.00')
+        with self.captureOnCommitCallbacks(execute=True):
+            snapshot.save()
+            # Stale until the edit commits: reads aggregate in memory
+            self.period.refresh_from_db()
+            self.assertIsNone(self.period.facts_built_at)
+
+        self.assertEqual(
+            self._stored().get(item=self.gin).closing_stock_value, Decimal('120.00')
+        )
+
+    def test_movement_edit_on_closed_period_rebuilds_facts(self):
+        self._close()
+        movement = StockMovement.objects.get(
+            item=self.merlot, movement_type=StockMovement.PURCHASE
+        )
+
+        movement.quantity = Decimal('6')
+        with self.captureOnCommitCallbacks(execute=True):
+            movement.save()
+
+        self.assertEqual(
+            self._stored().get(item=self.merlot).purchases_value, Decimal('30')
+        )
+
+    def test_item_category_change_rebuilds_facts(self):
+        self._close()
+
+        # The category follows the SKU prefix
+        self.merlot.sku = 'S0003'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.merlot.save()
+
+        categories = StockPeriodCategoryFact.objects.filter(period=self.period)
+        self.assertEqual(list(categories.values_list('category_id', flat=True)), ['S'])
+        self.assertEqual(categories.get().item_count, 3)
+
+    def test_unrelated_item_edit_keeps_facts(self):
+        self._close()
+        built_at = self.period.facts_built_at
+
+        self.gin.name = 'London Gin'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.gin.save()
+
+        self.period.refresh_from_db()
+        self.assertEqual(self.period.facts_built_at, built_at)
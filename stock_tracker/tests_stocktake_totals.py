@@ -0,0 +1,161 @@
+"""
+Tests for stored Stocktake financial totals (stock_tracker/stocktake_totals.py).
+"""
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from hotel.models import Hotel
+from .models import (
+    Sale,
+    StockCategory,
+    StockItem,
+    StockPeriod,
+    Stocktake,
+    StocktakeLine,
+)
+from .stocktake_totals import prefetch_financial_totals
+
+
+class StocktakeTotalsTests(TestCase):
+    """Totals follow the priority rules and are stored when inputs change."""
+
+    def setUp(self):
+        self.hotel = Hotel.objects.create(name='Totals Hotel', slug='totals-hotel')
+        spirits, _ = StockCategory.objects.get_or_create(
+            code='S', defaults={'name': 'Spirits'}
+        )
+        self.gin = StockItem.objects.create(
+            hotel=self.hotel,
+            sku='S0001',
+            name='Gin',
+            category=spirits,
+            size='70cl',
+            size_value=Decimal('70'),
+            size_unit='cl',
+            uom=Decimal('20'),
+            unit_cost=Decimal('20.00'),
+        )
+        self.stocktake = Stocktake.objects.create(
+            hotel=self.hotel,
+            period_start=date(2025, 1, 1),
+            period_end=date(2025, 1, 31),
+        )
+        self.line = StocktakeLine.objects.create(
+            stocktake=self.stocktake,
+            item=self.gin,
+            opening_qty=Decimal('40'),
+            valuation_cost=Decimal('1.00'),
+        )
+        Sale.objects.create(
+            stocktake=self.stocktake,
+            item=self.gin,
+            quantity=Decimal('10'),
+            unit_cost=Decimal('1.00'),
+            unit_price=Decimal('5.00'),
+            sale_date=date(2025, 1, 15),
+        )
+
+    def _fresh(self):
+        return Stocktake.objects.get(pk=self.stocktake.pk)
+
+    def test_reads_compute_missing_totals_without_storing(self):
+        stocktake = self._fresh()
+
+        # One read for both totals, no UPDATE
+        with self.assertNumQueries(1):
+            self.assertEqual(stocktake.total_cogs, Decimal('10.00'))
+            self.assertEqual(stocktake.total_revenue, Decimal('50.00'))
+        self.assertEqual(stocktake.gross_profit_percentage, Decimal('80.00'))
+
+        self.assertIsNone(self._fresh().totals_calculated_at)
+
+    def test_writes_store_totals_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.line.manual_purchases_value = Decimal('30.00')
+            self.line.save()
+
+        stocktake = self._fresh()
+        self.assertIsNotNone(stocktake.totals_calculated_at)
+        with self.assertNumQueries(0):
+            self.assertEqual(stocktake.total_cogs, Decimal('30.00'))
+            self.assertEqual(stocktake.pour_cost_percentage, Decimal('60.00'))
+
+    def test_bulk_edit_recalculates_once(self):
+        with patch('stock_tracker.stocktake_totals.store_financial_totals') as store:
+            with self.captureOnCommitCallbacks(execute=True):
+                for value in range(5):
+                    self.line.manual_sales_value = Decimal(value)
+                    self.line.save()
+
+        store.assert_called_once_with(pk=self.stocktake.pk)
+
+    def test_line_manual_values_invalidate_and_take_priority(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.line.save()
+        self.assertEqual(self._fresh().total_cogs, Decimal('10.00'))
+
+        self.line.manual_purchases_value = Decimal('30.00')
+        self.line.manual_sales_value = Decimal('90.00')
+        self.line.save()
+
+        stocktake = self._fresh()
+        self.assertIsNone(stocktake.totals_calculated_at)
+        self.assertEqual(stocktake.total_cogs, Decimal('30.00'))
+        self.assertEqual(stocktake.total_revenue, Decimal('90.00'))
+
+    def test_period_manual_amounts_invalidate_and_take_priority(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            StockPeriod.objects.create(
+                hotel=self.hotel,
+                period_type=StockPeriod.MONTHLY,
+                start_date=date(2025, 1, 1),
+                end_date=date(2025, 1, 31),
+                year=2025,
+                month=1,
+                manual_purchases_amount=Decimal('42.00'),
+                manual_sales_amount=Decimal('100.00'),
+            )
+
+        stocktake = self._fresh()
+        self.assertIsNotNone(stocktake.totals_calculated_at)
+        self.assertEqual(stocktake.total_cogs, Decimal('42.00'))
+        self.assertEqual(stocktake.total_revenue, Decimal('100.00'))
+
+    def test_list_computes_only_missing_totals_in_one_query(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.line.save()
+        Stocktake.objects.create(
+            hotel=self.hotel,
+            period_start=date(2025, 2, 1),
+            period_end=date(2025, 2, 28),
+        )
+        stocktakes = list(Stocktake.objects.filter(hotel=self.hotel))
+
+        with self.assertNumQueries(1):
+            prefetch_financial_totals(stocktakes)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                [stocktake.total_revenue for stocktake in stocktakes],
+                [Decimal('0'), Decimal('50.00')],
+            )
+
+    def test_saving_stale_instance_does_not_restore_old_totals(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.line.save()
+        stale = self._fresh()
+        self.assertEqual(stale.total_cogs, Decimal('10.00'))
+
+        Sale.objects.create(
+            stocktake=self.stocktake,
+            item=self.gin,
+            quantity=Decimal('5'),
+            unit_cost=Decimal('1.00'),
+            sale_date=date(2025, 1, 16),
+        )
+        stale.notes = 'Counted'
+        stale.save()
+
+        self.assertEqual(self._fresh().total_cogs, Decimal('15.00'))
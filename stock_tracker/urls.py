@@ -14,7 +14,9 @@ from .views import (
     StocktakeViewSet,
     StocktakeLineViewSet,
     SaleViewSet,
-    KPISummaryView
+    KPISummaryView,
+    StockExportJobView,
+    StockExportDownloadView
 )
 from .report_views import (
     StockValueReportView,
@@ -138,6 +140,9 @@ period_download_pdf = StockPeriodViewSet.as_view({
 period_download_excel = StockPeriodViewSet.as_view({
     'get': 'download_excel'
 })
+period_create_export = StockPeriodViewSet.as_view({
+    'post': 'create_export'
+})
 
 snapshot_list = StockSnapshotViewSet.as_view({
     'get': 'list', 'post': 'create'
@@ -197,6 +202,12 @@ stocktake_download_excel = StocktakeViewSet.as_view({
 stocktake_download_combined = StocktakeViewSet.as_view({
     'get': 'download_combined_pdf'
 })
+stocktake_create_export = StocktakeViewSet.as_view({
+    'post': 'create_export'
+})
+stocktake_bulk_entries = StocktakeViewSet.as_view({
+    'post': 'bulk_entries'
+})
 
 stocktake_line_list = StocktakeLineViewSet.as_view({
     'get': 'list'
@@ -413,6 +424,12 @@ urlpatterns = [
         period_download_excel,
         name='period-download-excel-by-date'
     ),
+    # Background exports (request, poll, download)
+    path(
+        '<str:hotel_identifier>/periods/<int:pk>/exports/',
+        period_create_export,
+        name='period-create-export'
+    ),
 
     # Stock Snapshots
     path(
@@ -537,6 +554,28 @@ urlpatterns = [
         stocktake_download_combined,
         name='stocktake-download-combined-pdf-by-date'
     ),
+    # Bulk movement / sale entry
+    path(
+        '<str:hotel_identifier>/stocktakes/<int:pk>/bulk-entries/',
+        stocktake_bulk_entries,
+        name='stocktake-bulk-entries'
+    ),
+    # Background exports (request, poll, download)
+    path(
+        '<str:hotel_identifier>/stocktakes/<int:pk>/exports/',
+        stocktake_create_export,
+        name='stocktake-create-export'
+    ),
+    path(
+        '<str:hotel_identifier>/exports/<str:job_id>/',
+        StockExportJobView.as_view(),
+        name='stock-export-job'
+    ),
+    path(
+        '<str:hotel_identifier>/exports/<str:job_id>/download/',
+        StockExportDownloadView.as_view(),
+        name='stock-export-job-download'
+    ),
 
     # Stocktake Lines
     path(
@@ -99,8 +99,8 @@ def generate_combined_report_pdf(stocktake, period, include_cocktails=True):
     elements.append(Spacer(1, 0.3 * inch))
     
     # Stocktake Summary - Calculate totals from lines
-    lines = stocktake.lines.all()
-    total_items = lines.count()
+    lines = list(stocktake.lines.select_related('item', 'item__category'))
+    total_items = len(lines)
     total_expected_value = sum(line.expected_value for line in lines)
     total_counted_value = sum(line.counted_value for line in lines)
     total_variance_value = sum(line.variance_value for line in lines)
@@ -287,7 +287,8 @@ def generate_combined_report_pdf(stocktake, period, include_cocktails=True):
     
     snapshots = period.snapshots.select_related('item', 'item__category').order_by('item__category__code', 'item__name')
     
-    if snapshots.exists():
+    snapshot_count = snapshots.count()
+    if snapshot_count:
         snapshot_headers = [['SKU', 'Name', 'Category', 'Full', 'Partial', 'Total Qty', 'Value €']]
         snapshot_data = []
         
@@ -321,10 +322,10 @@ def generate_combined_report_pdf(stocktake, period, include_cocktails=True):
         ]))
         elements.append(snapshot_table)
         
-        if snapshots.count() > 50:
+        if snapshot_count > 50:
             elements.append(Spacer(1, 0.2 * inch))
             elements.append(Paragraph(
-                f"<i>Note: Showing first 50 of {snapshots.count()} items. "
+                f"<i>Note: Showing first 50 of {snapshot_count} items. "
                 f"Download Excel for complete list.</i>",
                 styles['Normal']
             ))
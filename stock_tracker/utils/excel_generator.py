@@ -86,10 +86,10 @@ def generate_stocktake_excel(stocktake):
     
     # Summary totals
     row += 2
-    lines = stocktake.lines.all()
+    lines = list(stocktake.lines.select_related('item', 'item__category'))
     
     ws_summary[f'A{row}'] = "Total Items"
-    ws_summary[f'B{row}'] = lines.count()
+    ws_summary[f'B{row}'] = len(lines)
     ws_summary[f'A{row}'].font = bold_font
     row += 1
     
@@ -477,9 +477,9 @@ def generate_period_excel(period, include_cocktails=True):
     
     # Get snapshots
     from stock_tracker.models import StockSnapshot
-    snapshots = StockSnapshot.objects.filter(
+    snapshots = list(StockSnapshot.objects.filter(
         period=period
-    ).select_related('item', 'item__category')
+    ).select_related('item', 'item__category'))
     
     # --- SHEET 1: SUMMARY ---
     ws_summary = wb.create_sheet("Summary")
@@ -516,7 +516,7 @@ def generate_period_excel(period, include_cocktails=True):
     total_value = sum(s.closing_stock_value for s in snapshots)
     
     ws_summary[f'A{row}'] = "Total Items"
-    ws_summary[f'B{row}'] = snapshots.count()
+    ws_summary[f'B{row}'] = len(snapshots)
     ws_summary[f'A{row}'].font = bold_font
     row += 1
     
@@ -8,7 +8,7 @@ from reportlab.lib.pagesizes import A4, landscape
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import (
-    SimpleDocTemplate, Table, TableStyle, Paragraph, 
+    SimpleDocTemplate, Table, LongTable, TableStyle, Paragraph, 
     Spacer, PageBreak, KeepTogether
 )
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
@@ -99,7 +99,7 @@ def generate_stocktake_pdf(stocktake, include_variance=True):
     elements.append(Spacer(1, 0.3*inch))
     
     # Summary Totals
-    lines = stocktake.lines.all()
+    lines = list(stocktake.lines.select_related('item', 'item__category'))
     total_expected_value = sum(line.expected_value for line in lines)
     total_counted_value = sum(line.counted_value for line in lines)
     total_variance_value = sum(line.variance_value for line in lines)
@@ -108,7 +108,7 @@ def generate_stocktake_pdf(stocktake, include_variance=True):
     elements.append(summary_heading)
     
     summary_data = [
-        ['Total Items:', str(lines.count())],
+        ['Total Items:', str(len(lines))],
         ['Expected Stock Value:', f"€{total_expected_value:,.2f}"],
         ['Counted Stock Value:', f"€{total_counted_value:,.2f}"],
         ['Variance:', f"€{total_variance_value:,.2f}"],
@@ -297,7 +297,7 @@ def generate_stocktake_pdf(stocktake, include_variance=True):
                 )
             row_num += 1
         
-        items_table = Table(
+        items_table = LongTable(
             items_data,
             colWidths=[0.8*inch, 2*inch, 0.7*inch, 0.8*inch, 
                        0.7*inch, 0.7*inch, 0.7*inch, 0.8*inch]
@@ -410,7 +410,7 @@ def generate_period_pdf(period, include_cocktails=True):
     
     # Get snapshots
     from stock_tracker.models import StockSnapshot
-    snapshots = StockSnapshot.objects.filter(period=period).select_related('item', 'item__category')
+    snapshots = list(StockSnapshot.objects.filter(period=period).select_related('item', 'item__category'))
     
     # Summary
     summary_heading = Paragraph("<b>Period Summary</b>", heading_style)
@@ -419,7 +419,7 @@ def generate_period_pdf(period, include_cocktails=True):
     total_closing_value = sum(s.closing_stock_value for s in snapshots)
     
     summary_data = [
-        ['Total Items:', str(snapshots.count())],
+        ['Total Items:', str(len(snapshots))],
         ['Closing Stock Value:', f"€{total_closing_value:,.2f}"],
     ]
     
@@ -527,7 +527,7 @@ def generate_period_pdf(period, include_cocktails=True):
                 f"€{float(snapshot.closing_stock_value):,.2f}"
             ])
         
-        items_table = Table(
+        items_table = LongTable(
             items_data,
             colWidths=[0.7*inch, 2.3*inch, 0.8*inch, 0.7*inch, 0.8*inch, 1*inch, 1*inch]
         )
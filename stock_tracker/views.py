@@ -23,10 +23,22 @@ from .pusher_utils import (
     broadcast_stocktake_populated,
     broadcast_line_counted_updated,
     broadcast_line_movement_added,
+    broadcast_bulk_lines_updated,
 )
 
 logger = logging.getLogger(__name__)
 from .analytics import ingredient_usage
+from .period_facts import get_category_facts, get_item_facts, period_totals
+from .stocktake_totals import prefetch_financial_totals
+from .export_jobs import (
+    FAILED,
+    READY,
+    build_export_spec,
+    get_export_content,
+    get_export_job,
+    get_or_build_export,
+    request_export,
+)
 from .models import (
     Ingredient,
     CocktailRecipe,
@@ -60,7 +72,12 @@ from .stock_serializers import (
 from .stocktake_service import (
     populate_stocktake,
     approve_stocktake,
-    populate_period_opening_stock
+    populate_period_opening_stock,
+    parse_line_movement,
+    line_movement_timestamp,
+    add_line_movements,
+    bulk_insert_sales,
+    merge_cocktail_consumption
 )
 
 
@@ -166,6 +183,123 @@ def _get_staff_hotel(request):
     return request.user.staff_profile.hotel
 
 
+def _export_file_response(spec, content):
+    """Return export bytes as a file download."""
+    from django.http import HttpResponse
+
+    response = HttpResponse(content, content_type=spec['content_type'])
+    response['Content-Disposition'] = \
+        f'attachment; filename="{spec['filename']}"'
+    return response
+
+
+def _export_job_response(job, request):
+    """Job status payload; 200 when ready/failed, 202 while generating."""
+    from django.urls import reverse
+
+    # Reuse the URL prefix kwargs (hotel_identifier, and hotel_slug when
+    # mounted under the staff routes) of the current request
+    url_kwargs = {
+        key: value for key, value in request.resolver_match.kwargs.items()
+        if key in ('hotel_slug', 'hotel_identifier')
+    }
+    url_kwargs['job_id'] = job['job_id']
+
+    data = {
+        'job_id': job['job_id'],
+        'kind': job['kind'],
+        'status': job['status'],
+        'filename': job['filename'],
+        'error': job.get('error'),
+        'status_url': reverse('stock-export-job', kwargs=url_kwargs),
+        'download_url': None,
+    }
+    if job['status'] == READY:
+        data['download_url'] = reverse(
+            'stock-export-job-download', kwargs=url_kwargs
+        )
+    http_status = (
+        status.HTTP_200_OK if job['status'] in (READY, FAILED)
+        else status.HTTP_202_ACCEPTED
+    )
+    return Response(data, status=http_status)
+
+
+BULK_ENTRY_CSV_COLUMNS = [
+    'type', 'sku', 'quantity', 'unit_cost', 'unit_price',
+    'sale_date', 'reference', 'notes'
+]
+
+
+def _parse_bulk_entries_csv(upload):
+    """
+    Split an uploaded CSV into movement and sale rows.
+
+    Columns (header row required): type, sku, quantity and optional
+    unit_cost, unit_price, sale_date, reference, notes. type is PURCHASE,
+    WASTE or SALE.
+
+    Returns:
+        tuple: (movements, sales, errors)
+    """
+    import csv
+    import io
+
+    try:
+        text = upload.read().decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return [], [], [{'row': None, 'error': "CSV must be UTF-8 encoded"}]
+
+    movements, sales, errors = [], [], []
+    reader = csv.DictReader(io.StringIO(text))
+    for row_number, row in enumerate(reader, start=2):
+        row = {
+            (key or '').strip().lower(): (value or '').strip()
+            for key, value in row.items()
+        }
+        entry_type = row.get('type', '').upper()
+        if entry_type == 'SALE':
+            sales.append({
+                key: row[key]
+                for key in ('sku', 'quantity', 'unit_cost', 'unit_price',
+                            'sale_date', 'notes')
+                if row.get(key)
+            })
+        elif entry_type in (StockMovement.PURCHASE, StockMovement.WASTE):
+            movements.append({
+                'sku': row.get('sku'),
+                'movement_type': entry_type,
+                'quantity': row.get('quantity'),
+                'unit_cost': row.get('unit_cost') or None,
+                'reference': row.get('reference') or None,
+                'notes': row.get('notes', ''),
+            })
+        else:
+            errors.append({
+                'row': row_number,
+                'error': "type must be PURCHASE, WASTE or SALE"
+            })
+    return movements, sales, errors
+
+
+def _build_sales(serializer_class, rows, staff, context):
+    """
+    Validate sale rows and build unsaved Sales for bulk_insert_sales.
+
+    Returns:
+        tuple: (sales, errors) - errors as [{'index', 'errors'}]
+    """
+    sales, errors = [], []
+    for idx, row in enumerate(rows):
+        serializer = serializer_class(data=row, context=context)
+        if serializer.is_valid():
+            data = serializer.prepare_sale_data(dict(serializer.validated_data))
+            sales.append(Sale(created_by=staff, **data))
+        else:
+            errors.append({'index': idx, 'errors': serializer.errors})
+    return sales, errors
+
+
 class IngredientViewSet(viewsets.ModelViewSet):
     serializer_class = IngredientSerializer
     permission_classes = [IsAuthenticated, HasStockTrackerNav, IsStaffMember, IsSameHotel]
@@ -743,7 +877,6 @@ class StockPeriodViewSet(viewsets.ModelViewSet):
         
         # Combined reopen: Period first, then Stocktake
         # STEP 1: Reopen the period
-        from django.utils import timezone
         period.is_closed = False
         period.reopened_at = timezone.now()
         # Track who reopened it
@@ -1009,7 +1142,6 @@ class StockPeriodViewSet(viewsets.ModelViewSet):
         
         This ensures the stocktake is finalized before period is locked.
         """
-        from django.utils import timezone
         from .models import Stocktake
         
         period = self.get_object()
@@ -1156,8 +1288,6 @@ class StockPeriodViewSet(viewsets.ModelViewSet):
         
         Returns: PDF file download
         """
-        from django.http import HttpResponse
-        from .utils.pdf_generator import generate_period_pdf
         from datetime import datetime
         
         # Get hotel
@@ -1213,24 +1343,12 @@ class StockPeriodViewSet(viewsets.ModelViewSet):
             'include_cocktails', 'true'
         ).lower() == 'true'
         
-        # Generate PDF
-        pdf_buffer = generate_period_pdf(period, include_cocktails)
-        
-        # Create filename
-        filename = (
-            f"period_{period.hotel.name.replace(' ', '_')}_"
-            f"{period.period_name.replace(' ', '_')}.pdf"
+        # Served from the export cache until the period's data changes
+        spec = build_export_spec(
+            'period_pdf', period.hotel, period=period,
+            include_cocktails=include_cocktails
         )
-        
-        # Return PDF as download
-        response = HttpResponse(
-            pdf_buffer.getvalue(),
-            content_type='application/pdf'
-        )
-        response['Content-Disposition'] = \
-            f'attachment; filename="{filename}"'
-        
-        return response
+        return _export_file_response(spec, get_or_build_export(spec))
 
     @action(detail=False, methods=['get'], url_path='download-excel')
     @action(detail=True, methods=['get'], url_path='download-excel')
@@ -1255,8 +1373,6 @@ class StockPeriodViewSet(viewsets.ModelViewSet):
         
         Returns: Excel file download
         """
-        from django.http import HttpResponse
-        from .utils.excel_generator import generate_period_excel
         from datetime import datetime
         
         # Get hotel
@@ -1312,25 +1428,44 @@ class StockPeriodViewSet(viewsets.ModelViewSet):
             'include_cocktails', 'true'
         ).lower() == 'true'
         
-        # Generate Excel
-        excel_buffer = generate_period_excel(period, include_cocktails)
-        
-        # Create filename
-        filename = (
-            f"period_{period.hotel.name.replace(' ', '_')}_"
-            f"{period.period_name.replace(' ', '_')}.xlsx"
+        # Served from the export cache until the period's data changes
+        spec = build_export_spec(
+            'period_excel', period.hotel, period=period,
+            include_cocktails=include_cocktails
         )
+        return _export_file_response(spec, get_or_build_export(spec))
+
+    @action(detail=True, methods=['post'], url_path='exports')
+    def create_export(self, request, pk=None, hotel_identifier=None):
+        """
+        Request a period export generated in the background.
         
-        # Return Excel as download
-        response = HttpResponse(
-            excel_buffer.getvalue(),
-            content_type='application/vnd.openxmlformats-officedocument'
-            '.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = \
-            f'attachment; filename="{filename}"'
+        POST /api/stock-tracker/{hotel_identifier}/periods/{id}/exports/
+        Body:
+        - format: "pdf" or "excel" (default: pdf)
+        - include_cocktails: true/false (default: true)
+        
+        Returns the export job: 202 while generating, 200 once ready.
+        Poll status_url, then fetch download_url.
+        """
+        period = self.get_object()
+        
+        export_format = request.data.get('format', 'pdf')
+        if export_format not in ('pdf', 'excel'):
+            return Response(
+                {"error": "format must be 'pdf' or 'excel'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        include_cocktails = str(
+            request.data.get('include_cocktails', 'true')
+        ).lower() == 'true'
         
-        return response
+        spec = build_export_spec(
+            f'period_{export_format}', period.hotel, period=period,
+            include_cocktails=include_cocktails
+        )
+        return _export_job_response(request_export(spec), request)
+
 
 
 class StockSnapshotViewSet(viewsets.ModelViewSet):
@@ -1609,6 +1744,15 @@ class StocktakeViewSet(viewsets.ModelViewSet):
         hotel = _get_staff_hotel(self.request)
         return Stocktake.objects.filter(hotel=hotel)
 
+    def list(self, request, *args, **kwargs):
+        # Financial totals come from the stored columns; only stocktakes
+        # without stored totals have theirs computed, in one extra query
+        stocktakes = prefetch_financial_totals(
+            list(self.filter_queryset(self.get_queryset()))
+        )
+        serializer = self.get_serializer(stocktakes, many=True)
+        return Response(serializer.data)
+
     def get_serializer_class(self):
         if self.action == 'list':
             return StocktakeListSerializer
@@ -1946,7 +2090,8 @@ class StocktakeViewSet(viewsets.ModelViewSet):
         
         This endpoint merges ALL available cocktail consumption across all
         stocktake lines with one action. Creates StockMovement records with
-        COCKTAIL_CONSUMPTION type for each merged item.
+        COCKTAIL_CONSUMPTION type for each merged item (see
+        stocktake_service.merge_cocktail_consumption).
         
         Returns summary of what was merged including:
         - lines_affected: Number of lines that had cocktails merged
@@ -1955,9 +2100,6 @@ class StocktakeViewSet(viewsets.ModelViewSet):
         - total_value_merged: Sum of all values merged
         - details: Per-line breakdown
         """
-        from django.db import transaction
-        from decimal import Decimal
-        
         stocktake = self.get_object()
         
         if stocktake.is_locked:
@@ -1971,93 +2113,24 @@ class StocktakeViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Get all lines with available cocktail consumption
-        lines = stocktake.lines.all()
+        # Get staff profile for audit trail
+        staff = (
+            request.user.staff_profile
+            if hasattr(request.user, 'staff_profile')
+            else None
+        )
+        
+        # Aggregate per item and merge every line in one transaction
+        result = merge_cocktail_consumption(stocktake, staff)
         
         merge_summary = {
-            'lines_affected': 0,
-            'total_items_merged': 0,
-            'total_quantity_merged': Decimal('0'),
-            'total_value_merged': Decimal('0'),
-            'details': []
+            'lines_affected': len(result['lines']),
+            'total_items_merged': result['total_items_merged'],
+            'total_quantity_merged': result['total_quantity_merged'],
+            'total_value_merged': result['total_value_merged'],
+            'details': result['details']
         }
         
-        with transaction.atomic():
-            for line in lines:
-                # Get available cocktail consumption for this line
-                available = line.get_available_cocktail_consumption()
-                
-                if not available.exists():
-                    continue
-                
-                # Calculate totals for this line
-                line_qty = sum(c.quantity_used for c in available)
-                line_value = sum(c.total_cost for c in available)
-                
-                # Find the matching StockPeriod
-                period = StockPeriod.objects.filter(
-                    hotel=stocktake.hotel,
-                    start_date=stocktake.period_start,
-                    end_date=stocktake.period_end
-                ).first()
-                
-                # Get staff profile for audit trail
-                staff = (
-                    request.user.staff_profile
-                    if hasattr(request.user, 'staff_profile')
-                    else None
-                )
-                
-                # Create StockMovement with COCKTAIL_CONSUMPTION type
-                StockMovement.objects.create(
-                    hotel=stocktake.hotel,
-                    item=line.item,
-                    period=period,
-                    movement_type=StockMovement.COCKTAIL_CONSUMPTION,
-                    quantity=line_qty,
-                    unit_cost=line.item.cost_price,
-                    reference=(
-                        f'Cocktail merge for stocktake {stocktake.id}'
-                    ),
-                    notes=(
-                        f'Bulk merged {available.count()} '
-                        f'cocktail consumption records'
-                    ),
-                    staff=staff
-                )
-                
-                # Mark all consumption records as merged
-                for consumption_record in available:
-                    consumption_record.is_merged_to_stocktake = True
-                    consumption_record.merged_at = timezone.now()
-                    consumption_record.merged_by = staff
-                    consumption_record.merged_to_stocktake = stocktake
-                    consumption_record.save()
-                
-                # Recalculate line purchases from movements
-                from .stocktake_service import _calculate_period_movements
-                movements = _calculate_period_movements(
-                    line.item,
-                    stocktake.period_start,
-                    stocktake.period_end
-                )
-                line.purchases = movements['purchases']
-                line.save()
-                
-                # Add to summary
-                merge_summary['lines_affected'] += 1
-                merge_summary['total_items_merged'] += available.count()
-                merge_summary['total_quantity_merged'] += line_qty
-                merge_summary['total_value_merged'] += line_value
-                merge_summary['details'].append({
-                    'line_id': line.id,
-                    'item_sku': line.item.sku,
-                    'item_name': line.item.name,
-                    'quantity_merged': str(line_qty),
-                    'value_merged': str(line_value),
-                    'records_merged': available.count()
-                })
-        
         # Convert Decimal to string for JSON serialization
         merge_summary['total_quantity_merged'] = str(
             merge_summary['total_quantity_merged']
@@ -2111,8 +2184,6 @@ class StocktakeViewSet(viewsets.ModelViewSet):
         
         Returns: PDF file download
         """
-        from django.http import HttpResponse
-        from .utils.pdf_generator import generate_stocktake_pdf
         from datetime import datetime
         
         # Get hotel
@@ -2163,24 +2234,9 @@ class StocktakeViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_404_NOT_FOUND
                 )
         
-        # Generate PDF
-        pdf_buffer = generate_stocktake_pdf(stocktake)
-        
-        # Create filename
-        filename = (
-            f"stocktake_{hotel.name.replace(' ', '_')}_"
-            f"{stocktake.period_start}_to_{stocktake.period_end}.pdf"
-        )
-        
-        # Return PDF as download
-        response = HttpResponse(
-            pdf_buffer.getvalue(),
-            content_type='application/pdf'
-        )
-        response['Content-Disposition'] = \
-            f'attachment; filename="{filename}"'
-        
-        return response
+        # Served from the export cache until the stocktake's data changes
+        spec = build_export_spec('stocktake_pdf', hotel, stocktake=stocktake)
+        return _export_file_response(spec, get_or_build_export(spec))
 
     @action(detail=False, methods=['get'], url_path='download-excel')
     @action(detail=True, methods=['get'], url_path='download-excel')
@@ -2204,8 +2260,6 @@ class StocktakeViewSet(viewsets.ModelViewSet):
         
         Returns: Excel file download
         """
-        from django.http import HttpResponse
-        from .utils.excel_generator import generate_stocktake_excel
         from datetime import datetime
         
         # Get hotel
@@ -2256,25 +2310,9 @@ class StocktakeViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_404_NOT_FOUND
                 )
         
-        # Generate Excel
-        excel_buffer = generate_stocktake_excel(stocktake)
-        
-        # Create filename
-        filename = (
-            f"stocktake_{hotel.name.replace(' ', '_')}_"
-            f"{stocktake.period_start}_to_{stocktake.period_end}.xlsx"
-        )
-        
-        # Return Excel as download
-        response = HttpResponse(
-            excel_buffer.getvalue(),
-            content_type='application/vnd.openxmlformats-officedocument'
-            '.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = \
-            f'attachment; filename="{filename}"'
-        
-        return response
+        # Served from the export cache until the stocktake's data changes
+        spec = build_export_spec('stocktake_excel', hotel, stocktake=stocktake)
+        return _export_file_response(spec, get_or_build_export(spec))
 
     @action(detail=False, methods=['get'], url_path='download-combined-pdf')
     @action(detail=True, methods=['get'], url_path='download-combined-pdf')
@@ -2299,8 +2337,6 @@ class StocktakeViewSet(viewsets.ModelViewSet):
         
         Returns: Combined PDF file with stocktake + period data
         """
-        from django.http import HttpResponse
-        from .utils.combined_pdf_generator import generate_combined_report_pdf
         from datetime import datetime
         
         # Get hotel
@@ -2369,28 +2405,191 @@ class StocktakeViewSet(viewsets.ModelViewSet):
             'include_cocktails', 'true'
         ).lower() == 'true'
         
-        # Generate combined PDF
-        pdf_buffer = generate_combined_report_pdf(
-            stocktake,
-            period,
-            include_cocktails
+        # Served from the export cache until either side's data changes
+        spec = build_export_spec(
+            'combined_pdf', hotel, stocktake=stocktake, period=period,
+            include_cocktails=include_cocktails
         )
+        return _export_file_response(spec, get_or_build_export(spec))
+
+    @action(detail=True, methods=['post'], url_path='exports')
+    def create_export(self, request, pk=None, hotel_identifier=None):
+        """
+        Request a stocktake export generated in the background.
         
-        # Create filename
-        filename = (
-            f"combined_report_{hotel.name.replace(' ', '_')}_"
-            f"{stocktake.period_start}_to_{stocktake.period_end}.pdf"
-        )
+        POST /api/stock-tracker/{hotel_identifier}/stocktakes/{id}/exports/
+        Body:
+        - format: "pdf", "excel" or "combined_pdf" (default: pdf)
+        - include_cocktails: true/false, combined_pdf only (default: true)
+        
+        Returns the export job: 202 while generating, 200 once ready.
+        Poll status_url, then fetch download_url.
+        """
+        hotel = _get_staff_hotel(request)
+        stocktake = self.get_object()
+        
+        export_format = request.data.get('format', 'pdf')
+        if export_format not in ('pdf', 'excel', 'combined_pdf'):
+            return Response(
+                {"error": "format must be 'pdf', 'excel' or 'combined_pdf'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if export_format == 'combined_pdf':
+            period = StockPeriod.objects.filter(
+                hotel=hotel,
+                start_date=stocktake.period_start,
+                end_date=stocktake.period_end
+            ).first()
+            if not period:
+                return Response(
+                    {
+                        "error": "No matching period found for this stocktake",
+                        "suggestion": "Ensure a period exists with matching dates"
+                    },
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            include_cocktails = str(
+                request.data.get('include_cocktails', 'true')
+            ).lower() == 'true'
+            spec = build_export_spec(
+                'combined_pdf', hotel, stocktake=stocktake, period=period,
+                include_cocktails=include_cocktails
+            )
+        else:
+            spec = build_export_spec(
+                f'stocktake_{export_format}', hotel, stocktake=stocktake
+            )
+        
+        return _export_job_response(request_export(spec), request)
+
+    @action(detail=True, methods=['post'], url_path='bulk-entries')
+    def bulk_entries(self, request, pk=None, hotel_identifier=None):
+        """
+        Record many movements and sales for a stocktake in one request
+        (e.g. a whole delivery docket or end-of-night waste sheet).
+        
+        POST /api/stock-tracker/{hotel_identifier}/stocktakes/{id}/bulk-entries/
+        
+        JSON body:
+        {
+            "movements": [
+                {"sku": "D0001", "movement_type": "PURCHASE", "quantity": 2},
+                {"line_id": 15, "movement_type": "WASTE", "quantity": 0.5}
+            ],
+            "sales": [
+                {"item": 12, "quantity": 40, "sale_date": "2025-01-31"}
+            ]
+        }
+        
+        Or multipart with a CSV "file" (columns: type, sku, quantity,
+        unit_cost, unit_price, sale_date, reference, notes; type is
+        PURCHASE, WASTE or SALE).
+        
+        Movements follow the same rules as line add_movement. Everything
+        is validated first and nothing is saved if any entry is invalid.
+        Affected lines are recalculated once and a bulk_lines_updated
+        event with their changed values is broadcast (split into chunks
+        when it would exceed Pusher's message limit).
+        """
+        hotel = _get_staff_hotel(request)
+        stocktake = self.get_object()
+        
+        if stocktake.is_locked:
+            return Response(
+                {"error": "Cannot add movements to approved stocktake"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        upload = request.FILES.get('file')
+        if upload:
+            movements_data, sales_data, errors = _parse_bulk_entries_csv(upload)
+            if errors:
+                return Response(
+                    {"error": "Invalid CSV", "errors": errors},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        else:
+            movements_data = request.data.get('movements') or []
+            sales_data = request.data.get('sales') or []
+        
+        if not movements_data and not sales_data:
+            return Response(
+                {"error": "movements, sales or a CSV file is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        staff_user = None
+        if hasattr(request.user, 'staff'):
+            staff_user = request.user.staff
         
-        # Return PDF as download
-        response = HttpResponse(
-            pdf_buffer.getvalue(),
-            content_type='application/pdf'
+        # Sales: resolve SKUs in one query, pin them to this stocktake
+        skus = {row['sku'] for row in sales_data if row.get('sku')}
+        item_ids = dict(
+            StockItem.objects.filter(hotel=hotel, sku__in=skus)
+            .values_list('sku', 'id')
+        ) if skus else {}
+        sale_rows = []
+        for row in sales_data:
+            row = dict(row)
+            sku = row.pop('sku', None)
+            if sku:
+                row['item'] = item_ids.get(sku)
+            row['stocktake'] = stocktake.id
+            row.setdefault('sale_date', str(stocktake.period_end))
+            sale_rows.append(row)
+        
+        from .stock_serializers import SaleSerializer
+        sales, sale_errors = _build_sales(
+            SaleSerializer, sale_rows, staff_user, {'request': request}
         )
-        response['Content-Disposition'] = \
-            f'attachment; filename="{filename}"'
+        if sale_errors:
+            return Response(
+                {"error": "Invalid sales", "sales_errors": sale_errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        return response
+        from django.db import transaction
+        with transaction.atomic():
+            result = add_line_movements(stocktake, movements_data, staff_user)
+            if result['errors']:
+                return Response(
+                    {
+                        "error": "Invalid movements",
+                        "movement_errors": result['errors']
+                    },
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            created_sales = bulk_insert_sales(sales) if sales else []
+        
+        lines_data = StocktakeLineSerializer(
+            result['lines'], many=True, context={'request': request}
+        ).data
+        response_data = {
+            "message": "Entries created successfully",
+            "movements_created": len(result['movements']),
+            "sales_created": len(created_sales),
+            "lines": lines_data
+        }
+        
+        # One aggregated event instead of one per movement
+        try:
+            broadcast_bulk_lines_updated(
+                hotel_identifier,
+                stocktake.id,
+                {
+                    "movements_created": len(result['movements']),
+                    "sales_created": len(created_sales),
+                    "lines": lines_data
+                }
+            )
+        except Exception as e:
+            logger.error(
+                f"Failed to broadcast bulk entries: {e}"
+            )
+        
+        return Response(response_data, status=status.HTTP_201_CREATED)
+
 
 
 class StocktakeLineViewSet(viewsets.ModelViewSet):
@@ -2486,169 +2685,18 @@ class StocktakeLineViewSet(viewsets.ModelViewSet):
             )
         
         movement_type = request.data.get('movement_type')
-        quantity = request.data.get('quantity')
-        
-        if not movement_type or quantity is None:
-            return Response(
-                {"error": "movement_type and quantity are required"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Only allow PURCHASE and WASTE movement types
-        valid_types = ['PURCHASE', 'WASTE']
-        if movement_type not in valid_types:
-            error_msg = (
-                f"Invalid movement_type. "
-                f"Must be one of: {', '.join(valid_types)}"
-            )
-            return Response(
-                {"error": error_msg},
-                status=status.HTTP_400_BAD_REQUEST
-            )
         
-        # Convert quantity to Decimal for validation
+        # Purchases must be full units (converted to servings),
+        # waste partial units only - see parse_line_movement
         try:
-            quantity_decimal = Decimal(str(quantity))
-            if quantity_decimal <= 0:
-                return Response(
-                    {"error": "Quantity must be greater than 0"},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-        except (ValueError, InvalidOperation):
+            quantity_decimal = parse_line_movement(
+                line.item, movement_type, request.data.get('quantity')
+            )
+        except ValueError as e:
             return Response(
-                {"error": "Invalid quantity format"},
+                {"error": str(e)},
                 status=status.HTTP_400_BAD_REQUEST
             )
-
-        # VALIDATE & CONVERT: Purchases must be FULL PHYSICAL UNITS only
-        # VALIDATE: Waste must be PARTIAL PHYSICAL UNITS only
-        # Frontend sends user-friendly units (kegs, cases, bottles, boxes)
-        # Backend converts to servings and validates
-        item = line.item
-        category = item.category_id
-        uom = item.uom
-
-        if movement_type == 'PURCHASE':
-            # Purchases = full physical units (kegs, cases, bottles, boxes)
-            # Frontend sends what user enters, backend converts to servings
-            
-            if uom == Decimal('1'):
-                # UOM=1: Spirits, Wine, Syrups, BIB, Bulk Juices
-                # User enters bottles/boxes, we store as-is (1:1)
-                # Must be whole numbers (1, 2, 3... bottles/boxes)
-                if quantity_decimal % 1 != 0:
-                    if category == 'M' and item.subcategory == 'SYRUPS':
-                        unit_name = 'bottles'
-                    elif category == 'M':
-                        unit_name = 'boxes'
-                    elif category in ['S', 'W']:
-                        unit_name = 'bottles'
-                    else:
-                        unit_name = 'units'
-
-                    error_msg = (
-                        f"Purchases must be in full {unit_name} only "
-                        f"(whole numbers). Partial {unit_name} should "
-                        f"be recorded as waste."
-                    )
-                    return Response(
-                        {"error": error_msg},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                # No conversion needed for UOM=1
-            else:
-                # UOM>1: Draught, Bottled Beer, Soft Drinks, Cordials
-                # User enters kegs/cases, backend converts to pints/bottles
-                
-                # Validate: must be whole number (full kegs/cases)
-                if quantity_decimal % 1 != 0:
-                    if category == 'D':
-                        unit_name = 'kegs'
-                    else:
-                        unit_name = 'cases'
-                    
-                    error_msg = (
-                        f"Purchases must be in full {unit_name} only. "
-                        f"Partial {unit_name} should be recorded as waste."
-                    )
-                    return Response(
-                        {"error": error_msg},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                
-                # CONVERT: kegs/cases → pints/bottles
-                quantity_decimal = quantity_decimal * uom
-
-        elif movement_type == 'WASTE':
-            # Waste = partial physical units only
-            # Examples: 0.5 bottle, 3 bottles from opened case,
-            # 15 pints from opened keg
-
-            if uom == Decimal('1'):
-                # UOM=1: Spirits, Wine, Syrups, BIB, Bulk Juices
-                # quantity = bottles/boxes (1:1)
-                # waste should be < 1 (partial bottle/box only)
-                if quantity_decimal >= 1:
-                    if category == 'M' and item.subcategory == 'SYRUPS':
-                        unit_name = 'bottle'
-                    elif category == 'M':
-                        unit_name = 'box'
-                    elif category in ['S', 'W']:
-                        unit_name = 'bottle'
-                    else:
-                        unit_name = 'unit'
-
-                    error_msg = (
-                        f"Waste must be partial {unit_name}s only "
-                        f"(less than 1 {unit_name}). "
-                        f"Full {unit_name}s should be recorded as "
-                        f"negative adjustments."
-                    )
-                    return Response(
-                        {"error": error_msg},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-            else:
-                # UOM>1: Draught, Bottled Beer, Soft Drinks, Cordials
-                # Draught: quantity in pints, waste < UOM pints
-                # Others: quantity in bottles, waste < UOM bottles
-                if quantity_decimal >= uom:
-                    if category == 'D':
-                        unit_name = (
-                            f'partial keg only '
-                            f'(less than {int(uom)} pints)'
-                        )
-                    elif category == 'B':
-                        unit_name = (
-                            f'partial case only '
-                            f'(less than {int(uom)} bottles)'
-                        )
-                    elif (category == 'M' and
-                          item.subcategory == 'SOFT_DRINKS'):
-                        unit_name = (
-                            f'partial case only '
-                            f'(less than {int(uom)} bottles)'
-                        )
-                    elif (category == 'M' and
-                          item.subcategory == 'CORDIALS'):
-                        unit_name = (
-                            f'partial case only '
-                            f'(less than {int(uom)} bottles)'
-                        )
-                    else:
-                        unit_name = (
-                            f'partial unit (less than {int(uom)})'
-                        )
-
-                    error_msg = (
-                        f"Waste must be {unit_name}. "
-                        f"Full kegs/cases should be recorded as "
-                        f"negative adjustments."
-                    )
-                    return Response(
-                        {"error": error_msg},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
         
         # Default reference if not provided
         default_ref = f'Stocktake-{line.stocktake.id}'
@@ -2666,20 +2714,8 @@ class StocktakeLineViewSet(viewsets.ModelViewSet):
         ).first()
         
         # Create the movement with timestamp within the stocktake period
-        # CRITICAL: Use period end date to ensure movement is within period
-        from django.utils import timezone
-        from datetime import datetime, time
-        
-        # Set timestamp to end of stocktake period
-        # (or current time if in period)
-        movement_timestamp = timezone.now()
-        period_end_dt = timezone.make_aware(
-            datetime.combine(line.stocktake.period_end, time.max)
-        )
-        
-        # If current time is after period, use period end date instead
-        if movement_timestamp > period_end_dt:
-            movement_timestamp = period_end_dt
+        # (now, or the period end if the period is already over)
+        movement_timestamp = line_movement_timestamp(line.stocktake)
         
         movement = StockMovement.objects.create(
             hotel=line.stocktake.hotel,
@@ -2756,7 +2792,6 @@ class StocktakeLineViewSet(viewsets.ModelViewSet):
         line's calculations, allowing the UI to display both auto-calculated
         and manually entered movements together.
         """
-        from django.utils import timezone
         from datetime import datetime, time
         
         line = self.get_object()
@@ -2881,7 +2916,6 @@ class StocktakeLineViewSet(viewsets.ModelViewSet):
             )
         
         # Get the movement
-        from django.utils import timezone
         from datetime import datetime, time
         
         # Convert date to datetime for proper comparison
@@ -2993,7 +3027,6 @@ class StocktakeLineViewSet(viewsets.ModelViewSet):
             )
         
         # Get the movement
-        from django.utils import timezone
         from datetime import datetime, time
         
         # Convert date to datetime for proper comparison
@@ -3147,15 +3180,6 @@ class StocktakeLineViewSet(viewsets.ModelViewSet):
         
         CRITICAL: Does NOT affect variance until this action is called.
         """
-        from stock_tracker.models import (
-            CocktailIngredientConsumption,
-            StockMovement,
-            StockPeriod
-        )
-        from django.utils import timezone
-        from django.db import transaction
-        from decimal import Decimal
-        
         line = self.get_object()
         
         # Check if stocktake is locked
@@ -3165,10 +3189,18 @@ class StocktakeLineViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Get unmerged cocktail consumption for this item
-        unmerged_consumptions = line.get_available_cocktail_consumption()
+        # Get staff if available
+        staff_user = None
+        if hasattr(request.user, 'staff'):
+            staff_user = request.user.staff
+        
+        result = merge_cocktail_consumption(
+            line.stocktake, staff_user, lines=[line]
+        )
+        merged_count = result['total_items_merged']
+        total_quantity_merged = result['total_quantity_merged']
         
-        if not unmerged_consumptions.exists():
+        if not merged_count:
             return Response(
                 {
                     "message": "No unmerged cocktail consumption found",
@@ -3178,58 +3210,6 @@ class StocktakeLineViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_200_OK
             )
         
-        # Get staff if available
-        staff_user = None
-        if hasattr(request.user, 'staff'):
-            staff_user = request.user.staff
-        
-        # Find the matching StockPeriod
-        period = StockPeriod.objects.filter(
-            hotel=line.stocktake.hotel,
-            start_date=line.stocktake.period_start,
-            end_date=line.stocktake.period_end
-        ).first()
-        
-        # Use transaction to ensure atomicity
-        with transaction.atomic():
-            total_quantity_merged = Decimal('0.0000')
-            merged_count = 0
-            
-            # Create a single StockMovement for all merged consumptions
-            for consumption in unmerged_consumptions:
-                total_quantity_merged += consumption.quantity_used
-                
-                # Mark as merged
-                consumption.merge_to_stocktake(line.stocktake, staff_user)
-                merged_count += 1
-            
-            # Create StockMovement with COCKTAIL_CONSUMPTION type
-            movement = StockMovement.objects.create(
-                hotel=line.stocktake.hotel,
-                item=line.item,
-                period=period,
-                movement_type='COCKTAIL_CONSUMPTION',
-                quantity=total_quantity_merged,
-                unit_cost=line.item.cost_per_serving,
-                reference=f'Cocktail-Merge-Stocktake-{line.stocktake.id}',
-                notes=f'Merged {merged_count} cocktail consumption records',
-                staff=staff_user
-            )
-            
-            # Recalculate the line from all movements
-            from .stocktake_service import _calculate_period_movements
-            
-            movements = _calculate_period_movements(
-                line.item,
-                line.stocktake.period_start,
-                line.stocktake.period_end
-            )
-            
-            # Update line - cocktail consumption is added to purchases
-            line.purchases = movements['purchases']
-            line.waste = movements['waste']
-            line.save()
-        
         # Refresh from DB to get calculated values
         line.refresh_from_db()
         
@@ -3239,7 +3219,7 @@ class StocktakeLineViewSet(viewsets.ModelViewSet):
             'message': 'Cocktail consumption merged successfully',
             'merged_count': merged_count,
             'total_quantity_merged': str(total_quantity_merged),
-            'movement_id': movement.id,
+            'movement_id': result['movements'][0].id,
             'line': serializer.data
         }
         
@@ -3455,6 +3435,9 @@ class SaleViewSet(viewsets.ModelViewSet):
         """
         Create multiple sales at once.
         Accepts a list of sale objects in request body.
+        
+        Rows are validated first; valid rows are inserted with a single
+        bulk_create (invalid ones are reported with 207).
         """
         hotel = _get_staff_hotel(request)
 
@@ -3470,19 +3453,12 @@ class SaleViewSet(viewsets.ModelViewSet):
         if hasattr(request.user, 'staff'):
             staff_user = request.user.staff
 
-        created_sales = []
-        errors = []
-
-        for idx, sale_data in enumerate(sales_data):
-            serializer = self.get_serializer(data=sale_data)
-            if serializer.is_valid():
-                sale = serializer.save(created_by=staff_user)
-                created_sales.append(sale)
-            else:
-                errors.append({
-                    'index': idx,
-                    'errors': serializer.errors
-                })
+        # Validate every row, then insert the valid ones in one query
+        sales, errors = _build_sales(
+            self.get_serializer_class(), sales_data, staff_user,
+            self.get_serializer_context()
+        )
+        created_sales = bulk_insert_sales(sales) if sales else []
 
         if errors:
             return Response(
@@ -3577,20 +3553,20 @@ class KPISummaryView(APIView):
         """Calculate stock value KPIs"""
         latest_period = periods.last()
         
-        # Get snapshots for all periods
-        all_snapshots = StockSnapshot.objects.filter(period__in=periods)
+        # Pre-aggregated per-(period, category) rows for all periods
+        category_facts = get_category_facts(periods)
         
         # Current/latest period value
-        latest_snapshots = all_snapshots.filter(period=latest_period)
-        total_current_value = sum(
-            snapshot.closing_stock_value for snapshot in latest_snapshots
-        )
+        total_current_value = period_totals(
+            category_facts[latest_period.id].values()
+        )['closing_stock_value']
         
         # Calculate value per period
         period_values = []
         for period in periods:
-            period_snapshots = all_snapshots.filter(period=period)
-            period_value = sum(s.closing_stock_value for s in period_snapshots)
+            period_value = period_totals(
+                category_facts[period.id].values()
+            )['closing_stock_value']
             period_values.append({
                 "period_id": period.id,
                 "period_name": period.period_name,
@@ -3760,35 +3736,24 @@ class KPISummaryView(APIView):
     
     def _calculate_category_performance(self, periods):
         """Calculate category performance KPIs"""
+        first_period = periods.first()
         latest_period = periods.last()
         
-        # Get snapshots for latest period grouped by category
-        snapshots = StockSnapshot.objects.filter(
-            period=latest_period
-        ).select_related('item__category')
+        # Pre-aggregated per-(period, category) rows
+        category_facts = get_category_facts([first_period, latest_period])
         
+        # Categories with stock counted in the latest period
         category_data = {}
-        for snapshot in snapshots:
-            cat_code = snapshot.item.category.code
-            cat_name = snapshot.item.category.name
-            
-            if cat_code not in category_data:
-                category_data[cat_code] = {
-                    "category_name": cat_name,
-                    "total_value": Decimal('0'),
-                    "item_count": 0,
-                    "total_gp": Decimal('0'),
-                    "gp_count": 0
-                }
-            
-            category_data[cat_code]["total_value"] += snapshot.closing_stock_value
-            category_data[cat_code]["item_count"] += 1
-            
-            # Calculate GP if menu price available
-            if snapshot.menu_price and snapshot.menu_price > 0:
-                gp = ((snapshot.menu_price - snapshot.cost_per_serving) / snapshot.menu_price) * 100
-                category_data[cat_code]["total_gp"] += Decimal(str(gp))
-                category_data[cat_code]["gp_count"] += 1
+        for cat_code, fact in category_facts[latest_period.id].items():
+            if fact.item_count == 0:
+                continue
+            category_data[cat_code] = {
+                "category_name": fact.category.name,
+                "total_value": fact.closing_stock_value,
+                "item_count": fact.item_count,
+                "total_gp": fact.gp_total,
+                "gp_count": fact.gp_count
+            }
         
         # Calculate averages and find top performers
         category_list = []
@@ -3819,23 +3784,14 @@ class KPISummaryView(APIView):
         # Category growth (if multiple periods)
         most_growth = None
         if len(periods) >= 2:
-            first_period = periods.first()
-            last_period = periods.last()
-            
             growth_data = {}
             for cat_code in category_data.keys():
-                first_value = sum(
-                    s.closing_stock_value for s in StockSnapshot.objects.filter(
-                        period=first_period,
-                        item__category__code=cat_code
-                    )
-                )
-                last_value = sum(
-                    s.closing_stock_value for s in StockSnapshot.objects.filter(
-                        period=last_period,
-                        item__category__code=cat_code
-                    )
+                first_fact = category_facts[first_period.id].get(cat_code)
+                first_value = (
+                    first_fact.closing_stock_value if first_fact
+                    else Decimal('0')
                 )
+                last_value = category_data[cat_code]["total_value"]
                 
                 if first_value > 0:
                     growth_pct = ((last_value - first_value) / first_value) * 100
@@ -3872,6 +3828,14 @@ class KPISummaryView(APIView):
         overstocked_items = []
         dead_stock_items = []
         
+        # Dead stock candidates: items with no movement in latest period
+        moved_item_ids = set(
+            StockMovement.objects.filter(
+                hotel=hotel,
+                period=latest_period
+            ).values_list('item_id', flat=True)
+        )
+        
         for item in stock_items:
             total_servings = item.total_stock_in_servings
             
@@ -3901,15 +3865,9 @@ class KPISummaryView(APIView):
                     "par_level": float(item.par_level),
                     "percentage_of_par": float(round((total_servings / item.par_level * 100), 2))
                 })
-        
-        # Dead stock (no movement in latest period)
-        movements_in_period = StockMovement.objects.filter(
-            hotel=hotel,
-            period=latest_period
-        ).values_list('item_id', flat=True).distinct()
-        
-        for item in stock_items:
-            if item.id not in movements_in_period and item.total_stock_in_servings > 0:
+            
+            # Dead stock (no movement in latest period)
+            if item.id not in moved_item_ids and total_servings > 0:
                 dead_stock_items.append({
                     "item_name": item.name,
                     "sku": item.sku,
@@ -3961,9 +3919,17 @@ class KPISummaryView(APIView):
         first_period = periods.first()
         last_period = periods.last()
         
-        # Get snapshots
-        first_snapshots = {s.item_id: s for s in StockSnapshot.objects.filter(period=first_period)}
-        last_snapshots = {s.item_id: s for s in StockSnapshot.objects.filter(period=last_period)}
+        # Pre-aggregated per-(period, item) rows with a closing snapshot
+        item_facts = get_item_facts([first_period, last_period])
+        first_snapshots = {
+            item_id: fact for item_id, fact in item_facts[first_period.id].items()
+            if fact.has_snapshot
+        }
+        last_snapshots = {
+            item_id: fact for item_id, fact in item_facts[last_period.id].items()
+            if fact.has_snapshot
+        }
+        category_facts = get_category_facts([first_period, last_period])
         
         increases = []
         decreases = []
@@ -3990,7 +3956,7 @@ class KPISummaryView(APIView):
                     change_data = {
                         "item_name": last_snap.item.name,
                         "sku": last_snap.item.sku,
-                        "category": last_snap.item.category.name,
+                        "category": last_snap.category.name,
                         "previous_value": float(first_value),
                         "current_value": float(last_value),
                         "change": float(change),
@@ -4009,13 +3975,13 @@ class KPISummaryView(APIView):
         # Category changes
         category_changes = {}
         for cat in StockCategory.objects.all():
-            first_cat_value = sum(
-                s.closing_stock_value for s in first_snapshots.values()
-                if s.item.category.code == cat.code
+            first_fact = category_facts[first_period.id].get(cat.code)
+            last_fact = category_facts[last_period.id].get(cat.code)
+            first_cat_value = (
+                first_fact.closing_stock_value if first_fact else Decimal('0')
             )
-            last_cat_value = sum(
-                s.closing_stock_value for s in last_snapshots.values()
-                if s.item.category.code == cat.code
+            last_cat_value = (
+                last_fact.closing_stock_value if last_fact else Decimal('0')
             )
             
             if first_cat_value > 0:
@@ -4030,8 +3996,12 @@ class KPISummaryView(APIView):
                 }
         
         # Overall variance
-        total_first_value = sum(s.closing_stock_value for s in first_snapshots.values())
-        total_last_value = sum(s.closing_stock_value for s in last_snapshots.values())
+        total_first_value = period_totals(
+            category_facts[first_period.id].values()
+        )['closing_stock_value']
+        total_last_value = period_totals(
+            category_facts[last_period.id].values()
+        )['closing_stock_value']
         
         if total_first_value > 0:
             overall_variance = ((total_last_value - total_first_value) / total_first_value) * 100
@@ -4217,10 +4187,13 @@ class KPISummaryView(APIView):
         total_categories = StockCategory.objects.count()
         
         # Average item value
-        latest_snapshots = StockSnapshot.objects.filter(period=latest_period)
-        if latest_snapshots.exists():
-            total_value = sum(s.closing_stock_value for s in latest_snapshots)
-            avg_item_value = total_value / latest_snapshots.count() if latest_snapshots.count() > 0 else 0
+        latest_totals = period_totals(
+            get_category_facts([latest_period])[latest_period.id].values()
+        )
+        if latest_totals['item_count'] > 0:
+            avg_item_value = (
+                latest_totals['closing_stock_value'] / latest_totals['item_count']
+            )
         else:
             avg_item_value = 0
         
@@ -4290,3 +4263,53 @@ class KPISummaryView(APIView):
                 "cocktail_percentage_of_total": round(cocktail_pct, 2)
             }
         }
+
+
+class StockExportJobView(APIView):
+    """
+    Status of a background stocktake/period export.
+    
+    GET /api/stock-tracker/<hotel>/exports/<job_id>/
+    """
+    permission_classes = [IsAuthenticated, HasStockTrackerNav, IsStaffMember, IsSameHotel]
+    
+    def get(self, request, hotel_identifier, job_id, **kwargs):
+        hotel = _get_staff_hotel(request)
+        job = get_export_job(job_id)
+        if job is None or job['hotel_id'] != hotel.id:
+            return Response(
+                {"error": "Export job not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return _export_job_response(job, request)
+
+
+class StockExportDownloadView(APIView):
+    """
+    Download the file produced by a finished export job.
+    
+    GET /api/stock-tracker/<hotel>/exports/<job_id>/download/
+    """
+    permission_classes = [IsAuthenticated, HasStockTrackerNav, IsStaffMember, IsSameHotel]
+    
+    def get(self, request, hotel_identifier, job_id, **kwargs):
+        hotel = _get_staff_hotel(request)
+        job = get_export_job(job_id)
+        if job is None or job['hotel_id'] != hotel.id:
+            return Response(
+                {"error": "Export job not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        if job['status'] != READY:
+            return Response(
+                {"error": "Export is not ready", "status": job['status']},
+                status=status.HTTP_409_CONFLICT
+            )
+        
+        content = get_export_content(job)
+        if content is None:
+            return Response(
+                {"error": "Export has expired, request it again"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return _export_file_response(job, content)
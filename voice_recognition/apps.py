@@ -5,3 +5,6 @@ class VoiceRecognitionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'voice_recognition'
     verbose_name = 'Voice Recognition'
+
+    def ready(self):
+        from . import signals  # noqa: F401
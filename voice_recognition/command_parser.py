@@ -4,7 +4,7 @@ Parses transcribed text into structured stocktake commands using regex
 """
 import re
 import logging
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from decimal import Decimal
 
 logger = logging.getLogger(__name__)
@@ -381,3 +381,77 @@ def parse_voice_command(transcription: str) -> Dict:
     logger.info(f"✅ Parsed command: {result}")
     
     return result
+
+
+# Batch recordings: "guinness three kegs, heineken two cases then ..."
+COMMAND_SEPARATORS = re.compile(r"[,;\n]+|\.(?!\d)|\b(?:and then|then|next)\b")
+
+# Words that on their own only continue the previous command
+# ("3 kegs, 3 pints" is one count, not two)
+CONTINUATION_WORDS = {
+    'pint', 'pints', 'bottle', 'bottles', 'keg', 'kegs', 'case', 'cases',
+    'box', 'boxes', 'can', 'cans', 'dozen', 'litre', 'litres', 'liter', 'liters',
+    'half', 'quarter', 'and', 'a', 'of',
+}
+
+
+def _is_continuation(segment: str) -> bool:
+    for token in convert_number_words(segment).split():
+        if token in CONTINUATION_WORDS:
+            continue
+        try:
+            float(token)
+        except ValueError:
+            return False
+    return True
+
+
+def split_voice_commands(transcription: str) -> List[str]:
+    """
+    Split one recording's transcript into single-command segments.
+
+    Segments are separated by commas, semicolons, full stops, new lines and
+    "then" / "next"; a segment made only of numbers and unit words is
+    joined back onto the one before it.
+    """
+    segments: List[str] = []
+    for piece in COMMAND_SEPARATORS.split(transcription):
+        piece = piece.strip()
+        if not piece:
+            continue
+        if segments and _is_continuation(piece):
+            segments[-1] = f"{segments[-1]}, {piece}"
+        else:
+            segments.append(piece)
+    return segments
+
+
+def parse_voice_commands(transcription: str, default_action: str = 'count') -> List[Dict]:
+    """
+    Parse a multi-command transcript.
+
+    A segment without an action keyword takes the previous segment's action
+    (the first one takes default_action), so "count guinness 3 kegs,
+    heineken 2 cases" is two counts.
+
+    Returns:
+        one dict per segment: {'text', 'command'} on success or
+        {'text', 'error'} when the segment can't be parsed
+    """
+    results: List[Dict] = []
+    action = default_action
+    for segment in split_voice_commands(transcription):
+        try:
+            try:
+                command = parse_voice_command(segment)
+            except ValueError as exc:
+                if not str(exc).startswith('No action keyword'):
+                    raise
+                command = parse_voice_command(f"{action} {segment}")
+                command['transcription'] = segment
+        except ValueError as exc:
+            results.append({'text': segment, 'error': str(exc)})
+            continue
+        action = command['action']
+        results.append({'text': segment, 'command': command})
+    return results
@@ -1,9 +1,15 @@
 """Fuzzy item matching utilities for voice commands."""
 
 import logging
-from typing import Dict, Iterable, List, Optional
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
 
-from rapidfuzz import fuzz
+import numpy
+from rapidfuzz import fuzz, process
+
+from common.concurrency import bump_cache_version, get_cache_versions
 
 from .brand_synonyms import (
     BRAND_SYNONYMS,
@@ -60,16 +66,31 @@ def expand_search_tokens(phrase: str) -> List[str]:
     return list(expanded)
 
 
-def _package_alignment_score(phrase_lower: str, item_label: str) -> float:
-    """Return a boost or penalty based on draught/bottle hints."""
+KEY_MODIFIERS = ("zero", "diet", "light", "lite", "free", "blonde", "panther", "fuascal")
+DRAUGHT_WORDS = ["draught"] + PACKAGE_SYNONYMS.get("draught", [])
+BOTTLE_WORDS = ["bottle"] + PACKAGE_SYNONYMS.get("bottle", [])
+PRIMARY_SCORERS = (fuzz.token_set_ratio, fuzz.token_sort_ratio, fuzz.partial_ratio, fuzz.WRatio)
+
+# Candidates must share a token prefix this long with the (expanded) phrase
+PREFIX_LENGTH = 3
+
+# Per-process cache of stocktake matcher indexes
+MATCHER_INDEX_TTL = 60 * 10
+MATCHER_INDEX_LIMIT = 32
+
+
+def _package_flags(text: str) -> Tuple[bool, bool]:
+    """(mentions draught, mentions bottle)."""
+
+    return (
+        any(word in text for word in DRAUGHT_WORDS),
+        any(word in text for word in BOTTLE_WORDS),
+    )
 
-    draught_words = ["draught"] + PACKAGE_SYNONYMS.get("draught", [])
-    bottle_words = ["bottle"] + PACKAGE_SYNONYMS.get("bottle", [])
 
-    search_has_draught = any(word in phrase_lower for word in draught_words)
-    search_has_bottle = any(word in phrase_lower for word in bottle_words)
-    item_has_draught = any(word in item_label for word in draught_words)
-    item_has_bottle = any(word in item_label for word in bottle_words)
+def _package_factor(search_flags: Tuple[bool, bool], item_flags: Tuple[bool, bool]) -> float:
+    search_has_draught, search_has_bottle = search_flags
+    item_has_draught, item_has_bottle = item_flags
 
     # Strong penalty for package type mismatch
     if search_has_draught and item_has_bottle:
@@ -84,6 +105,58 @@ def _package_alignment_score(phrase_lower: str, item_label: str) -> float:
     return 1.0
 
 
+def _package_alignment_score(phrase_lower: str, item_label: str) -> float:
+    """Return a boost or penalty based on draught/bottle hints."""
+
+    return _package_factor(_package_flags(phrase_lower), _package_flags(item_label))
+
+
+def _modifiers(text: str) -> FrozenSet[str]:
+    return frozenset(mod for mod in KEY_MODIFIERS if mod in text)
+
+
+def _modifier_factor(phrase_mods: FrozenSet[str], item_mods: FrozenSet[str]) -> float:
+    """Modifier alignment (zero, blonde, etc.)."""
+
+    if phrase_mods and item_mods:
+        # Same modifier boosts, different modifiers penalise
+        return 1.3 if phrase_mods & item_mods else 0.15
+    if phrase_mods:
+        return 0.15  # Said modifier but item doesn't have it
+    if item_mods:
+        return 0.7  # Item has modifier but not mentioned
+    return 1.0
+
+
+def _phrase_ngrams(phrase_lower: str) -> Tuple[List[str], List[str]]:
+    """The phrase's 3-word and 2-word runs long enough to count as exact matches."""
+
+    tokens = phrase_lower.split()
+    three_words = [
+        gram for gram in (" ".join(tokens[i:i + 3]) for i in range(len(tokens) - 2))
+        if len(gram) > 8
+    ]
+    two_words = [
+        gram for gram in (" ".join(tokens[i:i + 2]) for i in range(len(tokens) - 1))
+        if len(gram) > 5
+    ]
+    return three_words, two_words
+
+
+def _semantic_boost(ngrams: Tuple[List[str], List[str]], item_name_lower: str) -> float:
+    """
+    Exact phrase matches ANYWHERE in the sentence, in any word order:
+    "arnie full circle" OR "full circle arnie".
+    """
+
+    three_words, two_words = ngrams
+    if any(gram in item_name_lower for gram in three_words):
+        return 5.0  # HUGE boost for 3-word match
+    if any(gram in item_name_lower for gram in two_words):
+        return 3.5  # BIG boost for 2-word match
+    return 1.0
+
+
 def score_item(item_name: str, sku: str, search_phrase: str) -> float:
     """Compute a fuzzy score between 0.0 and 1.0 for a stock item.
     
@@ -96,78 +169,173 @@ def score_item(item_name: str, sku: str, search_phrase: str) -> float:
     item_name_lower = item_name.lower()
 
     # PRIMARY: Whole-phrase fuzzy matching using multiple algorithms
-    primary_scores: List[float] = []
-    
-    # Direct fuzzy matching against item name
-    primary_scores.append(fuzz.token_set_ratio(phrase_lower, item_name_lower) / 100.0)
-    primary_scores.append(fuzz.token_sort_ratio(phrase_lower, item_name_lower) / 100.0)
-    primary_scores.append(fuzz.partial_ratio(phrase_lower, item_name_lower) / 100.0)
-    primary_scores.append(fuzz.WRatio(phrase_lower, item_name_lower) / 100.0)
-
-    # CRITICAL: Check for exact phrase matches ANYWHERE in sentence
-    semantic_boost = 1.0
-    exact_phrase_match = False
-    best_match_length = 0
-    
-    phrase_tokens = phrase_lower.split()
-    
-    # Check ALL possible 2-word and 3-word combinations
-    # This handles ANY word order: "arnie full circle" OR "full circle arnie"
-    for i in range(len(phrase_tokens)):
-        # Check 3-word phrases first (longer = better)
-        if i + 2 < len(phrase_tokens):
-            three_word = f"{phrase_tokens[i]} {phrase_tokens[i+1]} {phrase_tokens[i+2]}"
-            if three_word in item_name_lower and len(three_word) > 8:
-                semantic_boost = 5.0  # HUGE boost for 3-word match
-                exact_phrase_match = True
-                best_match_length = 3
-                logger.info(
-                    f"✅ 3-WORD MATCH: '{three_word}' in '{item_name}'"
-                )
-                break
-        
-        # Check 2-word phrases
-        if i + 1 < len(phrase_tokens) and best_match_length < 2:
-            two_word = f"{phrase_tokens[i]} {phrase_tokens[i+1]}"
-            if two_word in item_name_lower and len(two_word) > 5:
-                semantic_boost = 3.5  # BIG boost for 2-word match
-                exact_phrase_match = True
-                best_match_length = 2
-                logger.info(
-                    f"✅ 2-WORD MATCH: '{two_word}' in '{item_name}'"
-                )
-    
-    # Modifier alignment (zero, blonde, etc.)
-    modifier_factor = 1.0
-    key_modifiers = ["zero", "diet", "light", "lite", "free", "blonde", "panther", "fuascal"]
-    
-    phrase_has_modifier = any(mod in phrase_lower for mod in key_modifiers)
-    item_has_modifier = any(mod in item_name_lower for mod in key_modifiers)
-    
-    if phrase_has_modifier and item_has_modifier:
-        # Check if SAME modifier
-        for mod in key_modifiers:
-            if mod in phrase_lower and mod in item_name_lower:
-                modifier_factor = 1.3
-                break
-        # Different modifiers = penalty
-        if modifier_factor == 1.0:
-            modifier_factor = 0.15
-    elif phrase_has_modifier and not item_has_modifier:
-        modifier_factor = 0.15  # Said modifier but item doesn't have it
-    elif not phrase_has_modifier and item_has_modifier:
-        modifier_factor = 0.7  # Item has modifier but not mentioned
-
-    # Package type alignment
-    package_factor = _package_alignment_score(phrase_lower, item_label)
+    primary_scores = [
+        scorer(phrase_lower, item_name_lower) / 100.0 for scorer in PRIMARY_SCORERS
+    ]
 
     # FINAL SCORE: Average of primary scores with boosts applied
     base_score = sum(primary_scores) / len(primary_scores)
-    final_score = base_score * semantic_boost * modifier_factor * package_factor
-    
+    final_score = (
+        base_score
+        * _semantic_boost(_phrase_ngrams(phrase_lower), item_name_lower)
+        * _modifier_factor(_modifiers(phrase_lower), _modifiers(item_name_lower))
+        * _package_factor(_package_flags(phrase_lower), _package_flags(item_label))
+    )
+
     return min(final_score, 1.0)  # Cap at 1.0
 
 
+class MatcherIndex:
+    """
+    Stock items prepared for repeated matching.
+
+    Lowercased names, modifier and package flags are computed once, and
+    item tokens are indexed by prefix so a phrase is only scored against
+    items sharing a token prefix with it (or its brand / package
+    synonyms), falling back to every item when none do. Candidates are
+    scored with score_item()'s formula, the fuzzy ratios batched through
+    rapidfuzz.process.cdist.
+
+    Args:
+        entries: (key, name, sku) tuples; key is returned for a match
+    """
+
+    def __init__(self, entries: Iterable[Tuple[object, str, str]]):
+        self.keys: List = []
+        self.names: List[str] = []
+        self.skus: List[str] = []
+        self._name_lowers: List[str] = []
+        self._modifiers: List[FrozenSet[str]] = []
+        self._packages: List[Tuple[bool, bool]] = []
+        self._prefixes: Dict[str, List[int]] = defaultdict(list)
+
+        for position, (key, name, sku) in enumerate(entries):
+            name, sku = name or "", sku or ""
+            name_lower = name.lower()
+            label = f"{sku} {name}".strip().lower()
+            self.keys.append(key)
+            self.names.append(name)
+            self.skus.append(sku)
+            self._name_lowers.append(name_lower)
+            self._modifiers.append(_modifiers(name_lower))
+            self._packages.append(_package_flags(label))
+            for token in set(label.split()):
+                if len(token) >= PREFIX_LENGTH:
+                    self._prefixes[token[:PREFIX_LENGTH]].append(position)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def candidates(self, phrase_lower: str) -> List[int]:
+        """Positions of items sharing a token prefix with the phrase."""
+
+        positions = set()
+        for token in expand_search_tokens(phrase_lower):
+            for word in token.split():
+                if len(word) >= PREFIX_LENGTH:
+                    positions.update(self._prefixes.get(word[:PREFIX_LENGTH], ()))
+        return sorted(positions) if positions else list(range(len(self.keys)))
+
+    def rank(self, search_phrase: str) -> List[Tuple[int, float]]:
+        """(position, score) for the candidates, best first (ties in index order)."""
+
+        return self.rank_many([search_phrase])[0]
+
+    def rank_many(self, search_phrases: List[str]) -> List[List[Tuple[int, float]]]:
+        """
+        rank() for several phrases, scored in one cdist call per scorer.
+
+        Each phrase is still only ranked against its own candidates.
+        """
+
+        phrases = [phrase.lower() for phrase in search_phrases]
+        candidates = [self.candidates(phrase) for phrase in phrases]
+        union = sorted(set().union(*candidates))
+        if not union:
+            return [[] for _ in phrases]
+
+        column = {position: i for i, position in enumerate(union)}
+        names = [self._name_lowers[position] for position in union]
+        base_scores = None
+        for scorer in PRIMARY_SCORERS:
+            scores = process.cdist(
+                phrases, names, scorer=scorer, dtype=numpy.float64
+            ) / 100.0
+            base_scores = scores if base_scores is None else base_scores + scores
+        base_scores = (base_scores / len(PRIMARY_SCORERS)).tolist()
+
+        rankings = []
+        for phrase_lower, positions, row in zip(phrases, candidates, base_scores):
+            ngrams = _phrase_ngrams(phrase_lower)
+            phrase_mods = _modifiers(phrase_lower)
+            phrase_package = _package_flags(phrase_lower)
+
+            ranked = []
+            for position in positions:
+                final_score = (
+                    row[column[position]]
+                    * _semantic_boost(ngrams, self._name_lowers[position])
+                    * _modifier_factor(phrase_mods, self._modifiers[position])
+                    * _package_factor(phrase_package, self._packages[position])
+                )
+                ranked.append((position, min(final_score, 1.0)))
+            ranked.sort(key=lambda candidate: candidate[1], reverse=True)
+            rankings.append(ranked)
+        return rankings
+
+
+def _select_best(
+    index: MatcherIndex,
+    search_phrase: str,
+    ranked: List[Tuple[int, float]],
+    min_score: float,
+) -> Optional[Tuple[int, float]]:
+    """(position, score) of the best candidate if it clears min_score."""
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "🔍 Search '%s' -> TOP 5 candidates:\n%s",
+            search_phrase,
+            "\n".join(
+                f"  {rank}. {index.names[position]} (SKU: {index.skus[position]}) - Score: {score:.3f}"
+                for rank, (position, score) in enumerate(ranked[:5], start=1)
+            ),
+        )
+
+    if not ranked:
+        logger.warning("No candidates produced for '%s'", search_phrase)
+        return None
+
+    position, score = ranked[0]
+    if score < min_score:
+        logger.warning(
+            "No confident match for '%s' (best %.2f < %.2f)",
+            search_phrase,
+            score,
+            min_score,
+        )
+        return None
+
+    logger.info(
+        "Selected '%s' → '%s' (%s) with score %.2f",
+        search_phrase,
+        index.names[position],
+        index.skus[position],
+        score,
+    )
+    return position, score
+
+
+def _match_payload(item, score: float, search_phrase: str) -> Optional[Dict]:
+    if item is None:
+        return None
+    return {
+        "item": item,
+        "confidence": score,
+        "search_phrase": search_phrase,
+    }
+
+
 def find_best_match(
     search_phrase: str,
     items: Iterable,
@@ -178,76 +346,75 @@ def find_best_match(
     if not search_phrase:
         return None
 
-    items_list = list(items)
-    if not items_list:
+    index = MatcherIndex((item, item.name, item.sku) for item in items)
+    if not len(index):
+        return None
+    best = _select_best(
+        index, search_phrase, index.rank(normalize_phrase(search_phrase)), min_score
+    )
+    if best is None:
         return None
+    position, score = best
+    return _match_payload(index.keys[position], score, search_phrase)
 
-    normalized = normalize_phrase(search_phrase)
-    candidates: List[Dict] = []
-
-    for item in items_list:
-        score = score_item(item.name, item.sku, normalized)
-        candidates.append(
-            {
-                "item": item,
-                "score": score,
-                "name": item.name,
-                "sku": item.sku,
-            }
-        )
 
-    candidates.sort(key=lambda candidate: candidate["score"], reverse=True)
+# ---------------------------------------------------------------------------
+# Cached stocktake indexes
+# ---------------------------------------------------------------------------
 
-    logger.info(
-        "🔍 Search '%s' -> TOP 5 candidates:\n"
-        "  1. %s (SKU: %s) - Score: %.3f\n"
-        "  2. %s (SKU: %s) - Score: %.3f\n"
-        "  3. %s (SKU: %s) - Score: %.3f\n"
-        "  4. %s (SKU: %s) - Score: %.3f\n"
-        "  5. %s (SKU: %s) - Score: %.3f",
-        search_phrase,
-        candidates[0]["name"] if len(candidates) > 0 else "N/A",
-        candidates[0]["sku"] if len(candidates) > 0 else "N/A",
-        candidates[0]["score"] if len(candidates) > 0 else 0,
-        candidates[1]["name"] if len(candidates) > 1 else "N/A",
-        candidates[1]["sku"] if len(candidates) > 1 else "N/A",
-        candidates[1]["score"] if len(candidates) > 1 else 0,
-        candidates[2]["name"] if len(candidates) > 2 else "N/A",
-        candidates[2]["sku"] if len(candidates) > 2 else "N/A",
-        candidates[2]["score"] if len(candidates) > 2 else 0,
-        candidates[3]["name"] if len(candidates) > 3 else "N/A",
-        candidates[3]["sku"] if len(candidates) > 3 else "N/A",
-        candidates[3]["score"] if len(candidates) > 3 else 0,
-        candidates[4]["name"] if len(candidates) > 4 else "N/A",
-        candidates[4]["sku"] if len(candidates) > 4 else "N/A",
-        candidates[4]["score"] if len(candidates) > 4 else 0,
-    )
+_indexes: "OrderedDict[Tuple[int, int], Tuple[Tuple, float, MatcherIndex]]" = OrderedDict()
+_indexes_lock = threading.Lock()
 
-    best = candidates[0] if candidates else None
-    if best and best["score"] >= min_score:
-        logger.info(
-            "Selected '%s' → '%s' (%s) with score %.2f",
-            search_phrase,
-            best["name"],
-            best["sku"],
-            best["score"],
-        )
-        return {
-            "item": best["item"],
-            "confidence": best["score"],
-            "search_phrase": search_phrase,
-        }
 
-    if best:
-        logger.warning(
-            "No confident match for '%s' (best %.2f < %.2f)",
-            search_phrase,
-            best["score"],
-            min_score,
-        )
-    else:
-        logger.warning("No candidates produced for '%s'", search_phrase)
-    return None
+def _version_key(scope: str, pk) -> str:
+    return f"voice_matcher_version:{scope}:{pk}"
+
+
+def bump_matcher_version(scope: str, pk) -> None:
+    """
+    Invalidate the cached matcher indexes of a hotel or stocktake.
+
+    Args:
+        scope: 'hotel' (stock items changed) or 'stocktake' (lines added /
+            removed)
+        pk: Object id
+    """
+    bump_cache_version(_version_key(scope, pk))
+
+
+def get_stocktake_index(stocktake) -> MatcherIndex:
+    """
+    Matcher index of the active items on a stocktake.
+
+    Built once per process and reused until the hotel's stock items or the
+    stocktake's lines change (see signals.py) or MATCHER_INDEX_TTL passes.
+    """
+    from stock_tracker.models import StockItem
+
+    version = get_cache_versions([
+        _version_key("hotel", stocktake.hotel_id),
+        _version_key("stocktake", stocktake.pk),
+    ])
+    index_key = (stocktake.hotel_id, stocktake.pk)
+
+    with _indexes_lock:
+        cached = _indexes.get(index_key)
+        if cached and cached[0] == version and cached[1] > time.monotonic():
+            _indexes.move_to_end(index_key)
+            return cached[2]
+
+    item_ids = stocktake.lines.values_list("item_id", flat=True)
+    index = MatcherIndex(
+        StockItem.objects.filter(id__in=item_ids, active=True)
+        .values_list("id", "name", "sku")
+    )
+
+    with _indexes_lock:
+        _indexes[index_key] = (version, time.monotonic() + MATCHER_INDEX_TTL, index)
+        _indexes.move_to_end(index_key)
+        while len(_indexes) > MATCHER_INDEX_LIMIT:
+            _indexes.popitem(last=False)
+    return index
 
 
 def find_best_match_in_stocktake(
@@ -259,9 +426,72 @@ def find_best_match_in_stocktake(
 
     from stock_tracker.models import StockItem
 
-    item_ids = stocktake.lines.values_list("item_id", flat=True)
-    items = StockItem.objects.filter(id__in=item_ids, active=True)
-    return find_best_match(search_phrase, items, min_score=min_score)
+    if not search_phrase:
+        return None
+
+    index = get_stocktake_index(stocktake)
+    if not len(index):
+        return None
+    best = _select_best(
+        index, search_phrase, index.rank(normalize_phrase(search_phrase)), min_score
+    )
+    if best is None:
+        return None
+    position, score = best
+    return _match_payload(
+        StockItem.objects.filter(pk=index.keys[position]).first(), score, search_phrase
+    )
+
+
+def find_best_matches(
+    search_phrases: List[str],
+    *,
+    items: Optional[Iterable] = None,
+    stocktake=None,
+    min_score: float = 0.55,
+) -> List[Optional[Dict]]:
+    """
+    find_best_match_in_stocktake() / find_best_match() for several phrases.
+
+    The index is built (or fetched) once, all phrases are ranked in one
+    batch and matched stock items are loaded with one query.
+
+    Returns:
+        one match dict or None per phrase, in order
+    """
+
+    from stock_tracker.models import StockItem
+
+    matches: List[Optional[Dict]] = [None] * len(search_phrases)
+    if stocktake is not None:
+        index = get_stocktake_index(stocktake)
+    else:
+        index = MatcherIndex(
+            (item, item.name, item.sku) for item in (items if items is not None else ())
+        )
+
+    wanted = [(i, phrase) for i, phrase in enumerate(search_phrases) if phrase]
+    if not len(index) or not wanted:
+        return matches
+
+    rankings = index.rank_many([normalize_phrase(phrase) for _, phrase in wanted])
+    selected = {}
+    for (i, phrase), ranked in zip(wanted, rankings):
+        best = _select_best(index, phrase, ranked, min_score)
+        if best is not None:
+            selected[i] = best
+
+    if stocktake is not None:
+        items_by_id = StockItem.objects.in_bulk(
+            [index.keys[position] for position, _ in selected.values()]
+        )
+        resolve = items_by_id.get
+    else:
+        resolve = lambda item: item  # noqa: E731
+
+    for i, (position, score) in selected.items():
+        matches[i] = _match_payload(resolve(index.keys[position]), score, search_phrases[i])
+    return matches
 
 
 __all__ = [
@@ -270,4 +500,8 @@ __all__ = [
     "score_item",
     "find_best_match",
     "find_best_match_in_stocktake",
+    "find_best_matches",
+    "MatcherIndex",
+    "get_stocktake_index",
+    "bump_matcher_version",
 ]
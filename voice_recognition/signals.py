@@ -0,0 +1,27 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from stock_tracker.models import StockItem, StocktakeLine
+
+
+def _bump_matcher_version(scope, pk):
+    from .fuzzy_matcher import bump_matcher_version
+
+    if pk is not None:
+        transaction.on_commit(lambda: bump_matcher_version(scope, pk))
+
+
+@receiver(post_save, sender=StockItem)
+@receiver(post_delete, sender=StockItem)
+def invalidate_hotel_matchers(sender, instance, **kwargs):
+    """Names, SKUs and active flags feed every stocktake index of the hotel."""
+    _bump_matcher_version('hotel', instance.hotel_id)
+
+
+@receiver(post_save, sender=StocktakeLine)
+@receiver(post_delete, sender=StocktakeLine)
+def invalidate_stocktake_matcher(sender, instance, created=True, **kwargs):
+    # Counting updates existing lines; only added / removed items matter
+    if created:
+        _bump_matcher_version('stocktake', instance.stocktake_id)
@@ -0,0 +1,290 @@
+"""
+Tests for voice item matching (voice_recognition/fuzzy_matcher.py).
+"""
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from hotel.models import Hotel
+from stock_tracker.models import StockCategory, StockItem, Stocktake, StocktakeLine
+from .command_parser import parse_voice_commands
+from .fuzzy_matcher import (
+    MatcherIndex,
+    find_best_match,
+    find_best_match_in_stocktake,
+    find_best_matches,
+    normalize_phrase,
+    score_item,
+)
+from .transcription import transcribe_audio
+from .views_voice import VoiceCommandConfirmView, VoiceCommandView
+from .voice_command_service import process_audio_command
+
+CATALOG = [
+    ("D0001", "Heineken Draught"),
+    ("B0001", "Heineken Bottle"),
+    ("B0002", "Heineken Zero Bottle"),
+    ("B0003", "Coors Light Bottle"),
+    ("S0001", "Jameson Whiskey"),
+    ("W0001", "Jack Rabbit Merlot"),
+]
+
+
+class MatcherIndexTests(SimpleTestCase):
+    """The index ranks candidates with score_item()'s scores."""
+
+    def setUp(self):
+        self.index = MatcherIndex((sku, name, sku) for sku, name in CATALOG)
+
+    def test_scores_match_score_item(self):
+        for phrase in ("heineken bottle", "heiny zero", "jack rabbit merlot", "coors"):
+            normalized = normalize_phrase(phrase)
+            for position, score in self.index.rank(normalized):
+                sku, name = CATALOG[position]
+                self.assertAlmostEqual(score, score_item(name, sku, normalized), places=9)
+
+    def test_prefilter_keeps_synonym_matches_and_falls_back_to_all(self):
+        candidates = self.index.candidates("heiny on tap")
+        self.assertEqual(
+            [CATALOG[position][0] for position in candidates], ["D0001", "B0001", "B0002"]
+        )
+        self.assertEqual(len(self.index.candidates("xyz")), len(CATALOG))
+
+    def test_find_best_match_over_items(self):
+        items = [SimpleNamespace(sku=sku, name=name) for sku, name in CATALOG]
+
+        match = find_best_match("heineken on tap", items)
+
+        self.assertEqual(match["item"].sku, "D0001")
+        self.assertIsNone(find_best_match("heineken on tap", []))
+
+    def test_batched_ranking_matches_single_ranking(self):
+        phrases = ["heineken bottle", "heiny zero", "jameson", "nothing like it"]
+
+        self.assertEqual(
+            self.index.rank_many(phrases), [self.index.rank(phrase) for phrase in phrases]
+        )
+
+    def test_transcript_is_split_into_commands(self):
+        entries = parse_voice_commands(
+            "guinness three kegs, 3 pints, heineken two cases then purchase bulmers 2 cases. xx"
+        )
+
+        self.assertEqual(
+            [(entry["command"]["action"], entry["command"]["item_identifier"])
+             for entry in entries[:3]],
+            [("count", "guinness"), ("count", "heineken"), ("purchase", "bulmers")],
+        )
+        self.assertEqual(entries[0]["command"]["full_units"], 3)
+        self.assertIn("error", entries[3])
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+)
+class VoiceStocktakeTestCase(TestCase):
+    """A stocktake with a Heineken line."""
+
+    def setUp(self):
+        cache.clear()
+        self.hotel = Hotel.objects.create(name='Voice Hotel', slug='voice-hotel')
+        self.category, _ = StockCategory.objects.get_or_create(
+            code='B', defaults={'name': 'Bottled Beer'}
+        )
+        self.stocktake = Stocktake.objects.create(
+            hotel=self.hotel,
+            period_start=date(2025, 1, 1),
+            period_end=date(2025, 1, 31),
+        )
+        self.heineken = self._item('B0001', 'Heineken Bottle')
+        self._line(self.heineken)
+
+    def _item(self, sku, name, uom=Decimal('24')):
+        with self.captureOnCommitCallbacks(execute=True):
+            return StockItem.objects.create(
+                hotel=self.hotel,
+                sku=sku,
+                name=name,
+                category=self.category,
+                size='330ml',
+                size_value=Decimal('330'),
+                size_unit='ml',
+                uom=uom,
+                unit_cost=Decimal('20.00'),
+            )
+
+    def _line(self, item):
+        with self.captureOnCommitCallbacks(execute=True):
+            return StocktakeLine.objects.create(
+                stocktake=self.stocktake,
+                item=item,
+                opening_qty=Decimal('0'),
+                valuation_cost=Decimal('1.00'),
+            )
+
+
+class StocktakeIndexTests(VoiceStocktakeTestCase):
+    """Stocktake indexes are reused until stock items or lines change."""
+
+    def test_index_is_reused_until_lines_or_items_change(self):
+        match = find_best_match_in_stocktake("heineken bottle", self.stocktake)
+        self.assertEqual(match["item"], self.heineken)
+
+        # Version lookup is served by the cache; only the matched item is loaded
+        with self.assertNumQueries(1):
+            find_best_match_in_stocktake("heineken bottle", self.stocktake)
+
+        coors = self._item('B0002', 'Coors Light Bottle')
+        self.assertIsNone(find_best_match_in_stocktake("coors light", self.stocktake))
+
+        self._line(coors)
+        match = find_best_match_in_stocktake("coors light", self.stocktake)
+        self.assertEqual(match["item"], coors)
+
+        self.heineken.name = 'Heineken Zero Bottle'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.heineken.save()
+        match = find_best_match_in_stocktake("heineken zero", self.stocktake)
+        self.assertEqual(match["item"], self.heineken)
+
+
+class _StubTranscriptions:
+    """Stands in for client.audio.transcriptions; records the uploads."""
+
+    def __init__(self, text):
+        self.text = text
+        self.files = []
+
+    def create(self, **kwargs):
+        self.files.append(kwargs["file"])
+        return SimpleNamespace(text=self.text)
+
+
+def _stub_client(text):
+    return SimpleNamespace(audio=SimpleNamespace(transcriptions=_StubTranscriptions(text)))
+
+
+@override_settings(OPENAI_API_KEY='test-key')
+class VoiceBatchTests(VoiceStocktakeTestCase):
+    """Longer recordings become several commands confirmed in one request."""
+
+    def setUp(self):
+        super().setUp()
+        self.guinness = self._item('D0001', 'Guinness Keg', uom=Decimal('88'))
+        self._line(self.guinness)
+        self.user = User.objects.create_user(username='counter', password='pw')
+
+    def test_upload_buffer_is_sent_without_a_temp_file(self):
+        client = _stub_client("count guinness 3 kegs")
+        upload = SimpleUploadedFile("clip.webm", b"RIFF-audio", content_type="audio/webm")
+
+        with mock.patch("voice_recognition.transcription.client", client), \
+                mock.patch("tempfile.NamedTemporaryFile") as temp_file:
+            self.assertEqual(transcribe_audio(upload), "count guinness 3 kegs")
+
+        temp_file.assert_not_called()
+        name, buffer, content_type = client.audio.transcriptions.files[0]
+        self.assertEqual((name, content_type), ("audio.webm", "audio/webm"))
+        self.assertIs(buffer, upload.file)
+
+    def test_batch_preview_and_confirm(self):
+        client = _stub_client("guinness three kegs, 12 pints, heineken two cases")
+        upload = SimpleUploadedFile("clip.webm", b"RIFF-audio", content_type="audio/webm")
+
+        with mock.patch("voice_recognition.transcription.client", client), \
+                mock.patch(
+                    "voice_recognition.voice_command_service.find_best_matches",
+                    wraps=find_best_matches,
+                ) as matcher:
+            result = process_audio_command(upload, stocktake=self.stocktake, batch=True)
+
+        matcher.assert_called_once()
+        self.assertEqual(
+            [entry["match"]["item"] for entry in result["commands"]],
+            [self.guinness, self.heineken],
+        )
+        self.assertEqual(result["preview"].splitlines()[0], "1. Count Guinness Keg: 3 full + 12")
+        self.assertEqual(result["preview"].splitlines()[1], "2. Count Heineken Bottle: 2")
+
+        commands = [
+            {**entry["command"], "item_id": entry["match"]["item"].id}
+            for entry in result["commands"]
+        ]
+        response = self._confirm(commands)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 2)
+        line = StocktakeLine.objects.get(stocktake=self.stocktake, item=self.guinness)
+        self.assertEqual((line.counted_full_units, line.counted_partial_units), (3, 12))
+
+    def test_batch_confirm_is_all_or_nothing(self):
+        response = self._confirm([
+            {"action": "count", "item_identifier": "guinness", "value": 2},
+            {"action": "shelve", "item_identifier": "heineken", "value": 1},
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["index"], 1)
+        line = StocktakeLine.objects.get(stocktake=self.stocktake, item=self.guinness)
+        self.assertEqual(line.counted_full_units, 0)
+
+    def test_batch_preview_commands_carry_the_matched_item(self):
+        client = _stub_client("guinness three kegs, heineken two cases")
+        request = APIRequestFactory().post(
+            "/voice/",
+            {
+                "stocktake_id": self.stocktake.id,
+                "batch": "true",
+                "audio": SimpleUploadedFile(
+                    "clip.webm", b"RIFF-audio", content_type="audio/webm"
+                ),
+            },
+            format="multipart",
+        )
+        force_authenticate(request, user=self.user)
+        with mock.patch("voice_recognition.transcription.client", client):
+            response = VoiceCommandView.as_view()(request, hotel_identifier=self.hotel.slug)
+
+        self.assertEqual(response.status_code, 200)
+        commands = [entry["command"] for entry in response.data["commands"]]
+        self.assertEqual(
+            [command["item_id"] for command in commands],
+            [self.guinness.id, self.heineken.id],
+        )
+
+        self.assertEqual(self._confirm(commands).status_code, 200)
+
+    def test_batch_confirm_rejects_a_malformed_item_id(self):
+        response = self._confirm([
+            {"action": "count", "item_id": self.guinness.id, "value": 2},
+            {"action": "count", "item_id": "abc", "value": 1},
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["index"], 1)
+
+    def test_batch_confirm_reports_the_unmatched_command(self):
+        response = self._confirm([
+            {"action": "count", "item_identifier": "guinness", "value": 2},
+            {"action": "count", "item_id": 999999, "value": 1},
+        ])
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.data["index"], 1)
+
+    def _confirm(self, commands):
+        request = APIRequestFactory().post(
+            "/confirm/",
+            {"stocktake_id": self.stocktake.id, "commands": commands},
+            format="json",
+        )
+        force_authenticate(request, user=self.user)
+        with mock.patch("stock_tracker.pusher_utils.broadcast_line_counted_updated"):
+            return VoiceCommandConfirmView.as_view()(request, hotel_identifier=self.hotel.slug)
@@ -3,7 +3,7 @@ Audio Transcription Service using OpenAI STT (gpt-4o-mini-transcribe)
 
 Responsible ONLY for:
     - Taking a Django UploadedFile (in-memory or temp file)
-    - Converting it into a format OpenAI accepts
+    - Handing its buffer to the API as a named upload (no temp file copy)
     - Calling STT model
     - Returning plain transcription text
 
@@ -11,9 +11,6 @@ Used by: voice_command_service.py
 """
 
 import logging
-import os
-import tempfile
-from typing import Optional
 
 from django.conf import settings
 from openai import OpenAI
@@ -46,34 +43,36 @@ def _guess_suffix(uploaded_file) -> str:
     return ".webm"
 
 
-def _save_uploaded_to_temp(uploaded_file) -> str:
+def _guess_content_type(uploaded_file, suffix: str) -> str:
+    content_type = getattr(uploaded_file, "content_type", None)
+    if content_type:
+        return content_type
+    return {
+        ".webm": "audio/webm",
+        ".mp4": "audio/mp4",
+        ".m4a": "audio/mp4",
+        ".mp3": "audio/mpeg",
+        ".ogg": "audio/ogg",
+        ".wav": "audio/wav",
+    }.get(suffix.lower(), "application/octet-stream")
+
+
+def _upload_payload(uploaded_file):
     """
-    Save Django UploadedFile to a NamedTemporaryFile and return its path.
+    (filename, file object, content type) tuple for the OpenAI client.
 
-    OpenAI Python v1 prefers a real file object (open(path, 'rb')),
-    and sometimes doesn't like InMemoryUploadedFile directly.
+    The client infers the format from the filename, so the upload's own
+    buffer (BytesIO for in-memory uploads, the spooled file otherwise) is
+    passed directly under a name with the right suffix.
     """
 
     suffix = _guess_suffix(uploaded_file)
-    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
-    try:
-        for chunk in uploaded_file.chunks():
-            tmp.write(chunk)
-        tmp.flush()
-    finally:
-        tmp.close()
-    return tmp.name
-
-
-def _cleanup_temp(path: Optional[str]) -> None:
-    """Best-effort cleanup of temp files."""
-
-    if not path:
-        return
-    try:
-        os.unlink(path)
-    except OSError:
-        logger.debug("Temp file already removed: %s", path)
+    buffer = getattr(uploaded_file, "file", None) or uploaded_file
+    return (
+        f"audio{suffix}",
+        buffer,
+        _guess_content_type(uploaded_file, suffix),
+    )
 
 
 def transcribe_audio(audio_file) -> str:
@@ -94,34 +93,30 @@ def transcribe_audio(audio_file) -> str:
         logger.error("❌ OPENAI_API_KEY missing in settings")
         raise TranscriptionError("OpenAI API key not configured")
 
-    temp_path = None
     try:
         try:
             audio_file.seek(0)
         except Exception:
             logger.debug("Uploaded file does not support seek")
 
-        temp_path = _save_uploaded_to_temp(audio_file)
         logger.info(
-            "🎧 Saved uploaded audio to temp file: %s (name=%s, size=%s bytes)",
-            temp_path,
+            "🎧 Transcribing uploaded audio (name=%s, size=%s bytes)",
             getattr(audio_file, "name", "<unknown>"),
             getattr(audio_file, "size", "<unknown>"),
         )
 
-        with open(temp_path, "rb") as file_handle:
-            response = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=file_handle,
-                language="en",
-                prompt=(
-                    "Count Killarney Full Circle Panther Fuascal "
-                    "Heineken Guinness Budweiser Coors Bulmers Smithwicks "
-                    "Beamish Carlsberg Peroni Corona Moretti bottles kegs "
-                    "cases pints count purchase waste"
-                ),
-                temperature=0.0,
-            )
+        response = client.audio.transcriptions.create(
+            model="whisper-1",
+            file=_upload_payload(audio_file),
+            language="en",
+            prompt=(
+                "Count Killarney Full Circle Panther Fuascal "
+                "Heineken Guinness Budweiser Coors Bulmers Smithwicks "
+                "Beamish Carlsberg Peroni Corona Moretti bottles kegs "
+                "cases pints count purchase waste"
+            ),
+            temperature=0.0,
+        )
 
         text = (
             getattr(response, "text", None)
@@ -141,5 +136,3 @@ def transcribe_audio(audio_file) -> str:
     except Exception as exc:
         logger.error("❌ Speech-to-text failed: %s", exc, exc_info=True)
         raise TranscriptionError(f"Audio transcription failed: {exc}")
-    finally:
-        _cleanup_temp(temp_path)
@@ -1,6 +1,7 @@
 """Django REST views for the voice command pipeline."""
 
 import logging
+from decimal import Decimal
 from typing import Optional
 
 from django.conf import settings
@@ -20,12 +21,36 @@ from stock_tracker.models import (
     StocktakeLine,
 )
 
-from .fuzzy_matcher import find_best_match_in_stocktake
+from .fuzzy_matcher import find_best_matches
 from .voice_command_service import VoiceCommandError, process_audio_command
 
 logger = logging.getLogger(__name__)
 
 
+class _CommandRejected(Exception):
+    """
+    A confirmed command that can't be applied; carries the response status
+    and, when known, the position of the command in a batch.
+    """
+
+    def __init__(self, message, status_code=status.HTTP_400_BAD_REQUEST, index=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.index = index
+
+
+def _preview_command(entry: dict) -> Optional[dict]:
+    """A batch entry's command with the matched item_id, ready to confirm."""
+    command = entry.get("command")
+    if command is None:
+        return None
+    command = dict(command)
+    match = entry.get("match")
+    if match and match.get("item"):
+        command["item_id"] = match["item"].id
+    return command
+
+
 def _build_match_payload(match: Optional[dict]) -> Optional[dict]:
     if not match:
         return None
@@ -47,6 +72,7 @@ class VoiceCommandView(APIView):
     def post(self, request, hotel_identifier):
         audio_file = request.FILES.get("audio")
         stocktake_id = request.data.get("stocktake_id")
+        batch = str(request.data.get("batch", "")).lower() in {"1", "true", "yes"}
 
         if not audio_file:
             return Response(
@@ -114,6 +140,7 @@ class VoiceCommandView(APIView):
                     "VOICE_COMMAND_DOMAIN_HINT",
                     None,
                 ),
+                batch=batch,
             )
         except VoiceCommandError as exc:
             logger.warning("Voice command pipeline failed: %s", exc)
@@ -122,6 +149,29 @@ class VoiceCommandView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        if batch:
+            return Response(
+                {
+                    "success": True,
+                    "batch": True,
+                    "stocktake_id": int(stocktake_id),
+                    "raw_transcription": result.get("transcription"),
+                    "transcription": result.get("cleaned_transcription"),
+                    "commands": [
+                        {
+                            "text": entry["text"],
+                            "command": _preview_command(entry),
+                            "unit_details": entry.get("unit_details"),
+                            "match": _build_match_payload(entry.get("match")),
+                            "error": entry.get("error"),
+                        }
+                        for entry in result["commands"]
+                    ],
+                    "preview": result.get("preview"),
+                },
+                status=status.HTTP_200_OK,
+            )
+
         match_payload = _build_match_payload(result.get("match"))
         command_payload = result.get("command", {}).copy()
         command_payload["transcription"] = result.get("cleaned_transcription")
@@ -145,8 +195,9 @@ class VoiceCommandConfirmView(APIView):
     def post(self, request, hotel_identifier):
         stocktake_id = request.data.get("stocktake_id")
         command = request.data.get("command") or {}
+        commands = request.data.get("commands")
 
-        if not stocktake_id or not command:
+        if not stocktake_id or not (command or commands):
             return Response(
                 {"success": False, "error": "Missing stocktake_id or command"},
                 status=status.HTTP_400_BAD_REQUEST,
@@ -168,44 +219,162 @@ class VoiceCommandConfirmView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        item_identifier = (command.get("item_identifier") or "").strip()
-        if not item_identifier:
+        if commands is not None:
+            return self._confirm_batch(request, hotel_identifier, hotel, stocktake, commands)
+
+        try:
+            stock_item = self._resolve_items(hotel, stocktake, [command])[0]
+            line, message = self._apply_command(request, stocktake, stock_item, command)
+        except _CommandRejected as exc:
             return Response(
-                {"success": False, "error": "Command missing item identifier"},
-                status=status.HTTP_400_BAD_REQUEST,
+                {"success": False, "error": str(exc)},
+                status=exc.status_code,
             )
 
-        match_result = find_best_match_in_stocktake(
-            item_identifier,
-            stocktake,
-            min_score=getattr(settings, "VOICE_COMMAND_MIN_SCORE", 0.7),
+        from stock_tracker.stock_serializers import StocktakeLineSerializer
+
+        serializer = StocktakeLineSerializer(line)
+        self._broadcast(hotel_identifier, stocktake, line, stock_item, serializer.data)
+
+        return Response(
+            {
+                "success": True,
+                "line": serializer.data,
+                "message": message,
+                "item_name": stock_item.name,
+                "item_sku": stock_item.sku,
+            },
+            status=status.HTTP_200_OK,
         )
 
-        if match_result:
-            stock_item = match_result["item"]
-        else:
-            stock_item = StockItem.objects.filter(
-                hotel=hotel,
-                active=True,
-            ).filter(
-                Q(sku__iexact=item_identifier)
-                | Q(name__iexact=item_identifier)
-                | Q(sku__icontains=item_identifier)
-                | Q(name__icontains=item_identifier)
-            ).first()
-
-        if not stock_item:
+    def _confirm_batch(self, request, hotel_identifier, hotel, stocktake, commands):
+        """
+        Apply a batch preview's commands in one transaction.
+
+        Either every command is applied or none is; the error names the
+        position of the command that was rejected.
+        """
+        from django.db import transaction
+
+        from stock_tracker.stock_serializers import StocktakeLineSerializer
+
+        if not isinstance(commands, list) or not commands:
             return Response(
-                {
-                    "success": False,
-                    "error": (
-                        "No matching item found for '"
-                        f"{item_identifier}'."
-                    ),
-                },
-                status=status.HTTP_404_NOT_FOUND,
+                {"success": False, "error": "commands must be a non-empty list"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        applied = []
+        index = 0
+        try:
+            with transaction.atomic():
+                stock_items = self._resolve_items(hotel, stocktake, commands)
+                for index, (command, stock_item) in enumerate(zip(commands, stock_items)):
+                    line, message = self._apply_command(
+                        request, stocktake, stock_item, command
+                    )
+                    applied.append((line, stock_item, message))
+        except _CommandRejected as exc:
+            if exc.index is not None:
+                index = exc.index
+            return Response(
+                {"success": False, "index": index, "error": str(exc)},
+                status=exc.status_code,
             )
 
+        results = []
+        for line, stock_item, message in applied:
+            line_data = StocktakeLineSerializer(line).data
+            self._broadcast(hotel_identifier, stocktake, line, stock_item, line_data)
+            results.append({
+                "line": line_data,
+                "message": message,
+                "item_name": stock_item.name,
+                "item_sku": stock_item.sku,
+            })
+
+        return Response(
+            {"success": True, "results": results},
+            status=status.HTTP_200_OK,
+        )
+
+    def _resolve_items(self, hotel, stocktake, commands):
+        """
+        Stock item for each command.
+
+        A command from a preview carries the matched item_id; otherwise the
+        item_identifier is matched within the stocktake (all commands in one
+        batched matcher call), then by SKU / name across the hotel.
+
+        Raises:
+            _CommandRejected: a malformed command, or no item found (with
+                the command's index)
+        """
+        item_ids = []
+        for index, command in enumerate(commands):
+            if not isinstance(command, dict):
+                raise _CommandRejected("Each command must be an object", index=index)
+            item_id = command.get("item_id")
+            if item_id in (None, ""):
+                item_ids.append(None)
+                continue
+            try:
+                item_ids.append(int(item_id))
+            except (TypeError, ValueError):
+                raise _CommandRejected(
+                    f"Invalid item_id '{item_id}'.", index=index
+                ) from None
+        by_id = StockItem.objects.filter(hotel=hotel).in_bulk(
+            {item_id for item_id in item_ids if item_id is not None}
+        )
+
+        identifiers = [
+            None if item_id is not None else (command.get("item_identifier") or "").strip()
+            for command, item_id in zip(commands, item_ids)
+        ]
+        matches = find_best_matches(
+            [identifier or "" for identifier in identifiers],
+            stocktake=stocktake,
+            min_score=getattr(settings, "VOICE_COMMAND_MIN_SCORE", 0.7),
+        )
+
+        stock_items = []
+        for index, (item_id, identifier, match) in enumerate(
+            zip(item_ids, identifiers, matches)
+        ):
+            if identifier is None:
+                stock_item = by_id.get(item_id)
+                if not stock_item:
+                    raise _CommandRejected(
+                        f"Stock item {item_id} not found.",
+                        status.HTTP_404_NOT_FOUND,
+                        index,
+                    )
+            elif not identifier:
+                raise _CommandRejected("Command missing item identifier", index=index)
+            elif match:
+                stock_item = match["item"]
+            else:
+                stock_item = StockItem.objects.filter(
+                    hotel=hotel,
+                    active=True,
+                ).filter(
+                    Q(sku__iexact=identifier)
+                    | Q(name__iexact=identifier)
+                    | Q(sku__icontains=identifier)
+                    | Q(name__icontains=identifier)
+                ).first()
+                if not stock_item:
+                    raise _CommandRejected(
+                        f"No matching item found for '{identifier}'.",
+                        status.HTTP_404_NOT_FOUND,
+                        index,
+                    )
+            stock_items.append(stock_item)
+        return stock_items
+
+    def _apply_command(self, request, stocktake, stock_item, command):
+        """Apply one confirmed command to its stocktake line; (line, message)."""
         line, created = StocktakeLine.objects.get_or_create(
             stocktake=stocktake,
             item=stock_item,
@@ -236,12 +405,14 @@ class VoiceCommandConfirmView(APIView):
         )
 
         if action == "count":
+            # Decimals, as the fields are: the serializer reads the saved
+            # instance and JSON gives floats
             if full_units is not None and partial_units is not None:
-                line.counted_full_units = full_units
-                line.counted_partial_units = partial_units
+                line.counted_full_units = Decimal(str(full_units))
+                line.counted_partial_units = Decimal(str(partial_units))
             else:
-                line.counted_full_units = value
-                line.counted_partial_units = 0
+                line.counted_full_units = Decimal(str(value))
+                line.counted_partial_units = Decimal("0")
             line.save()
             message = f"Counted {stock_item.name}"
 
@@ -255,21 +426,14 @@ class VoiceCommandConfirmView(APIView):
                     value,
                 )
             except VoiceCommandError as exc:
-                return Response(
-                    {"success": False, "error": str(exc)},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
+                raise _CommandRejected(str(exc)) from exc
             line.refresh_from_db()
         else:
-            return Response(
-                {"success": False, "error": f"Unknown action '{action}'"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+            raise _CommandRejected(f"Unknown action '{action}'")
 
-        from stock_tracker.stock_serializers import StocktakeLineSerializer
-
-        serializer = StocktakeLineSerializer(line)
+        return line, message
 
+    def _broadcast(self, hotel_identifier, stocktake, line, stock_item, line_data):
         from stock_tracker.pusher_utils import broadcast_line_counted_updated
 
         try:
@@ -279,23 +443,12 @@ class VoiceCommandConfirmView(APIView):
                 {
                     "line_id": line.id,
                     "item_sku": stock_item.sku,
-                    "line": serializer.data,
+                    "line": line_data,
                 },
             )
         except Exception as exc:
             logger.warning("Pusher broadcast failed: %s", exc)
 
-        return Response(
-            {
-                "success": True,
-                "line": serializer.data,
-                "message": message,
-                "item_name": stock_item.name,
-                "item_sku": stock_item.sku,
-            },
-            status=status.HTTP_200_OK,
-        )
-
     def _apply_movement(
         self,
         request,
@@ -1,12 +1,12 @@
 """High-level orchestration for voice command processing."""
 
 import logging
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 from django.db.models import QuerySet
 
-from .command_parser import parse_voice_command
-from .fuzzy_matcher import find_best_match, find_best_match_in_stocktake
+from .command_parser import parse_voice_command, parse_voice_commands
+from .fuzzy_matcher import find_best_match, find_best_match_in_stocktake, find_best_matches
 from .llm_reasoner import LLMUnavailable, pick_best_match, repair_transcription
 from .transcription import TranscriptionError, transcribe_audio
 from .unit_interpreter import interpret_messy_unit_phrase
@@ -117,6 +117,78 @@ def _match_items(
     return None
 
 
+def _format_number(value) -> str:
+    return f"{value:g}" if isinstance(value, (int, float)) else str(value)
+
+
+def _preview_line(number: int, entry: Dict) -> str:
+    if entry.get("error"):
+        return f"{number}. ⚠ {entry['text']} ({entry['error']})"
+    command = entry["command"]
+    match = entry.get("match")
+    item_name = match["item"].name if match else f"? {command.get('item_identifier')}"
+    if command.get("full_units") is not None and command.get("partial_units") is not None:
+        quantity = (
+            f"{_format_number(command['full_units'])} full + "
+            f"{_format_number(command['partial_units'])}"
+        )
+    else:
+        quantity = _format_number(command.get("value"))
+    return f"{number}. {command['action'].title()} {item_name}: {quantity}"
+
+
+def _process_batch(
+    transcription: str,
+    cleaned_text: str,
+    *,
+    stocktake=None,
+    items: Optional[QuerySet] = None,
+    min_match_score: float = 0.55,
+    use_llm: bool = False,
+    domain_hint: Optional[str] = None,
+) -> Dict:
+    """Split, parse and match every command of a longer recording."""
+
+    entries: List[Dict] = parse_voice_commands(cleaned_text)
+    parsed = [entry for entry in entries if "command" in entry]
+    if not parsed:
+        errors = "; ".join(entry["error"] for entry in entries) or "No commands found"
+        raise VoiceCommandError(errors)
+
+    for entry in parsed:
+        entry["unit_details"] = interpret_messy_unit_phrase(entry["text"])
+        _apply_unit_insights(entry["command"], entry["unit_details"])
+
+    # One batched matcher call for every command
+    matches = find_best_matches(
+        [entry["command"].get("item_identifier") for entry in parsed],
+        stocktake=stocktake,
+        items=items,
+        min_score=min_match_score,
+    )
+    for entry, match in zip(parsed, matches):
+        if match is None and use_llm:
+            match = _match_items(
+                entry["command"].get("item_identifier"),
+                stocktake=stocktake,
+                items=items,
+                min_score=min_match_score,
+                use_llm=True,
+                transcription=entry["text"],
+                domain_hint=domain_hint,
+            )
+        entry["match"] = match
+
+    return {
+        "transcription": transcription,
+        "cleaned_transcription": cleaned_text,
+        "commands": entries,
+        "preview": "\n".join(
+            _preview_line(number, entry) for number, entry in enumerate(entries, start=1)
+        ),
+    }
+
+
 def process_audio_command(
     audio_file,
     *,
@@ -125,8 +197,16 @@ def process_audio_command(
     min_match_score: float = 0.55,
     use_llm: bool = False,
     domain_hint: Optional[str] = None,
+    batch: bool = False,
 ) -> Dict:
-    """Run the full voice command pipeline and return structured output."""
+    """
+    Run the full voice command pipeline and return structured output.
+
+    With batch=True the recording may hold several commands ("guinness
+    three kegs, heineken two cases"); the result then has a "commands" list
+    (text, command, unit_details, match, or error per segment) and a
+    multi-line "preview" instead of a single command / match.
+    """
 
     try:
         transcription = transcribe_audio(audio_file)
@@ -143,6 +223,17 @@ def process_audio_command(
         except LLMUnavailable:
             cleaned_text = transcription
 
+    if batch:
+        return _process_batch(
+            transcription,
+            cleaned_text,
+            stocktake=stocktake,
+            items=items,
+            min_match_score=min_match_score,
+            use_llm=use_llm,
+            domain_hint=domain_hint,
+        )
+
     try:
         parsed_command = parse_voice_command(cleaned_text)
     except ValueError as exc: